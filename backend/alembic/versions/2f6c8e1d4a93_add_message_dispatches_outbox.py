@@ -0,0 +1,67 @@
+"""add message_dispatches outbox
+
+Outgoing messages get a dispatch row written in the same transaction; the
+outbox relay in the response sender publishes committed rows to the delivery
+queue (replacing enqueue-before-commit).
+
+Revision ID: 2f6c8e1d4a93
+Revises: 9d3a6f5c1b84
+Create Date: 2026-10-19 00:37:45.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2f6c8e1d4a93"
+down_revision: Union[str, None] = "9d3a6f5c1b84"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "message_dispatches",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("message_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("account_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("queue_name", sa.String(length=100), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column(
+            "publish_attempts", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column("published_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_message_dispatches_unpublished",
+        "message_dispatches",
+        ["created_at"],
+        postgresql_where=sa.text("published_at IS NULL"),
+    )
+    op.create_index(
+        "ix_message_dispatches_published_at", "message_dispatches", ["published_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_message_dispatches_published_at", table_name="message_dispatches")
+    op.drop_index("ix_message_dispatches_unpublished", table_name="message_dispatches")
+    op.drop_table("message_dispatches")
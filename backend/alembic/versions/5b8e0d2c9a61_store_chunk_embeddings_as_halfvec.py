@@ -0,0 +1,73 @@
+"""store knowledge_chunks.embedding as halfvec
+
+Halves the table and the HNSW index (float16 instead of float32). The
+float32 values are not kept: every distance, including the rerank after the
+optional hamming pre-filter, is computed on halfvec. The binary-quantized
+index for that pre-filter is not part of the schema: it is built on demand
+with scripts/binary_quantized_index.py. Requires pgvector >= 0.7.
+
+The column change rewrites the table under an exclusive lock, so the indexes
+are rebuilt in the same transaction; run it in a maintenance window.
+
+Revision ID: 5b8e0d2c9a61
+Revises: c3f58a7d1e42
+Create Date: 2026-10-18 21:58:40.118237
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b8e0d2c9a61"
+down_revision: Union[str, None] = "c3f58a7d1e42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_DIMENSION = 1536
+
+
+def upgrade() -> None:
+    op.drop_index(
+        "ix_knowledge_chunks_embedding", table_name="knowledge_chunks", if_exists=True
+    )
+    op.execute(
+        f"ALTER TABLE knowledge_chunks ALTER COLUMN embedding "
+        f"TYPE halfvec({EMBEDDING_DIMENSION}) "
+        f"USING embedding::halfvec({EMBEDDING_DIMENSION})"
+    )
+    op.create_index(
+        "ix_knowledge_chunks_embedding",
+        "knowledge_chunks",
+        ["embedding"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_ops={"embedding": "halfvec_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_knowledge_chunks_embedding", table_name="knowledge_chunks", if_exists=True
+    )
+    # Built outside the migrations (scripts/binary_quantized_index.py) on halfvec
+    op.drop_index(
+        "ix_knowledge_chunks_embedding_bq",
+        table_name="knowledge_chunks",
+        if_exists=True,
+    )
+    op.execute(
+        f"ALTER TABLE knowledge_chunks ALTER COLUMN embedding "
+        f"TYPE vector({EMBEDDING_DIMENSION}) "
+        f"USING embedding::vector({EMBEDDING_DIMENSION})"
+    )
+    op.create_index(
+        "ix_knowledge_chunks_embedding",
+        "knowledge_chunks",
+        ["embedding"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    )
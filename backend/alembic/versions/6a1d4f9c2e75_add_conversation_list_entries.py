@@ -0,0 +1,150 @@
+"""add conversation_list_entries read model
+
+Denormalized conversation list maintained by a trigger on conversations,
+served with keyset pagination and a delta ("changes since version") endpoint.
+Backfilled from the existing non-simulation conversations.
+
+Revision ID: 6a1d4f9c2e75
+Revises: b58e2a7c3f16
+Create Date: 2026-10-19 01:48:02.417395
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6a1d4f9c2e75"
+down_revision: Union[str, None] = "b58e2a7c3f16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION sync_conversation_list_entry() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE conversation_list_entries
+        SET deleted = true, version = pg_current_xact_id()::text::bigint
+        WHERE conversation_id = OLD.id;
+        RETURN OLD;
+    END IF;
+    IF NEW.is_simulation THEN
+        RETURN NEW;
+    END IF;
+    INSERT INTO conversation_list_entries AS e (
+        conversation_id, account_id, inbox_id, status, unread_agent_count,
+        is_bot_active, contact_name, phone_number, profile_picture_url,
+        last_message, last_message_at, updated_at, deleted, version
+    ) VALUES (
+        NEW.id, NEW.account_id, NEW.inbox_id, NEW.status::text,
+        NEW.unread_agent_count, NEW.is_bot_active,
+        NEW.additional_attributes->>'contact_name',
+        NEW.additional_attributes->>'phone_number',
+        NEW.additional_attributes->>'profile_picture_url',
+        NEW.additional_attributes->'last_message',
+        NEW.last_message_at, NEW.updated_at, false,
+        pg_current_xact_id()::text::bigint
+    )
+    ON CONFLICT (conversation_id) DO UPDATE SET
+        inbox_id = EXCLUDED.inbox_id,
+        status = EXCLUDED.status,
+        unread_agent_count = EXCLUDED.unread_agent_count,
+        is_bot_active = EXCLUDED.is_bot_active,
+        contact_name = EXCLUDED.contact_name,
+        phone_number = EXCLUDED.phone_number,
+        profile_picture_url = EXCLUDED.profile_picture_url,
+        last_message = EXCLUDED.last_message,
+        last_message_at = EXCLUDED.last_message_at,
+        updated_at = EXCLUDED.updated_at,
+        deleted = false,
+        version = EXCLUDED.version;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "conversation_list_entries",
+        sa.Column("conversation_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("account_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("inbox_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column(
+            "unread_agent_count", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "is_bot_active", sa.Boolean(), server_default=sa.false(), nullable=False
+        ),
+        sa.Column("contact_name", sa.String(length=255), nullable=True),
+        sa.Column("phone_number", sa.String(length=255), nullable=True),
+        sa.Column("profile_picture_url", sa.String(), nullable=True),
+        sa.Column(
+            "last_message", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+        sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("deleted", sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("conversation_id"),
+    )
+    op.create_index(
+        "ix_conversation_list_entries_account_updated",
+        "conversation_list_entries",
+        ["account_id", sa.text("updated_at DESC"), sa.text("conversation_id DESC")],
+    )
+    op.create_index(
+        "ix_conversation_list_entries_account_version",
+        "conversation_list_entries",
+        ["account_id", "version", "conversation_id"],
+    )
+
+    op.execute(SYNC_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER conversations_sync_list_entry "
+        "AFTER INSERT OR UPDATE OR DELETE ON conversations "
+        "FOR EACH ROW EXECUTE FUNCTION sync_conversation_list_entry()"
+    )
+
+    # Backfill (in the same transaction as the trigger creation, so nothing is missed)
+    op.execute(
+        """
+        INSERT INTO conversation_list_entries (
+            conversation_id, account_id, inbox_id, status, unread_agent_count,
+            is_bot_active, contact_name, phone_number, profile_picture_url,
+            last_message, last_message_at, updated_at, deleted, version
+        )
+        SELECT
+            c.id, c.account_id, c.inbox_id, c.status::text, c.unread_agent_count,
+            c.is_bot_active,
+            c.additional_attributes->>'contact_name',
+            c.additional_attributes->>'phone_number',
+            c.additional_attributes->>'profile_picture_url',
+            c.additional_attributes->'last_message',
+            c.last_message_at, c.updated_at, false,
+            pg_current_xact_id()::text::bigint
+        FROM conversations c
+        WHERE NOT c.is_simulation
+        ON CONFLICT (conversation_id) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS conversations_sync_list_entry ON conversations")
+    op.execute("DROP FUNCTION IF EXISTS sync_conversation_list_entry()")
+    op.drop_index(
+        "ix_conversation_list_entries_account_version",
+        table_name="conversation_list_entries",
+    )
+    op.drop_index(
+        "ix_conversation_list_entries_account_updated",
+        table_name="conversation_list_entries",
+    )
+    op.drop_table("conversation_list_entries")
@@ -0,0 +1,44 @@
+"""add content_hash to knowledge_chunks
+
+Revision ID: 7c2e4f1a9b3d
+Revises: 55651831bd92
+Create Date: 2026-10-18 10:12:41.503118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e4f1a9b3d"
+down_revision: Union[str, None] = "55651831bd92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "knowledge_chunks",
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+    )
+    # Backfill with the same digest computed by the ingestion service
+    # (sha256 of the UTF-8 chunk text), so existing documents re-ingest incrementally.
+    op.execute(
+        "UPDATE knowledge_chunks "
+        "SET content_hash = encode(sha256(convert_to(chunk_text, 'UTF8')), 'hex') "
+        "WHERE content_hash IS NULL"
+    )
+    op.create_index(
+        "ix_chunk_document_id_content_hash",
+        "knowledge_chunks",
+        ["document_id", "content_hash"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chunk_document_id_content_hash", table_name="knowledge_chunks")
+    op.drop_column("knowledge_chunks", "content_hash")
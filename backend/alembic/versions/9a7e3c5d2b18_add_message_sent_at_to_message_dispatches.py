@@ -0,0 +1,35 @@
+"""add message_sent_at to message_dispatches
+
+messages is partitioned by sent_at, so the dispatch carries the message's
+sent_at next to its id and the response sender looks the message up by
+(id, sent_at) in a single partition. Existing rows keep a null value and
+are looked up by id alone.
+
+Revision ID: 9a7e3c5d2b18
+Revises: 6a1d4f9c2e75
+Create Date: 2026-10-19 10:03:51.627480
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a7e3c5d2b18"
+down_revision: Union[str, None] = "6a1d4f9c2e75"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "message_dispatches",
+        sa.Column("message_sent_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("message_dispatches", "message_sent_at")
@@ -0,0 +1,53 @@
+"""unique message source id per inbox
+
+Replaces the plain (inbox_id, source_id) index with a partial unique one so
+message creation can be a single INSERT ... ON CONFLICT DO NOTHING. messages
+is partitioned on sent_at and a unique index on a partitioned table must
+include the partition key, hence (inbox_id, source_id, sent_at): sent_at is
+the provider timestamp, which is the same on every redelivery.
+
+Existing duplicates (same inbox, source id and timestamp) are removed first,
+keeping the oldest row.
+
+Revision ID: 9d3a6f5c1b84
+Revises: e71b9c4d2a58
+Create Date: 2026-10-18 23:52:16.204318
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d3a6f5c1b84"
+down_revision: Union[str, None] = "e71b9c4d2a58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "DELETE FROM messages m USING messages d "
+        "WHERE m.source_id IS NOT NULL "
+        "AND m.inbox_id = d.inbox_id AND m.source_id = d.source_id "
+        "AND m.sent_at = d.sent_at "
+        "AND (m.created_at, m.id) > (d.created_at, d.id)"
+    )
+    op.create_index(
+        "ux_messages_inbox_id_source_id_sent_at",
+        "messages",
+        ["inbox_id", "source_id", "sent_at"],
+        unique=True,
+        postgresql_where=sa.text("source_id IS NOT NULL"),
+    )
+    op.drop_index("ix_messages_inbox_id_source_id", table_name="messages")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_messages_inbox_id_source_id", "messages", ["inbox_id", "source_id"]
+    )
+    op.drop_index("ux_messages_inbox_id_source_id_sent_at", table_name="messages")
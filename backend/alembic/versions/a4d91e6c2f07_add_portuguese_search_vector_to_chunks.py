@@ -0,0 +1,48 @@
+"""add portuguese search_vector to knowledge_chunks
+
+Revision ID: a4d91e6c2f07
+Revises: 7c2e4f1a9b3d
+Create Date: 2026-10-18 14:37:05.281904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d91e6c2f07"
+down_revision: Union[str, None] = "7c2e4f1a9b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "knowledge_chunks",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('portuguese', chunk_text)", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_knowledge_chunks_search_vector",
+        "knowledge_chunks",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_knowledge_chunks_search_vector",
+        table_name="knowledge_chunks",
+        postgresql_using="gin",
+    )
+    op.drop_column("knowledge_chunks", "search_vector")
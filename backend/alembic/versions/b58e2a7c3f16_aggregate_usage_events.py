@@ -0,0 +1,65 @@
+"""aggregate usage events per bucket
+
+Usage is now counted in Redis and persisted as one usage_events row per
+(customer, meter, hour bucket), identified by usage_key. Unreported legacy
+per-message rows are folded into such aggregates here (their usage_key ends
+in ":legacy"); reported rows are left as they are.
+
+Revision ID: b58e2a7c3f16
+Revises: 2f6c8e1d4a93
+Create Date: 2026-10-19 01:26:03.447591
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b58e2a7c3f16"
+down_revision: Union[str, None] = "2f6c8e1d4a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "usage_events",
+        sa.Column(
+            "usage_key",
+            sa.String(length=255),
+            nullable=True,
+            comment="customer:meter:bucket:flush id; Stripe meter event identifier",
+        ),
+    )
+    op.create_unique_constraint(
+        "usage_events_usage_key_key", "usage_events", ["usage_key"]
+    )
+
+    op.execute(
+        """
+        WITH legacy AS (
+            DELETE FROM usage_events
+            WHERE reported_to_stripe_at IS NULL AND usage_key IS NULL
+            RETURNING account_id, stripe_customer_id, meter_event_name, quantity,
+                      date_trunc('hour', event_timestamp) AS bucket
+        )
+        INSERT INTO usage_events (
+            id, account_id, stripe_customer_id, meter_event_name, quantity,
+            event_timestamp, usage_key
+        )
+        SELECT gen_random_uuid(), account_id, stripe_customer_id, meter_event_name,
+               sum(quantity), bucket,
+               stripe_customer_id || ':' || meter_event_name || ':'
+                   || extract(epoch FROM bucket)::bigint || ':legacy'
+        FROM legacy
+        GROUP BY account_id, stripe_customer_id, meter_event_name, bucket
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("usage_events_usage_key_key", "usage_events", type_="unique")
+    op.drop_column("usage_events", "usage_key")
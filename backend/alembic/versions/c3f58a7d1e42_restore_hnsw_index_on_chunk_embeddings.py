@@ -0,0 +1,47 @@
+"""restore hnsw index on knowledge_chunks.embedding
+
+The index created with the table was dropped by an autogenerated revision
+(9f36e4892390) because the model did not declare it; it is now declared on
+KnowledgeChunk so autogenerate keeps it.
+
+Revision ID: c3f58a7d1e42
+Revises: a4d91e6c2f07
+Create Date: 2026-10-18 17:02:19.664310
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f58a7d1e42"
+down_revision: Union[str, None] = "a4d91e6c2f07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_knowledge_chunks_embedding",
+            "knowledge_chunks",
+            ["embedding"],
+            unique=False,
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_knowledge_chunks_embedding",
+            table_name="knowledge_chunks",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
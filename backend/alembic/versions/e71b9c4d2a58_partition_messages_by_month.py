@@ -0,0 +1,199 @@
+"""partition messages by month on sent_at
+
+Builds a range-partitioned copy of messages (one partition per month of
+existing data up to three months ahead, plus messages_default), keeps it in
+sync with a trigger while the existing rows are copied month by month (one
+transaction per month), then swaps the tables under a short exclusive lock.
+
+The nine single-column indexes are replaced by composite ones on the real
+access paths: (conversation_id, sent_at), (account_id, sent_at) and
+(inbox_id, source_id). sent_at becomes NOT NULL (legacy NULLs take
+created_at) and part of the primary key, as the partition key must be.
+
+The downgrade copies the data back into an unpartitioned table while holding
+an exclusive lock (offline).
+
+Revision ID: e71b9c4d2a58
+Revises: 5b8e0d2c9a61
+Create Date: 2026-10-18 22:41:07.530914
+
+"""
+
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e71b9c4d2a58"
+down_revision: Union[str, None] = "5b8e0d2c9a61"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+FOREIGN_KEYS = {
+    "account_id": "accounts",
+    "inbox_id": "inboxes",
+    "conversation_id": "conversations",
+    "user_id": "users",
+    "bot_agent_id": "bot_agents",
+    "contact_id": "contacts",
+}
+
+LEGACY_INDEXES = {
+    "idx_messages_account_id_index": "account_id",
+    "idx_messages_inbox_id_index": "inbox_id",
+    "idx_messages_conversation_id_index": "conversation_id",
+    "idx_messages_user_id_index": "user_id",
+    "idx_messages_bot_agent_id_index": "bot_agent_id",
+    "idx_messages_source_id_index": "source_id",
+    "idx_messages_contact_id_index": "contact_id",
+    "idx_messages_sent_at_index": "sent_at",
+    "ix_messages_is_simulation": "is_simulation",
+}
+
+MIRROR_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION messages_mirror_to_partitioned() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM messages_partitioned WHERE id = OLD.id;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    NEW.sent_at := COALESCE(NEW.sent_at, NEW.created_at, now());
+    INSERT INTO messages_partitioned SELECT (NEW).* ON CONFLICT DO NOTHING;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partition(table: str, month: date) -> None:
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS messages_p{month:%Y_%m} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00:00+00') "
+        f"TO ('{_add_months(month, 1):%Y-%m-%d} 00:00:00+00')"
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    today = date.today().replace(day=1)
+    first_month = bind.execute(
+        sa.text(
+            "SELECT date_trunc('month', min(COALESCE(sent_at, created_at)) "
+            "AT TIME ZONE 'UTC')::date FROM messages"
+        )
+    ).scalar() or today
+    last_month = _add_months(today, MONTHS_AHEAD)
+
+    # 1. Partitioned copy (same columns and defaults), its partitions and indexes.
+    op.execute(
+        "CREATE TABLE messages_partitioned (LIKE messages INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (sent_at)"
+    )
+    op.execute(
+        "ALTER TABLE messages_partitioned "
+        "ALTER COLUMN sent_at SET DEFAULT now(), "
+        "ALTER COLUMN sent_at SET NOT NULL, "
+        "ADD CONSTRAINT messages_partitioned_pkey PRIMARY KEY (id, sent_at)"
+    )
+    for column, referred in FOREIGN_KEYS.items():
+        op.execute(
+            f"ALTER TABLE messages_partitioned ADD CONSTRAINT messages_{column}_fkey "
+            f"FOREIGN KEY ({column}) REFERENCES {referred} (id)"
+        )
+    month = first_month
+    while month <= last_month:
+        _create_month_partition("messages_partitioned", month)
+        month = _add_months(month, 1)
+    op.execute("CREATE TABLE messages_default PARTITION OF messages_partitioned DEFAULT")
+    op.create_index(
+        "ix_messages_conversation_id_sent_at",
+        "messages_partitioned",
+        ["conversation_id", "sent_at"],
+    )
+    op.create_index(
+        "ix_messages_account_id_sent_at", "messages_partitioned", ["account_id", "sent_at"]
+    )
+    op.create_index(
+        "ix_messages_inbox_id_source_id", "messages_partitioned", ["inbox_id", "source_id"]
+    )
+    op.execute(
+        "CREATE INDEX ix_messages_partitioned_content_gin_trgm ON messages_partitioned "
+        "USING gin (content gin_trgm_ops)"
+    )
+
+    # 2. Keep the copy in sync with new writes while the backfill runs.
+    op.execute(MIRROR_FUNCTION_SQL)
+    op.execute(
+        "CREATE TRIGGER messages_mirror_to_partitioned "
+        "BEFORE INSERT OR UPDATE OR DELETE ON messages "
+        "FOR EACH ROW EXECUTE FUNCTION messages_mirror_to_partitioned()"
+    )
+
+    # 3. Backfill one month per transaction (the trigger is live from here on).
+    with op.get_context().autocommit_block():
+        op.execute(
+            "UPDATE messages SET sent_at = created_at WHERE sent_at IS NULL"
+        )
+        month = first_month
+        while month <= last_month:
+            op.execute(
+                f"INSERT INTO messages_partitioned SELECT * FROM messages "
+                f"WHERE sent_at >= '{month:%Y-%m-%d} 00:00:00+00' "
+                f"AND sent_at < '{_add_months(month, 1):%Y-%m-%d} 00:00:00+00' "
+                f"ON CONFLICT DO NOTHING"
+            )
+            month = _add_months(month, 1)
+        # Anything outside the range (e.g. dates far in the future) -> default partition.
+        op.execute(
+            f"INSERT INTO messages_partitioned SELECT * FROM messages "
+            f"WHERE sent_at < '{first_month:%Y-%m-%d} 00:00:00+00' "
+            f"OR sent_at >= '{_add_months(last_month, 1):%Y-%m-%d} 00:00:00+00' "
+            f"ON CONFLICT DO NOTHING"
+        )
+
+    # 4. Swap (migration transaction: short exclusive lock, no data copied here).
+    op.execute("LOCK TABLE messages IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER messages_mirror_to_partitioned ON messages")
+    op.execute("DROP FUNCTION messages_mirror_to_partitioned()")
+    op.execute("DROP TABLE messages")
+    op.execute("ALTER TABLE messages_partitioned RENAME TO messages")
+    op.execute(
+        "ALTER TABLE messages RENAME CONSTRAINT messages_partitioned_pkey TO messages_pkey"
+    )
+    op.execute(
+        "ALTER INDEX ix_messages_partitioned_content_gin_trgm "
+        "RENAME TO ix_messages_content_gin_trgm"
+    )
+
+
+def downgrade() -> None:
+    op.execute("LOCK TABLE messages IN ACCESS EXCLUSIVE MODE")
+    op.execute("CREATE TABLE messages_unpartitioned (LIKE messages INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO messages_unpartitioned SELECT * FROM messages")
+    op.execute("DROP TABLE messages CASCADE")
+    op.execute("ALTER TABLE messages_unpartitioned RENAME TO messages")
+    op.execute("ALTER TABLE messages ALTER COLUMN sent_at DROP NOT NULL")
+    op.execute("ALTER TABLE messages ALTER COLUMN sent_at DROP DEFAULT")
+    op.create_primary_key("messages_pkey", "messages", ["id"])
+    for column, referred in FOREIGN_KEYS.items():
+        op.create_foreign_key(
+            f"messages_{column}_fkey", "messages", referred, [column], ["id"]
+        )
+    for index_name, column in LEGACY_INDEXES.items():
+        op.create_index(index_name, "messages", [column])
+    op.execute(
+        "CREATE INDEX ix_messages_content_gin_trgm ON messages "
+        "USING gin (content gin_trgm_ops)"
+    )
@@ -12,15 +12,19 @@ from app.api.schemas.conversation import (
     StartConversationResponse,
     StartConversationRequest,
     ConversationUpdateStatus,
+    ConversationListPage,
+    ConversationListChanges,
 )
 from app.services.repository import contact as contact_repo
 from app.services.repository import conversation as conversation_repo
+from app.services.repository import conversation_list as conversation_list_repo
 from app.services.repository import inbox as inbox_repo
 from app.models.conversation import Conversation, ConversationStatusEnum
 from app.services.helper.websocket import publish_to_account_conversations_ws
 from app.services.helper.conversation import (
     conversations_to_conversations_response,
     parse_conversation_to_conversation_response,
+    list_entry_to_conversation_response,
 )
 from app.api.schemas.contact import ContactCreate
 from app.services.helper.contact import normalize_phone_number
@@ -29,6 +33,122 @@ from app.services.helper.contact import normalize_phone_number
 router = APIRouter()
 
 
+@router.get(
+    "/conversation-list",
+    response_model=ConversationListPage,
+    summary="Conversation List (cursor)",
+    description=(
+        "Pages through the conversation list, most recently updated first. "
+        "The returned `since` token feeds `/conversation-list/changes`."
+    ),
+)
+async def get_conversation_list(
+    cursor: Optional[str] = Query(
+        None, description="`next_cursor` of the previous page"
+    ),
+    limit: int = Query(50, ge=1, le=200),
+    status_filter: Optional[List[ConversationStatusEnum]] = Query(
+        None, alias="status", description="Statuses to include"
+    ),
+    has_unread: Optional[bool] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    auth_context: AuthContext = Depends(get_auth_context),
+):
+    """
+    Serves the inbox from the conversation list read model (keyset pagination).
+    """
+    try:
+        page_cursor = (
+            conversation_list_repo.decode_page_cursor(cursor) if cursor else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    inbox_ids = await conversation_list_repo.find_user_inbox_ids(
+        db, auth_context.user.id
+    )
+    # Taken before reading the page: anything the page misses is a later change
+    since_version = await conversation_list_repo.current_version(db)
+    entries = await conversation_list_repo.list_entries(
+        db=db,
+        account_id=auth_context.account.id,
+        inbox_ids=inbox_ids,
+        limit=limit,
+        cursor=page_cursor,
+        status=status_filter,
+        has_unread=has_unread,
+    )
+
+    next_cursor = None
+    if len(entries) == limit:
+        last = entries[-1]
+        next_cursor = conversation_list_repo.encode_page_cursor(
+            last.updated_at, last.conversation_id
+        )
+    return ConversationListPage(
+        items=[list_entry_to_conversation_response(entry) for entry in entries],
+        next_cursor=next_cursor,
+        since=conversation_list_repo.encode_since(since_version),
+    )
+
+
+@router.get(
+    "/conversation-list/changes",
+    response_model=ConversationListChanges,
+    summary="Conversation List Changes",
+    description=(
+        "Returns the conversations created, updated or deleted since the `since` "
+        "token of a previous list page or changes call."
+    ),
+)
+async def get_conversation_list_changes(
+    since: str = Query(..., description="Sync token from a previous response"),
+    limit: int = Query(200, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    auth_context: AuthContext = Depends(get_auth_context),
+):
+    """
+    Delta sync of the conversation list: only the entries whose version moved.
+    """
+    try:
+        since_version, after_id = conversation_list_repo.decode_since(since)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    inbox_ids = await conversation_list_repo.find_user_inbox_ids(
+        db, auth_context.user.id
+    )
+    until_version = await conversation_list_repo.current_version(db)
+    entries = await conversation_list_repo.list_changes(
+        db=db,
+        account_id=auth_context.account.id,
+        inbox_ids=inbox_ids,
+        since_version=since_version,
+        until_version=until_version,
+        after_id=after_id,
+        limit=limit,
+    )
+
+    has_more = len(entries) == limit
+    if has_more:
+        last = entries[-1]
+        next_since = conversation_list_repo.encode_since(
+            last.version, last.conversation_id
+        )
+    else:
+        next_since = conversation_list_repo.encode_since(until_version)
+    return ConversationListChanges(
+        items=[
+            list_entry_to_conversation_response(entry)
+            for entry in entries
+            if not entry.deleted
+        ],
+        deleted_ids=[entry.conversation_id for entry in entries if entry.deleted],
+        since=next_since,
+        has_more=has_more,
+    )
+
+
 @router.get(
     "/conversations/{conversation_id}",
     response_model=ConversationSearchResult,
@@ -117,16 +237,18 @@ async def search_or_list_conversations(
             )
             return conversations
         else:
-            conversations = await conversation_repo.find_conversations_by_user(
+            # --- List Path (read model) ---
+            inbox_ids = await conversation_list_repo.find_user_inbox_ids(db, user_id)
+            entries = await conversation_list_repo.list_entries(
                 db=db,
-                user_id=user_id,
                 account_id=account_id,
+                inbox_ids=inbox_ids,
                 limit=limit,
                 offset=offset,
                 status=status,
                 has_unread=has_unread,
             )
-        return conversations_to_conversations_response(conversations)
+        return [list_entry_to_conversation_response(entry) for entry in entries]
 
     except Exception as e:
         raise HTTPException(
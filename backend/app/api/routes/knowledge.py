@@ -632,6 +632,116 @@ async def list_knowledge_documents(
         ) from e
 
 
+# --- Re-ingest Document Endpoint ---
+@router.post(
+    "/knowledge/documents/{document_id}/reingest",
+    response_model=IngestResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Re-ingest Knowledge Document",
+    description=(
+        "Re-processes a URL or file document. Only chunks whose text changed are "
+        "embedded again; unchanged chunks are kept."
+    ),
+    responses={
+        status.HTTP_404_NOT_FOUND: {"description": "Document not found"},
+        status.HTTP_400_BAD_REQUEST: {"description": "Document cannot be re-ingested"},
+    },
+)
+async def reingest_knowledge_document(
+    document_id: UUID,
+    recursive: bool = Query(
+        False, description="For URL documents, crawl the whole site again."
+    ),
+    auth_context: AuthContext = Depends(get_auth_context),
+    arq_pool: ArqRedis = Depends(get_arq_pool),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Enqueues the ingestion task again for an existing document.
+    """
+    account_id: UUID = auth_context.account.id
+    logger.info(f"Received re-ingestion request for document {document_id}")
+
+    if not DOCUMENT_REPO_AVAILABLE or not knowledge_document_repo:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Document repository unavailable.",
+        )
+    if not arq_pool:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Task queue unavailable.",
+        )
+
+    document = await knowledge_document_repo.get_document_by_id(db, document_id)
+    if not document or document.account_id != account_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Document not found."
+        )
+    if document.source_type not in ("url", "file"):
+        # Raw text is not stored on the document; it must be added again.
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only URL and file documents can be re-ingested.",
+        )
+    if document.status in (DocumentStatus.PENDING, DocumentStatus.PROCESSING):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Document is already being processed.",
+        )
+
+    source_identifier = document.original_filename or document.source_uri
+    try:
+        await knowledge_document_repo.update_document_status(
+            db, document_id=document_id, status=DocumentStatus.PENDING
+        )
+        await db.commit()
+
+        await wake_worker(settings.BATCH_WORKER_INTERNAL_URL)
+        job = await arq_pool.enqueue_job(
+            KNOWLEDGE_TASK_NAME,
+            account_id=account_id,
+            source_type=document.source_type,
+            source_uri=document.source_uri,
+            source_identifier=source_identifier,
+            document_id=document_id,
+            recursive=recursive,
+            _queue_name=BATCH_ARQ_QUEUE_NAME,
+        )
+        if not job:
+            raise RuntimeError("arq_pool.enqueue_job returned None.")
+
+        logger.info(
+            f"Enqueued knowledge re-ingestion job '{job.job_id}' for document {document_id}."
+        )
+        return IngestResponse(
+            document_id=document_id,
+            job_id=job.job_id,
+            message=f"'{source_identifier}' re-ingestion task queued.",
+        )
+    except (ArqConnectionError, EnqueueTimeout, RuntimeError, Exception) as q_err:
+        logger.exception(
+            f"Failed to enqueue re-ingestion task for document {document_id}: {q_err}"
+        )
+        try:
+            async with AsyncSessionLocal() as db_fail:
+                await knowledge_document_repo.update_document_status(
+                    db_fail,
+                    document_id=document_id,
+                    status=DocumentStatus.FAILED,
+                    error_message=f"Failed to queue task: {q_err}",
+                )
+                await db_fail.commit()
+        except Exception as db_err:
+            logger.error(
+                f"Failed to update document {document_id} status to FAILED after queue error: {db_err}"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to queue re-ingestion task.",
+        ) from q_err
+
+
 # --- Delete Document Endpoint ---
 @router.delete(
     "/knowledge/documents/{document_id}",
@@ -8,11 +8,11 @@ from loguru import logger
 
 from app.database import get_db
 from app.core.dependencies.auth import get_auth_context, AuthContext
-from app.services.queue.redis_queue import RedisQueue
 from app.api.schemas.message import MessageResponse, MessageCreatePayload, MessageCreate
 from app.models.conversation import Conversation, ConversationStatusEnum
 
 from app.services.repository import message as message_repo
+from app.services.repository import message_dispatch as dispatch_repo
 from app.services.repository import conversation as conversation_repo
 from app.services.helper.conversation import (
     update_last_message_snapshot,
@@ -23,13 +23,11 @@ from app.services.helper.websocket import (
     publish_to_account_conversations_ws,
 )
 
-from app.core.wake_workers import wake_worker
 from app.config import get_settings
 
 settings = get_settings()
 
 router = APIRouter()
-queue = RedisQueue(queue_name="response_queue")
 
 
 @router.get(
@@ -54,6 +52,10 @@ async def get_conversation_messages_paginated(
     after_cursor: Optional[UUID] = Query(
         None, description="Fetch messages newer than this message ID"
     ),
+    cursor_sent_at: Optional[datetime] = Query(
+        None,
+        description="sent_at of the cursor message (saves looking the cursor up)",
+    ),
     db: AsyncSession = Depends(get_db),
     auth_context: AuthContext = Depends(get_auth_context),
 ) -> List[MessageResponse]:
@@ -64,6 +66,7 @@ async def get_conversation_messages_paginated(
         limit (int): Maximum number of messages to return.
         before_cursor (Optional[UUID]): Fetch messages older than this message ID.
         after_cursor (Optional[UUID]): Fetch messages newer than this message ID.
+        cursor_sent_at (Optional[datetime]): sent_at of the cursor message.
         db (AsyncSession): The database session.
         auth_context (AuthContext): Authentication context containing user and account info.
 
@@ -98,6 +101,7 @@ async def get_conversation_messages_paginated(
         limit=limit,
         before_cursor=before_cursor,
         after_cursor=after_cursor,
+        cursor_sent_at=cursor_sent_at,
     )
     return messages
 
@@ -199,6 +203,9 @@ async def create_outgoing_message(
             f"Outgoing message {message.id} created for conversation {conversation_id}."
         )
 
+        # Delivery is recorded in the same transaction (transactional outbox)
+        await dispatch_repo.add_message_dispatch(db, message)
+
         # Variable to hold the latest conversation state after updates
         final_updated_conversation: Conversation = conversation
 
@@ -271,33 +278,9 @@ async def create_outgoing_message(
             detail="Failed to save message or update conversation state.",
         )
 
-    # --- Post-Transaction Operations (Queueing & WebSockets) ---
-    # These happen only if the database operations above were successful (no exception raised)
-    # Enqueue the message ID for the sending worker
-    try:
-        # Ensure queue is connected (ideally handle connection more robustly)
-        if not queue.is_connected:
-            logger.warning(
-                "[queue] Response queue not connected. Attempting to connect..."
-            )
-            await queue.connect()
-            if not queue.is_connected:
-                logger.error(
-                    "[queue] Failed to connect to response queue. Cannot enqueue message."
-                )
-            else:
-                await wake_worker(settings.RESPONSE_SENDER_WORKER_INTERNAL_URL)
-                await queue.enqueue({"message_id": str(message.id)})
-                logger.info(f"[queue] Message {message.id} enqueued for delivery")
-        else:
-            await queue.enqueue({"message_id": str(message.id)})
-            logger.info(f"[queue] Message {message.id} enqueued for delivery")
-
-    except Exception as e:
-        logger.error(
-            f"[queue] Failed to enqueue message {message.id} for delivery: {e}"
-        )
-        # Potentially add a background task to retry enqueueing later
+    # --- Post-Transaction Operations (WebSockets) ---
+    # Delivery needs nothing here: the dispatch recorded above is published to
+    # the response sender by the outbox relay once the request transaction commits.
 
     # Publish WebSocket events
     try:
@@ -371,6 +354,10 @@ async def get_message_context_endpoint(
         le=200,
         description="Number of messages to retrieve after (and including) the target",
     ),
+    sent_at: Optional[datetime] = Query(
+        None,
+        description="sent_at of the target message (limits its lookup to one partition)",
+    ),
     db: AsyncSession = Depends(get_db),
     auth_context: AuthContext = Depends(get_auth_context),
 ) -> List[MessageResponse]:
@@ -381,6 +368,7 @@ async def get_message_context_endpoint(
         message_id (UUID): The ID of the target message.
         limit_before (int): Number of messages to retrieve before the target message.
         limit_after (int): Number of messages to retrieve after (and including) the target message.
+        sent_at (Optional[datetime]): sent_at of the target message, when known.
         db (AsyncSession): The database session.
         auth_context (AuthContext): Authentication context containing user and account info.
 
@@ -399,6 +387,7 @@ async def get_message_context_endpoint(
             account_id=account_id,
             conversation_id=conversation_id,
             target_message_id=message_id,
+            target_sent_at=sent_at,
             limit_before=limit_before,
             limit_after=limit_after,
         )
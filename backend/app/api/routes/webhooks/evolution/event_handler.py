@@ -20,6 +20,8 @@ from app.services.helper.websocket import publish_to_instance_ws
 
 from app.core.arq_manager import get_arq_pool
 from app.core.wake_workers import wake_worker
+from app.core.tracing import new_trace
+from app.core.log import payload as log_payload
 from app.config import get_settings
 
 settings = get_settings()
@@ -149,7 +151,7 @@ async def handle_message(
 
     try:
         logger.debug(
-            f"{log_prefix} Validated Evolution payload: {payload.model_dump_json(indent=2, exclude_none=True)}"
+            "{} Validated Evolution payload: {}", log_prefix, log_payload(payload)
         )
 
         event = payload.event
@@ -185,6 +187,7 @@ async def handle_message(
         await arq_pool.enqueue_job(
             "process_incoming_message_task",  # Name of the ARQ task function
             arq_payload_dict=arq_task_payload.model_dump(),
+            trace_context=new_trace("whatsapp_evolution"),
             _queue_name=settings.MESSAGE_QUEUE_NAME,
         )
 
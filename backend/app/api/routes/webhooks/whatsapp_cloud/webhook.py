@@ -28,6 +28,8 @@ from app.database import get_db
 from app.config import get_settings, Settings
 
 from app.core.wake_workers import wake_worker
+from app.core.tracing import new_trace
+from app.core.log import payload
 
 settings: Settings = get_settings()
 
@@ -110,7 +112,7 @@ async def handle_whatsapp_cloud_webhook(
     # --- 2. Parse and Validate JSON Payload ---
     try:
         payload_dict = json.loads(raw_body.decode("utf-8"))
-        logger.debug(f"Webhook raw payload dict: {payload_dict}")
+        logger.debug("Webhook raw payload dict: {}", payload(payload_dict))
         webhook_data = WhatsAppCloudWebhookPayload.model_validate(payload_dict)
     except json.JSONDecodeError as e:
         logger.error(f"Error parsing webhook JSON body: {e}")
@@ -173,6 +175,7 @@ async def handle_whatsapp_cloud_webhook(
                                 await arq_client.enqueue_job(
                                     "process_incoming_message_task",
                                     arq_payload_dict=arq_task_payload.model_dump(),
+                                    trace_context=new_trace("whatsapp_cloud"),
                                     _queue_name=settings.MESSAGE_QUEUE_NAME,
                                 )
                                 logger.info(
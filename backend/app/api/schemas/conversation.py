@@ -1,6 +1,6 @@
 from uuid import UUID
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 from .contact import ContactBase
@@ -115,3 +115,27 @@ class StartConversationRequest(BaseModel):
 
 class StartConversationResponse(BaseModel):
     conversation_id: UUID
+
+
+class ConversationListPage(BaseModel):
+    items: List[ConversationSearchResult] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(
+        None, description="Opaque cursor of the next page, null on the last page"
+    )
+    since: str = Field(
+        ...,
+        description="Sync token: pass it to /conversation-list/changes to receive what changed after this page was read",
+    )
+
+
+class ConversationListChanges(BaseModel):
+    items: List[ConversationSearchResult] = Field(
+        default_factory=list, description="Conversations created or updated"
+    )
+    deleted_ids: List[UUID] = Field(
+        default_factory=list, description="Conversations removed from the list"
+    )
+    since: str = Field(..., description="Sync token for the next call")
+    has_more: bool = Field(
+        False, description="More changes are ready: call again right away with `since`"
+    )
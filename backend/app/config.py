@@ -55,17 +55,69 @@ class Settings(BaseSettings):
     PRIMARY_LLM_TEMPERATURE: int = 0
     FAST_LLM_MODEL_NAME: str = "gpt-4o-mini"
     FAST_LLM_TEMPERATURE: int = 0
+    # Token streaming for follow-up/integration replies; replies to user
+    # messages are only chunked after validation (see agent_graph.py)
+    AI_REPLY_STREAMING_ENABLED: bool = False
+    AI_REPLY_STREAM_MIN_CHUNK_CHARS: int = 160
+    STAGE_ANALYZER_LLM: str = "primary"  # "primary" | "fast"
+    STAGE_ANALYZER_HEURISTIC_SKIP: bool = False
+    STAGE_ANALYZER_CONCURRENT: bool = False
+    AGENT_CONTEXT_CACHE_MAX_ENTRIES: int = 512
+    CHECKPOINT_KEEP_LAST_PER_THREAD: int = 10
+    # messages is partitioned by month: partitions created ahead / months kept in Postgres
+    MESSAGES_PARTITION_MONTHS_AHEAD: int = 3
+    MESSAGES_RETENTION_MONTHS: int = 24  # 0 = never archive
+    MESSAGES_ARCHIVE_GCS_BUCKET_NAME: Optional[str] = None  # gzipped CSV per archived month
 
     # -- Embbeding --
     EMBEDDING_PROVIDER: str = "openai"
     AZURE_OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
     LOCAL_EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    # Build the provider (and probe it with one embedding) on AI replier startup
+    EMBEDDING_WARMUP_ON_STARTUP: bool = False
+    # Local provider: concurrent requests are batched into one encode
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+
+    # -- Web crawler (researcher / URL ingestion) --
+    CRAWLER_MAX_CONCURRENCY: int = 8
+    CRAWLER_PER_DOMAIN_CONCURRENCY: int = 2
+    CRAWLER_PER_DOMAIN_DELAY_SECONDS: float = 0.25
+    CRAWLER_REQUEST_TIMEOUT_SECONDS: float = 20.0
+    CRAWLER_RESPECT_ROBOTS: bool = True
+    CRAWLER_MAX_PAGES: int = 100
+    CRAWLER_PARSER_PROCESSES: int = 2  # 0 parses in a thread instead
+
+    # -- Knowledge ingestion pipeline --
+    INGESTION_EMBEDDING_CONCURRENCY: int = 4
+    INGESTION_QUEUE_MAX_ITEMS: int = 8  # Per stage; bounds memory in flight
+    INGESTION_EMBEDDING_MAX_RETRIES: int = 5
+    INGESTION_EMBEDDING_BACKOFF_SECONDS: float = 1.0
+    INGESTION_EXTRACTED_CONTENT_MAX_CHARS: int = 1_000_000
+
+    # -- Knowledge retrieval (RAG) --
+    RAG_HYBRID_CANDIDATES: int = 40  # Per side (lexical / vector) before fusion
+    RAG_RRF_K: int = 60
+    KNOWLEDGE_EXISTS_CACHE_TTL_SECONDS: float = 600.0
+    KNOWLEDGE_MISSING_CACHE_TTL_SECONDS: float = 60.0
+    RAG_EXACT_SCAN_MAX_CHUNKS: int = 5000  # Above this, use the HNSW index
+    RAG_HNSW_EF_SEARCH: int = 100
+    RAG_HNSW_ITERATIVE_SCAN: str = "relaxed_order"  # pgvector >= 0.8; "off" otherwise
+    # > 0: take this many candidates from the binary-quantized index, rerank by
+    # halfvec cosine. Build the index first: scripts/binary_quantized_index.py.
+    RAG_BINARY_PREFILTER_CANDIDATES: int = 0
 
     # -- Azure Openai --
     OPENAI_API_VERSION: str = "2025-01-01-preview"
     AZURE_OPENAI_API_KEY: str = "your-secret-key"
     AZURE_OPENAI_ENDPOINT: str = "https://eastus2.api.cognitive.microsoft.com/"
 
+    # -- Inbound routing cache (webhook parsers) --
+    INBOUND_ROUTING_CACHE_TTL_SECONDS: int = 900
+    INBOUND_ROUTING_LOCAL_TTL_SECONDS: float = 5.0
+    INBOUND_ROUTING_LOCAL_MAX_ENTRIES: int = 10000
+    PHONE_NORMALIZATION_CACHE_MAX_ENTRIES: int = 50000  # (raw number, region) -> E.164
+
     # -- Worker queues --
     RESET_MESSAGE_TRIGGER: str = "bot@123"
     RESPONSE_SENDER_QUEUE_NAME: str = "response_queue"
@@ -73,6 +125,11 @@ class Settings(BaseSettings):
     MESSAGE_QUEUE_NAME: str = "message_queue"
     BATCH_ARQ_QUEUE_NAME: str = "batch_queue"
 
+    # -- Outbound message outbox (relay runs in the response sender) --
+    MESSAGE_OUTBOX_BATCH_SIZE: int = 100
+    MESSAGE_OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0  # Fallback when NOTIFY is missed
+    MESSAGE_OUTBOX_RETENTION_HOURS: int = 24
+
     RESPONSE_SENDER_WORKER_INTERNAL_URL: Optional[str] = (
         "https://response-sender-worker-g4mps25xua-uc.a.run.app"
     )
@@ -88,6 +145,7 @@ class Settings(BaseSettings):
 
     # --- Meta ---
     META_APP_SECRET: str = "your-meta-secret"
+    WHATSAPP_GRAPH_API_BASE_URL: str = "https://graph.facebook.com"
 
     # --- Google OAuth Settings (for reference, managed by Clerk) ---
     GOOGLE_CLIENT_ID: str = "your-google-client-id"
@@ -119,6 +177,24 @@ class Settings(BaseSettings):
 
     STRIPE_PAYMENT_METHOD_TYPES: List[str] = Field(default_factory=lambda: ["card"])
 
+    # Usage metering: counted in Redis per time bucket, one UsageEvent row per bucket
+    USAGE_METER_BUCKET_SECONDS: int = 3600
+    USAGE_METER_FLUSH_GRACE_SECONDS: int = 120  # Buckets are flushed once closed this long
+    USAGE_METER_CUSTOMER_CACHE_TTL_SECONDS: float = 300.0
+
+    # --- Metrics (Prometheus text format on /metrics) ---
+    METRICS_ENABLED: bool = True
+    METRICS_AUTH_TOKEN: Optional[str] = None  # Bearer token required on /metrics when set
+    # Worker processes write snapshots here; their keep-alive server serves them
+    METRICS_SNAPSHOT_DIR: str = "/tmp/app-metrics"
+    METRICS_SNAPSHOT_INTERVAL_SECONDS: float = 10.0
+
+    # --- Logging ---
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = False  # One JSON object per line (Cloud Logging)
+    LOG_PAYLOAD_MAX_CHARS: int = 2000  # Cap for payloads rendered in log lines
+    LOG_SAMPLE_EVERY: int = 1  # Sampled info lines: log 1 in N per call site
+
     # --- App ---
     APP_NAME: str = "Lambda Labs"
     DEBUG: bool = True
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+
+class EmbeddingMicroBatcher:
+    """
+    Coalesces concurrent embedding requests into batched encode calls.
+
+    The first request waits `max_wait_seconds` for others to arrive (up to
+    about `max_batch_size` texts are taken); the batch is then encoded once
+    in a worker thread and each caller gets its own slice back. Requests that
+    arrive while a batch is encoding form the next one, so batches grow with
+    concurrency instead of each caller paying a full encode call.
+
+    Bound to the event loop it is first used on; used from another loop, it
+    starts a new collector there.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_seconds: float = 0.005,
+    ):
+        self._encode = encode
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait_seconds = max(max_wait_seconds, 0.0)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+
+    def _ensure_collector(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._collector is None or self._collector.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._collector = loop.create_task(self._collect(self._queue))
+        return self._queue
+
+    async def embed(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embeds `texts` as part of the next batch.
+
+        Raises:
+            Exception: Whatever the encode function raised for that batch.
+        """
+        if not texts:
+            return []
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._ensure_collector().put_nowait((texts, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stops the collector task (e.g. on shutdown)."""
+        if self._collector and not self._collector.done():
+            self._collector.cancel()
+            await asyncio.gather(self._collector, return_exceptions=True)
+        self._collector = None
+
+    async def _collect(self, queue: asyncio.Queue) -> None:
+        while True:
+            pending: List[Tuple[List[str], asyncio.Future]] = [await queue.get()]
+            size = len(pending[0][0])
+            if size < self.max_batch_size and self.max_wait_seconds:
+                await asyncio.sleep(self.max_wait_seconds)
+            while size < self.max_batch_size and not queue.empty():
+                item = queue.get_nowait()
+                pending.append(item)
+                size += len(item[0])
+
+            # Callers cancelled while waiting don't need their texts encoded.
+            pending = [(texts, fut) for texts, fut in pending if not fut.done()]
+            if not pending:
+                continue
+            batch = [text for texts, _ in pending for text in texts]
+            try:
+                embeddings = await asyncio.to_thread(self._encode, batch)
+            except Exception as e:
+                logger.warning(f"[EmbeddingBatcher] Batch of {len(batch)} texts failed: {e}")
+                for _, fut in pending:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            logger.trace(
+                f"[EmbeddingBatcher] Encoded {len(batch)} texts for {len(pending)} requests."
+            )
+            offset = 0
+            for texts, fut in pending:
+                if not fut.done():
+                    fut.set_result(list(embeddings[offset : offset + len(texts)]))
+                offset += len(texts)
@@ -1,9 +1,20 @@
-import os
 import asyncio
-from typing import List, Optional, Union
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
 import numpy as np
 from loguru import logger
 from app.config import get_settings, Settings
+from app.core.embedding_batching import EmbeddingMicroBatcher
+
+try:
+    from langchain_core.embeddings import Embeddings
+except ImportError:  # SemanticChunker (the only consumer) needs langchain anyway
+
+    class Embeddings:  # type: ignore
+        pass
+
 
 settings: Settings = get_settings()
 # --- Configuration ---
@@ -13,81 +24,273 @@ AZURE_OPENAI_ENDPOINT = settings.AZURE_OPENAI_ENDPOINT
 AZURE_OPENAI_EMBEDDING_MODEL = settings.AZURE_OPENAI_EMBEDDING_MODEL
 EMBEDDING_PROVIDER = settings.EMBEDDING_PROVIDER.lower()
 LOCAL_EMBEDDING_MODEL = settings.LOCAL_EMBEDDING_MODEL.lower()
+AZURE_OPENAI_EMBEDDING_API_VERSION = "2025-01-01-preview"
 
-# --- Initialize Models/Clients ---
-local_model: Optional["SentenceTransformer"] = None
-openai_async_client: Optional["AsyncAzureOpenAI"] = None
 
-if EMBEDDING_PROVIDER == "local":
-    try:
-        from sentence_transformers import SentenceTransformer
+# --- Providers ---
+# Nothing is loaded at import time: the configured provider is built on first
+# use (or by `warmup_embeddings`), once per process, and shared by every caller.
+
+
+class EmbeddingProvider(ABC):
+    """Base class of the embedding backends."""
+
+    name: str = "base"
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> Optional[List[np.ndarray]]:
+        """Embeds the texts; returns None on failure."""
+        pass
+
+    @abstractmethod
+    def langchain_embeddings(self) -> Embeddings:
+        """LangChain `Embeddings` backed by this provider (for SemanticChunker)."""
+        pass
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    SentenceTransformer model running in this process. Concurrent calls are
+    micro-batched into one encode (in a worker thread), see EmbeddingMicroBatcher.
+    """
+
+    name = "local"
 
-        logger.info(f"Loading local embedding model: {LOCAL_EMBEDDING_MODEL}")
+    def __init__(self, model_name: str = LOCAL_EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
 
-        local_model = SentenceTransformer(LOCAL_EMBEDDING_MODEL)
+        logger.info(f"Loading local embedding model: {model_name}")
+        self.model = SentenceTransformer(model_name)
         logger.info("Local embedding model loaded successfully.")
-    except ImportError:
-        logger.error(
-            "sentence-transformers library not found. pip install sentence-transformers"
+        self.batcher = EmbeddingMicroBatcher(
+            self._encode,
+            max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            max_wait_seconds=settings.EMBEDDING_BATCH_MAX_WAIT_MS / 1000,
         )
-        local_model = None
-    except Exception as e:
-        logger.error(f"Failed to load local model '{LOCAL_EMBEDDING_MODEL}': {e}")
-        local_model = None
 
-elif EMBEDDING_PROVIDER == "openai":
-    try:
-        from langchain_openai import AzureOpenAIEmbeddings
-        from openai import (
-            APIConnectionError,
-            RateLimitError,
-            APIError,
-            AsyncAzureOpenAI,
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        embeddings = self.model.encode(
+            texts, batch_size=len(texts), convert_to_numpy=True
         )
+        if not isinstance(embeddings, np.ndarray):
+            raise TypeError(
+                f"Local model encode did not return np.ndarray, got {type(embeddings)}"
+            )
+        return embeddings
+
+    async def embed(self, texts: List[str]) -> Optional[List[np.ndarray]]:
+        try:
+            return await self.batcher.embed(texts)
+        except Exception as e:
+            logger.exception(f"Error generating local embeddings: {e}")
+            return None
+
+    def langchain_embeddings(self) -> Embeddings:
+        return _LocalLangChainEmbeddings(self)
+
+
+class _LocalLangChainEmbeddings(Embeddings):
+    """LangChain view of the local provider: same model, same micro-batcher (async)."""
+
+    def __init__(self, provider: LocalEmbeddingProvider):
+        self.provider = provider
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.provider._encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [embedding.tolist() for embedding in await self.provider.batcher.embed(texts)]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class AzureOpenAIEmbeddingProvider(EmbeddingProvider):
+    """Azure OpenAI embeddings through one AsyncAzureOpenAI client per process."""
+
+    name = "openai"
+
+    def __init__(self):
+        from openai import APIConnectionError, RateLimitError, APIError, AsyncAzureOpenAI
 
         logger.info("Initializing AsyncAzureOpenAI client for embeddings...")
         if not AZURE_OPENAI_API_KEY:
             raise EnvironmentError(
                 "API key not found. Please set the 'AZURE_OPENAI_API_KEY' environment variable."
             )
-
         if not AZURE_OPENAI_ENDPOINT:
             raise EnvironmentError(
                 "Azure Endpoint not found. Please set the 'AZURE_OPENAI_ENDPOINT' environment variable."
             )
-
         if not OPENAI_API_VERSION:
             raise EnvironmentError(
-                "Openai api version not found. Please set the 'AZURE_OPENAI_ENDPOINT' environment variable."
+                "Openai api version not found. Please set the 'OPENAI_API_VERSION' environment variable."
             )
 
-        # openai_async_client = AsyncAzureOpenAI()
-        openai_async_client = AsyncAzureOpenAI(
-            api_version="2025-01-01-preview",
+        self._api_errors = (APIConnectionError, RateLimitError, APIError)
+        self.client = AsyncAzureOpenAI(
+            api_version=AZURE_OPENAI_EMBEDDING_API_VERSION,
             azure_endpoint=AZURE_OPENAI_ENDPOINT,
             api_key=AZURE_OPENAI_API_KEY,
         )
+        logger.info("AsyncAzureOpenAI client initialized.")
 
-        langchain_embbedings = AzureOpenAIEmbeddings(
-            model=settings.AZURE_OPENAI_EMBEDDING_MODEL,
-            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-            api_key=settings.AZURE_OPENAI_API_KEY,
-            api_version="2025-01-01-preview",
-        )
+    async def embed(self, texts: List[str]) -> Optional[List[np.ndarray]]:
+        try:
+            response = await self.client.embeddings.create(
+                input=texts, model=AZURE_OPENAI_EMBEDDING_MODEL
+            )
+            return [np.array(data.embedding) for data in response.data]
+        except self._api_errors as api_err:
+            logger.error(f"OpenAI API error during embedding: {api_err}")
+            return None
+        except Exception as e:
+            logger.exception(f"Unexpected error generating OpenAI embeddings: {e}")
+            return None
 
-        logger.info("AsyncAzureOpenAI client initialized.")
-    except ImportError as import_error:
-        logger.error(
-            "openai library not found or version < 1.0. pip install --upgrade openai, {e}"
+    def langchain_embeddings(self) -> Embeddings:
+        from langchain_openai import AzureOpenAIEmbeddings
+
+        # Async calls reuse the shared client; sync ones (SemanticChunker) get
+        # LangChain's own sync client.
+        return AzureOpenAIEmbeddings(
+            model=AZURE_OPENAI_EMBEDDING_MODEL,
+            azure_endpoint=AZURE_OPENAI_ENDPOINT,
+            api_key=AZURE_OPENAI_API_KEY,
+            api_version=AZURE_OPENAI_EMBEDDING_API_VERSION,
+            async_client=self.client.embeddings,
         )
-        openai_async_client = None
-    except Exception as e:
-        logger.error(f"Failed to initialize AsyncAzureOpenAI client: {e}")
-        openai_async_client = None
-else:
-    logger.error(
-        f"Invalid EMBEDDING_PROVIDER: '{EMBEDDING_PROVIDER}'. Choose 'local' or 'openai'."
-    )
+
+
+# --- Registry ---
+
+_provider_factories: Dict[str, Callable[[], EmbeddingProvider]] = {
+    "local": LocalEmbeddingProvider,
+    "openai": AzureOpenAIEmbeddingProvider,
+}
+_provider_lock = threading.Lock()
+_provider: Optional[EmbeddingProvider] = None
+_provider_failed = False
+_langchain_embeddings: Optional[Embeddings] = None
+
+
+def register_embedding_provider(
+    name: str, factory: Callable[[], EmbeddingProvider]
+) -> None:
+    """Registers (or replaces) a provider factory, selected by EMBEDDING_PROVIDER."""
+    _provider_factories[name.lower()] = factory
+
+
+def get_embedding_provider() -> Optional[EmbeddingProvider]:
+    """
+    Returns the process-wide provider, building it on first call.
+
+    Thread-safe: concurrent first calls (e.g. from `asyncio.to_thread`) build
+    it once. A failed initialization is not retried, as before (it was done
+    once at import time).
+    """
+    global _provider, _provider_failed
+    if _provider is not None or _provider_failed:
+        return _provider
+    with _provider_lock:
+        if _provider is not None or _provider_failed:
+            return _provider
+        factory = _provider_factories.get(EMBEDDING_PROVIDER)
+        if factory is None:
+            logger.error(
+                f"Invalid EMBEDDING_PROVIDER: '{EMBEDDING_PROVIDER}'. "
+                f"Choose one of {sorted(_provider_factories)}."
+            )
+            _provider_failed = True
+            return None
+        try:
+            _provider = factory()
+        except ImportError as e:
+            logger.error(f"Embedding provider '{EMBEDDING_PROVIDER}' unavailable: {e}")
+            _provider_failed = True
+        except Exception as e:
+            logger.error(f"Failed to initialize embedding provider '{EMBEDDING_PROVIDER}': {e}")
+            _provider_failed = True
+        return _provider
+
+
+async def _aget_embedding_provider() -> Optional[EmbeddingProvider]:
+    """`get_embedding_provider` without blocking the event loop on first use."""
+    if _provider is not None or _provider_failed:
+        return _provider
+    return await asyncio.to_thread(get_embedding_provider)
+
+
+def get_langchain_embeddings() -> Optional[Embeddings]:
+    """Shared LangChain `Embeddings` of the configured provider (built on first use)."""
+    global _langchain_embeddings
+    if _langchain_embeddings is None:
+        provider = get_embedding_provider()
+        if provider is None:
+            return None
+        with _provider_lock:
+            if _langchain_embeddings is None:
+                _langchain_embeddings = provider.langchain_embeddings()
+    return _langchain_embeddings
+
+
+class LazyLangChainEmbeddings(Embeddings):
+    """
+    LangChain `Embeddings` that resolves the shared provider on first call, so
+    objects holding it (e.g. SemanticChunker) can be created at startup for free.
+    """
+
+    def _embeddings(self) -> Embeddings:
+        embeddings = get_langchain_embeddings()
+        if embeddings is None:
+            raise RuntimeError("No embedding provider available.")
+        return embeddings
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embeddings().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embeddings().embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        embeddings = await asyncio.to_thread(self._embeddings)
+        return await embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        embeddings = await asyncio.to_thread(self._embeddings)
+        return await embeddings.aembed_query(text)
+
+
+langchain_embbedings = LazyLangChainEmbeddings()
+
+
+async def warmup_embeddings(probe: bool = False) -> bool:
+    """
+    Builds the provider ahead of the first request (e.g. on worker startup).
+
+    Args:
+        probe: Also embed a test string, which checks credentials/model
+            end to end (costs one embedding call).
+
+    Returns:
+        True if the provider is ready (and the probe, if any, succeeded).
+    """
+    provider = await _aget_embedding_provider()
+    if provider is None:
+        logger.warning("Embedding warmup: no provider available.")
+        return False
+    if probe:
+        result = await provider.embed(["test"])
+        if not result:
+            logger.warning("Embedding warmup probe returned empty or None.")
+            return False
+        logger.success(f"Embedding warmup probe successful (vector dim: {len(result[0])}).")
+    logger.info(f"Embedding provider '{provider.name}' ready.")
+    return True
+
 
 # --- Core Async Functions ---
 
@@ -102,48 +305,12 @@ async def get_embedding(text: str) -> Optional[np.ndarray]:
     Returns:
         A numpy array representing the embedding, or None if an error occurs.
     """
-    if EMBEDDING_PROVIDER == "local":
-        if local_model:
-            try:
-
-                embedding = await asyncio.to_thread(
-                    local_model.encode, text, convert_to_numpy=True
-                )
-
-                if isinstance(embedding, np.ndarray):
-                    return embedding
-                else:
-                    logger.error(
-                        f"Local model encode did not return np.ndarray, got {type(embedding)}"
-                    )
-                    return None
-            except Exception as e:
-                logger.exception(f"Error generating local embedding via thread: {e}")
-                return None
-        else:
-            logger.error("Local embedding model not available.")
-            return None
-
-    elif EMBEDDING_PROVIDER == "openai":
-        if openai_async_client:
-            try:
-
-                response = await openai_async_client.embeddings.create(
-                    input=[text], model=AZURE_OPENAI_EMBEDDING_MODEL
-                )
-                return np.array(response.data[0].embedding)
-            except (APIConnectionError, RateLimitError, APIError) as api_err:
-                logger.error(f"OpenAI API error during embedding: {api_err}")
-                return None
-            except Exception as e:
-                logger.exception(f"Unexpected error generating OpenAI embedding: {e}")
-                return None
-        else:
-            logger.error("AsyncAzureOpenAI client not available.")
-            return None
-    else:
+    provider = await _aget_embedding_provider()
+    if provider is None:
         logger.error("No valid embedding provider configured.")
         return None
+    embeddings = await provider.embed([text])
+    return embeddings[0] if embeddings else None
 
 
 async def get_embeddings_batch(texts: List[str]) -> Optional[List[np.ndarray]]:
@@ -160,52 +327,11 @@ async def get_embeddings_batch(texts: List[str]) -> Optional[List[np.ndarray]]:
     if not texts:
         return []
 
-    if EMBEDDING_PROVIDER == "local":
-        if local_model:
-            try:
-
-                embeddings = await asyncio.to_thread(
-                    local_model.encode, texts, convert_to_numpy=True
-                )
-
-                if isinstance(embeddings, np.ndarray):
-                    return list(embeddings)
-                else:
-                    logger.error(
-                        f"Local model batch encode did not return np.ndarray, got {type(embeddings)}"
-                    )
-                    return None
-            except Exception as e:
-                logger.exception(
-                    f"Error generating local embeddings batch via thread: {e}"
-                )
-                return None
-        else:
-            logger.error("Local embedding model not available.")
-            return None
-
-    elif EMBEDDING_PROVIDER == "openai":
-        if openai_async_client:
-            try:
-
-                response = await openai_async_client.embeddings.create(
-                    input=texts, model=AZURE_OPENAI_EMBEDDING_MODEL
-                )
-                return [np.array(data.embedding) for data in response.data]
-            except (APIConnectionError, RateLimitError, APIError) as api_err:
-                logger.error(f"OpenAI API error during batch embedding: {api_err}")
-                return None
-            except Exception as e:
-                logger.exception(
-                    f"Unexpected error generating OpenAI embeddings batch: {e}"
-                )
-                return None
-        else:
-            logger.error("AsyncAzureOpenAI client not available.")
-            return None
-    else:
+    provider = await _aget_embedding_provider()
+    if provider is None:
         logger.error("No valid embedding provider configured.")
         return None
+    return await provider.embed(texts)
 
 
 async def calculate_cosine_similarity(
@@ -0,0 +1,157 @@
+import itertools
+import json
+import sys
+import traceback
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.core.tracing import current_trace
+
+settings = get_settings()
+
+
+# ==============================================================================
+# Lazy, size-capped payload rendering
+# ==============================================================================
+
+
+def _render(value: Any) -> str:
+    try:
+        if isinstance(value, BaseModel):
+            return value.model_dump_json(exclude_none=True, fallback=str)
+        if isinstance(value, (dict, list, tuple)):
+            return json.dumps(value, default=str, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return repr(value)
+    return str(value)
+
+
+class LazyPayload:
+    """
+    Payload rendered (compact JSON, capped at `limit` characters) only when the
+    log line is actually formatted.
+
+    Use it as a loguru argument, not inside an f-string:
+        logger.debug("{} Raw payload: {}", log_prefix, payload(raw))
+    Loguru returns before formatting when no handler accepts the level, so a
+    disabled debug line costs one small object instead of a JSON dump.
+    """
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: Optional[int] = None):
+        self.value = value
+        self.limit = limit if limit is not None else settings.LOG_PAYLOAD_MAX_CHARS
+
+    def __str__(self) -> str:
+        rendered = _render(self.value)
+        if self.limit and len(rendered) > self.limit:
+            return f"{rendered[: self.limit]}... (+{len(rendered) - self.limit} chars)"
+        return rendered
+
+    def __format__(self, format_spec: str) -> str:
+        return format(str(self), format_spec)
+
+
+def payload(value: Any, limit: Optional[int] = None) -> LazyPayload:
+    """Shorthand for `LazyPayload(value, limit)`."""
+    return LazyPayload(value, limit)
+
+
+# ==============================================================================
+# Per-call-site sampling
+# ==============================================================================
+
+
+class SampledLogger:
+    """
+    Logs one in every `every` calls made from the same line of code.
+
+    For high-volume info lines of the message pipeline (one per message or per
+    job); warnings and errors must go through `logger` directly. The first call
+    of each site is always logged.
+    """
+
+    def __init__(self, every: Optional[int] = None):
+        self._every = every
+        self._counters: Dict[Tuple[str, int], "itertools.count"] = {}
+
+    @property
+    def every(self) -> int:
+        return max(self._every or settings.LOG_SAMPLE_EVERY, 1)
+
+    def _should_log(self) -> bool:
+        every = self.every
+        if every == 1:
+            return True
+        caller = sys._getframe(2)
+        site = (caller.f_code.co_filename, caller.f_lineno)
+        counter = self._counters.get(site)
+        if counter is None:
+            counter = self._counters.setdefault(site, itertools.count())
+        return next(counter) % every == 0
+
+    def debug(self, message: str, *args: Any, **kwargs: Any) -> None:
+        if self._should_log():
+            logger.opt(depth=1).debug(message, *args, **kwargs)
+
+    def info(self, message: str, *args: Any, **kwargs: Any) -> None:
+        if self._should_log():
+            logger.opt(depth=1).info(message, *args, **kwargs)
+
+    def success(self, message: str, *args: Any, **kwargs: Any) -> None:
+        if self._should_log():
+            logger.opt(depth=1).success(message, *args, **kwargs)
+
+
+sampled = SampledLogger()
+
+
+# ==============================================================================
+# Sinks
+# ==============================================================================
+
+
+def _json_sink(message) -> None:
+    """One JSON object per line; `severity` is what Cloud Logging reads."""
+    record = message.record
+    entry = {
+        "time": record["time"].isoformat(),
+        "severity": record["level"].name,
+        "message": record["message"],
+        "logger": f"{record['name']}:{record['function']}:{record['line']}",
+        **record["extra"],
+    }
+    if record["exception"] is not None:
+        exc_type, exc_value, exc_traceback = record["exception"]
+        entry["exception"] = "".join(
+            traceback.format_exception(exc_type, exc_value, exc_traceback)
+        )
+    sys.stderr.write(json.dumps(entry, default=str, ensure_ascii=False) + "\n")
+
+
+def configure_logging(service: str) -> None:
+    """
+    Replaces loguru's default handler (DEBUG, eager) with one at LOG_LEVEL,
+    as text or JSON (LOG_JSON). Records carry the service name and, inside a
+    traced message, the trace id.
+
+    Args:
+        service: Name of the process (api, message-consumer, ai-replier...).
+    """
+
+    def add_context(record: Dict[str, Any]) -> None:
+        record["extra"].setdefault("service", service)
+        trace = current_trace()
+        if trace:
+            record["extra"].setdefault("trace_id", trace.get("trace_id"))
+
+    logger.remove()
+    logger.configure(patcher=add_context)
+    if settings.LOG_JSON:
+        logger.add(_json_sink, level=settings.LOG_LEVEL, backtrace=False, diagnose=False)
+    else:
+        logger.add(sys.stderr, level=settings.LOG_LEVEL)
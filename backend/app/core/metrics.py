@@ -0,0 +1,374 @@
+import asyncio
+import functools
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from app.config import get_settings
+from app.core.tracing import activate_trace, current_trace, seconds_since_received
+
+settings = get_settings()
+
+# Seconds; spans a Redis round trip up to a slow LLM turn
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+TOKEN_BUCKETS: Tuple[float, ...] = (
+    100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000,
+)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        # Callbacks may report from executor threads
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            series = [[list(key), value] for key, value in self._series.items()]
+        return {
+            "type": self.kind,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "series": series,
+        }
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "buckets": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels: Any):
+        """Observes the duration of the `with` block."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        return data
+
+
+class MetricsRegistry:
+    """
+    Process-local counters and histograms, rendered in the Prometheus text format.
+
+    No client library: the exposition format is small, and snapshots (plain
+    JSON) let the worker keep-alive server expose the metrics of the worker
+    process running next to it.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render(self) -> str:
+        return render_snapshot(self.snapshot())
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ==============================================================================
+# Exposition
+# ==============================================================================
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Iterable[str], values: Iterable[str], **extra: str) -> str:
+    pairs = [(name, value) for name, value in zip(labelnames, values)]
+    pairs.extend(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render_snapshot(snapshot: Dict[str, Dict[str, Any]]) -> str:
+    """Prometheus text exposition (version 0.0.4) of a registry snapshot."""
+    lines: List[str] = []
+    for name in sorted(snapshot):
+        metric = snapshot[name]
+        labelnames = metric["labelnames"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for label_values, value in metric["series"]:
+            if metric["type"] == "counter":
+                lines.append(f"{name}{_format_labels(labelnames, label_values)} {_format_value(value)}")
+                continue
+            for bound, count in zip(metric["buckets"], value["buckets"]):
+                lines.append(
+                    f"{name}_bucket{_format_labels(labelnames, label_values, le=_format_value(bound))} {count}"
+                )
+            lines.append(
+                f"{name}_bucket{_format_labels(labelnames, label_values, le='+Inf')} {value['count']}"
+            )
+            lines.append(f"{name}_sum{_format_labels(labelnames, label_values)} {_format_value(value['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labelnames, label_values)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Sums the series of several process snapshots (counters and histograms add up)."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "series": []})
+            if target.get("buckets") != metric.get("buckets"):
+                continue  # Redefined between deploys; keep the first definition
+            index = {tuple(labels): position for position, (labels, _) in enumerate(target["series"])}
+            for labels, value in metric["series"]:
+                position = index.get(tuple(labels))
+                if position is None:
+                    index[tuple(labels)] = len(target["series"])
+                    target["series"].append([labels, json.loads(json.dumps(value))])
+                    continue
+                current = target["series"][position][1]
+                if metric["type"] == "counter":
+                    target["series"][position][1] = current + value
+                else:
+                    current["buckets"] = [a + b for a, b in zip(current["buckets"], value["buckets"])]
+                    current["sum"] += value["sum"]
+                    current["count"] += value["count"]
+    return merged
+
+
+def write_snapshot(service: str, directory: Optional[str] = None) -> None:
+    """Atomically writes this process' snapshot for the keep-alive server to pick up."""
+    directory = directory or settings.METRICS_SNAPSHOT_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{service}-{os.getpid()}.json")
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w") as f:
+        json.dump(REGISTRY.snapshot(), f)
+    os.replace(temporary_path, path)
+
+
+def read_snapshots(directory: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Merged snapshots written by the worker processes of this container."""
+    snapshots = []
+    for path in glob.glob(os.path.join(directory or settings.METRICS_SNAPSHOT_DIR, "*.json")):
+        try:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"[Metrics] Skipping unreadable snapshot {path}: {e}")
+    return merge_snapshots(snapshots)
+
+
+async def run_snapshot_writer(service: str, interval_seconds: Optional[float] = None) -> None:
+    """Writes the snapshot every `interval_seconds` until cancelled (and once more on the way out)."""
+    interval_seconds = interval_seconds or settings.METRICS_SNAPSHOT_INTERVAL_SECONDS
+    try:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                write_snapshot(service)
+            except OSError as e:
+                logger.warning(f"[Metrics] Could not write snapshot for {service}: {e}")
+    finally:
+        try:
+            write_snapshot(service)
+        except OSError:
+            pass
+
+
+def start_snapshot_writer(service: str) -> Optional[asyncio.Task]:
+    """Starts the snapshot writer of a worker process, if metrics are enabled."""
+    if not settings.METRICS_ENABLED:
+        return None
+    return asyncio.create_task(run_snapshot_writer(service))
+
+
+async def stop_snapshot_writer(task: Optional[asyncio.Task]) -> None:
+    """Stops a writer started by `start_snapshot_writer` (it writes a last snapshot)."""
+    if task is None:
+        return
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+# ==============================================================================
+# Pipeline metrics
+# ==============================================================================
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template.",
+    ("method", "route", "status"),
+)
+ARQ_JOB_QUEUED_SECONDS = REGISTRY.histogram(
+    "arq_job_queued_seconds",
+    "Time between enqueue (or the deferred run time) and the job starting.",
+    ("task",),
+)
+ARQ_JOB_SECONDS = REGISTRY.histogram(
+    "arq_job_duration_seconds", "ARQ job run time.", ("task", "outcome")
+)
+PIPELINE_STAGE_SECONDS = REGISTRY.histogram(
+    "pipeline_stage_seconds",
+    "Time from the webhook reaching the API to the end of each pipeline stage.",
+    ("stage", "source"),
+)
+DEBOUNCE_WAIT_SECONDS = REGISTRY.histogram(
+    "debounce_wait_seconds",
+    "Time from the first buffered message of a conversation to the AI trigger.",
+)
+AI_TURN_STEP_SECONDS = REGISTRY.histogram(
+    "ai_turn_step_seconds",
+    "Time spent per step of an AI turn (graph, stage analysis, chatbot...).",
+    ("step",),
+)
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "llm_call_duration_seconds", "Latency of a single LLM call.", ("model", "outcome")
+)
+LLM_TOKENS_TOTAL = REGISTRY.counter(
+    "llm_tokens_total", "Tokens consumed by LLM calls.", ("model", "type")
+)
+AI_TURN_TOKENS = REGISTRY.histogram(
+    "ai_turn_tokens", "Tokens consumed by one AI turn.", ("type",), buckets=TOKEN_BUCKETS
+)
+TOOL_CALL_SECONDS = REGISTRY.histogram(
+    "agent_tool_duration_seconds", "Run time of the agent tools.", ("tool", "outcome")
+)
+SENDER_SEND_SECONDS = REGISTRY.histogram(
+    "sender_send_duration_seconds",
+    "Delivery of one outgoing message to the provider.",
+    ("channel", "outcome"),
+)
+
+
+def observe_pipeline_stage(stage: str, trace: Optional[Dict[str, Any]] = None) -> None:
+    """Records that the traced message (default: the active trace) reached `stage`."""
+    trace = trace if trace is not None else current_trace()
+    elapsed = seconds_since_received(trace)
+    if elapsed is not None:
+        PIPELINE_STAGE_SECONDS.observe(elapsed, stage=stage, source=trace.get("source", ""))
+
+
+def instrument_job(task: Callable) -> Callable:
+    """
+    Wraps an ARQ task: times it, records how long it waited in the queue and
+    activates the trace context passed in the `trace_context` job kwarg.
+    Keeps the task's name, so it is registered and enqueued as before.
+    """
+
+    @functools.wraps(task)
+    async def wrapper(ctx: dict, *args, trace_context: Optional[dict] = None, **kwargs):
+        task_name = task.__name__
+        # The score is when the job became due (enqueue time, or the deferred run time)
+        due_ms = ctx.get("score")
+        if due_ms:
+            ARQ_JOB_QUEUED_SECONDS.observe(
+                max(time.time() - due_ms / 1000, 0.0), task=task_name
+            )
+        outcome = "error"
+        started_at = time.perf_counter()
+        with activate_trace(trace_context):
+            try:
+                result = await task(ctx, *args, **kwargs)
+                outcome = "success"
+                return result
+            finally:
+                ARQ_JOB_SECONDS.observe(
+                    time.perf_counter() - started_at, task=task_name, outcome=outcome
+                )
+
+    return wrapper
+
+
+# ==============================================================================
+# /metrics endpoints
+# ==============================================================================
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def is_metrics_request_authorized(authorization: Optional[str]) -> bool:
+    """Checks the bearer token of a /metrics request (open when no token is configured)."""
+    if not settings.METRICS_AUTH_TOKEN:
+        return True
+    return hmac.compare_digest(
+        authorization or "", f"Bearer {settings.METRICS_AUTH_TOKEN}"
+    )
@@ -0,0 +1,40 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+# Trace context of the message being handled: {"trace_id", "source", "received_at"}.
+# It travels as the `trace_context` ARQ job kwarg, in the debounce buffer and in
+# the outbox payload, so every stage can be related to the webhook that started it.
+_current_trace: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    "current_trace", default=None
+)
+
+
+def new_trace(source: str) -> Dict[str, Any]:
+    """Starts a trace for a message that just reached the API."""
+    return {"trace_id": uuid4().hex, "source": source, "received_at": time.time()}
+
+
+def current_trace() -> Optional[Dict[str, Any]]:
+    """The active trace context, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def activate_trace(trace: Optional[Dict[str, Any]]):
+    """Makes `trace` the active trace context inside the `with` block."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def seconds_since_received(trace: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """Time elapsed since the traced message reached the API (None without a trace)."""
+    trace = trace if trace is not None else current_trace()
+    if not trace or trace.get("received_at") is None:
+        return None
+    return max(time.time() - float(trace["received_at"]), 0.0)
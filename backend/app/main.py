@@ -1,7 +1,8 @@
 import os
 import asyncio
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Header, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 from starlette.middleware.sessions import SessionMiddleware
@@ -45,6 +46,13 @@ from app.core.dependencies.billing import require_active_subscription
 # Import Services/Config
 from app.services.realtime.redis_pubsub import RedisPubSubBridge
 from app.config import get_settings
+from app.core.log import configure_logging
+from app.core.metrics import (
+    HTTP_REQUEST_SECONDS,
+    PROMETHEUS_CONTENT_TYPE,
+    REGISTRY,
+    is_metrics_request_authorized,
+)
 
 
 # Import functions from arq_manager
@@ -77,6 +85,7 @@ async def lifespan_manager(app: FastAPI):
     Handles application startup and shutdown events.
     Initializes ARQ pool and starts background tasks like Redis bridge.
     """
+    configure_logging("api")
     logger.info("Application startup sequence initiated...")
 
     # Initialize ARQ Redis pool
@@ -122,6 +131,26 @@ app.router.lifespan_context = lifespan_manager
 # --- Middleware ---
 app.add_middleware(ProxyHeadersMiddleware, trusted_hosts="*")
 
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Times every request, labelled by route template (not the raw path)."""
+    started_at = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started_at,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status_code,
+        )
+
+
 # CORS Middleware (Essential for frontend interaction)
 allowed_origins_str = (
     settings.FRONTEND_ALLOWED_ORIGINS
@@ -331,6 +360,16 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus exposition of this API process' metrics."""
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+    if not is_metrics_request_authorized(authorization):
+        return Response(status_code=status.HTTP_401_UNAUTHORIZED)
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @app.get(f"{api_v1_prefix}/me", tags=["v1 - Users"])
 def get_authenticated_user_context(
     auth_context: AuthContext = Depends(get_auth_context),
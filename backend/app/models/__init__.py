@@ -9,10 +9,12 @@ from .base import BaseModel
 from .contact import Contact
 from .contact_inbox import ContactInbox
 from .conversation import Conversation
+from .conversation_list_entry import ConversationListEntry
 from .event import Event
 from .inbox import Inbox
 from .inbox_member import InboxMember
 from .message import Message
+from .message_dispatch import MessageDispatch
 from .subscription import Subscription
 from .user import User
 from .webhook import Webhook
@@ -42,10 +44,12 @@ __all__ = [
     "Contact",
     "ContactInbox",
     "Conversation",
+    "ConversationListEntry",
     "Event",
     "Inbox",
     "InboxMember",
     "Message",
+    "MessageDispatch",
     "Subscription",
     "User",
     "Webhook",
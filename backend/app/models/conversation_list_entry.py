@@ -0,0 +1,138 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    DDL,
+    Index,
+    Integer,
+    String,
+    event,
+    sql,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from app.database import Base
+from app.models.conversation import Conversation
+
+# Keeps conversation_list_entries in step with conversations. A trigger (rather
+# than application code) so that every write path is covered, including the
+# Core UPDATEs of status / unread counters and bulk bot status changes.
+# `version` is the id of the writing transaction: the delta endpoint only
+# serves versions below the oldest running transaction (pg_snapshot_xmin), so
+# a row committed late with a smaller version is never skipped.
+CONVERSATION_LIST_SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION sync_conversation_list_entry() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE conversation_list_entries
+        SET deleted = true, version = pg_current_xact_id()::text::bigint
+        WHERE conversation_id = OLD.id;
+        RETURN OLD;
+    END IF;
+    IF NEW.is_simulation THEN
+        RETURN NEW;
+    END IF;
+    INSERT INTO conversation_list_entries AS e (
+        conversation_id, account_id, inbox_id, status, unread_agent_count,
+        is_bot_active, contact_name, phone_number, profile_picture_url,
+        last_message, last_message_at, updated_at, deleted, version
+    ) VALUES (
+        NEW.id, NEW.account_id, NEW.inbox_id, NEW.status::text,
+        NEW.unread_agent_count, NEW.is_bot_active,
+        NEW.additional_attributes->>'contact_name',
+        NEW.additional_attributes->>'phone_number',
+        NEW.additional_attributes->>'profile_picture_url',
+        NEW.additional_attributes->'last_message',
+        NEW.last_message_at, NEW.updated_at, false,
+        pg_current_xact_id()::text::bigint
+    )
+    ON CONFLICT (conversation_id) DO UPDATE SET
+        inbox_id = EXCLUDED.inbox_id,
+        status = EXCLUDED.status,
+        unread_agent_count = EXCLUDED.unread_agent_count,
+        is_bot_active = EXCLUDED.is_bot_active,
+        contact_name = EXCLUDED.contact_name,
+        phone_number = EXCLUDED.phone_number,
+        profile_picture_url = EXCLUDED.profile_picture_url,
+        last_message = EXCLUDED.last_message,
+        last_message_at = EXCLUDED.last_message_at,
+        updated_at = EXCLUDED.updated_at,
+        deleted = false,
+        version = EXCLUDED.version;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+CONVERSATION_LIST_SYNC_TRIGGER = """
+CREATE TRIGGER conversations_sync_list_entry
+AFTER INSERT OR UPDATE OR DELETE ON conversations
+FOR EACH ROW EXECUTE FUNCTION sync_conversation_list_entry()
+"""
+
+
+class ConversationListEntry(Base):
+    """
+    Read model of the conversation list: one row per (non-simulation)
+    conversation holding exactly what ConversationSearchResult needs, so the
+    inbox is served from a single index range scan without joins.
+
+    Written only by the trigger on conversations; deleted conversations are
+    kept as tombstones (`deleted`) so delta clients learn about them.
+    """
+
+    __tablename__ = "conversation_list_entries"
+
+    # No FK: the row outlives its conversation as a tombstone
+    conversation_id: uuid.UUID = Column(PG_UUID(as_uuid=True), primary_key=True)
+    account_id: uuid.UUID = Column(PG_UUID(as_uuid=True), nullable=False)
+    inbox_id: uuid.UUID = Column(PG_UUID(as_uuid=True), nullable=False)
+
+    status: str = Column(String(32), nullable=False)
+    unread_agent_count: int = Column(Integer, nullable=False, server_default="0")
+    is_bot_active: bool = Column(Boolean, nullable=False, server_default=sql.false())
+
+    contact_name: Optional[str] = Column(String(255), nullable=True)
+    phone_number: Optional[str] = Column(String(255), nullable=True)
+    profile_picture_url: Optional[str] = Column(String, nullable=True)
+    last_message: Optional[dict] = Column(JSONB, nullable=True)
+    last_message_at: Optional[datetime] = Column(DateTime(timezone=True), nullable=True)
+
+    updated_at: datetime = Column(DateTime(timezone=True), nullable=False)
+    deleted: bool = Column(Boolean, nullable=False, server_default=sql.false())
+    version: int = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        # Inbox listing, newest activity first (keyset pagination)
+        Index(
+            "ix_conversation_list_entries_account_updated",
+            "account_id",
+            updated_at.desc(),
+            conversation_id.desc(),
+        ),
+        # Delta sync
+        Index(
+            "ix_conversation_list_entries_account_version",
+            "account_id",
+            "version",
+            "conversation_id",
+        ),
+    )
+
+    def __repr__(self):
+        return (
+            f"<ConversationListEntry(conversation_id={self.conversation_id}, "
+            f"status='{self.status}', version={self.version}, deleted={self.deleted})>"
+        )
+
+
+# The trigger lives on conversations; the function body only resolves
+# conversation_list_entries when it runs, so creation order does not matter.
+event.listen(Conversation.__table__, "after_create", DDL(CONVERSATION_LIST_SYNC_FUNCTION))
+event.listen(Conversation.__table__, "after_create", DDL(CONVERSATION_LIST_SYNC_TRIGGER))
@@ -1,25 +1,81 @@
 import uuid
-from sqlalchemy import Column, String, Text, ForeignKey, Integer, Index, text
+from sqlalchemy import (
+    Column,
+    Computed,
+    String,
+    Text,
+    ForeignKey,
+    Integer,
+    Index,
+    text,
+)
 from typing import Optional, Dict, Any
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB
-from sqlalchemy.orm import relationship
+import numpy as np
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import UserDefinedType
 
 
 try:
-    from pgvector.sqlalchemy import Vector
+    from pgvector.sqlalchemy import HALFVEC
 
     PGVECTOR_AVAILABLE = True
 except ImportError:
     PGVECTOR_AVAILABLE = False
     print("WARNING: pgvector.sqlalchemy not found. Vector type operations might fail.")
 
+    class HALFVEC(UserDefinedType):  # type: ignore
+        """Placeholder so the model still imports without pgvector."""
+
+        cache_ok = True
+
+        def __init__(self, dim=None):
+            self.dim = dim
+
+        def get_col_spec(self, **kw):
+            return f"HALFVEC({self.dim})"
+
 from app.models.base import BaseModel
 
 # Define the embedding dimension (MUST match the migration and the embedding model)
 EMBEDDING_DIMENSION = 1536  #  text-embedding-3-small
 
 
+class HalfVectorEmbedding(HALFVEC):
+    """
+    pgvector `halfvec` (float16) column/parameter type that works with numpy.
+
+    Embeddings are bound from (and loaded as) float32 numpy arrays; the text
+    literal is built with one C-level join instead of pgvector's per-element
+    conversion.
+    """
+
+    cache_ok = True
+
+    def bind_processor(self, dialect):
+        def process(value):
+            if value is None:
+                return None
+            array = np.asarray(value, dtype=np.float32)
+            if array.ndim != 1 or (self.dim is not None and array.shape[0] != self.dim):
+                raise ValueError(
+                    f"Expected an embedding of shape ({self.dim},), got {array.shape}."
+                )
+            return "[" + ",".join(map(repr, array.tolist())) + "]"
+
+        return process
+
+    def result_processor(self, dialect, coltype):
+        parent = super().result_processor(dialect, coltype)
+
+        def process(value):
+            value = parent(value)
+            return None if value is None else value.to_numpy().astype(np.float32)
+
+        return process
+
+
 class KnowledgeChunk(BaseModel):
     """
     SQLAlchemy model for storing text chunks and their vector embeddings.
@@ -66,6 +122,12 @@ class KnowledgeChunk(BaseModel):
         Text, nullable=False, doc="The actual text content of the chunk."
     )
 
+    content_hash: Optional[str] = Column(
+        String(64),
+        nullable=True,
+        doc="SHA-256 of chunk_text, used to re-ingest a document incrementally.",
+    )
+
     chunk_index: str = Column(
         Integer,
         nullable=False,
@@ -74,9 +136,18 @@ class KnowledgeChunk(BaseModel):
     )
 
     embedding = Column(
-        Vector(EMBEDDING_DIMENSION),  # Specify the dimension
+        HalfVectorEmbedding(EMBEDDING_DIMENSION),  # Specify the dimension
         nullable=False,
-        doc=f"Vector embedding of the chunk text (dimension: {EMBEDDING_DIMENSION}).",
+        doc=f"Half-precision vector embedding of the chunk text (dimension: {EMBEDDING_DIMENSION}).",
+    )
+    # Only used inside SQL (hybrid retrieval): never loaded with the entity.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed("to_tsvector('portuguese', chunk_text)", persisted=True),
+            nullable=True,
+            doc="Portuguese full-text representation of chunk_text (generated column).",
+        )
     )
     metadata_: Optional[Dict[str, Any]] = Column(
         "metadata",
@@ -92,6 +163,23 @@ class KnowledgeChunk(BaseModel):
     __table_args__ = (
         # Create a composite index for efficiently fetching neighboring chunks
         Index("ix_chunk_document_id_chunk_index", "document_id", "chunk_index"),
+        # Diffing a re-ingested document against its stored chunks
+        Index("ix_chunk_document_id_content_hash", "document_id", "content_hash"),
+        # ANN index, used for accounts above RAG_EXACT_SCAN_MAX_CHUNKS.
+        # The binary-quantized expression index (ix_knowledge_chunks_embedding_bq,
+        # see RAG_BINARY_PREFILTER_CANDIDATES) is not managed by the migrations;
+        # it is built on demand with scripts/binary_quantized_index.py.
+        Index(
+            "ix_knowledge_chunks_embedding",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "halfvec_cosine_ops"},
+        ),
+        Index(
+            "ix_knowledge_chunks_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
     )
 
     def __repr__(self):
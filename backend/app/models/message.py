@@ -10,6 +10,8 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     DateTime,
+    DDL,
+    event,
     text,
     sql,
 )
@@ -18,21 +20,36 @@ from app.models.base import BaseModel
 
 
 class Message(BaseModel):
+    """
+    Partitioned by month on sent_at (messages_pYYYY_MM partitions plus
+    messages_default), so sent_at is part of the primary key. Partitions are
+    created ahead of time and archived by the message partition maintenance
+    task (see app/services/helper/message_partitions.py).
+    """
+
     __tablename__ = "messages"
     __table_args__ = (
-        Index("idx_messages_account_id_index", "account_id"),
-        Index("idx_messages_inbox_id_index", "inbox_id"),
-        Index("idx_messages_conversation_id_index", "conversation_id"),
-        Index("idx_messages_user_id_index", "user_id"),
-        Index("idx_messages_bot_agent_id_index", "bot_agent_id"),
-        Index("idx_messages_source_id_index", "source_id"),
-        Index("idx_messages_contact_id_index", "contact_id"),
-        Index("idx_messages_sent_at_index", "sent_at"),
+        # Conversation history / cursor pagination
+        Index("ix_messages_conversation_id_sent_at", "conversation_id", "sent_at"),
+        # Account-wide listings and dashboards
+        Index("ix_messages_account_id_sent_at", "account_id", "sent_at"),
+        # Deduplication of provider messages (webhook retries, status updates).
+        # Unique indexes on a partitioned table must contain the partition key,
+        # so sent_at (the provider timestamp, identical on every redelivery) is in it.
+        Index(
+            "ux_messages_inbox_id_source_id_sent_at",
+            "inbox_id",
+            "source_id",
+            "sent_at",
+            unique=True,
+            postgresql_where=text("source_id IS NOT NULL"),
+        ),
         Index(
             "ix_messages_content_gin_trgm",
             text("(content) gin_trgm_ops"),
             postgresql_using="gin",
         ),
+        {"postgresql_partition_by": "RANGE (sent_at)"},
     )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     account_id = Column(UUID(as_uuid=True), ForeignKey("accounts.id"), nullable=False)
@@ -56,12 +73,14 @@ class Message(BaseModel):
     contact_id = Column(UUID(as_uuid=True), ForeignKey("contacts.id"), nullable=True)
     sent_at = Column(
         DateTime(timezone=True),
-        nullable=True,
+        primary_key=True,  # partition key
+        nullable=False,
         default=lambda: datetime.now(timezone.utc),
+        server_default=sql.func.now(),
     )
 
     is_simulation = Column(
-        Boolean, nullable=False, default=False, server_default=sql.false(), index=True
+        Boolean, nullable=False, default=False, server_default=sql.false()
     )
     account = relationship("Account", back_populates="messages")
     inbox = relationship("Inbox", back_populates="messages")
@@ -71,3 +90,12 @@ class Message(BaseModel):
         "BotAgent", back_populates="messages", foreign_keys=[bot_agent_id]
     )
     contact = relationship("Contact", back_populates="messages")
+
+
+# Tables created from the metadata (create_all) still need a partition to
+# accept rows; the migrations create the monthly ones as well.
+event.listen(
+    Message.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS messages_default PARTITION OF messages DEFAULT"),
+)
@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from app.models.base import BaseModel
+
+
+class MessageDispatch(BaseModel):
+    """
+    Transactional outbox of outgoing messages.
+
+    A row is written in the same transaction as the outgoing Message, so the
+    dispatch exists if and only if the message was committed. The outbox relay
+    (app/services/queue/outbox_relay.py) publishes unpublished rows to the
+    delivery queue and stamps `published_at`.
+    """
+
+    __tablename__ = "message_dispatches"
+
+    id: uuid.UUID = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # No FK: messages is partitioned and its primary key is (id, sent_at)
+    message_id: uuid.UUID = Column(PG_UUID(as_uuid=True), nullable=False)
+    # Partition key of the message, so the sender's lookup hits one partition
+    # (null on dispatches written before the column existed)
+    message_sent_at: Optional[datetime] = Column(DateTime(timezone=True), nullable=True)
+    account_id: uuid.UUID = Column(PG_UUID(as_uuid=True), nullable=False)
+    queue_name: str = Column(String(100), nullable=False)
+    payload: dict = Column(JSON, nullable=False)
+
+    publish_attempts: int = Column(Integer, nullable=False, default=0, server_default="0")
+    published_at: Optional[datetime] = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # The relay only ever scans the unpublished tail
+        Index(
+            "ix_message_dispatches_unpublished",
+            "created_at",
+            postgresql_where=published_at.is_(None),
+        ),
+        Index("ix_message_dispatches_published_at", "published_at"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<MessageDispatch(id={self.id}, message_id={self.message_id}, "
+            f"queue='{self.queue_name}', published_at={self.published_at})>"
+        )
@@ -22,10 +22,12 @@ from app.models.base import BaseModel
 
 class UsageEvent(BaseModel):
     """
-    Represents a unit of billable usage to be reported to Stripe.
+    Represents an amount of billable usage to be reported to Stripe.
 
-    Each record typically corresponds to a specific action or resource consumption
-    by an account that is subject to metered billing (e.g., number of AI messages generated).
+    Usage is counted in Redis (see app/services/billing/usage_metering.py) and
+    each record is the aggregate of one time bucket for a customer and meter,
+    with `event_timestamp` set to the bucket start. `usage_key` identifies the
+    aggregate and is sent to Stripe as the meter event identifier.
     """
 
     __tablename__ = "usage_events"
@@ -66,6 +68,13 @@ class UsageEvent(BaseModel):
         nullable=True,
         comment="Timestamp when this usage event (or an aggregation including it) was successfully reported to Stripe",
     )
+    usage_key: Optional[str] = Column(
+        String(255),
+        nullable=True,
+        unique=True,
+        comment="customer:meter:bucket:flush id; Stripe meter event identifier",
+    )
+
     # Optional: Store the ID of the Stripe MeterEvent object after successful reporting
     stripe_meter_event_id: Optional[str] = Column(
         String, nullable=True, unique=True, index=True
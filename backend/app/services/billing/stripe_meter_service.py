@@ -1,7 +1,7 @@
 # backend/app/services/stripe_meter_service.py
 import stripe  # type: ignore
 from loguru import logger
-from typing import Dict, Any  # Removido List pois não é usado aqui
+from typing import Dict, Any, Optional  # Removido List pois não é usado aqui
 from datetime import datetime, timezone  # Adicionado timezone
 
 from app.config import get_settings
@@ -25,6 +25,7 @@ async def report_usage_to_stripe_meter(
     stripe_customer_id: str,
     value: int,
     timestamp: datetime,  # Python datetime object (UTC é o ideal)
+    identifier: Optional[str] = None,
 ) -> bool:
     """
     Reports a single aggregated usage event to a Stripe Meter.
@@ -37,6 +38,9 @@ async def report_usage_to_stripe_meter(
                    (or the end of an aggregation period). Stripe uses this for
                    allocating usage to the correct billing cycle.
                    It will be converted to a Unix timestamp.
+        identifier: Unique id of this usage (e.g. the aggregate's usage_key). Sent
+                    as the meter event identifier and as the idempotency key, so
+                    retrying a report never bills the same usage twice.
 
     Returns:
         True if the event was successfully reported to Stripe, False otherwise.
@@ -86,10 +90,16 @@ async def report_usage_to_stripe_meter(
     )
     try:
         # A API correta é stripe.billing.MeterEvent.create
+        identifier_params: Dict[str, Any] = (
+            {"identifier": identifier, "idempotency_key": identifier}
+            if identifier
+            else {}
+        )
         meter_event_response = stripe.billing.MeterEvent.create(  # type: ignore
             event_name=event_name,
             payload=payload_for_stripe_api,
             timestamp=unix_timestamp,
+            **identifier_params,
         )
         # O objeto retornado não é o MeterEvent em si, mas um objeto de status/confirmação.
         # A documentação do Stripe para esta API específica não detalha muito a resposta de sucesso,
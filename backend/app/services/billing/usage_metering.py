@@ -0,0 +1,256 @@
+# backend/app/services/billing/usage_metering.py
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from loguru import logger
+from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.account import Account
+from app.models.usage_event import UsageEvent
+
+settings = get_settings()
+
+# Redis layout:
+#   usage:bucket:<epoch>           hash "<account>|<stripe customer>|<meter>" -> count
+#   usage:buckets                  set of bucket epochs that have a hash
+#   usage:flushing:<epoch>:<id>    hash taken out of circulation by a flush
+#   usage:flushing                 set of flushing keys not yet persisted
+BUCKET_KEY_PREFIX = "usage:bucket:"
+BUCKETS_SET_KEY = "usage:buckets"
+FLUSHING_KEY_PREFIX = "usage:flushing:"
+FLUSHING_SET_KEY = "usage:flushing"
+_FIELD_SEPARATOR = "|"
+_BUCKET_KEY_TTL_SECONDS = 7 * 24 * 3600
+
+# Atomically moves a bucket hash aside for flushing (increments arriving
+# afterwards start a new hash, flushed next time).
+_TAKE_BUCKET_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+    redis.call('SADD', KEYS[3], KEYS[2])
+end
+redis.call('SREM', KEYS[4], ARGV[1])
+return 1
+"""
+
+
+def bucket_start(moment: datetime, bucket_seconds: int) -> int:
+    """Epoch (seconds) of the start of the bucket containing `moment`."""
+    epoch = int(moment.timestamp())
+    return epoch - epoch % bucket_seconds
+
+
+def usage_key(stripe_customer_id: str, meter_event_name: str, bucket: int, flush_id: str) -> str:
+    """
+    Identity of one aggregate row, also sent to Stripe as the meter event
+    identifier (and idempotency key), so a row is never billed twice.
+    """
+    return f"{stripe_customer_id}:{meter_event_name}:{bucket}:{flush_id}"
+
+
+def parse_flushing_key(key: str) -> Tuple[int, str]:
+    """(bucket epoch, flush id) of a flushing key."""
+    bucket, flush_id = key[len(FLUSHING_KEY_PREFIX) :].split(":", 1)
+    return int(bucket), flush_id
+
+
+def aggregate_rows(
+    counts: Dict[str, str], bucket: int, flush_id: str
+) -> List[Dict[str, object]]:
+    """UsageEvent rows (as insert values) for the counters of one flushed bucket."""
+    event_timestamp = datetime.fromtimestamp(bucket, tz=timezone.utc)
+    rows = []
+    for field, raw_count in counts.items():
+        account_id, stripe_customer_id, meter_event_name = field.split(
+            _FIELD_SEPARATOR, 2
+        )
+        quantity = int(raw_count)
+        if quantity <= 0:
+            continue
+        rows.append(
+            {
+                "account_id": UUID(account_id),
+                "stripe_customer_id": stripe_customer_id,
+                "meter_event_name": meter_event_name,
+                "quantity": quantity,
+                "event_timestamp": event_timestamp,
+                "usage_key": usage_key(
+                    stripe_customer_id, meter_event_name, bucket, flush_id
+                ),
+            }
+        )
+    return rows
+
+
+class UsageMeter:
+    """
+    Counts billable usage in Redis, per (Stripe customer, meter, time bucket).
+
+    `record` costs one MULTI (HINCRBY + SADD) on the reply path; the Stripe
+    customer id comes from a per-process cache. `flush` later persists every
+    closed bucket as one UsageEvent row per customer and meter, which the
+    billing task reports to Stripe. Flushes are idempotent: a bucket is moved
+    aside under a flush id before being read, and the rows it produces are
+    keyed by that id (ON CONFLICT DO NOTHING), so a flush interrupted after
+    the commit just finds its rows already there.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int,
+        flush_grace_seconds: int,
+        customer_cache_ttl_seconds: float,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.flush_grace_seconds = flush_grace_seconds
+        self.customer_cache_ttl_seconds = customer_cache_ttl_seconds
+        # account_id -> (expires_at, stripe_customer_id or None)
+        self._customers: Dict[UUID, Tuple[float, Optional[str]]] = {}
+        self._redis: Optional[Redis] = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_redis(self) -> Redis:
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            self._redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+            self._redis_loop = loop
+        return self._redis
+
+    async def get_stripe_customer_id(
+        self, db: AsyncSession, account_id: UUID
+    ) -> Optional[str]:
+        """Stripe customer of the account, cached per process (misses for a shorter time)."""
+        cached = self._customers.get(account_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        stripe_customer_id = await db.scalar(
+            select(Account.stripe_customer_id).where(Account.id == account_id)
+        )
+        ttl = self.customer_cache_ttl_seconds
+        if not stripe_customer_id:
+            # Accounts subscribe at any moment; don't drop their usage for long.
+            ttl = min(ttl, 60.0)
+        self._customers[account_id] = (time.monotonic() + ttl, stripe_customer_id)
+        return stripe_customer_id
+
+    def invalidate_customer(self, account_id: UUID) -> None:
+        self._customers.pop(account_id, None)
+
+    async def record(
+        self,
+        db: AsyncSession,
+        account_id: UUID,
+        meter_event_name: str,
+        quantity: int = 1,
+        moment: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Counts `quantity` units of `meter_event_name` for the account.
+
+        If Redis is unavailable, the usage is written as its own UsageEvent row
+        in the caller's transaction instead, so it is never lost.
+
+        Returns:
+            False if the account has no Stripe customer (usage not billable).
+        """
+        stripe_customer_id = await self.get_stripe_customer_id(db, account_id)
+        if not stripe_customer_id:
+            logger.warning(
+                f"[UsageMeter] Account {account_id} has no stripe_customer_id. "
+                f"Usage for '{meter_event_name}' will not be reported to Stripe."
+            )
+            return False
+
+        moment = moment or datetime.now(timezone.utc)
+        bucket = bucket_start(moment, self.bucket_seconds)
+        bucket_key = f"{BUCKET_KEY_PREFIX}{bucket}"
+        field = _FIELD_SEPARATOR.join(
+            [str(account_id), stripe_customer_id, meter_event_name]
+        )
+        try:
+            async with self._get_redis().pipeline(transaction=True) as pipe:
+                pipe.hincrby(bucket_key, field, quantity)
+                pipe.expire(bucket_key, _BUCKET_KEY_TTL_SECONDS)
+                pipe.sadd(BUCKETS_SET_KEY, bucket)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(
+                f"[UsageMeter] Redis unavailable ({e}); writing usage for account "
+                f"{account_id} directly to the database."
+            )
+        db.add(
+            UsageEvent(
+                account_id=account_id,
+                stripe_customer_id=stripe_customer_id,
+                meter_event_name=meter_event_name,
+                quantity=quantity,
+                event_timestamp=moment,
+                usage_key=usage_key(
+                    stripe_customer_id, meter_event_name, bucket, f"direct-{uuid.uuid4().hex}"
+                ),
+            )
+        )
+        return True
+
+    async def _take_closed_buckets(self, redis: Redis, now: datetime) -> None:
+        """Moves every bucket closed for longer than the grace period aside."""
+        cutoff = now.timestamp() - self.bucket_seconds - self.flush_grace_seconds
+        for raw_bucket in await redis.smembers(BUCKETS_SET_KEY):
+            bucket = int(raw_bucket)
+            if bucket > cutoff:
+                continue
+            await redis.eval(
+                _TAKE_BUCKET_SCRIPT,
+                4,
+                f"{BUCKET_KEY_PREFIX}{bucket}",
+                f"{FLUSHING_KEY_PREFIX}{bucket}:{uuid.uuid4().hex}",
+                FLUSHING_SET_KEY,
+                BUCKETS_SET_KEY,
+                raw_bucket,
+            )
+
+    async def flush(self, db: AsyncSession, now: Optional[datetime] = None) -> int:
+        """
+        Persists the closed buckets as aggregate UsageEvent rows.
+
+        Returns:
+            The number of rows written.
+        """
+        redis = self._get_redis()
+        await self._take_closed_buckets(redis, now or datetime.now(timezone.utc))
+
+        written = 0
+        for flushing_key in sorted(await redis.smembers(FLUSHING_SET_KEY)):
+            bucket, flush_id = parse_flushing_key(flushing_key)
+            rows = aggregate_rows(await redis.hgetall(flushing_key), bucket, flush_id)
+            if rows:
+                result = await db.execute(
+                    pg_insert(UsageEvent)
+                    .values(rows)
+                    .on_conflict_do_nothing(index_elements=[UsageEvent.usage_key])
+                )
+                await db.commit()
+                written += result.rowcount or 0
+            # Only forgotten once the rows are committed
+            await redis.delete(flushing_key)
+            await redis.srem(FLUSHING_SET_KEY, flushing_key)
+            logger.info(
+                f"[UsageMeter] Flushed bucket {bucket} ({len(rows)} aggregates, flush {flush_id})."
+            )
+        return written
+
+
+usage_meter = UsageMeter(
+    bucket_seconds=settings.USAGE_METER_BUCKET_SECONDS,
+    flush_grace_seconds=settings.USAGE_METER_FLUSH_GRACE_SECONDS,
+    customer_cache_ttl_seconds=settings.USAGE_METER_CUSTOMER_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,481 @@
+# app/services/crawler/crawler.py
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from app.config import get_settings
+from .html_parsing import (
+    DEFAULT_STRIP_TAGS,
+    ParsedLink,
+    clean_link,
+    compute_content_hash,
+    extract_sitemap_urls,
+    is_same_site,
+    parse_html_page,
+)
+
+settings = get_settings()
+
+DEFAULT_REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+# A site asking for a longer Crawl-delay is still crawled, just at this pace.
+MAX_ROBOTS_CRAWL_DELAY_SECONDS = 10.0
+MAX_SITEMAP_URLS = 500
+MAX_NESTED_SITEMAPS = 5
+
+
+class CrawledPage(BaseModel):
+    """A fetched HTML page converted to Markdown."""
+
+    url: str = Field(..., description="The requested URL.")
+    final_url: str = Field(..., description="The URL after redirects.")
+    markdown: str
+    links: List[ParsedLink] = Field(default_factory=list)
+    content_hash: str
+    depth: int = 0
+    is_duplicate: bool = Field(
+        False,
+        description="True if a page with the same content was already seen by this crawler.",
+    )
+
+
+# --- Shared resources (one per worker process) ---
+
+_shared_client: Optional[httpx.AsyncClient] = None
+_shared_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_parser_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """
+    Returns the pooled HTTP client shared by every crawler of this process.
+
+    A new client is created if the previous one was closed or belongs to
+    another event loop.
+    """
+    global _shared_client, _shared_client_loop
+    loop = asyncio.get_running_loop()
+    if (
+        _shared_client is None
+        or _shared_client.is_closed
+        or _shared_client_loop is not loop
+    ):
+        _shared_client = httpx.AsyncClient(
+            timeout=settings.CRAWLER_REQUEST_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            headers=DEFAULT_REQUEST_HEADERS,
+            limits=httpx.Limits(
+                max_connections=settings.CRAWLER_MAX_CONCURRENCY * 2,
+                max_keepalive_connections=settings.CRAWLER_MAX_CONCURRENCY,
+            ),
+        )
+        _shared_client_loop = loop
+    return _shared_client
+
+
+async def close_crawler_resources() -> None:
+    """Closes the shared HTTP client and the parser pool. Call on worker shutdown."""
+    global _shared_client, _parser_pool
+    if _shared_client is not None and not _shared_client.is_closed:
+        await _shared_client.aclose()
+    _shared_client = None
+    if _parser_pool is not None:
+        _parser_pool.shutdown(wait=False, cancel_futures=True)
+        _parser_pool = None
+
+
+def _get_parser_pool() -> Optional[ProcessPoolExecutor]:
+    global _parser_pool
+    if settings.CRAWLER_PARSER_PROCESSES <= 0:
+        return None
+    if _parser_pool is None:
+        # spawn: forking a process that runs an event loop is not safe.
+        _parser_pool = ProcessPoolExecutor(
+            max_workers=settings.CRAWLER_PARSER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parser_pool
+
+
+async def parse_html_off_loop(
+    html_content: str,
+    base_url: str,
+    strip_tags: Sequence[str] = DEFAULT_STRIP_TAGS,
+    markdown_from_cleaned_html: bool = True,
+) -> Tuple[str, List[ParsedLink]]:
+    """
+    Runs `parse_html_page` in the parser process pool (or a thread if the
+    pool is disabled), keeping BeautifulSoup/html2text off the event loop.
+    """
+    global _parser_pool
+    args = (html_content, base_url, tuple(strip_tags), markdown_from_cleaned_html)
+    pool = _get_parser_pool()
+    if pool is not None:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                pool, parse_html_page, *args
+            )
+        except BrokenProcessPool:
+            logger.warning(
+                "[Crawler] Parser process pool is broken. Recreating it and parsing in a thread."
+            )
+            _parser_pool = None
+    return await asyncio.to_thread(parse_html_page, *args)
+
+
+def _normalize_url(url: str) -> Optional[str]:
+    cleaned = clean_link(url, url)
+    if cleaned and not urlparse(cleaned).path:
+        cleaned += "/"
+    return cleaned
+
+
+class _DomainGate:
+    """Caps concurrent requests to one host and spaces them by `delay` seconds."""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self.delay = delay
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.delay
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+
+
+class WebCrawler:
+    """
+    Polite, bounded crawler shared by the researcher and URL ingestion.
+
+    Requests go through the process-wide pooled HTTP client, limited globally
+    and per host (concurrency plus a minimum delay, raised to the robots.txt
+    Crawl-delay when there is one). HTML is parsed in a process pool and
+    pages whose content was already seen are flagged as duplicates.
+
+    The instance holds per-crawl state (robots cache, seen content hashes),
+    so create one per research run or ingestion job.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        per_domain_concurrency: Optional[int] = None,
+        per_domain_delay: Optional[float] = None,
+        respect_robots: Optional[bool] = None,
+        headers: Optional[Dict[str, str]] = None,
+        strip_tags: Sequence[str] = DEFAULT_STRIP_TAGS,
+        markdown_from_cleaned_html: bool = True,
+    ):
+        """
+        Initializes the crawler. Unset limits come from the CRAWLER_* settings.
+
+        Args:
+            max_concurrency: Maximum requests in flight across all hosts.
+            per_domain_concurrency: Maximum requests in flight per host.
+            per_domain_delay: Minimum seconds between two requests to a host.
+            respect_robots: Whether robots.txt rules are enforced.
+            headers: Extra headers merged over the default ones.
+            strip_tags: Tags removed from the HTML before link extraction.
+            markdown_from_cleaned_html: Build the Markdown from the cleaned HTML
+                (True) or from the raw HTML (False).
+        """
+        self.max_concurrency = max_concurrency or settings.CRAWLER_MAX_CONCURRENCY
+        self.per_domain_concurrency = (
+            per_domain_concurrency or settings.CRAWLER_PER_DOMAIN_CONCURRENCY
+        )
+        self.per_domain_delay = (
+            per_domain_delay
+            if per_domain_delay is not None
+            else settings.CRAWLER_PER_DOMAIN_DELAY_SECONDS
+        )
+        self.respect_robots = (
+            respect_robots
+            if respect_robots is not None
+            else settings.CRAWLER_RESPECT_ROBOTS
+        )
+        self.headers = headers or {}
+        self.strip_tags = tuple(strip_tags)
+        self.markdown_from_cleaned_html = markdown_from_cleaned_html
+
+        self.seen_hashes: Set[str] = set()
+        self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._gates: Dict[str, _DomainGate] = {}
+        self._robots: Dict[str, Optional[RobotFileParser]] = {}
+        self._robots_locks: Dict[str, asyncio.Lock] = {}
+
+    def mark_seen(self, texts: Iterable[str]) -> None:
+        """Registers already collected page texts so they count as duplicates."""
+        self.seen_hashes.update(compute_content_hash(text) for text in texts)
+
+    def _gate_for(self, netloc: str) -> _DomainGate:
+        gate = self._gates.get(netloc)
+        if gate is None:
+            gate = _DomainGate(self.per_domain_concurrency, self.per_domain_delay)
+            self._gates[netloc] = gate
+        return gate
+
+    async def _request(self, url: str) -> Optional[httpx.Response]:
+        netloc = urlparse(url).netloc
+        try:
+            async with self._global_semaphore, self._gate_for(netloc):
+                response = await get_shared_http_client().get(
+                    url, headers=self.headers or None
+                )
+            return response
+        except httpx.TimeoutException:
+            logger.warning(f"[Crawler] Timeout fetching {url}")
+        except httpx.RequestError as e:
+            logger.warning(f"[Crawler] HTTP request failed for URL {url}: {e}")
+        return None
+
+    async def _get_robots(self, url: str) -> Optional[RobotFileParser]:
+        parsed = urlparse(url)
+        netloc = parsed.netloc
+        if netloc in self._robots:
+            return self._robots[netloc]
+
+        lock = self._robots_locks.setdefault(netloc, asyncio.Lock())
+        async with lock:
+            if netloc in self._robots:
+                return self._robots[netloc]
+
+            robots_url = f"{parsed.scheme}://{netloc}/robots.txt"
+            response = await self._request(robots_url)
+            parser: Optional[RobotFileParser] = None
+            if response is not None and response.status_code in (401, 403):
+                parser = RobotFileParser(robots_url)
+                parser.disallow_all = True
+            elif response is not None and response.status_code == 200:
+                parser = RobotFileParser(robots_url)
+                parser.parse(response.text.splitlines())
+                crawl_delay = parser.crawl_delay("*")
+                if crawl_delay:
+                    gate = self._gate_for(netloc)
+                    gate.delay = max(
+                        gate.delay,
+                        min(float(crawl_delay), MAX_ROBOTS_CRAWL_DELAY_SECONDS),
+                    )
+            # Missing or unreachable robots.txt: everything is allowed.
+            self._robots[netloc] = parser
+            return parser
+
+    async def is_allowed(self, url: str) -> bool:
+        """Checks robots.txt for `url` (always True if robots are not respected)."""
+        if not self.respect_robots:
+            return True
+        parser = await self._get_robots(url)
+        return parser is None or parser.can_fetch("*", url)
+
+    async def fetch_page(self, url: str, depth: int = 0) -> Optional[CrawledPage]:
+        """
+        Fetches and parses one HTML page.
+
+        Args:
+            url: The page URL.
+            depth: Link depth of the page, stored on the result.
+
+        Returns:
+            The CrawledPage, or None if the page is blocked by robots.txt,
+            could not be fetched or is not HTML.
+        """
+        if not await self.is_allowed(url):
+            logger.info(f"[Crawler] Skipping {url} (disallowed by robots.txt).")
+            return None
+
+        response = await self._request(url)
+        if response is None:
+            return None
+        if response.status_code >= 400:
+            logger.warning(f"[Crawler] {url} returned HTTP {response.status_code}.")
+            return None
+
+        content_type = response.headers.get("content-type", "").lower()
+        if "html" not in content_type:
+            logger.debug(f"[Crawler] Skipping non-HTML content at {url} ({content_type})")
+            return None
+
+        try:
+            html_content = response.content.decode("utf-8")
+        except UnicodeDecodeError:
+            html_content = response.text
+
+        final_url = str(response.url)
+        markdown, links = await parse_html_off_loop(
+            html_content,
+            final_url,
+            strip_tags=self.strip_tags,
+            markdown_from_cleaned_html=self.markdown_from_cleaned_html,
+        )
+
+        content_hash = compute_content_hash(markdown)
+        is_duplicate = content_hash in self.seen_hashes
+        self.seen_hashes.add(content_hash)
+        if is_duplicate:
+            logger.debug(f"[Crawler] {url} has the same content as a page already seen.")
+
+        return CrawledPage(
+            url=url,
+            final_url=final_url,
+            markdown=markdown,
+            links=links,
+            content_hash=content_hash,
+            depth=depth,
+            is_duplicate=is_duplicate,
+        )
+
+    async def fetch_many(self, urls: Sequence[str]) -> List[Optional[CrawledPage]]:
+        """
+        Fetches several pages concurrently, within the crawler limits.
+
+        Returns:
+            One entry per URL, in order; None where the page could not be fetched.
+        """
+
+        async def _safe_fetch(url: str) -> Optional[CrawledPage]:
+            try:
+                return await self.fetch_page(url)
+            except Exception as e:
+                logger.exception(f"[Crawler] Unexpected error fetching {url}: {e}")
+                return None
+
+        return list(await asyncio.gather(*(_safe_fetch(url) for url in urls)))
+
+    async def sitemap_urls(self, start_url: str, limit: int = MAX_SITEMAP_URLS) -> List[str]:
+        """
+        Collects page URLs from the site's sitemaps (declared in robots.txt,
+        or /sitemap.xml), following at most MAX_NESTED_SITEMAPS index entries.
+        """
+        parsed = urlparse(start_url)
+        sitemap_queue: List[str] = []
+        parser = await self._get_robots(start_url)
+        if parser is not None and parser.site_maps():
+            sitemap_queue.extend(parser.site_maps())
+        else:
+            sitemap_queue.append(f"{parsed.scheme}://{parsed.netloc}/sitemap.xml")
+
+        page_urls: List[str] = []
+        fetched_sitemaps = 0
+        while sitemap_queue and fetched_sitemaps <= MAX_NESTED_SITEMAPS:
+            sitemap_url = sitemap_queue.pop(0)
+            fetched_sitemaps += 1
+            response = await self._request(sitemap_url)
+            if response is None or response.status_code != 200:
+                continue
+            pages, nested = extract_sitemap_urls(response.text)
+            page_urls.extend(pages)
+            sitemap_queue.extend(nested)
+            if len(page_urls) >= limit:
+                break
+
+        logger.info(
+            f"[Crawler] Found {len(page_urls)} URLs in sitemaps of {parsed.netloc}."
+        )
+        return page_urls[:limit]
+
+    async def crawl(
+        self,
+        start_url: str,
+        max_depth: int = 2,
+        max_pages: Optional[int] = None,
+        seed_from_sitemap: bool = False,
+    ) -> AsyncIterator[CrawledPage]:
+        """
+        Breadth-first crawl of a site, yielding unique pages as they are parsed.
+
+        Only same-site links (subdomains included) are followed.
+
+        Args:
+            start_url: Where the crawl starts.
+            max_depth: Maximum link depth from the start page.
+            max_pages: Maximum number of URLs fetched (CRAWLER_MAX_PAGES if unset).
+            seed_from_sitemap: Also schedule the URLs listed in the sitemaps.
+
+        Yields:
+            CrawledPage objects, duplicates excluded.
+        """
+        max_pages = max_pages or settings.CRAWLER_MAX_PAGES
+        start = _normalize_url(start_url)
+        if not start:
+            logger.warning(f"[Crawler] Invalid start URL: {start_url}")
+            return
+        base_netloc = urlparse(start).netloc
+
+        scheduled: Set[str] = {start}
+        frontier: "asyncio.Queue[Tuple[str, int]]" = asyncio.Queue()
+        frontier.put_nowait((start, 0))
+
+        def _schedule(url: str, depth: int) -> None:
+            normalized = _normalize_url(url)
+            if (
+                normalized
+                and normalized not in scheduled
+                and len(scheduled) < max_pages
+                and is_same_site(base_netloc, normalized)
+            ):
+                scheduled.add(normalized)
+                frontier.put_nowait((normalized, depth))
+
+        if seed_from_sitemap and max_depth > 0:
+            for sitemap_url in await self.sitemap_urls(start):
+                _schedule(sitemap_url, 1)
+
+        results: "asyncio.Queue[Optional[CrawledPage]]" = asyncio.Queue()
+
+        async def _worker() -> None:
+            while True:
+                url, depth = await frontier.get()
+                try:
+                    page = await self.fetch_page(url, depth=depth)
+                    if page is None or page.is_duplicate:
+                        continue
+                    await results.put(page)
+                    if depth < max_depth:
+                        for link_url, _anchor in page.links:
+                            _schedule(link_url, depth + 1)
+                except Exception as e:
+                    logger.exception(f"[Crawler] Unexpected error crawling {url}: {e}")
+                finally:
+                    frontier.task_done()
+
+        async def _close_when_done() -> None:
+            await frontier.join()
+            await results.put(None)
+
+        tasks = [asyncio.create_task(_worker()) for _ in range(self.max_concurrency)]
+        tasks.append(asyncio.create_task(_close_when_done()))
+        try:
+            while True:
+                page = await results.get()
+                if page is None:
+                    break
+                yield page
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(
+                f"[Crawler] Crawl of {start} finished. URLs scheduled: {len(scheduled)}."
+            )
@@ -0,0 +1,145 @@
+# app/services/crawler/html_parsing.py
+#
+# Pure, picklable helpers. The crawler runs `parse_html_page` in a process
+# pool, so this module must stay light to import (no app settings, no DB).
+
+import hashlib
+import re
+from typing import List, Optional, Sequence, Tuple
+from urllib.parse import urljoin, urlparse
+from xml.etree import ElementTree
+
+import html2text
+from bs4 import BeautifulSoup
+
+# Tags commonly holding boilerplate instead of page content.
+DEFAULT_STRIP_TAGS: Tuple[str, ...] = (
+    "script",
+    "style",
+    "svg",
+    "nav",
+    "footer",
+    "header",
+    "aside",
+    "form",
+)
+
+# (url, anchor text)
+ParsedLink = Tuple[str, str]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def build_html2text() -> html2text.HTML2Text:
+    """Returns the html2text converter configured for RAG/LLM consumption."""
+    h2t = html2text.HTML2Text()
+    h2t.body_width = 0  # No automatic line wrapping
+    h2t.ignore_images = True  # Usually good for RAG
+    h2t.ignore_links = False  # Keep links by default, can be changed
+    h2t.ignore_emphasis = False  # Keep bold/italic
+    h2t.unicode_snob = True
+    h2t.mark_code = True
+    h2t.header_style = 1  # Use #, ## for headers (ATX style)
+    h2t.use_automatic_links = True
+    h2t.skip_internal_links = True
+    h2t.include_doc_title = False  # Don't use <title> tag as H1 for the whole doc
+    return h2t
+
+
+def get_base_domain(netloc: str) -> str:
+    parts = netloc.lower().split(":")[0].split(".")
+    if len(parts) <= 2:
+        return ".".join(parts)
+    return ".".join(parts[-2:])
+
+
+def is_same_site(base_netloc: str, link_url: str) -> bool:
+    """True when `link_url` is on the same site as `base_netloc`, subdomains included."""
+    try:
+        link_netloc = urlparse(link_url).netloc
+        if not link_netloc:
+            return True
+        return get_base_domain(base_netloc) == get_base_domain(link_netloc)
+    except Exception:
+        return False
+
+
+def clean_link(base_url: str, link: str) -> Optional[str]:
+    """Resolves `link` against `base_url`; in-page anchors and non-HTTP schemes give None."""
+    try:
+        absolute_link = urljoin(base_url, link.strip())
+        parsed_link = urlparse(absolute_link)
+        if parsed_link.scheme not in ["http", "https"] or parsed_link.fragment:
+            return None
+        return parsed_link._replace(netloc=parsed_link.netloc.lower()).geturl()
+    except Exception:
+        return None
+
+
+def compute_content_hash(text: str) -> str:
+    """Hash of the whitespace-normalized text, used to drop duplicate pages."""
+    normalized = _WHITESPACE_RE.sub(" ", text).strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def parse_html_page(
+    html_content: str,
+    base_url: str,
+    strip_tags: Sequence[str] = DEFAULT_STRIP_TAGS,
+    markdown_from_cleaned_html: bool = True,
+) -> Tuple[str, List[ParsedLink]]:
+    """
+    Converts an HTML page to Markdown and collects its same-site links.
+
+    Args:
+        html_content: The raw HTML.
+        base_url: The URL the page was fetched from, to resolve relative links.
+        strip_tags: Tags removed before extracting links (and, optionally,
+            before the Markdown conversion).
+        markdown_from_cleaned_html: If False, the Markdown is built from the
+            raw HTML so footers/headers (contact info, addresses) are kept.
+
+    Returns:
+        A tuple (markdown, links), links being (url, anchor text) pairs.
+    """
+    if not html_content:
+        return "", []
+
+    soup = BeautifulSoup(html_content, "lxml")
+    for tag in soup(list(strip_tags)):
+        tag.decompose()
+
+    base_netloc = urlparse(base_url).netloc
+    links: List[ParsedLink] = []
+    seen = set()
+    for a_tag in soup.find_all("a", href=True):
+        cleaned = clean_link(base_url, a_tag["href"])
+        if cleaned and cleaned not in seen and is_same_site(base_netloc, cleaned):
+            seen.add(cleaned)
+            links.append((cleaned, a_tag.get_text(strip=True)))
+
+    source_html = str(soup) if markdown_from_cleaned_html else html_content
+    markdown = build_html2text().handle(source_html)
+    return markdown.strip(), links
+
+
+def extract_sitemap_urls(xml_content: str) -> Tuple[List[str], List[str]]:
+    """
+    Reads a sitemap or sitemap index.
+
+    Returns:
+        A tuple (page urls, nested sitemap urls).
+    """
+    try:
+        root = ElementTree.fromstring(xml_content.encode("utf-8"))
+    except ElementTree.ParseError:
+        return [], []
+
+    locs = [
+        (el.text or "").strip()
+        for el in root.iter()
+        if el.tag.endswith("loc") and el.text
+    ]
+    if root.tag.endswith("sitemapindex"):
+        return [], locs
+    return locs, []
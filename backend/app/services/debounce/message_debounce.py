@@ -2,6 +2,7 @@
 
 import asyncio
 import json
+import time
 import uuid as uuid_pkg
 from typing import (
     Dict,
@@ -14,6 +15,10 @@ from typing import (
 from loguru import logger
 import redis.asyncio as aioredis  # Para type hinting
 
+from app.core.log import payload
+from app.core.metrics import DEBOUNCE_WAIT_SECONDS
+from app.core.tracing import current_trace
+
 DEFAULT_DEBOUNCE_DELAY_SECONDS = 8.0
 REDIS_KEY_PREFIX = "debounce:convo"
 REDIS_KEY_TTL_SECONDS = int(DEFAULT_DEBOUNCE_DELAY_SECONDS * 3 + 300)
@@ -142,7 +147,9 @@ class MessageDebounceService:
                     f"Debounce trigger for conv_id={conversation_id_str}: Token match. Data retrieved and key deleted from Redis."
                 )
                 logger.trace(
-                    f"Retrieved data from Redis for {conversation_id_str}: {stored_data_dict}"
+                    "Retrieved data from Redis for {}: {}",
+                    conversation_id_str,
+                    payload(stored_data_dict),
                 )
 
                 message_contents_json = stored_data_dict.get("message_contents", "[]")
@@ -160,6 +167,16 @@ class MessageDebounceService:
                     # Adicionar outros campos do base_payload_for_task se foram armazenados
                 }
 
+                # Trace and wait of the first message of the burst
+                if stored_data_dict.get("trace_context"):
+                    final_payload_for_task["trace_context"] = json.loads(
+                        stored_data_dict["trace_context"]
+                    )
+                if stored_data_dict.get("first_buffered_at"):
+                    DEBOUNCE_WAIT_SECONDS.observe(
+                        max(time.time() - float(stored_data_dict["first_buffered_at"]), 0.0)
+                    )
+
                 # Adicionar quaisquer outros campos que foram armazenados em stored_data_dict
                 # e que são esperados por task_enqueuer_func, além dos IDs e merged_content.
                 # Ex: Se você armazenou "last_user_message_id" no Redis:
@@ -264,6 +281,12 @@ class MessageDebounceService:
                         "debounce_token": current_debounce_token,
                         "scheduled_at": str(asyncio.get_running_loop().time()),
                     }
+                    if "first_buffered_at" not in existing_data:
+                        # Kept across the burst (HSET leaves absent fields alone)
+                        payload_to_store["first_buffered_at"] = str(time.time())
+                        trace = current_trace()
+                        if trace:
+                            payload_to_store["trace_context"] = json.dumps(trace)
                     # Adicionar/sobrescrever chaves do base_payload_for_task
                     for key, value in base_payload_for_task.items():
                         payload_to_store[key] = str(
@@ -1,3 +1,4 @@
+from typing import Dict, List
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
@@ -27,3 +28,105 @@ async def reset_checkpoint(
         stmt = text(f"DELETE FROM {table} WHERE thread_id = :thread_id")
         await db.execute(stmt, {"thread_id": thread_id})
         logger.debug(f"[reset_checkpoint] Deleted rows from {table} (if any existed).")
+
+
+async def prune_checkpoints(
+    db: AsyncSession,
+    keep_last: int,
+    batch_size: int = 500,
+) -> Dict[str, int]:
+    """
+    Keeps only the latest `keep_last` checkpoints of every thread.
+
+    Older checkpoints and their pending writes are deleted, then the blobs no
+    longer referenced by any remaining checkpoint of those threads. Threads
+    are processed in batches, each one committed on its own.
+
+    Args:
+        db (AsyncSession): Assync Database Session
+        keep_last (int): Number of checkpoints to keep per thread
+        batch_size (int): Number of threads handled per transaction
+
+    Returns:
+        Dict[str, int]: Deleted row counts per table, plus the number of threads pruned.
+    """
+    keep_last = max(keep_last, 1)
+    totals = {
+        "threads": 0,
+        "checkpoint_writes": 0,
+        "checkpoints": 0,
+        "checkpoint_blobs": 0,
+    }
+
+    result = await db.execute(
+        text(
+            "SELECT thread_id FROM checkpoints "
+            "GROUP BY thread_id HAVING count(*) > :keep_last"
+        ),
+        {"keep_last": keep_last},
+    )
+    thread_ids: List[str] = [row[0] for row in result.all()]
+    logger.info(
+        f"[prune_checkpoints] {len(thread_ids)} thread(s) with more than {keep_last} checkpoints."
+    )
+
+    stale_checkpoints_cte = """
+        WITH stale AS (
+            SELECT thread_id, checkpoint_ns, checkpoint_id FROM (
+                SELECT thread_id, checkpoint_ns, checkpoint_id,
+                       row_number() OVER (
+                           PARTITION BY thread_id, checkpoint_ns
+                           ORDER BY checkpoint_id DESC
+                       ) AS rn
+                FROM checkpoints
+                WHERE thread_id = ANY(:thread_ids)
+            ) ranked
+            WHERE rn > :keep_last
+        )
+    """
+    statements = {
+        "checkpoint_writes": text(
+            stale_checkpoints_cte
+            + """
+            DELETE FROM checkpoint_writes w USING stale s
+            WHERE w.thread_id = s.thread_id
+              AND w.checkpoint_ns = s.checkpoint_ns
+              AND w.checkpoint_id = s.checkpoint_id
+            """
+        ),
+        "checkpoints": text(
+            stale_checkpoints_cte
+            + """
+            DELETE FROM checkpoints c USING stale s
+            WHERE c.thread_id = s.thread_id
+              AND c.checkpoint_ns = s.checkpoint_ns
+              AND c.checkpoint_id = s.checkpoint_id
+            """
+        ),
+        "checkpoint_blobs": text(
+            """
+            DELETE FROM checkpoint_blobs b
+            WHERE b.thread_id = ANY(:thread_ids)
+              AND NOT EXISTS (
+                  SELECT 1 FROM checkpoints c
+                  WHERE c.thread_id = b.thread_id
+                    AND c.checkpoint_ns = b.checkpoint_ns
+                    AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+              )
+            """
+        ),
+    }
+
+    for start in range(0, len(thread_ids), batch_size):
+        batch = thread_ids[start : start + batch_size]
+        params = {"thread_ids": batch, "keep_last": keep_last}
+        for table, stmt in statements.items():
+            deleted = await db.execute(stmt, params)
+            totals[table] += deleted.rowcount or 0
+        await db.commit()
+        totals["threads"] += len(batch)
+        logger.debug(
+            f"[prune_checkpoints] Pruned batch of {len(batch)} thread(s). Totals so far: {totals}"
+        )
+
+    return totals
@@ -1,6 +1,155 @@
+import re
 import phonenumbers
-from typing import Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Optional, Pattern, Tuple
 from loguru import logger
+from phonenumbers import PhoneMetadata
+
+from app.config import get_settings
+
+settings = get_settings()
+
+_MISSING = object()
+
+
+def _parse_to_e164_digits(
+    phone_number: str, account_country_code: Optional[str]
+) -> Optional[str]:
+    """The full phonenumbers parse / check / format; what the cache stores."""
+    try:
+        parsed_number = phonenumbers.parse(phone_number, account_country_code)
+        if not phonenumbers.is_valid_number(
+            parsed_number
+        ) and not phonenumbers.is_possible_number(parsed_number):
+            logger.error(f"Invalid phone number provided: {phone_number}")
+            return None
+        e164_format = phonenumbers.format_number(
+            parsed_number, phonenumbers.PhoneNumberFormat.E164
+        )
+
+        return e164_format.lstrip("+")
+    except phonenumbers.NumberParseException:
+        logger.error(f"Could not parse phone number: {phone_number}")
+        return None
+    except Exception as e:
+        logger.error(f"Error normalizing phone number {phone_number}: {e}")
+        return None
+
+
+@lru_cache(maxsize=32)
+def _e164_rule(
+    account_country_code: Optional[str],
+) -> Optional[Tuple[str, FrozenSet[int], Optional[Pattern]]]:
+    """
+    When a digits-only input is already the E.164 form of a number of the
+    default region, phonenumbers gives it back unchanged: the country code is
+    stripped because the whole input is too long to be a national number, and
+    "possible" only checks the national length. Returns (country code,
+    national lengths for which that holds, national prefix pattern).
+    """
+    metadata = (
+        PhoneMetadata.metadata_for_region(account_country_code.upper())
+        if account_country_code
+        else None
+    )
+    if metadata is None or not metadata.general_desc.possible_length:
+        return None
+    country_code = str(metadata.country_code)
+    possible_lengths = metadata.general_desc.possible_length
+    lengths = frozenset(
+        length
+        for length in possible_lengths
+        if len(country_code) + length > max(possible_lengths)
+    )
+    if not lengths:
+        return None
+    national_prefix = metadata.national_prefix_for_parsing
+    return country_code, lengths, re.compile(national_prefix) if national_prefix else None
+
+
+def _as_e164_digits(
+    phone_number: str, account_country_code: Optional[str]
+) -> Optional[str]:
+    """Fast path: `phone_number` ('55119...' or '+55119...') if it is already normalized."""
+    rule = _e164_rule(account_country_code)
+    if rule is None:
+        return None
+    digits = phone_number[1:] if phone_number.startswith("+") else phone_number
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    country_code, lengths, national_prefix = rule
+    if not digits.startswith(country_code):
+        return None
+    national = digits[len(country_code) :]
+    if len(national) not in lengths or national.startswith("0"):
+        return None
+    if national_prefix is not None and national_prefix.match(national):
+        return None  # National/carrier prefix rules could rewrite it
+    return digits
+
+
+class PhoneNumberNormalizer:
+    """
+    Bounded LRU of normalized phone numbers keyed by (raw input, region).
+
+    Inbound messages, contact creation, imports and syncs keep normalizing the
+    same few thousand numbers; invalid inputs are cached too (as None).
+    Inputs already in E.164 digits skip phonenumbers and the cache entirely.
+    """
+
+    def __init__(self, max_entries: int = 50_000):
+        self.max_entries = max(max_entries, 1)
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], Optional[str]]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def normalize(
+        self, phone_number: str, account_country_code: Optional[str] = "BR"
+    ) -> Optional[str]:
+        if not phone_number:
+            return None
+        fast = _as_e164_digits(phone_number, account_country_code)
+        if fast is not None:
+            return fast
+
+        key = (phone_number, account_country_code)
+        value = self._entries.get(key, _MISSING)
+        if value is not _MISSING:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = _parse_to_e164_digits(phone_number, account_country_code)
+        self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def normalize_many(
+        self,
+        phone_numbers: Iterable[Optional[str]],
+        account_country_code: Optional[str] = "BR",
+    ) -> List[Optional[str]]:
+        """Normalizes a batch; repeated inputs within it are parsed once."""
+        phone_numbers = list(phone_numbers)
+        results = {
+            phone: self.normalize(phone, account_country_code)
+            for phone in dict.fromkeys(phone_numbers)
+        }
+        return [results[phone] for phone in phone_numbers]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+phone_number_normalizer = PhoneNumberNormalizer(
+    settings.PHONE_NORMALIZATION_CACHE_MAX_ENTRIES
+)
 
 
 # --- Helper Function (Synchronous) ---
@@ -26,23 +175,18 @@ def normalize_phone_number(
     if is_simulation:
         return phone_number
 
-    if not phone_number:
-        return None
-    try:
-        parsed_number = phonenumbers.parse(phone_number, account_country_code)
-        if not phonenumbers.is_valid_number(
-            parsed_number
-        ) and not phonenumbers.is_possible_number(parsed_number):
-            logger.error(f"Invalid phone number provided: {phone_number}")
-            return None
-        e164_format = phonenumbers.format_number(
-            parsed_number, phonenumbers.PhoneNumberFormat.E164
-        )
+    return phone_number_normalizer.normalize(phone_number, account_country_code)
 
-        return e164_format.lstrip("+")
-    except phonenumbers.NumberParseException:
-        logger.error(f"Could not parse phone number: {phone_number}")
-        return None
-    except Exception as e:
-        logger.error(f"Error normalizing phone number {phone_number}: {e}")
-        return None
+
+def normalize_phone_numbers(
+    phone_numbers: Iterable[Optional[str]],
+    *,
+    account_country_code: Optional[str] = "BR",
+) -> List[Optional[str]]:
+    """
+    Batch version of `normalize_phone_number`, for imports and contact syncs.
+
+    Returns:
+        The normalized numbers (None for invalid ones), in input order.
+    """
+    return phone_number_normalizer.normalize_many(phone_numbers, account_country_code)
@@ -6,6 +6,7 @@ from app.models.message import Message
 from app.api.schemas.conversation import ConversationSearchResult, MessageSnippet
 from app.api.schemas.contact import ContactBase
 from app.models.conversation import Conversation
+from app.models.conversation_list_entry import ConversationListEntry
 from app.services.repository import contact as contact_repo
 
 
@@ -125,3 +126,39 @@ def conversations_to_conversations_response(
     for conv in conversations:
         response.append(parse_conversation_to_conversation_response(conv))
     return response
+
+
+def list_entry_to_conversation_response(
+    entry: ConversationListEntry,
+) -> ConversationSearchResult:
+    """parses a conversation list entry (read model) to a conversation response
+
+    Args:
+        entry (ConversationListEntry): conversation list entry
+
+    Returns:
+        ConversationSearchResult: the same response as for the conversation itself
+    """
+    last_message = entry.last_message or {}
+    return ConversationSearchResult(
+        id=entry.conversation_id,
+        status=entry.status,
+        unread_agent_count=entry.unread_agent_count,
+        is_bot_active=entry.is_bot_active,
+        contact=ContactBase(
+            name=entry.contact_name,
+            phone_number=entry.phone_number,
+            profile_picture_url=entry.profile_picture_url,
+        ),
+        last_message_at=entry.last_message_at,
+        last_message=(
+            MessageSnippet(
+                id=last_message.get("id", ""),
+                content=last_message.get("content", ""),
+                sent_at=last_message.get("sent_at", None),
+            )
+            if last_message
+            else None
+        ),
+        updated_at=entry.updated_at,
+    )
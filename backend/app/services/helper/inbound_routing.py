@@ -0,0 +1,265 @@
+# app/services/helper/inbound_routing.py
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from loguru import logger
+from pydantic import BaseModel
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.conversation import ConversationStatusEnum
+
+settings = get_settings()
+
+ROUTE_KEY_PREFIX = "routing:inbound:"
+ROUTE_TAG_PREFIX = "routing:tag:"
+
+_PENDING_ROUTES_KEY = "inbound_routes_to_cache"
+_PENDING_INVALIDATIONS_KEY = "inbound_route_invalidations"
+
+
+class InboundRoute(BaseModel):
+    """Everything the webhook parsers resolve for a (channel, sender phone) pair."""
+
+    account_id: UUID
+    inbox_id: UUID
+    contact_id: UUID
+    contact_inbox_id: UUID
+    conversation_id: UUID
+    conversation_status: ConversationStatusEnum
+    contact_name: Optional[str] = None
+
+
+def build_channel_key(provider: str, channel_identifier: str) -> str:
+    """
+    Builds the channel part of the routing key.
+
+    Args:
+        provider: "evolution" or "wpp_cloud".
+        channel_identifier: Evolution instance UUID or WhatsApp Cloud phone_number_id.
+    """
+    return f"{provider}:{channel_identifier}"
+
+
+def _route_key(channel_key: str, phone: str) -> str:
+    return f"{ROUTE_KEY_PREFIX}{channel_key}:{phone}"
+
+
+def _tag_keys(
+    conversation_id: Optional[UUID] = None,
+    contact_id: Optional[UUID] = None,
+    inbox_id: Optional[UUID] = None,
+) -> List[str]:
+    tags = []
+    if conversation_id:
+        tags.append(f"{ROUTE_TAG_PREFIX}conversation:{conversation_id}")
+    if contact_id:
+        tags.append(f"{ROUTE_TAG_PREFIX}contact:{contact_id}")
+    if inbox_id:
+        tags.append(f"{ROUTE_TAG_PREFIX}inbox:{inbox_id}")
+    return tags
+
+
+class InboundRoutingCache:
+    """
+    Two-tier cache of resolved inbound routes.
+
+    The in-process tier absorbs bursts from the same sender and keeps entries
+    for a few seconds only, which bounds how long another process can serve a
+    route that was invalidated elsewhere. Redis is the shared tier; every
+    entry is also added to tag sets (conversation, contact, inbox) so it can
+    be invalidated by id.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        local_ttl_seconds: float,
+        local_max_entries: int,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.local_ttl_seconds = local_ttl_seconds
+        self.local_max_entries = max(local_max_entries, 1)
+        self._local: "OrderedDict[str, Tuple[float, InboundRoute]]" = OrderedDict()
+        self._redis: Optional[Redis] = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._background_tasks: Set[asyncio.Task] = set()
+
+    def _get_redis(self) -> Redis:
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            self._redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+            self._redis_loop = loop
+        return self._redis
+
+    def _local_get(self, key: str) -> Optional[InboundRoute]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, route = entry
+        if expires_at < time.monotonic():
+            self._local.pop(key, None)
+            return None
+        self._local.move_to_end(key)
+        return route
+
+    def _local_put(self, key: str, route: InboundRoute) -> None:
+        self._local[key] = (time.monotonic() + self.local_ttl_seconds, route)
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_entries:
+            self._local.popitem(last=False)
+
+    async def get(self, channel_key: str, phone: str) -> Optional[InboundRoute]:
+        """Returns the cached route, or None on a miss (or if Redis is unavailable)."""
+        key = _route_key(channel_key, phone)
+        route = self._local_get(key)
+        if route is not None:
+            return route
+        try:
+            raw = await self._get_redis().get(key)
+        except Exception as e:
+            logger.warning(f"[InboundRouting] Redis lookup failed for {key}: {e}")
+            return None
+        if not raw:
+            return None
+        try:
+            route = InboundRoute.model_validate_json(raw)
+        except Exception:
+            return None
+        self._local_put(key, route)
+        return route
+
+    async def put(self, channel_key: str, phone: str, route: InboundRoute) -> None:
+        key = _route_key(channel_key, phone)
+        self._local_put(key, route)
+        try:
+            async with self._get_redis().pipeline(transaction=False) as pipe:
+                pipe.set(key, route.model_dump_json(), ex=self.ttl_seconds)
+                for tag in _tag_keys(
+                    route.conversation_id, route.contact_id, route.inbox_id
+                ):
+                    pipe.sadd(tag, key)
+                    pipe.expire(tag, self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[InboundRouting] Failed to store route {key}: {e}")
+
+    async def invalidate(
+        self,
+        conversation_id: Optional[UUID] = None,
+        contact_id: Optional[UUID] = None,
+        inbox_id: Optional[UUID] = None,
+    ) -> None:
+        """Drops every route pointing to the given conversation, contact or inbox."""
+        for key, (_, route) in list(self._local.items()):
+            if (
+                (conversation_id and route.conversation_id == conversation_id)
+                or (contact_id and route.contact_id == contact_id)
+                or (inbox_id and route.inbox_id == inbox_id)
+            ):
+                self._local.pop(key, None)
+
+        tags = _tag_keys(conversation_id, contact_id, inbox_id)
+        if not tags:
+            return
+        try:
+            redis = self._get_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.smembers(tag)
+                members = await pipe.execute()
+            keys = set().union(*members) if members else set()
+            await redis.delete(*keys, *tags)
+            logger.debug(
+                f"[InboundRouting] Invalidated {len(keys)} route(s) for tags {tags}."
+            )
+        except Exception as e:
+            logger.warning(f"[InboundRouting] Failed to invalidate {tags}: {e}")
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    # --- Transaction-aware helpers ---
+
+    def _spawn(self, coro) -> None:
+        try:
+            task = asyncio.get_running_loop().create_task(coro)
+        except RuntimeError:
+            coro.close()
+            return
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _ensure_session_hooks(self, db: AsyncSession) -> None:
+        sync_session = db.sync_session
+        if sync_session.info.get("inbound_routing_hooks"):
+            return
+        sync_session.info["inbound_routing_hooks"] = True
+
+        def _after_commit(session) -> None:
+            routes: Dict[Tuple[str, str], InboundRoute] = session.info.pop(
+                _PENDING_ROUTES_KEY, {}
+            )
+            invalidations = session.info.pop(_PENDING_INVALIDATIONS_KEY, [])
+            for ids in invalidations:
+                self._spawn(self.invalidate(*ids))
+            for (channel_key, phone), route in routes.items():
+                self._spawn(self.put(channel_key, phone, route))
+
+        def _after_rollback(session) -> None:
+            session.info.pop(_PENDING_ROUTES_KEY, None)
+            session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+
+        event.listen(sync_session, "after_commit", _after_commit)
+        event.listen(sync_session, "after_rollback", _after_rollback)
+
+    def put_after_commit(
+        self, db: AsyncSession, channel_key: str, phone: str, route: InboundRoute
+    ) -> None:
+        """
+        Stores the route once `db` commits, so ids of rows created in a
+        transaction that is later rolled back are never cached.
+        """
+        self._ensure_session_hooks(db)
+        db.sync_session.info.setdefault(_PENDING_ROUTES_KEY, {})[
+            (channel_key, phone)
+        ] = route
+
+
+inbound_routing_cache = InboundRoutingCache(
+    ttl_seconds=settings.INBOUND_ROUTING_CACHE_TTL_SECONDS,
+    local_ttl_seconds=settings.INBOUND_ROUTING_LOCAL_TTL_SECONDS,
+    local_max_entries=settings.INBOUND_ROUTING_LOCAL_MAX_ENTRIES,
+)
+
+
+async def invalidate_inbound_routes(
+    db: Optional[AsyncSession] = None,
+    *,
+    conversation_id: Optional[UUID] = None,
+    contact_id: Optional[UUID] = None,
+    inbox_id: Optional[UUID] = None,
+) -> None:
+    """
+    Invalidates cached inbound routes now and, when a session is given,
+    again right after it commits (a parser running concurrently could have
+    re-cached the pre-commit state in between).
+
+    Args:
+        db: The session performing the change, if any.
+        conversation_id: Conversation deleted, reassigned or whose status changed.
+        contact_id: Contact deleted or whose identifier changed.
+        inbox_id: Inbox deleted or reconfigured.
+    """
+    await inbound_routing_cache.invalidate(conversation_id, contact_id, inbox_id)
+    if db is not None:
+        inbound_routing_cache._ensure_session_hooks(db)
+        db.sync_session.info.setdefault(_PENDING_INVALIDATIONS_KEY, []).append(
+            (conversation_id, contact_id, inbox_id)
+        )
@@ -0,0 +1,59 @@
+import codecs
+import json
+from json.decoder import WHITESPACE
+from typing import Any, AsyncIterable, AsyncIterator
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """
+    Yields the elements of a top-level JSON array as its bytes arrive, so a
+    large provider response never has to be held (or decoded) as a whole.
+
+    Only the element being decoded is buffered. Each element is parsed with
+    the standard `json` decoder, so the values are the same as `json.loads`.
+
+    Args:
+        chunks: The response body, e.g. `httpx.Response.aiter_bytes()`.
+
+    Raises:
+        ValueError: The body is not a JSON array or ends before it is closed.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    started = finished = False
+
+    async for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        pos = 0
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            char = buffer[pos]
+            if not started:
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {buffer[pos:pos + 50]!r}")
+                started = True
+                pos += 1
+            elif char == ",":
+                pos += 1
+            elif char == "]":
+                finished = True
+                break
+            else:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break  # Element not complete yet; wait for the next chunk
+                if end == len(buffer) and not isinstance(item, (dict, list, str)):
+                    break  # A number/literal may continue in the next chunk
+                yield item
+                pos = end
+        if finished:
+            return
+        buffer = buffer[pos:]
+
+    if not started and not buffer.strip():
+        raise ValueError("Empty response body, expected a JSON array")
+    raise ValueError("JSON array ended before it was closed")
@@ -0,0 +1,253 @@
+import asyncio
+import gzip
+import os
+import re
+import tempfile
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# messages is range-partitioned by month on sent_at: messages_pYYYY_MM holds
+# [YYYY-MM-01, next month) in UTC, and messages_default catches the rest.
+PARENT_TABLE = "messages"
+DEFAULT_PARTITION = "messages_default"
+_PARTITION_NAME = re.compile(r"^messages_p(\d{4})_(\d{2})$")
+ARCHIVE_PREFIX = "archive/messages"
+
+
+def add_months(month: date, count: int) -> date:
+    """First day of the month `count` months after (or before) `month`."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_start(moment: Optional[datetime] = None) -> date:
+    """First day of the (UTC) month of `moment` (now by default)."""
+    moment = moment or datetime.now(timezone.utc)
+    return moment.astimezone(timezone.utc).date().replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y_%m}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month covered by a monthly partition name, or None for other tables."""
+    match = _PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def archivable_months(
+    partition_names: List[str], keep_months: int, today: Optional[date] = None
+) -> List[Tuple[str, date]]:
+    """
+    Monthly partitions entirely older than the last `keep_months` months
+    (the current month included), oldest first.
+    """
+    cutoff = add_months(today or month_start(), -(keep_months - 1))
+    months = [(name, partition_month(name)) for name in partition_names]
+    return sorted(
+        [(name, month) for name, month in months if month and month < cutoff],
+        key=lambda item: item[1],
+    )
+
+
+def _partition_bounds(month: date) -> Tuple[str, str]:
+    """Range of a monthly partition, as timestamptz literals."""
+    return (
+        f"{month:%Y-%m-%d} 00:00:00+00",
+        f"{add_months(month, 1):%Y-%m-%d} 00:00:00+00",
+    )
+
+
+async def create_message_partition(db: AsyncSession, month: date) -> None:
+    """
+    Creates the partition of `month`, in the caller's transaction.
+
+    When messages_default already holds rows of that month (the maintenance
+    task fell behind, or a message came with a future sent_at), a plain
+    CREATE ... PARTITION OF fails. The table is then created standalone, the
+    rows are moved out of the default partition and the table is attached,
+    with inserts into the default partition blocked meanwhile.
+    """
+    name = partition_name(month)
+    lower, upper = _partition_bounds(month)
+    bounds = f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    in_range = f"sent_at >= '{lower}' AND sent_at < '{upper}'"
+
+    await db.execute(
+        text(f"LOCK TABLE {DEFAULT_PARTITION} IN SHARE ROW EXCLUSIVE MODE")
+    )
+    stranded = await db.scalar(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})")
+    )
+    if not stranded:
+        await db.execute(
+            text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} {bounds}")
+        )
+        return
+
+    await db.execute(
+        text(
+            f"CREATE TABLE {name} "
+            f"(LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    moved = await db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        )
+    )
+    await db.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} {bounds}"))
+    logger.warning(
+        f"[MessagePartitions] Moved {moved.rowcount} rows of {month:%Y-%m} "
+        f"from {DEFAULT_PARTITION} into {name}."
+    )
+
+
+async def ensure_message_partitions(db: AsyncSession, months_ahead: int) -> List[str]:
+    """
+    Creates the monthly partitions from the current month to `months_ahead`
+    months ahead when missing, so new messages never land in the default
+    partition. Each month is created in its own transaction: a month that
+    fails is logged and retried on the next run without blocking the others.
+    Returns the names created.
+    """
+    current = month_start()
+    existing = set(await list_message_partitions(db))
+    created: List[str] = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        try:
+            await create_message_partition(db, month)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.exception(f"[MessagePartitions] Failed to create {name}: {e}")
+            continue
+        created.append(name)
+    if created:
+        logger.info(f"[MessagePartitions] Created partitions: {created}")
+    return created
+
+
+async def list_message_partitions(db: AsyncSession) -> List[str]:
+    """Names of the partitions currently attached to messages."""
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass)"
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    return [row[0] for row in result.all()]
+
+
+async def list_detached_message_partitions(db: AsyncSession) -> List[str]:
+    """Monthly partition tables already detached but not archived yet (e.g. a failed upload)."""
+    result = await db.execute(
+        text(
+            "SELECT relname FROM pg_class "
+            "WHERE relkind = 'r' AND NOT relispartition "
+            "AND relname ~ '^messages_p[0-9]{4}_[0-9]{2}$'"
+        )
+    )
+    return [row[0] for row in result.all()]
+
+
+async def detach_message_partition(
+    db: AsyncSession, name: str, lock_timeout_seconds: int = 5
+) -> bool:
+    """
+    Detaches a partition. DETACH briefly needs an exclusive lock on messages,
+    so it gives up after `lock_timeout_seconds` instead of queueing writers
+    behind it; returns False in that case (retried on the next run).
+    """
+    try:
+        await db.execute(text(f"SET LOCAL lock_timeout = '{int(lock_timeout_seconds)}s'"))
+        await db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        await db.commit()
+        logger.info(f"[MessagePartitions] Detached {name}.")
+        return True
+    except Exception as e:
+        await db.rollback()
+        logger.warning(f"[MessagePartitions] Could not detach {name} now: {e}")
+        return False
+
+
+async def export_table_gzip(db: AsyncSession, name: str, path: str) -> int:
+    """
+    Streams a table to a gzip-compressed CSV file (with header) through COPY.
+    Returns the number of rows exported.
+    """
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+
+    with gzip.open(path, "wb") as compressed:
+
+        async def write_chunk(chunk: bytes) -> None:
+            compressed.write(chunk)
+
+        status = await driver_connection.copy_from_table(
+            name, output=write_chunk, format="csv", header=True
+        )
+    # asyncpg returns the command tag, e.g. "COPY 1234"
+    return int(status.split()[-1])
+
+
+async def archive_message_partitions(
+    db_session_factory: Callable[[], AsyncSession],
+    keep_months: int,
+    upload: Callable[[str, str], None],
+) -> Dict[str, int]:
+    """
+    Moves partitions older than `keep_months` months to compressed cold storage:
+    detach, export as gzipped CSV, upload, then drop the table. Tables left
+    detached by a previous failed run are archived as well.
+
+    Args:
+        db_session_factory: Factory of AsyncSessions.
+        keep_months: Months kept in the database (current month included).
+        upload: Blocking callable (local path, object name) storing the file;
+            it must raise on failure, the table is only dropped after it returns.
+
+    Returns:
+        Rows archived per partition.
+    """
+    archived: Dict[str, int] = {}
+    async with db_session_factory() as db:
+        to_detach = archivable_months(await list_message_partitions(db), keep_months)
+        for name, _ in to_detach:
+            await detach_message_partition(db, name)
+        detached = await list_detached_message_partitions(db)
+
+    for name in detached:
+        object_name = f"{ARCHIVE_PREFIX}/{name}.csv.gz"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, f"{name}.csv.gz")
+            async with db_session_factory() as db:
+                try:
+                    rows = await export_table_gzip(db, name, path)
+                    await asyncio.to_thread(upload, path, object_name)
+                    await db.execute(text(f"DROP TABLE {name}"))
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    logger.exception(
+                        f"[MessagePartitions] Failed to archive {name} (kept detached): {e}"
+                    )
+                    continue
+        archived[name] = rows
+        logger.info(
+            f"[MessagePartitions] Archived {name} ({rows} rows) to {object_name}."
+        )
+    return archived
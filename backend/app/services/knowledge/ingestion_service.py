@@ -1,15 +1,15 @@
 # backend/app/services/knowledge/ingestion_service.py
 import asyncio
-from typing import Any, Dict, List, Optional, Tuple, Union, Literal
+import random
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union, Literal
 from uuid import UUID
-from urllib.parse import urlparse, urlunparse
-from itertools import groupby
-
-import html2text
 
+import numpy as np
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from .custom_web_loader import CustomWebLoader
+from app.config import get_settings
+from app.services.crawler.crawler import WebCrawler
+from .custom_web_loader import CustomWebLoader, CLEANING_STRIP_TAGS
 
 
 # --- LangChain Imports ---
@@ -19,7 +19,6 @@ try:
         PyPDFLoader,
         TextLoader,
         UnstructuredFileLoader,  # Keep if used, remove if not
-        RecursiveUrlLoader,
     )
     from langchain_core.documents import Document
     from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -89,7 +88,13 @@ except ImportError:
 # Knowledge Chunk Repository
 try:
     # Assuming 'add_chunks' is the primary function needed from this repo
-    from app.services.repository.knowledge_chunk import add_chunks
+    from app.services.repository.knowledge_chunk import (
+        add_chunks,
+        compute_chunk_content_hash,
+        delete_chunks_by_ids,
+        get_chunk_fingerprints,
+        update_chunk_indexes,
+    )
 
     REPO_AVAILABLE = True
 except ImportError:
@@ -137,10 +142,14 @@ except ImportError:
         return None  # Dummy
 
 
+settings = get_settings()
+
 # --- Configuration ---
 DEFAULT_CHUNK_SIZE = 1000
 DEFAULT_CHUNK_OVERLAP = 150
 EMBEDDING_BATCH_SIZE = 32  # Batch size for embedding generation
+RECURSIVE_CRAWL_MAX_DEPTH = 2
+_END_OF_STREAM = object()  # Queue sentinel between pipeline stages
 DEFAULT_REQUEST_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
@@ -206,27 +215,32 @@ class KnowledgeIngestionService:
             f"KnowledgeIngestionService initialized (Chunk Size: {chunk_size}, Overlap: {chunk_overlap})."
         )
 
-    async def _load_documents(
+    async def _iter_documents(
         self,
         source_type: str,
         source_uri: str,
         recursive: bool = False,
-    ) -> List[Document]:
+    ) -> AsyncIterator[Document]:
         """
-        Loads documents from the specified source using appropriate LangChain loaders.
+        Streams documents from the specified source using appropriate LangChain loaders.
 
-        Prioritizes asynchronous loading methods (`alazy_load`) where available.
+        Documents are yielded as soon as the loader produces them (PDF pages,
+        crawled pages), so the caller never holds the whole source in memory.
 
         Args:
             source_type: The type of the source ('file', 'url', 'text').
             source_uri: The path, URL, or raw text content of the source.
+            recursive: For URLs, crawl the whole site instead of a single page.
 
-        Returns:
-            A list of LangChain Document objects, or an empty list if loading fails.
+        Yields:
+            LangChain Document objects.
+
+        Raises:
+            ValueError: If the source could not be loaded.
         """
         logger.info(f"Loading documents from {source_type}: {source_uri}")
-        documents: List[Document] = []
         loader: Any = None  # To store the loader instance for logging
+        loaded_count = 0
 
         try:
             if source_type == "file":
@@ -242,7 +256,6 @@ class KnowledgeIngestionService:
                         raise ValueError(
                             f"Failed to download file from GCS: {source_uri}"
                         )
-                    is_temp_file = True  # Marcar para exclusão posterior
                     logger.info(
                         f"File downloaded from GCS to temporary path: {local_file_path}"
                     )
@@ -271,100 +284,61 @@ class KnowledgeIngestionService:
                     logger.warning(
                         f"Unsupported file type for direct loading: {file_path_for_loader}"
                     )
-                    return []  # Return empty if type not supported
+                    return
 
-                # Use asynchronous loading if available
+                # Use asynchronous (lazy) loading if available
                 if hasattr(loader, "alazy_load"):
-                    logger.debug("Attempting asynchronous loading (alazy_load)...")
-                    documents = [doc async for doc in loader.alazy_load()]
+                    logger.debug("Streaming documents (alazy_load)...")
+                    async for doc in loader.alazy_load():
+                        loaded_count += 1
+                        yield doc
                 elif hasattr(loader, "load"):
                     logger.debug("Using synchronous loading (load)...")
                     # Run synchronous load in a thread pool to avoid blocking async event loop
-                    documents = await asyncio.to_thread(loader.load)
+                    for doc in await asyncio.to_thread(loader.load):
+                        loaded_count += 1
+                        yield doc
                 else:
                     logger.error(
                         f"Loader for {file_path_for_loader} has no load or alazy_load method."
                     )
-                    return []
+                    return
 
             elif source_type == "url":
-                logger.debug("Using WebBaseLoader...")
-                # WebBaseLoader expects a list of URLs
-
                 if not recursive:
+                    logger.debug("Using CustomWebLoader...")
                     loader = CustomWebLoader(source_uri)
+                    for doc in await loader.aload():
+                        loaded_count += 1
+                        yield doc
                 else:
-                    parsed_url = urlparse(source_uri)
-                    base_url = urlunparse(
-                        (
-                            parsed_url.scheme,
-                            parsed_url.netloc,
-                            "/",  # We want the path to be just the root
-                            "",  # No parameters
-                            "",  # No query string
-                            "",  # No fragment
-                        )
-                    )
-
-                    h2t = html2text.HTML2Text()
-                    h2t.body_width = 0  # No automatic line wrapping
-                    h2t.ignore_images = True  # Usually good for RAG
-                    h2t.ignore_links = False  # Keep links by default, can be changed
-                    h2t.ignore_emphasis = False  # Keep bold/italic
-                    h2t.unicode_snob = True
-                    h2t.mark_code = True
-                    h2t.header_style = 1  # Use #, ## for headers (ATX style)
-                    h2t.use_automatic_links = True
-                    h2t.skip_internal_links = True
-                    h2t.include_doc_title = (
-                        False  # Don't use <title> tag as H1 for the whole doc
-                    )
-
-                    loader = RecursiveUrlLoader(
-                        url=source_uri,
-                        max_depth=2,
-                        prevent_outside=False,
-                        base_url=base_url,
-                        extractor=h2t.handle,
-                        check_response_status=True,
-                        continue_on_failure=True,
-                        link_regex=r'<a\s+(?:[^>]*?\s+)?href="([^"]*)"',
-                    )
-
-                if hasattr(loader, "alazy_load"):
-                    logger.debug("Attempting asynchronous loading (alazy_load)...")
-                    documents = [doc async for doc in loader.alazy_load()]
-                elif hasattr(loader, "load"):
-                    logger.debug("Using synchronous loading (load)...")
-                    documents = await asyncio.to_thread(loader.load)
-                else:
-                    logger.error("WebBaseLoader has no load or alazy_load method.")
-                    return []
+                    logger.debug("Using WebCrawler for recursive loading...")
+                    async for doc in self._iter_crawled_documents(source_uri):
+                        loaded_count += 1
+                        yield doc
 
             elif source_type == "text":
                 # Create a single document directly from the text content
-                documents = [
-                    Document(
-                        page_content=source_uri, metadata={"source": "manual_text"}
-                    )
-                ]
                 logger.debug("Created document directly from text input.")
+                loaded_count += 1
+                yield Document(
+                    page_content=source_uri, metadata={"source": "manual_text"}
+                )
 
             else:
                 # Handle unknown source types
                 logger.error(f"Unknown source_type for loading: {source_type}")
-                return []
+                return
 
-            logger.info(f"Loaded {len(documents)} LangChain documents from source.")
-            return documents
+            logger.info(f"Loaded {loaded_count} LangChain documents from source.")
 
-        except FileNotFoundError:
+        except FileNotFoundError as fnf:
             logger.error(f"File not found during loading: {source_uri}")
-            return []
+            raise ValueError(f"File not found: {source_uri}") from fnf
         except ImportError as ie:
             # Catch errors if a specific loader's dependency is missing
             logger.error(f"Import error during loading (dependency missing?): {ie}")
-            return []
+            raise ValueError(f"Loader dependency missing: {ie}") from ie
         except Exception as e:
             # Catch-all for other loading errors
             loader_name = loader.__class__.__name__ if loader else "N/A"
@@ -372,94 +346,336 @@ class KnowledgeIngestionService:
                 f"Failed to load documents using {loader_name} from "
                 f"{source_type} '{source_uri}': {e}"
             )
-            return []
+            raise ValueError(f"Failed to load documents: {e}") from e
+
+    async def _iter_crawled_documents(self, start_url: str) -> AsyncIterator[Document]:
+        """
+        Crawls the site of `start_url` (same site, depth 2, seeded from its
+        sitemap) and yields one Markdown Document per unique page.
+
+        Args:
+            start_url: The URL the crawl starts from.
+
+        Yields:
+            LangChain Document objects.
+        """
+        crawler = WebCrawler(strip_tags=CLEANING_STRIP_TAGS)
+        async for page in crawler.crawl(
+            start_url,
+            max_depth=RECURSIVE_CRAWL_MAX_DEPTH,
+            seed_from_sitemap=True,
+        ):
+            if not page.markdown:
+                continue
+            yield Document(
+                page_content=page.markdown,
+                metadata={
+                    "source": page.final_url,
+                    "loader": "WebCrawler",
+                    "format": "markdown",
+                    "depth": page.depth,
+                },
+            )
+
+    def _validate_embeddings(
+        self, batch_embeddings_result: List[Any], batch_texts: List[str]
+    ) -> np.ndarray:
+        """
+        Checks an embedding batch against its texts and stacks it into a
+        float32 matrix (one row per text), validated with vectorized checks.
+
+        Raises:
+            ValueError: If the counts differ, an embedding is missing, or the
+                values are malformed (ragged or not finite).
+        """
+        if len(batch_embeddings_result) != len(batch_texts):
+            error_msg = (
+                f"Embedding result count ({len(batch_embeddings_result)}) "
+                f"does not match text count ({len(batch_texts)})."
+            )
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        for idx, emb in enumerate(batch_embeddings_result):
+            if emb is None:
+                # This case should ideally be prevented by get_embeddings_batch raising an error
+                error_msg = f"Unexpected None embedding received at index {idx}."
+                logger.error(error_msg)
+                raise ValueError(error_msg)
+        try:
+            embeddings = np.asarray(batch_embeddings_result, dtype=np.float32)
+        except (TypeError, ValueError) as e:
+            error_msg = f"Malformed embedding batch: {e}"
+            logger.error(error_msg)
+            raise ValueError(error_msg) from e
+        if embeddings.ndim != 2 or not np.isfinite(embeddings).all():
+            error_msg = f"Invalid embedding batch (shape {embeddings.shape} or non-finite values)."
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        return embeddings
 
-    async def _generate_embeddings_in_batches(
-        self, texts: List[str]
-    ) -> List[List[float]]:
+    async def _embed_batch_with_backoff(self, texts: List[str]) -> np.ndarray:
         """
-        Generates embeddings for a list of text strings in batches.
+        Embeds one batch, retrying with exponential backoff (and jitter) when
+        the provider fails, which is how rate limits surface from
+        `get_embeddings_batch`.
 
         Args:
-            texts: A list of strings to embed.
+            texts: The batch of texts to embed.
 
         Returns:
-            A list of embeddings (each embedding is a list of floats).
+            A float32 matrix with one embedding row per text.
 
         Raises:
-            ValueError: If embedding generation fails for any batch or if the
-                        number of embeddings does not match the number of texts.
+            ValueError: If every attempt failed.
         """
-        all_embeddings: List[List[float]] = []
-        if not texts:
-            logger.info("No texts provided for embedding generation.")
-            return all_embeddings
+        max_retries = max(settings.INGESTION_EMBEDDING_MAX_RETRIES, 0)
+        for attempt in range(max_retries + 1):
+            batch_embeddings_result = await get_embeddings_batch(texts)
+            if batch_embeddings_result is not None:
+                return self._validate_embeddings(batch_embeddings_result, texts)
+            if attempt == max_retries:
+                break
+            delay = (
+                settings.INGESTION_EMBEDDING_BACKOFF_SECONDS
+                * (2**attempt)
+                * random.uniform(0.5, 1.0)
+            )
+            logger.warning(
+                f"Embedding batch failed (attempt {attempt + 1}/{max_retries + 1}). "
+                f"Retrying in {delay:.1f}s..."
+            )
+            await asyncio.sleep(delay)
 
-        logger.info(
-            f"Generating embeddings for {len(texts)} texts in batches of {EMBEDDING_BATCH_SIZE}..."
+        error_msg = (
+            f"Failed to generate embeddings for a batch of {len(texts)} texts "
+            f"after {max_retries + 1} attempts."
         )
-        for i in range(0, len(texts), EMBEDDING_BATCH_SIZE):
-            batch_texts = texts[i : i + EMBEDDING_BATCH_SIZE]
-            batch_num = i // EMBEDDING_BATCH_SIZE + 1
-            logger.debug(
-                f"Processing embedding batch {batch_num} ({len(batch_texts)} texts)..."
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+
+    async def _report_progress(self, document_id: Optional[UUID], count: int) -> None:
+        """Stores the number of chunks written so far on the KnowledgeDocument."""
+        if not (DOCUMENT_REPO_AVAILABLE and document_id):
+            return
+        try:
+            async with self.db_session_factory() as db:
+                await knowledge_document_repo.update_document_chunk_count(
+                    db, document_id=document_id, count=count
+                )
+                await db.commit()
+        except Exception as e:
+            # Progress is informative only; never fail the ingestion because of it.
+            logger.warning(f"Failed to report progress for document {document_id}: {e}")
+
+    async def _load_existing_chunks(
+        self, db: AsyncSession, document_id: Optional[UUID]
+    ) -> Dict[Tuple[str, Optional[str]], List[Tuple[UUID, int]]]:
+        """
+        Maps (source_identifier, content_hash) to the (id, chunk_index) of the
+        chunks already stored for the document, sorted by chunk_index.
+        """
+        existing: Dict[Tuple[str, Optional[str]], List[Tuple[UUID, int]]] = {}
+        if not document_id:
+            return existing
+        for chunk_id, source_key, content_hash, chunk_index in (
+            await get_chunk_fingerprints(db, document_id)
+        ):
+            # A missing hash never matches, so such rows are replaced and deleted.
+            existing.setdefault((source_key, content_hash), []).append(
+                (chunk_id, chunk_index)
             )
+        for entries in existing.values():
+            entries.sort(key=lambda entry: entry[1])
+        if existing:
+            logger.info(
+                f"Document {document_id} already has chunks: re-ingesting incrementally."
+            )
+        return existing
 
-            # Call the actual embedding function
-            batch_embeddings_result = await get_embeddings_batch(batch_texts)
+    async def _run_pipeline(
+        self,
+        *,
+        account_id: UUID,
+        source_type: str,
+        source_uri: str,
+        recursive: bool,
+        document_id: Optional[UUID],
+        splitter: Any,
+        extracted_content: List[Dict[str, Any]],
+    ) -> int:
+        """
+        Runs loader -> splitter -> embedders -> writer, connected by bounded
+        queues, so only a few batches are in flight regardless of the source
+        size. Chunks are written in one transaction, committed at the end.
 
-            # Check if the result is valid
-            if batch_embeddings_result is None:
-                error_msg = f"Failed to generate embeddings for batch {batch_num} (starting index {i})."
-                logger.error(error_msg)
-                raise ValueError(error_msg)  # Fail fast if a batch fails
-
-            # Process the batch result (handle potential None values defensively, convert numpy arrays)
-            processed_batch: List[List[float]] = []
-            if len(batch_embeddings_result) != len(batch_texts):
-                error_msg = (
-                    f"Embedding result count ({len(batch_embeddings_result)}) "
-                    f"does not match text count ({len(batch_texts)}) for batch {batch_num}."
-                )
-                logger.error(error_msg)
-                raise ValueError(error_msg)
+        When the document already has chunks, each new chunk is matched by
+        (source, content hash) against them: unchanged text keeps its row and
+        embedding (only chunk_index is updated if it moved), new text is
+        embedded and inserted, and unmatched old rows are deleted.
+
+        Args:
+            account_id: The UUID of the account owning the data.
+            source_type: Type of the source ('file', 'url', 'text').
+            source_uri: Path, URL, or text content.
+            recursive: For URLs, crawl the whole site.
+            document_id: Optional KnowledgeDocument for progress tracking.
+            splitter: The LangChain text splitter to use.
+            extracted_content: Filled with the loaded documents (page_content and
+                metadata), up to INGESTION_EXTRACTED_CONTENT_MAX_CHARS.
+
+        Returns:
+            The number of chunks the document has after ingestion.
 
-            for idx, emb in enumerate(batch_embeddings_result):
-                if emb is not None:
-                    # Convert numpy array to list if necessary
-                    processed_embedding = (
-                        emb.tolist() if hasattr(emb, "tolist") else emb
+        Raises:
+            ValueError: If loading, embedding or saving fails.
+        """
+        queue_size = max(settings.INGESTION_QUEUE_MAX_ITEMS, 1)
+        embedding_workers = max(settings.INGESTION_EMBEDDING_CONCURRENCY, 1)
+        documents_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        saved_count = 0
+        kept_count = 0
+        loaded_count = 0
+        index_updates: List[Dict[str, Any]] = []
+
+        async def load_stage() -> None:
+            nonlocal loaded_count
+            extracted_chars = 0
+            async for doc in self._iter_documents(source_type, source_uri, recursive):
+                loaded_count += 1
+                if extracted_chars < settings.INGESTION_EXTRACTED_CONTENT_MAX_CHARS:
+                    extracted_content.append(
+                        {"page_content": doc.page_content, "metadata": doc.metadata}
                     )
-                    # Basic validation of embedding structure (optional)
-                    if not isinstance(processed_embedding, list) or not all(
-                        isinstance(f, float) for f in processed_embedding
-                    ):
-                        logger.warning(
-                            f"Unexpected embedding format at index {i+idx} in batch {batch_num}. Type: {type(processed_embedding)}"
-                        )
-                        # Decide whether to raise error or skip
-                        # raise ValueError(f"Invalid embedding format received at index {i+idx}.")
-                    processed_batch.append(processed_embedding)
-                else:
-                    # This case should ideally be prevented by get_embeddings_batch raising an error
-                    error_msg = f"Unexpected None embedding received at index {i+idx} in batch {batch_num}."
-                    logger.error(error_msg)
-                    raise ValueError(error_msg)
+                    extracted_chars += len(doc.page_content)
+                await documents_queue.put(doc)
+            await documents_queue.put(_END_OF_STREAM)
+
+        async def split_stage() -> None:
+            nonlocal kept_count
+            # Chunk indexes restart for each source (e.g. each webpage).
+            next_chunk_index: Dict[str, int] = {}
+            batch: List[Dict[str, Any]] = []
+            while (doc := await documents_queue.get()) is not _END_OF_STREAM:
+                source_key = doc.metadata.get("source", "default_source")
+                chunks = await asyncio.to_thread(splitter.split_documents, [doc])
+                for chunk_doc in chunks:
+                    chunk_index = next_chunk_index.get(source_key, 0)
+                    next_chunk_index[source_key] = chunk_index + 1
 
-            all_embeddings.extend(processed_batch)
-            logger.debug(f"Finished processing embedding batch {batch_num}.")
+                    metadata = chunk_doc.metadata.copy() if chunk_doc.metadata else {}
+                    metadata["original_source"] = source_key
+                    if "page" in metadata:
+                        metadata["page_number"] = metadata.pop("page")
 
-        # Final check: ensure the total number of embeddings matches the input texts
-        if len(all_embeddings) != len(texts):
-            error_msg = (
-                f"Final embedding count ({len(all_embeddings)}) does not match "
-                f"initial text count ({len(texts)})."
-            )
-            logger.error(error_msg)
-            raise ValueError(error_msg)
+                    content_hash = compute_chunk_content_hash(chunk_doc.page_content)
+                    reusable = existing_chunks.get((source_key, content_hash))
+                    if reusable:
+                        chunk_id, previous_index = reusable.pop(0)
+                        kept_count += 1
+                        if previous_index != chunk_index:
+                            index_updates.append(
+                                {
+                                    "id": chunk_id,
+                                    "chunk_index": chunk_index,
+                                    "metadata_": metadata,
+                                }
+                            )
+                        continue
+
+                    batch.append(
+                        {
+                            "chunk_text": chunk_doc.page_content,
+                            "content_hash": content_hash,
+                            "chunk_index": chunk_index,
+                            "source_type": source_type,
+                            # We use the more specific source_key for the identifier
+                            "source_identifier": source_key,
+                            "metadata_": metadata,
+                            "document_id": document_id,
+                        }
+                    )
+                    if len(batch) >= EMBEDDING_BATCH_SIZE:
+                        await embed_queue.put(batch)
+                        batch = []
+            if batch:
+                await embed_queue.put(batch)
+            for _ in range(embedding_workers):
+                await embed_queue.put(_END_OF_STREAM)
+
+        async def embed_stage() -> None:
+            while (batch := await embed_queue.get()) is not _END_OF_STREAM:
+                embeddings = await self._embed_batch_with_backoff(
+                    [row["chunk_text"] for row in batch]
+                )
+                for row, embedding in zip(batch, embeddings):
+                    row["embedding"] = embedding
+                await write_queue.put(batch)
+            await write_queue.put(_END_OF_STREAM)
+
+        async def write_stage(db: AsyncSession) -> None:
+            nonlocal saved_count
+            finished_workers = 0
+            while finished_workers < embedding_workers:
+                batch = await write_queue.get()
+                if batch is _END_OF_STREAM:
+                    finished_workers += 1
+                    continue
+                added_count = await add_chunks(
+                    db, account_id=account_id, chunks_data=batch
+                )
+                if added_count != len(batch):
+                    raise ValueError(
+                        f"DB save mismatch: Expected {len(batch)}, saved {added_count}."
+                    )
+                saved_count += added_count
+                if not has_previous_chunks:
+                    # On re-ingestion chunk_count keeps the committed count until the end.
+                    await self._report_progress(document_id, saved_count)
+
+        async with self.db_session_factory() as db:
+            existing_chunks = await self._load_existing_chunks(db, document_id)
+            has_previous_chunks = bool(existing_chunks)
+            tasks = [
+                asyncio.create_task(load_stage()),
+                asyncio.create_task(split_stage()),
+                *(
+                    asyncio.create_task(embed_stage())
+                    for _ in range(embedding_workers)
+                ),
+                asyncio.create_task(write_stage(db)),
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                # One stage failed: stop the others so none blocks on a full queue.
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await db.rollback()
+                raise
+
+            if not loaded_count:
+                # Nothing loaded (e.g. site down): keep whatever the document had.
+                await db.rollback()
+                return 0
+
+            await update_chunk_indexes(db, index_updates)
+            stale_chunk_ids = [
+                chunk_id
+                for entries in existing_chunks.values()
+                for chunk_id, _ in entries
+            ]
+            await delete_chunks_by_ids(db, stale_chunk_ids)
+            await db.commit()
 
-        logger.info(f"Successfully generated {len(all_embeddings)} embeddings.")
-        return all_embeddings
+        logger.info(
+            f"Ingestion diff for document {document_id}: {kept_count} unchanged, "
+            f"{saved_count} embedded, {len(stale_chunk_ids)} removed."
+        )
+        return kept_count + saved_count
 
     async def ingest_source(
         self,
@@ -496,7 +712,8 @@ class KnowledgeIngestionService:
         error_message: Optional[str] = (
             "Ingestion process did not complete successfully."
         )
-        processed_chunk_count = 0
+        total_processed_chunk_count = 0
+        loaded_documents_for_db: List[Dict[str, Any]] = []
         ingestion_successful = False
 
         try:
@@ -509,112 +726,38 @@ class KnowledgeIngestionService:
                     )
                     await db.commit()
 
-            # --- Step 1: Load ALL Documents from the source ---
-            all_loaded_docs = await self._load_documents(
-                source_type, source_uri, recursive
+            splitter = (
+                self.semantic_text_splitter
+                if text_splitter_type == "semantic"
+                else self.text_splitter
             )
-            if not all_loaded_docs:
-                error_message = "Failed to load documents or the source is empty."
-                logger.warning(f"No documents loaded from source: {source_identifier}")
-                return False
-
-            loaded_documents_for_db = [
-                {"page_content": doc.page_content, "metadata": doc.metadata}
-                for doc in all_loaded_docs
-            ]
-
-            # --- Group documents by their source metadata ---
-            # This is crucial for websites or sources that yield multiple files.
-            # We group by the 'source' key in the metadata, which LangChain loaders populate.
-            get_source_key = lambda doc: doc.metadata.get("source", "default_source")
-
-            # Sort documents by source to ensure groupby works correctly
-            all_loaded_docs.sort(key=get_source_key)
-
-            grouped_docs = groupby(all_loaded_docs, key=get_source_key)
 
-            all_chunks_to_save: List[Dict[str, Any]] = []
-
-            # --- Process each group of documents (e.g., each webpage) separately ---
-            for source_key, doc_group_iter in grouped_docs:
-                doc_group = list(doc_group_iter)
-                logger.info(
-                    f"Processing document group with source: '{source_key}' ({len(doc_group)} parts)."
-                )
-
-                # --- Step 2: Split into Chunks (for this group only) ---
-                splitter = (
-                    self.semantic_text_splitter
-                    if text_splitter_type == "semantic"
-                    else self.text_splitter
-                )
-                chunks = splitter.split_documents(doc_group)
+            # --- Load, split, embed and save as a stream ---
+            total_processed_chunk_count = await self._run_pipeline(
+                account_id=account_id,
+                source_type=source_type,
+                source_uri=source_uri,
+                recursive=recursive,
+                document_id=document_id,
+                splitter=splitter,
+                extracted_content=loaded_documents_for_db,
+            )
 
-                if not chunks:
+            if not loaded_documents_for_db:
+                error_message = "Failed to load documents or the source is empty."
+                logger.warning(f"No documents loaded from source: {source_identifier}")
+            else:
+                if not total_processed_chunk_count:
                     logger.warning(
-                        f"Splitting resulted in zero chunks for source '{source_key}'. Skipping."
+                        "Processing all documents resulted in zero chunks. Marking as complete."
                     )
-                    continue
-
-                # --- Step 3: Generate Embeddings (for this group's chunks) ---
-                chunk_texts = [chunk.page_content for chunk in chunks]
-                embeddings = await self._generate_embeddings_in_batches(chunk_texts)
-
-                # --- Step 4: Prepare Chunk Data (with correct, resetting index) ---
-                for i, chunk_doc in enumerate(chunks):
-                    metadata = chunk_doc.metadata.copy() if chunk_doc.metadata else {}
-                    # Use the specific source of this group, not the overall identifier
-                    metadata["original_source"] = source_key
-                    if "page" in metadata:
-                        metadata["page_number"] = metadata.pop("page")
-
-                    all_chunks_to_save.append(
-                        {
-                            "chunk_text": chunk_doc.page_content,
-                            "embedding": embeddings[i],
-                            "chunk_index": i,  # Index resets for each new group
-                            "source_type": source_type,
-                            # We use the more specific source_key for the identifier
-                            "source_identifier": source_key,
-                            "metadata_": metadata,
-                            "document_id": document_id,
-                        }
+                else:
+                    logger.success(
+                        f"Successfully ingested and saved {total_processed_chunk_count} chunks."
                     )
-
-            total_processed_chunk_count = len(all_chunks_to_save)
-            logger.info(
-                f"Total chunks prepared from all groups: {total_processed_chunk_count}"
-            )
-
-            if not all_chunks_to_save:
-                logger.warning(
-                    "Processing all groups resulted in zero chunks. Marking as complete."
-                )
                 final_status = DocumentStatus.COMPLETED
                 error_message = None
                 ingestion_successful = True
-            else:
-                # --- Step 5: Save All Prepared Chunks to Database in one go ---
-                logger.debug(
-                    f"Saving {total_processed_chunk_count} total chunks to the repository..."
-                )
-                async with self.db_session_factory() as db:
-                    added_count = await add_chunks(
-                        db, account_id=account_id, chunks_data=all_chunks_to_save
-                    )
-                    if added_count != total_processed_chunk_count:
-                        error_message = f"DB save mismatch: Expected {total_processed_chunk_count}, saved {added_count}."
-                        logger.error(error_message)
-                        final_status = DocumentStatus.FAILED
-                        ingestion_successful = False
-                    else:
-                        await db.commit()
-                        logger.success(
-                            f"Successfully ingested and saved {added_count} chunks."
-                        )
-                        final_status = DocumentStatus.COMPLETED
-                        error_message = None
-                        ingestion_successful = True
 
         except ValueError as ve:
             logger.error(f"Ingestion failed due to ValueError: {ve}")
@@ -650,10 +793,7 @@ class KnowledgeIngestionService:
                             extracted_content=loaded_documents_for_db,
                         )
 
-                        if (
-                            final_status == DocumentStatus.COMPLETED
-                            and ingestion_successful
-                        ):
+                        if ingestion_successful:
                             await knowledge_document_repo.update_document_chunk_count(
                                 db,
                                 document_id=document_id,
@@ -0,0 +1,110 @@
+# backend/app/services/knowledge/retrieval.py
+import time
+from typing import Dict, List, Tuple, Union
+from uuid import UUID
+
+import numpy as np
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.models.knowledge_chunk import KnowledgeChunk
+from app.services.repository.knowledge_chunk import (
+    configure_ann_search,
+    count_chunks_for_account,
+    hybrid_search_chunks_with_context,
+)
+
+settings = get_settings()
+
+# account_id -> (expires_at, chunk count capped at RAG_EXACT_SCAN_MAX_CHUNKS + 1)
+_chunk_count_cache: Dict[UUID, Tuple[float, int]] = {}
+
+
+async def get_account_chunk_count(
+    db_session_factory: async_sessionmaker[AsyncSession], account_id: UUID
+) -> int:
+    """
+    Number of knowledge chunks of the account, cached in memory. Counting
+    stops just above RAG_EXACT_SCAN_MAX_CHUNKS: only the side of the
+    threshold matters.
+
+    Ingestion runs in another process, so there is no invalidation: an empty
+    account is cached briefly (new knowledge shows up quickly) and a
+    non-empty one for longer (if stale, the search just returns less).
+    """
+    now = time.monotonic()
+    cached = _chunk_count_cache.get(account_id)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    async with db_session_factory() as db:
+        count = await count_chunks_for_account(
+            db, account_id=account_id, cap=settings.RAG_EXACT_SCAN_MAX_CHUNKS
+        )
+    ttl = (
+        settings.KNOWLEDGE_EXISTS_CACHE_TTL_SECONDS
+        if count
+        else settings.KNOWLEDGE_MISSING_CACHE_TTL_SECONDS
+    )
+    _chunk_count_cache[account_id] = (now + ttl, count)
+    return count
+
+
+async def account_has_knowledge(
+    db_session_factory: async_sessionmaker[AsyncSession], account_id: UUID
+) -> bool:
+    """Whether the account has any knowledge chunk (cached, see `get_account_chunk_count`)."""
+    return await get_account_chunk_count(db_session_factory, account_id) > 0
+
+
+def use_exact_scan(chunk_count: int) -> bool:
+    """
+    Small accounts are scanned exactly: cheap, and full recall. The shared
+    HNSW index filtered by account would either miss their rows or need a
+    high ef_search.
+    """
+    return chunk_count <= settings.RAG_EXACT_SCAN_MAX_CHUNKS
+
+
+async def retrieve_knowledge(
+    db_session_factory: async_sessionmaker[AsyncSession],
+    account_id: UUID,
+    query_text: str,
+    query_embedding: Union[List[float], np.ndarray],
+    limit: int,
+    similarity_threshold: float,
+) -> Tuple[List[KnowledgeChunk], List[KnowledgeChunk]]:
+    """
+    Runs the hybrid retrieval for a query: one search statement returning
+    (all context chunks, seed chunks), with exact scan or HNSW chosen from
+    the account's cached chunk count.
+    """
+    chunk_count = await get_account_chunk_count(db_session_factory, account_id)
+    exact = use_exact_scan(chunk_count)
+
+    started = time.perf_counter()
+    async with db_session_factory() as db:
+        if not exact:
+            await configure_ann_search(
+                db,
+                ef_search=settings.RAG_HNSW_EF_SEARCH,
+                iterative_scan=settings.RAG_HNSW_ITERATIVE_SCAN,
+            )
+        all_chunks, seed_chunks = await hybrid_search_chunks_with_context(
+            db,
+            account_id=account_id,
+            query_text=query_text,
+            query_embedding=query_embedding,
+            limit=limit,
+            similarity_threshold=similarity_threshold,
+            candidate_limit=settings.RAG_HYBRID_CANDIDATES,
+            rrf_k=settings.RAG_RRF_K,
+            exact=exact,
+            binary_prefilter=settings.RAG_BINARY_PREFILTER_CANDIDATES,
+        )
+    logger.debug(
+        f"[KnowledgeRetrieval] Account {account_id} ({'exact' if exact else 'hnsw'}): "
+        f"{len(seed_chunks)} seeds in {(time.perf_counter() - started) * 1000:.1f}ms"
+    )
+    return all_chunks, seed_chunks
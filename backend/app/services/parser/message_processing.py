@@ -38,6 +38,8 @@ from app.services.helper.websocket import (
 from app.services.debounce.message_debounce import (
     MessageDebounceService,
 )
+from app.core.log import payload, sampled
+from app.core.metrics import observe_pipeline_stage
 
 
 from app.services.queue.utils.enqueue import (
@@ -65,13 +67,12 @@ async def process_incoming_message_logic(
     5. Committing all database changes as a single transaction.
     """
     log_prefix = f"MsgLogic (ExtID: {internal_message.external_message_id}, ConvoID: {internal_message.conversation_id}):"
-    logger.info(f"{log_prefix} Starting core processing.")
-    logger.info(
-        f"{log_prefix} Processing message logic for internal DTO, source: {internal_message.source_api}, source_id: {internal_message.external_message_id}"
-    )
-    logger.debug(
-        f"{log_prefix} Internal DTO payload: {internal_message.model_dump_json(indent=2)}"
+    sampled.info(
+        "{} Processing message logic for internal DTO, source: {}",
+        log_prefix,
+        internal_message.source_api,
     )
+    logger.debug("{} Internal DTO payload: {}", log_prefix, payload(internal_message))
 
     try:
         # --- 1. Prepare MessageCreateSchema for the repository ---
@@ -91,19 +92,20 @@ async def process_incoming_message_logic(
             private=internal_message.is_private,
         )
 
-        # --- 2. Get or Create Message (Idempotent) ---
-        # get_or_create_message must be idempotent based on (source_id, inbox_id, account_id) or similar.
-        # If the message already exists and has been processed (e.g., status != "received"),
-        # we may choose to skip conversation updates to avoid duplication.
-        db_message = await message_repo.get_or_create_message(
+        # --- 2. Create Message (Idempotent) ---
+        # A single INSERT ... ON CONFLICT DO NOTHING on (inbox_id, source_id, sent_at):
+        # a redelivered webhook returns None, and since the first delivery committed
+        # the conversation updates with it, there is nothing left to do.
+        db_message = await message_repo.insert_message_if_absent(
             db=db, message_data=message_create_for_repo
         )
 
         if not db_message:
-            logger.error(
-                f"{log_prefix} Failed to get or create message for source_id: {internal_message.external_message_id}. Aborting processing for this message."
+            logger.info(
+                f"{log_prefix} Duplicate delivery of source_id {internal_message.external_message_id}, already processed. Skipping."
             )
-            # Do not raise to avoid infinite retries in ARQ due to bad data.
+            # Keeps what the transformer prepared in this session for the other DTOs of the batch.
+            await db.commit()
             return
 
         logger.info(
@@ -183,7 +185,7 @@ async def process_incoming_message_logic(
         )
 
         # --- DEBOUNCE SERVICE CALL  ---
-        logger.debug(f"Message: {db_message}")
+        logger.debug("{} Message: {}", log_prefix, db_message)
         should_trigger_ai_debounce = (
             db_message.direction == "in"
             and not db_message.private
@@ -299,6 +301,7 @@ async def process_incoming_message_logic(
 
         # --- 6. Commit ---
         await db.commit()
+        observe_pipeline_stage("stored")
         logger.info(
             f"{log_prefix} Successfully processed and committed changes for DTO, source_id: {internal_message.external_message_id}, message_id: {db_message.id}"
         )
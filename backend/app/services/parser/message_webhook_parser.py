@@ -30,10 +30,15 @@ from app.services.repository import contact as contact_repo
 from app.services.repository import conversation as conversation_repo
 
 from app.models.inbox import Inbox
-from app.models.account import Account
 from app.models.conversation import ConversationStatusEnum
 
 from app.services.helper.contact import normalize_phone_number
+from app.core.log import payload, sampled
+from app.services.helper.inbound_routing import (
+    InboundRoute,
+    build_channel_key,
+    inbound_routing_cache,
+)
 
 
 def _get_internal_content_type_from_evolution(
@@ -81,6 +86,110 @@ def _get_internal_content_type_from_evolution(
     return "unknown"
 
 
+def _is_cached_route_usable(
+    route: InboundRoute, sender_profile_name: Optional[str]
+) -> bool:
+    """
+    A cached route can be used as is unless the DB still has work to do:
+    reopening a closed conversation or updating the contact's name.
+    """
+    if route.conversation_status == ConversationStatusEnum.CLOSED:
+        return False
+    if sender_profile_name and route.contact_name != sender_profile_name:
+        return False
+    return True
+
+
+async def _resolve_inbound_route(
+    db: AsyncSession,
+    *,
+    inbox: Inbox,
+    account_id: UUID,
+    sender_phone: str,
+    sender_profile_name: Optional[str],
+    source_id: str,
+    log_prefix: str,
+) -> InboundRoute:
+    """
+    Resolves (creating when needed) the contact, contact inbox and conversation
+    of an inbound message, reopening the conversation if it was closed.
+
+    Args:
+        db: The asynchronous database session.
+        inbox: The inbox receiving the message.
+        account_id: The account owning the inbox.
+        sender_phone: The normalized phone of the sender.
+        sender_profile_name: The profile name sent by the provider, if any.
+        source_id: The ContactInbox source_id used when creating the association.
+        log_prefix: Prefix for log messages.
+
+    Returns:
+        The resolved InboundRoute.
+    """
+    logger.info(f"Transformer: Using Inbox ID {inbox.id}, Account ID {account_id}")
+
+    # --- Get or Create Contact (for the actual sender) ---
+    contact = await contact_repo.find_contact_by_identifier(
+        db=db, identifier=sender_phone, account_id=account_id
+    )
+    if not contact:
+        contact_create_data = ContactCreateSchema(
+            phone_number=sender_phone, name=sender_profile_name
+        )
+        contact = await contact_repo.create_contact(
+            db=db, contact_data=contact_create_data, account_id=account_id
+        )
+        logger.info(
+            f"{log_prefix} Created new Contact ID {contact.id} for {sender_phone}"
+        )
+    elif sender_profile_name and contact.name != sender_profile_name:
+        contact.name = sender_profile_name
+        db.add(contact)
+        logger.info(
+            f"{log_prefix} Updated Contact ID {contact.id} with name '{sender_profile_name}'"
+        )
+    logger.info(f"{log_prefix} Using Contact ID {contact.id} for sender {sender_phone}")
+
+    # --- Get or Create ContactInbox ---
+    contact_inbox = await contact_repo.get_or_create_contact_inbox(
+        db=db,
+        account_id=account_id,
+        contact_id=contact.id,
+        inbox_id=inbox.id,
+        source_id=source_id,
+    )
+    logger.info(f"{log_prefix} Using ContactInbox ID {contact_inbox.id}")
+
+    # --- Get or Create Conversation ---
+    initial_conv_status = (
+        inbox.initial_conversation_status or ConversationStatusEnum.PENDING
+    )
+    conversation = await conversation_repo.get_or_create_conversation(
+        db=db,
+        account_id=account_id,
+        inbox_id=inbox.id,
+        contact_inbox_id=contact_inbox.id,
+        status=initial_conv_status,
+    )
+    if conversation.status == ConversationStatusEnum.CLOSED:
+        conversation.status = initial_conv_status
+        conversation.unread_agent_count = 0
+        db.add(conversation)
+    logger.info(
+        f"{log_prefix} Using Conversation ID {conversation.id} (Status: {conversation.status.value})"
+    )
+
+    return InboundRoute(
+        account_id=account_id,
+        inbox_id=inbox.id,
+        contact_id=contact.id,
+        contact_inbox_id=contact_inbox.id,
+        conversation_id=conversation.id,
+        conversation_status=conversation.status,
+        contact_name=contact.name,
+    )
+
+
 async def transform_evolution_api_to_internal_dto(
     db: AsyncSession,
     internal_evolution_instance_uuid: str,
@@ -112,7 +221,7 @@ async def transform_evolution_api_to_internal_dto(
         data_dict = raw_evolution_webhook_payload_dict.get("data")
         if not isinstance(data_dict, dict):  # Basic check
             logger.error(
-                f"{log_prefix} 'data' field is not a dictionary or is missing. Payload: {raw_evolution_webhook_payload_dict}"
+                f"{log_prefix} 'data' field is not a dictionary or is missing. Payload: {payload(raw_evolution_webhook_payload_dict)}"
             )
             return None
 
@@ -159,7 +268,7 @@ async def transform_evolution_api_to_internal_dto(
                 )
                 return None
             logger.warning(
-                f"{log_prefix} Core message fields (message object, messageType, or timestamp) missing in evo_message_data. Key ID: {evo_message_data.key.id}. Data: {evo_message_data.model_dump_json(exclude_none=True)}"
+                f"{log_prefix} Core message fields (message object, messageType, or timestamp) missing in evo_message_data. Key ID: {evo_message_data.key.id}. Data: {payload(evo_message_data)}"
             )
             return None
 
@@ -180,26 +289,7 @@ async def transform_evolution_api_to_internal_dto(
             )
             return None  # Or handle outbound differently if needed.
 
-        # --- 1. Find associated Account and Inbox ---
-        inbox_details = (
-            await inbox_repo.find_inbox_and_account_by_evolution_instance_id(
-                db, evolution_instance_id=UUID(internal_evolution_instance_uuid)
-            )
-        )
-
-        if not inbox_details:
-            logger.error(
-                f"No active inbox/account for Instance ID: {internal_evolution_instance_uuid}"
-            )
-            return None
-
-        inbox: Inbox = inbox_details.inbox
-        account: Account = inbox_details.account
-        account_id: UUID = account.id
-        inbox_id: UUID = inbox.id
-        logger.info(f"Transformer: Using Inbox ID {inbox.id}, Account ID {account_id}")
-
-        # --- 2. Determine Actual Sender and Normalize ---
+        # --- 1. Determine Actual Sender and Normalize ---
         # If participant_jid is present, it's a group message, and participant_jid is the sender.
         # Otherwise (direct message), remote_jid is the sender.
         actual_sender_jid = participant_jid if participant_jid else remote_jid
@@ -221,74 +311,47 @@ async def transform_evolution_api_to_internal_dto(
             f"{log_prefix} Chat JID (remoteJid): {remote_jid}, Actual Sender JID: {actual_sender_jid}, Normalized Phone: {normalized_sender_phone}, Profile Name: {sender_profile_name}"
         )
 
-        # --- 3. Get or Create Contact (for the actual sender) ---
-        contact = await contact_repo.find_contact_by_identifier(
-            db=db, identifier=normalized_sender_phone, account_id=account_id
-        )
-        if not contact:
-            contact_create_data = ContactCreateSchema(
-                phone_number=normalized_sender_phone, name=sender_profile_name
-            )
-            contact = await contact_repo.create_contact(
-                db=db, contact_data=contact_create_data, account_id=account_id
-            )
+        # --- 2. Resolve Account, Inbox, Contact and Conversation ---
+        # Steady state: served by the routing cache without touching the DB.
+        channel_key = build_channel_key("evolution", internal_evolution_instance_uuid)
+        route = await inbound_routing_cache.get(channel_key, normalized_sender_phone)
+        if route and _is_cached_route_usable(route, sender_profile_name):
             logger.info(
-                f"{log_prefix} Created new Contact ID {contact.id} for {normalized_sender_phone}"
+                f"{log_prefix} Routing cache hit: Conversation ID {route.conversation_id} (Status: {route.conversation_status.value})"
             )
-        elif sender_profile_name and (
-            not contact.name or contact.name != sender_profile_name
-        ):
-            contact.name = sender_profile_name
-            db.add(contact)
-            logger.info(
-                f"{log_prefix} Updated Contact ID {contact.id} with name '{sender_profile_name}'"
+        else:
+            inbox_details = (
+                await inbox_repo.find_inbox_and_account_by_evolution_instance_id(
+                    db, evolution_instance_id=UUID(internal_evolution_instance_uuid)
+                )
             )
-        logger.info(
-            f"{log_prefix} Using Contact ID {contact.id} for sender {actual_sender_jid}"
-        )
 
-        # --- 4. Get or Create ContactInbox ---
-        # The source_id for ContactInbox should be unique for this contact on this inbox.
-        # Using actual_sender_jid is a good candidate.
-        contact_inbox = await contact_repo.get_or_create_contact_inbox(
-            db=db,
-            account_id=account_id,
-            contact_id=contact.id,
-            inbox_id=inbox_id,
-            source_id=actual_sender_jid,
-        )
-        logger.info(f"{log_prefix} Using ContactInbox ID {contact_inbox.id}")
+            if not inbox_details:
+                logger.error(
+                    f"No active inbox/account for Instance ID: {internal_evolution_instance_uuid}"
+                )
+                return None
 
-        # --- 5. Get or Create Conversation ---
-        # Conversation is usually between the bot (inbox) and the chat_jid (remote_jid).
-        # If it's a group, the conversation is with the group. The contact above is the participant.
-        initial_conv_status = (
-            inbox.initial_conversation_status or ConversationStatusEnum.PENDING
-        )
+            # The source_id for ContactInbox should be unique for this contact on this inbox.
+            # Using actual_sender_jid is a good candidate.
+            # The conversation is with the message author (contact_inbox), even in a group.
+            route = await _resolve_inbound_route(
+                db,
+                inbox=inbox_details.inbox,
+                account_id=inbox_details.account.id,
+                sender_phone=normalized_sender_phone,
+                sender_profile_name=sender_profile_name,
+                source_id=actual_sender_jid,
+                log_prefix=log_prefix,
+            )
+            inbound_routing_cache.put_after_commit(
+                db, channel_key, normalized_sender_phone, route
+            )
 
-        # For conversations, we typically use an identifier for the chat itself (remote_jid)
-        # The contact_inbox links the specific sender (participant) to this inbox.
-        # A conversation can have multiple participants if you model it that way, or be simpler.
-        # For now, let's assume get_or_create_conversation uses contact_inbox_id which is tied to the *sender*.
-        # This means a "conversation" is with a specific user, even in a group context from this perspective.
-        # Alternative: conversation could be based on remote_jid (groupJID) directly. This needs careful thought.
-        # Let's stick to contact_inbox_id for now, implies conversation is with the message author.
-        conversation = await conversation_repo.get_or_create_conversation(
-            db=db,
-            account_id=account_id,
-            inbox_id=inbox_id,
-            contact_inbox_id=contact_inbox.id,
-            status=initial_conv_status,
-        )
-        if conversation.status == ConversationStatusEnum.CLOSED:
-            conversation.status = initial_conv_status
-            conversation.unread_agent_count = 0
-            db.add(conversation)
-        logger.info(
-            f"{log_prefix} Using Conversation ID {conversation.id} (Status: {conversation.status.value})"
-        )
+        account_id: UUID = route.account_id
+        inbox_id: UUID = route.inbox_id
 
-        # --- 6. Extract Content and Attributes from Parsed Message Object ---
+        # --- 3. Extract Content and Attributes from Parsed Message Object ---
         evo_msg_obj: EvolutionMessageObject = (
             evo_message_data.message
         )  # This is already parsed by Pydantic
@@ -414,7 +477,7 @@ async def transform_evolution_api_to_internal_dto(
                     context_info_payload.quoted_message_id
                 )
 
-        # --- 7. Construct InternalIncomingMessageDTO ---
+        # --- 4. Construct InternalIncomingMessageDTO ---
         message_timestamp_dt = datetime.fromtimestamp(
             message_timestamp_unix, tz=timezone.utc
         )
@@ -422,8 +485,8 @@ async def transform_evolution_api_to_internal_dto(
         internal_dto = InternalIncomingMessageDTO(
             account_id=account_id,
             inbox_id=inbox_id,
-            contact_id=contact.id,  # Contact of the actual sender
-            conversation_id=conversation.id,
+            contact_id=route.contact_id,  # Contact of the actual sender
+            conversation_id=route.conversation_id,
             external_message_id=external_message_id,
             sender_identifier=normalized_sender_phone,  # Normalized phone of the actual sender
             message_content=message_content_for_dto,
@@ -433,19 +496,19 @@ async def transform_evolution_api_to_internal_dto(
             source_api="whatsapp_evolution",
         )
 
-        logger.info(
-            f"{log_prefix} Successfully transformed Evolution message (ExtID: {external_message_id}) to DTO."
-        )
-        logger.debug(
-            f"{log_prefix} DTO: {internal_dto.model_dump_json(indent=2, exclude_none=True)}"
+        sampled.info(
+            "{} Successfully transformed Evolution message (ExtID: {}) to DTO.",
+            log_prefix,
+            external_message_id,
         )
+        logger.debug("{} DTO: {}", log_prefix, payload(internal_dto))
         return internal_dto
 
     except (
         ValidationError
     ) as e_val:  # Catch Pydantic validation errors during specific parsing
         logger.error(
-            f"{log_prefix} Pydantic validation error during detailed parsing: {e_val.errors()}. Payload: {raw_evolution_webhook_payload_dict}"
+            f"{log_prefix} Pydantic validation error during detailed parsing: {e_val.errors()}. Payload: {payload(raw_evolution_webhook_payload_dict)}"
         )
         return None
     except Exception as e:
@@ -464,29 +527,15 @@ async def transform_whatsapp_cloud_to_internal_dto(
 
     log_prefix = f"Transformer (WPP Cloud, BusinessPhID: {business_phone_number_id}):"
     logger.debug(f"{log_prefix} Starting transformation for single message.")
-    logger.trace(f"{log_prefix} Single message dict: {single_meta_message_dict}")
-    logger.trace(f"{log_prefix} Meta contacts list: {meta_contacts_list_dicts}")
+    logger.trace("{} Single message dict: {}", log_prefix, payload(single_meta_message_dict))
+    logger.trace("{} Meta contacts list: {}", log_prefix, payload(meta_contacts_list_dicts))
 
     try:
         parsed_meta_message = WhatsAppCloudMessageSchema.model_validate(
             single_meta_message_dict
         )
 
-        # --- 1. Find associated Inbox and Account ---
-        inbox_details = await inbox_repo.find_inbox_and_account_by_wpp_cloud_phone_id(
-            db, wpp_phone_number_id=business_phone_number_id
-        )
-        if not inbox_details:
-            logger.error(
-                f"No active inbox/account for WPP business_phone_id: {business_phone_number_id}"
-            )
-            return None
-        inbox: Inbox = inbox_details.inbox
-        account: Account = inbox_details.account
-        account_id: UUID = account.id
-        logger.info(f"Transformer: Using Inbox ID {inbox.id}, Account ID {account_id}")
-
-        # --- 2. Extract sender information ---
+        # --- 1. Extract sender information ---
         sender_wa_id = parsed_meta_message.from_number
         sender_profile_name: Optional[str] = None
         if meta_contacts_list_dicts:
@@ -501,51 +550,39 @@ async def transform_whatsapp_cloud_to_internal_dto(
             f"{log_prefix} Sender WA ID: {sender_wa_id}, Profile Name: {sender_profile_name}"
         )
 
-        # --- 3. Get or Create Contact ---
-        contact = await contact_repo.find_contact_by_identifier(
-            db=db, identifier=sender_wa_id, account_id=account_id
-        )
-
-        if not contact:
-            contact_create_data = ContactCreateSchema(
-                phone_number=sender_wa_id, name=sender_profile_name
+        # --- 2. Resolve Account, Inbox, Contact and Conversation ---
+        channel_key = build_channel_key("wpp_cloud", business_phone_number_id)
+        route = await inbound_routing_cache.get(channel_key, sender_wa_id)
+        if route and _is_cached_route_usable(route, sender_profile_name):
+            logger.info(
+                f"Transformer: Routing cache hit, Conversation ID {route.conversation_id}"
             )
-            contact = await contact_repo.create_contact(
-                db=db, contact_data=contact_create_data, account_id=account_id
+        else:
+            inbox_details = (
+                await inbox_repo.find_inbox_and_account_by_wpp_cloud_phone_id(
+                    db, wpp_phone_number_id=business_phone_number_id
+                )
             )
-        elif sender_profile_name and contact.name != sender_profile_name:
-            contact.name = sender_profile_name
-            db.add(contact)
-        logger.info(f"Transformer: Using Contact ID {contact.id}")
-
-        # --- 4. Get or Create ContactInbox ---
-        contact_inbox = await contact_repo.get_or_create_contact_inbox(
-            db=db,
-            account_id=account_id,
-            contact_id=contact.id,
-            inbox_id=inbox.id,
-            source_id=f"wpp_cloud_{business_phone_number_id}",
-        )
-        logger.info(f"Transformer: Using ContactInbox ID {contact_inbox.id}")
+            if not inbox_details:
+                logger.error(
+                    f"No active inbox/account for WPP business_phone_id: {business_phone_number_id}"
+                )
+                return None
 
-        # --- 5. Get or Create Conversation ---
-        initial_conv_status = (
-            inbox.initial_conversation_status or ConversationStatusEnum.PENDING
-        )
-        conversation = await conversation_repo.get_or_create_conversation(
-            db=db,
-            account_id=account_id,
-            inbox_id=inbox.id,
-            contact_inbox_id=contact_inbox.id,
-            status=initial_conv_status,
-        )
-        if conversation.status == ConversationStatusEnum.CLOSED:
-            conversation.status = initial_conv_status
-            conversation.unread_agent_count = 0
-            db.add(conversation)
-        logger.info(f"Transformer: Using Conversation ID {conversation.id}")
+            route = await _resolve_inbound_route(
+                db,
+                inbox=inbox_details.inbox,
+                account_id=inbox_details.account.id,
+                sender_phone=sender_wa_id,
+                sender_profile_name=sender_profile_name,
+                source_id=f"wpp_cloud_{business_phone_number_id}",
+                log_prefix=log_prefix,
+            )
+            inbound_routing_cache.put_after_commit(
+                db, channel_key, sender_wa_id, route
+            )
 
-        # --- 6. Map Meta message to InternalIncomingMessageDTO fields ---
+        # --- 3. Map Meta message to InternalIncomingMessageDTO fields ---
         external_message_id = parsed_meta_message.id
         message_timestamp = datetime.fromtimestamp(
             int(parsed_meta_message.timestamp), tz=timezone.utc
@@ -678,10 +715,10 @@ async def transform_whatsapp_cloud_to_internal_dto(
             )
 
         internal_dto = InternalIncomingMessageDTO(
-            account_id=account_id,
-            inbox_id=inbox.id,
-            contact_id=contact.id,
-            conversation_id=conversation.id,
+            account_id=route.account_id,
+            inbox_id=route.inbox_id,
+            contact_id=route.contact_id,
+            conversation_id=route.conversation_id,
             external_message_id=external_message_id,
             sender_identifier=sender_wa_id,
             message_content=message_content_for_dto,
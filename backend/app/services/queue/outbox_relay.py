@@ -0,0 +1,163 @@
+import asyncio
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import Callable, Dict, List
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.services.queue.redis_queue import RedisQueue
+from app.services.repository import message_dispatch as dispatch_repo
+
+settings = get_settings()
+
+
+class OutboxRelay:
+    """
+    Publishes committed message dispatches (the transactional outbox) to their
+    delivery queues.
+
+    Woken by NOTIFY on commit, with polling as the fallback (missed notifications,
+    LISTEN connection down). Each round claims a batch with FOR UPDATE SKIP LOCKED,
+    pushes it to Redis and stamps it published in the same transaction, so several
+    relays can run side by side. Delivery is at-least-once: a crash between the
+    push and the commit publishes the batch again, and the sender skips messages
+    it already handled.
+    """
+
+    def __init__(
+        self,
+        db_session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        batch_size: int = settings.MESSAGE_OUTBOX_BATCH_SIZE,
+        poll_interval_seconds: float = settings.MESSAGE_OUTBOX_POLL_INTERVAL_SECONDS,
+        retention: timedelta = timedelta(hours=settings.MESSAGE_OUTBOX_RETENTION_HOURS),
+    ):
+        self.db_session_factory = db_session_factory
+        self.batch_size = batch_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retention = retention
+        self._queues: Dict[str, RedisQueue] = {}
+        self._wakeup = asyncio.Event()
+        self._listen_connection = None
+        self._last_cleanup = 0.0
+
+    def _queue(self, queue_name: str) -> RedisQueue:
+        if queue_name not in self._queues:
+            self._queues[queue_name] = RedisQueue(queue_name=queue_name)
+        return self._queues[queue_name]
+
+    async def relay_once(self) -> int:
+        """
+        Publishes one batch of pending dispatches.
+
+        Returns:
+            The number of dispatches published.
+        """
+        async with self.db_session_factory() as db:
+            try:
+                dispatches = await dispatch_repo.claim_pending_dispatches(
+                    db, limit=self.batch_size
+                )
+                if not dispatches:
+                    await db.rollback()
+                    return 0
+
+                by_queue: Dict[str, List] = defaultdict(list)
+                for dispatch in dispatches:
+                    by_queue[dispatch.queue_name].append(dispatch)
+
+                published_ids = []
+                failed_ids = []
+                for queue_name, queue_dispatches in by_queue.items():
+                    ids = [dispatch.id for dispatch in queue_dispatches]
+                    if await self._queue(queue_name).enqueue_many(
+                        [dispatch.payload for dispatch in queue_dispatches]
+                    ):
+                        published_ids.extend(ids)
+                    else:
+                        failed_ids.extend(ids)
+
+                await dispatch_repo.mark_dispatches_published(db, published_ids)
+                await dispatch_repo.record_failed_publish(db, failed_ids)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+        if failed_ids:
+            logger.warning(
+                f"[OutboxRelay] {len(failed_ids)} dispatches could not be published, will retry."
+            )
+        if published_ids:
+            logger.info(f"[OutboxRelay] Published {len(published_ids)} dispatches.")
+        return len(published_ids)
+
+    async def cleanup(self) -> int:
+        """Deletes dispatches published longer ago than the retention."""
+        async with self.db_session_factory() as db:
+            deleted = await dispatch_repo.delete_published_dispatches(db, self.retention)
+            await db.commit()
+        if deleted:
+            logger.info(f"[OutboxRelay] Deleted {deleted} published dispatches.")
+        return deleted
+
+    async def _listen(self) -> None:
+        """LISTENs on the dispatch channel; polling keeps working if this fails."""
+        import asyncpg
+
+        try:
+            self._listen_connection = await asyncpg.connect(
+                settings.DATABASE_URL.replace("+asyncpg", "")
+            )
+            await self._listen_connection.add_listener(
+                dispatch_repo.MESSAGE_DISPATCH_CHANNEL,
+                lambda *_: self._wakeup.set(),
+            )
+            logger.info(
+                f"[OutboxRelay] Listening on '{dispatch_repo.MESSAGE_DISPATCH_CHANNEL}'."
+            )
+        except Exception as e:
+            self._listen_connection = None
+            logger.warning(
+                f"[OutboxRelay] LISTEN unavailable ({e}), polling every "
+                f"{self.poll_interval_seconds}s."
+            )
+
+    async def run(self) -> None:
+        """Relays until cancelled."""
+        await self._listen()
+        try:
+            while True:
+                if self._listen_connection is not None and self._listen_connection.is_closed():
+                    await self._listen()
+
+                self._wakeup.clear()
+                try:
+                    published = await self.relay_once()
+                    if time.monotonic() - self._last_cleanup > 3600:
+                        self._last_cleanup = time.monotonic()
+                        await self.cleanup()
+                except Exception as e:
+                    logger.exception(f"[OutboxRelay] Relay round failed: {e}")
+                    published = 0
+
+                # A full batch means there is probably more waiting
+                if published < self.batch_size:
+                    try:
+                        await asyncio.wait_for(
+                            self._wakeup.wait(), timeout=self.poll_interval_seconds
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        if self._listen_connection is not None:
+            await self._listen_connection.close()
+            self._listen_connection = None
+        for queue in self._queues.values():
+            await queue.close()
@@ -3,7 +3,7 @@ from uuid import UUID
 import datetime
 import asyncio
 import redis.asyncio as redis
-from typing import Optional
+from typing import List, Optional
 from loguru import logger
 
 from app.config import get_settings
@@ -92,6 +92,31 @@ class RedisQueue(IQueue):
                 logger.error("[RedisQueue] Failed to reconnect, enqueue aborted.")
                 return
 
+    async def enqueue_many(self, messages: List[dict]) -> bool:
+        """
+        Push several messages with a single LPUSH.
+
+        Unlike `enqueue`, reports the outcome so callers that must not lose
+        messages (the outbox relay) can retry: returns True once Redis accepted them.
+        """
+        if not messages:
+            return True
+        if not self.is_connected or self.redis is None:
+            await self.connect()
+            if not self.is_connected:
+                logger.error("[RedisQueue] Failed to connect, enqueue_many aborted.")
+                return False
+
+        serialized = [json.dumps(message, default=default_converter) for message in messages]
+        try:
+            await self.redis.lpush(self.queue_name, *serialized)
+            logger.debug(f"[RedisQueue] Enqueued {len(serialized)} messages.")
+            return True
+        except redis.exceptions.ConnectionError as e:
+            self.is_connected = False
+            logger.error(f"[RedisQueue] Connection error during enqueue_many: {e}")
+            return False
+
     async def dequeue(self) -> Optional[dict]:
         """Pop a message from the queue (FIFO) using BLPOP with a timeout."""
         if not self.is_connected or self.redis is None:
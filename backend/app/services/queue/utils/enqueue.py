@@ -12,6 +12,8 @@ from app.services.repository import (
 )  # Para buscar a conversa
 from app.models.conversation import ConversationStatusEnum  # Para comparar o status
 from app.models.message import Message as MessageModel
+from app.core.metrics import observe_pipeline_stage
+from app.core.tracing import current_trace
 
 settings = get_settings()
 
@@ -91,6 +93,9 @@ async def enqueue_ai_processing_task(payload_from_debounce: Dict[str, Any]):
         # ou pode ser omitido se a tarefa ARQ tratar None como default.
         # "follow_up_attempt_count" não é relevante aqui
     }
+    trace_context = payload_from_debounce.get("trace_context") or current_trace()
+    if trace_context:
+        arq_task_payload["trace_context"] = trace_context
 
     try:
         job = await arq_pool.enqueue_job(
@@ -99,6 +104,7 @@ async def enqueue_ai_processing_task(payload_from_debounce: Dict[str, Any]):
             **arq_task_payload,  # Argumentos para a tarefa
         )
         if job:
+            observe_pipeline_stage("ai_enqueued", trace_context)
             logger.info(
                 f"[EnqueueAIProcessing] Successfully enqueued 'handle_ai_reply_request' for ConvID {conversation_id} "
                 f"to queue '{settings.AI_REPLY_QUEUE_NAME}'. ARQ Job ID: {job.job_id}"
@@ -167,6 +173,8 @@ async def enqueue_ai_processing_for_trigger(
         "event_type": "integration_trigger",  # Novo tipo de evento para clareza
         "trigger_message_id": trigger_message.id,  # Passamos o ID da mensagem sintética
     }
+    if current_trace():
+        arq_task_payload["trace_context"] = current_trace()
 
     try:
         job = await arq_pool.enqueue_job(
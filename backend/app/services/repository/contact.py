@@ -11,6 +11,7 @@ from app.models.contact import Contact
 from app.models.contact_inbox import ContactInbox
 from app.api.schemas.contact import ContactCreate, ContactUpdate
 from app.services.helper.contact import normalize_phone_number
+from app.services.helper.inbound_routing import invalidate_inbound_routes
 
 ALLOWED_SORT_FIELDS: Dict[str, Any] = {
     "name": Contact.name,
@@ -321,6 +322,7 @@ async def update_contact(
 
     db.add(contact)
     await db.flush()  # Flush changes before returning.
+    await invalidate_inbound_routes(db, contact_id=contact.id)
     # Do not commit or refresh here. The upper layer should control this.
     return contact
 
@@ -360,6 +362,7 @@ async def delete_contact(db: AsyncSession, *, contact: Contact) -> None:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to soft delete the contact.",
             )
+    await invalidate_inbound_routes(db, contact_id=contact.id)
     # Do not commit here.
 
 
@@ -1,14 +1,29 @@
+from datetime import datetime
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import desc, select, or_, and_, cast, Text, literal, func, asc, update
+from sqlalchemy import (
+    DateTime,
+    desc,
+    select,
+    or_,
+    and_,
+    cast,
+    Text,
+    literal,
+    func,
+    asc,
+    null,
+    update,
+)
 from typing import Optional, List
 from loguru import logger
 from app.api.schemas.conversation import ConversationSearchResult, MessageSnippet
 from app.api.schemas.contact import ContactBase
 from app.api.schemas.contact import ContactCreate as ContactCreateSchema
 from app.services.helper.contact import normalize_phone_number
+from app.services.helper.inbound_routing import invalidate_inbound_routes
 from app.services.repository import contact as contact_repo
 from app.models.message import Message
 from app.models.conversation import Conversation, ConversationStatusEnum
@@ -305,6 +320,7 @@ async def search_conversations(
             Conversation.id.label("conversation_id"),
             literal(1).label("match_rank"),
             literal(None).label("matching_message_id"),
+            cast(null(), DateTime(timezone=True)).label("matching_message_sent_at"),
         )
         .select_from(Conversation)
         .filter(
@@ -342,6 +358,7 @@ async def search_conversations(
             message_subquery.c.conversation_id.label("conversation_id"),
             literal(2).label("match_rank"),
             message_subquery.c.message_id.label("matching_message_id"),
+            message_subquery.c.sent_at.label("matching_message_sent_at"),
         )
         .select_from(message_subquery)
         .where(message_subquery.c.rnk == 1)
@@ -353,6 +370,7 @@ async def search_conversations(
             name_phone_matches_cte.c.conversation_id,
             name_phone_matches_cte.c.match_rank,
             name_phone_matches_cte.c.matching_message_id,
+            name_phone_matches_cte.c.matching_message_sent_at,
         ).union_all(
             select(
                 message_matches_cte.c.conversation_id,
@@ -360,6 +378,7 @@ async def search_conversations(
                 cast(message_matches_cte.c.matching_message_id, Text).label(
                     "matching_message_id"
                 ),
+                message_matches_cte.c.matching_message_sent_at,
             )
         )
     ).cte("combined_matches")
@@ -370,6 +389,7 @@ async def search_conversations(
             combined_matches_cte.c.conversation_id,
             combined_matches_cte.c.match_rank,
             combined_matches_cte.c.matching_message_id,
+            combined_matches_cte.c.matching_message_sent_at,
             func.row_number()
             .over(
                 partition_by=combined_matches_cte.c.conversation_id,
@@ -385,6 +405,7 @@ async def search_conversations(
             prioritized_matches_cte.c.conversation_id,
             prioritized_matches_cte.c.match_rank,
             prioritized_matches_cte.c.matching_message_id,
+            prioritized_matches_cte.c.matching_message_sent_at,
             Conversation.last_message_at,
         )
         .select_from(prioritized_matches_cte)
@@ -434,6 +455,7 @@ async def search_conversations(
         res["conversation_id"]: {
             "rank": res["match_rank"],
             "matching_message_id": res["matching_message_id"],
+            "matching_message_sent_at": res["matching_message_sent_at"],
         }
         for res in prioritized_results
     }
@@ -457,9 +479,13 @@ async def search_conversations(
 
         most_recent_matching_message: Optional[Message] = None
         if match_rank == 2 and pre_fetched_matching_message_id:
+            # sent_at (the partition key) limits the lookup to one partition
             matching_message_stmt = (
                 select(Message)
-                .where(Message.id == pre_fetched_matching_message_id)
+                .where(
+                    Message.id == pre_fetched_matching_message_id,
+                    Message.sent_at == conv_info["matching_message_sent_at"],
+                )
                 .limit(1)
             )
             matching_message_result = await db.execute(matching_message_stmt)
@@ -515,6 +541,7 @@ async def get_message_context(
     account_id: UUID,
     conversation_id: UUID,
     target_message_id: UUID,
+    target_sent_at: Optional[datetime] = None,
     limit_before: int = 5,
     limit_after: int = 5,
 ) -> List[Message]:
@@ -528,6 +555,8 @@ async def get_message_context(
         account_id (UUID): The account ID.
         conversation_id (UUID): The conversation ID.
         target_message_id (UUID): The ID of the message for context.
+        target_sent_at (Optional[datetime]): sent_at of the target message, when
+            known; lets the lookup prune to one messages partition.
         limit_before (int, optional): Maximum messages to fetch before the target (default: 5).
         limit_after (int, optional): Maximum messages to fetch after the target (default: 5).
 
@@ -541,6 +570,8 @@ async def get_message_context(
             Message.conversation_id == conversation_id,
         )
     )
+    if target_sent_at is not None:
+        target_msg_stmt = target_msg_stmt.where(Message.sent_at == target_sent_at)
     target_msg_result = await db.execute(target_msg_stmt)
     target_message = target_msg_result.scalar_one_or_none()
 
@@ -617,6 +648,7 @@ async def update_conversation_status(
             logger.info(
                 f"Updated conversation {conversation_id} status to {new_status}"
             )
+            await invalidate_inbound_routes(db, conversation_id=conversation_id)
             return updated_conversation
         else:
             logger.warning(
@@ -0,0 +1,178 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import and_, or_, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.conversation import ConversationStatusEnum
+from app.models.conversation_list_entry import ConversationListEntry
+from app.models.inbox_member import InboxMember
+
+# Oldest transaction id still running: every version below it is committed
+# (or rolled back) and visible to any snapshot taken afterwards.
+_WATERMARK_SQL = text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+
+def _encode(payload: list) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(token: str) -> list:
+    padded = token + "=" * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_page_cursor(updated_at: datetime, conversation_id: UUID) -> str:
+    return _encode([updated_at.isoformat(), str(conversation_id)])
+
+
+def decode_page_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Raises ValueError on a malformed cursor."""
+    try:
+        updated_at, conversation_id = _decode(cursor)
+        return datetime.fromisoformat(updated_at), UUID(conversation_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def encode_since(version: int, after_id: Optional[UUID] = None) -> str:
+    return _encode([version, str(after_id) if after_id else None])
+
+
+def decode_since(since: str) -> Tuple[int, Optional[UUID]]:
+    """Raises ValueError on a malformed sync token."""
+    try:
+        version, after_id = _decode(since)
+        return int(version), UUID(after_id) if after_id else None
+    except Exception as e:
+        raise ValueError(f"Invalid sync token: {since}") from e
+
+
+async def find_user_inbox_ids(db: AsyncSession, user_id: UUID) -> List[UUID]:
+    result = await db.execute(
+        select(InboxMember.inbox_id).where(InboxMember.user_id == user_id)
+    )
+    return list(result.scalars().all())
+
+
+async def current_version(db: AsyncSession) -> int:
+    """Sync watermark: no entry can still be written with a version below it."""
+    return int(await db.scalar(_WATERMARK_SQL))
+
+
+async def list_entries(
+    db: AsyncSession,
+    account_id: UUID,
+    inbox_ids: List[UUID],
+    limit: int = 20,
+    cursor: Optional[Tuple[datetime, UUID]] = None,
+    offset: int = 0,
+    status: Optional[List[ConversationStatusEnum]] = None,
+    has_unread: Optional[bool] = None,
+) -> List[ConversationListEntry]:
+    """Retrieve a page of the conversation list, most recently updated first.
+
+    Args:
+        db (AsyncSession): SQLAlchemy asynchronous session.
+        account_id (UUID): The account ID.
+        inbox_ids (List[UUID]): Inboxes visible to the user.
+        limit (int): Page size.
+        cursor (Optional[Tuple[datetime, UUID]]): (updated_at, conversation_id) of
+            the last entry of the previous page (keyset pagination).
+        offset (int): Legacy offset pagination, only used without a cursor.
+        status (Optional[List[ConversationStatusEnum]]): Statuses to filter.
+        has_unread (Optional[bool]): Filter for conversations with unread messages.
+
+    Returns:
+        List[ConversationListEntry]: The entries of the page.
+    """
+    if not inbox_ids:
+        return []
+
+    stmt = select(ConversationListEntry).where(
+        ConversationListEntry.account_id == account_id,
+        ConversationListEntry.inbox_id.in_(inbox_ids),
+        ConversationListEntry.deleted.is_(False),
+    )
+    if status:
+        stmt = stmt.where(ConversationListEntry.status.in_([s.value for s in status]))
+    if has_unread is True:
+        stmt = stmt.where(ConversationListEntry.unread_agent_count > 0)
+    elif has_unread is False:
+        stmt = stmt.where(ConversationListEntry.unread_agent_count == 0)
+
+    if cursor is not None:
+        updated_at, conversation_id = cursor
+        stmt = stmt.where(
+            or_(
+                ConversationListEntry.updated_at < updated_at,
+                and_(
+                    ConversationListEntry.updated_at == updated_at,
+                    ConversationListEntry.conversation_id < conversation_id,
+                ),
+            )
+        )
+    elif offset:
+        stmt = stmt.offset(offset)
+
+    stmt = stmt.order_by(
+        ConversationListEntry.updated_at.desc(),
+        ConversationListEntry.conversation_id.desc(),
+    ).limit(limit)
+
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def list_changes(
+    db: AsyncSession,
+    account_id: UUID,
+    inbox_ids: List[UUID],
+    since_version: int,
+    until_version: int,
+    after_id: Optional[UUID] = None,
+    limit: int = 200,
+) -> List[ConversationListEntry]:
+    """Retrieve the entries changed in [since_version, until_version), tombstones included.
+
+    Ordered by (version, conversation_id); `after_id` resumes inside
+    `since_version` when the previous call was cut at `limit`.
+
+    Returns:
+        List[ConversationListEntry]: Up to `limit` changed entries.
+    """
+    if not inbox_ids:
+        return []
+
+    if after_id is not None:
+        lower_bound = tuple_(
+            ConversationListEntry.version, ConversationListEntry.conversation_id
+        ) > tuple_(since_version, after_id)
+    else:
+        lower_bound = ConversationListEntry.version >= since_version
+
+    stmt = (
+        select(ConversationListEntry)
+        .where(
+            ConversationListEntry.account_id == account_id,
+            ConversationListEntry.inbox_id.in_(inbox_ids),
+            lower_bound,
+            ConversationListEntry.version < until_version,
+        )
+        .order_by(
+            ConversationListEntry.version, ConversationListEntry.conversation_id
+        )
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    entries = list(result.scalars().all())
+    logger.debug(
+        f"[conversation_list] {len(entries)} changes for account {account_id} "
+        f"in [{since_version}, {until_version})"
+    )
+    return entries
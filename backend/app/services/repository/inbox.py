@@ -13,6 +13,7 @@ from app.models.inbox_member import InboxMember
 from app.models.bot_agent_inbox import BotAgentInbox
 from app.api.schemas.inbox import InboxCreate, InboxUpdate
 from app.models.conversation import ConversationStatusEnum
+from app.services.helper.inbound_routing import invalidate_inbound_routes
 
 from app.models.channels.channel_types import ChannelTypeEnum
 from app.models.channels.whatsapp_cloud_config import WhatsAppCloudConfig
@@ -499,6 +500,7 @@ async def update_inbox(
 
     db.add(inbox_to_update)
     await db.flush()
+    await invalidate_inbound_routes(db, inbox_id=inbox_to_update.id)
     # Não precisa de db.refresh(inbox_to_update) aqui se vamos re-selecionar
 
     # Re-selecionar para garantir que os relacionamentos sejam carregados para a resposta
@@ -546,6 +548,7 @@ async def delete_inbox(db: AsyncSession, *, inbox: Inbox) -> bool:
     logger.warning(f"[InboxRepo] Attempting to delete Inbox ID={inbox_id}")
     try:
         await db.delete(inbox)
+        await invalidate_inbound_routes(db, inbox_id=inbox_id)
         # Removed commit here; finalization should be handled by the caller.
         logger.info(f"[InboxRepo] Inbox ID={inbox_id} marked for deletion")
         return True
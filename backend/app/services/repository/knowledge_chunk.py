@@ -1,21 +1,43 @@
+import hashlib
 from typing import List, Optional, Dict, Any, Union, Tuple
 from uuid import UUID
 import numpy as np
 from loguru import logger
-from sqlalchemy import select, delete, tuple_, and_
+from sqlalchemy import (
+    Float,
+    bindparam,
+    cast,
+    func,
+    select,
+    delete,
+    insert,
+    text,
+    update,
+    tuple_,
+    and_,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Vector support for pgvector-based similarity queries
 try:
-    from pgvector.sqlalchemy import Vector
+    from pgvector.sqlalchemy import BIT
 
     PGVECTOR_AVAILABLE = True
 except ImportError:
     logger.error("pgvector.sqlalchemy not found. Similarity queries will fail.")
     PGVECTOR_AVAILABLE = False
-    Vector = None  # type: ignore
+    BIT = None  # type: ignore
 
-from app.models.knowledge_chunk import KnowledgeChunk, EMBEDDING_DIMENSION
+from app.models.knowledge_chunk import (
+    KnowledgeChunk,
+    EMBEDDING_DIMENSION,
+    HalfVectorEmbedding,
+)
+
+
+def compute_chunk_content_hash(chunk_text: str) -> str:
+    """SHA-256 (hex) of the chunk text, matching the backfill done in the migration."""
+    return hashlib.sha256(chunk_text.encode("utf-8")).hexdigest()
 
 
 async def check_knowledge_chunks_exist_for_account(
@@ -38,12 +60,16 @@ async def add_chunks(
 ) -> int:
     """
     Bulk-insert knowledge chunks for an account. Returns the count added.
+
+    Rows go through a single executemany INSERT instead of ORM objects, so
+    callers can stream batches without the session accumulating instances.
+    Embeddings can be lists or numpy arrays (stored as halfvec).
     """
     if not chunks_data:
         logger.info("No chunks provided.")
         return 0
 
-    new_chunks = []
+    rows = []
     for data in chunks_data:
         # Validate required keys and embedding dimension
         if not all(
@@ -62,45 +88,100 @@ async def add_chunks(
             logger.warning("Skipping chunk with incorrect embedding length.")
             continue
 
-        try:
-            new_chunks.append(
-                KnowledgeChunk(
-                    account_id=account_id,
-                    chunk_text=data["chunk_text"],
-                    chunk_index=data["chunk_index"],
-                    embedding=data["embedding"],
-                    source_type=data["source_type"],
-                    source_identifier=data["source_identifier"],
-                    metadata_=data.get("metadata_"),
-                    document_id=data.get("document_id"),
-                )
-            )
-        except Exception as e:
-            logger.error(f"Error creating chunk object: {e}")
+        rows.append(
+            {
+                "account_id": account_id,
+                "chunk_text": data["chunk_text"],
+                "chunk_index": data["chunk_index"],
+                "embedding": data["embedding"],
+                "source_type": data["source_type"],
+                "source_identifier": data["source_identifier"],
+                "content_hash": data.get("content_hash")
+                or compute_chunk_content_hash(data["chunk_text"]),
+                "metadata_": data.get("metadata_"),
+                "document_id": data.get("document_id"),
+            }
+        )
 
-    if not new_chunks:
+    if not rows:
         logger.warning("No valid chunks to add.")
         return 0
 
     try:
-        db.add_all(new_chunks)
-        await db.flush()
-        logger.success(f"Added {len(new_chunks)} chunks for account {account_id}.")
-        return len(new_chunks)
+        await db.execute(insert(KnowledgeChunk), rows)
+        logger.debug(f"Added {len(rows)} chunks for account {account_id}.")
+        return len(rows)
     except Exception:
         logger.exception("Database error during bulk insert.")
         raise
 
 
+HNSW_ITERATIVE_SCAN_MODES = ("off", "strict_order", "relaxed_order")
+
+
+async def count_chunks_for_account(
+    db: AsyncSession, account_id: UUID, cap: Optional[int] = None
+) -> int:
+    """
+    Counts the chunks of an account. With `cap`, counting stops at cap + 1
+    rows, which is enough to compare the account against a threshold.
+    """
+    inner = select(KnowledgeChunk.id).where(KnowledgeChunk.account_id == account_id)
+    if cap is not None:
+        inner = inner.limit(cap + 1)
+    result = await db.execute(select(func.count()).select_from(inner.subquery()))
+    return result.scalar_one()
+
+
+async def configure_ann_search(
+    db: AsyncSession, ef_search: int, iterative_scan: str = "relaxed_order"
+) -> None:
+    """
+    Tunes the HNSW scan for the current transaction (SET LOCAL).
+
+    With iterative scan (pgvector >= 0.8) the index keeps scanning until
+    enough rows pass the account filter, instead of returning at most
+    `ef_search` candidates before filtering.
+    """
+    if iterative_scan not in HNSW_ITERATIVE_SCAN_MODES:
+        raise ValueError(f"Invalid hnsw.iterative_scan mode: {iterative_scan}")
+    await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+    if iterative_scan != "off":
+        await db.execute(text(f"SET LOCAL hnsw.iterative_scan = {iterative_scan}"))
+
+
+def _binary_hamming_distance(query_embedding: Union[List[float], np.ndarray]):
+    """Hamming distance between the binary-quantized embeddings (matches ix_knowledge_chunks_embedding_bq)."""
+    embedding_type = HalfVectorEmbedding(EMBEDDING_DIMENSION)
+    query = cast(
+        bindparam("query_embedding_bq", query_embedding, type_=embedding_type),
+        embedding_type,
+    )
+    return cast(
+        func.binary_quantize(KnowledgeChunk.embedding), BIT(EMBEDDING_DIMENSION)
+    ).op("<~>", return_type=Float)(func.binary_quantize(query))
+
+
 async def search_similar_chunks(
     db: AsyncSession,
     account_id: UUID,
     query_embedding: Union[List[float], np.ndarray],
     limit: int = 5,
     similarity_threshold: Optional[float] = None,
+    exact: bool = False,
+    binary_prefilter: int = 0,
 ) -> List[KnowledgeChunk]:
     """
     Retrieve chunks most similar to the query embedding.
+
+    With `exact`, the ordering expression cannot use the HNSW index, so the
+    account's rows (found through the account_id index) are scanned exactly.
+    Otherwise, a positive `binary_prefilter` takes that many candidates from
+    the binary-quantized index (hamming distance) and reranks them by cosine
+    distance on the stored halfvec embeddings. The rerank is float16, not full
+    float32 precision: the float32 column is not kept. The index is opt-in
+    (scripts/binary_quantized_index.py); without it the pre-filter scans the
+    account's rows.
     """
     if not PGVECTOR_AVAILABLE:
         logger.error("pgvector not available.")
@@ -112,7 +193,16 @@ async def search_similar_chunks(
     try:
         stmt = select(KnowledgeChunk).where(KnowledgeChunk.account_id == account_id)
         distance = KnowledgeChunk.embedding.cosine_distance(query_embedding)
-        stmt = stmt.order_by(distance.asc())
+        if not exact and binary_prefilter > 0:
+            candidate_ids = (
+                select(KnowledgeChunk.id)
+                .where(KnowledgeChunk.account_id == account_id)
+                .order_by(_binary_hamming_distance(query_embedding))
+                .limit(binary_prefilter)
+            )
+            stmt = stmt.where(KnowledgeChunk.id.in_(candidate_ids))
+            exact = True  # rerank the candidates, without the halfvec index
+        stmt = stmt.order_by((distance + 0).asc() if exact else distance.asc())
 
         if similarity_threshold is not None:
             max_dist = 1.0 - similarity_threshold
@@ -226,6 +316,198 @@ async def search_similar_chunks_with_context(
     return all_retrieved_chunks, seed_chunks
 
 
+_VECTOR_CANDIDATES_SQL = """
+        SELECT kc.id, kc.embedding <=> :query_embedding AS distance
+        FROM knowledge_chunks kc
+        WHERE kc.account_id = :account_id
+        ORDER BY {vector_order}
+        LIMIT :candidate_limit"""
+
+# Hamming pre-filter on ix_knowledge_chunks_embedding_bq, then cosine rerank
+# on halfvec (float16; there is no float32 copy of the embeddings).
+_BINARY_RERANK_CANDIDATES_SQL = f"""
+        SELECT b.id, b.embedding <=> :query_embedding AS distance
+        FROM (
+            SELECT kc.id, kc.embedding
+            FROM knowledge_chunks kc
+            WHERE kc.account_id = :account_id
+            ORDER BY binary_quantize(kc.embedding)::bit({EMBEDDING_DIMENSION})
+                     <~> binary_quantize(CAST(:query_embedding AS halfvec({EMBEDDING_DIMENSION})))
+            LIMIT :prefilter_limit
+        ) b
+        ORDER BY distance
+        LIMIT :candidate_limit"""
+
+_HYBRID_SEARCH_SQL = """
+WITH vector_candidates AS (
+    SELECT id, distance, row_number() OVER (ORDER BY distance) AS rank
+    FROM ({vector_candidates}
+    ) v
+),
+text_candidates AS (
+    SELECT id, row_number() OVER (ORDER BY text_rank DESC) AS rank
+    FROM (
+        SELECT kc.id, ts_rank_cd(kc.search_vector, q.query) AS text_rank
+        FROM knowledge_chunks kc,
+             -- OR between terms: questions rarely contain every word of a chunk.
+             (SELECT replace(plainto_tsquery('portuguese', :query_text)::text, '&', '|')::tsquery AS query) q
+        WHERE kc.account_id = :account_id AND kc.search_vector @@ q.query
+        ORDER BY text_rank DESC
+        LIMIT :candidate_limit
+    ) t
+),
+fused AS (
+    SELECT COALESCE(v.id, t.id) AS id,
+           COALESCE(1.0 / (:rrf_k + v.rank), 0.0)
+             + COALESCE(1.0 / (:rrf_k + t.rank), 0.0) AS score
+    FROM vector_candidates v
+    FULL OUTER JOIN text_candidates t ON v.id = t.id
+    -- The similarity threshold only applies to hits without a lexical match.
+    WHERE t.id IS NOT NULL OR v.distance <= :max_distance
+    ORDER BY score DESC
+    LIMIT :seed_limit
+),
+seeds AS (
+    SELECT f.id, row_number() OVER (ORDER BY f.score DESC) - 1 AS seed_rank,
+           kc.document_id, kc.source_identifier, kc.chunk_index
+    FROM fused f
+    JOIN knowledge_chunks kc ON kc.id = f.id
+)
+SELECT s.seed_rank, n.id = s.id AS is_seed,
+       n.id, n.account_id, n.document_id, n.source_type, n.source_identifier,
+       n.chunk_text, n.chunk_index, n.metadata
+FROM seeds s
+CROSS JOIN LATERAL (
+    SELECT kc.id, kc.account_id, kc.document_id, kc.source_type,
+           kc.source_identifier, kc.chunk_text, kc.chunk_index, kc.metadata
+    FROM knowledge_chunks kc
+    WHERE kc.id = s.id
+    UNION ALL
+    SELECT kc.id, kc.account_id, kc.document_id, kc.source_type,
+           kc.source_identifier, kc.chunk_text, kc.chunk_index, kc.metadata
+    FROM knowledge_chunks kc
+    WHERE s.document_id IS NOT NULL
+      AND kc.document_id = s.document_id
+      AND kc.source_identifier = s.source_identifier
+      AND kc.chunk_index IN (s.chunk_index - 1, s.chunk_index + 1)
+) n
+ORDER BY s.seed_rank, n.chunk_index
+"""
+
+
+async def hybrid_search_chunks_with_context(
+    db: AsyncSession,
+    account_id: UUID,
+    query_text: str,
+    query_embedding: Union[List[float], np.ndarray],
+    limit: int = 3,
+    similarity_threshold: Optional[float] = None,
+    candidate_limit: int = 40,
+    rrf_k: int = 60,
+    exact: bool = False,
+    binary_prefilter: int = 0,
+) -> Tuple[List[KnowledgeChunk], List[KnowledgeChunk]]:
+    """Hybrid (Portuguese full-text + vector) search with neighbours, in one query.
+
+    The top `candidate_limit` chunks by cosine distance and by `ts_rank_cd` are
+    fused with reciprocal-rank fusion (score = sum of 1 / (rrf_k + rank)); the
+    best `limit` become seeds and their previous/next chunks are fetched
+    through a lateral join. Embeddings are not transferred.
+
+    Args:
+        db: The SQLAlchemy AsyncSession.
+        account_id: The UUID of the account to search within.
+        query_text: The user's query, for the lexical side.
+        query_embedding: The vector embedding of the user's query.
+        limit: The number of "seed" chunks to return.
+        similarity_threshold: Optional cosine similarity threshold for chunks
+            found only by the vector side.
+        candidate_limit: Candidates taken from each side before fusion.
+        rrf_k: The reciprocal-rank fusion constant.
+        exact: Exact scan of the account's rows instead of the HNSW index
+            (see `search_similar_chunks`).
+        binary_prefilter: When positive (and not `exact`), vector candidates
+            come from the binary-quantized index and are reranked by halfvec
+            cosine distance (see `search_similar_chunks`).
+
+    Returns:
+        A tuple: (all_retrieved_chunks, seed_chunks), with the same ordering as
+        `search_similar_chunks_with_context`. The chunks are detached objects
+        without `embedding`.
+    """
+    if not PGVECTOR_AVAILABLE:
+        logger.error("pgvector not available.")
+        return [], []
+    if len(query_embedding) != EMBEDDING_DIMENSION:
+        logger.error("Query embedding dimension mismatch.")
+        return [], []
+
+    max_distance = (
+        1.0 - similarity_threshold if similarity_threshold is not None else 2.0
+    )
+    if exact:
+        vector_candidates = _VECTOR_CANDIDATES_SQL.format(
+            vector_order="(kc.embedding <=> :query_embedding) + 0"
+        )
+    elif binary_prefilter > 0:
+        vector_candidates = _BINARY_RERANK_CANDIDATES_SQL
+    else:
+        vector_candidates = _VECTOR_CANDIDATES_SQL.format(
+            vector_order="kc.embedding <=> :query_embedding"
+        )
+    stmt = text(
+        _HYBRID_SEARCH_SQL.format(vector_candidates=vector_candidates)
+    ).bindparams(
+        bindparam("query_embedding", type_=HalfVectorEmbedding(EMBEDDING_DIMENSION))
+    )
+    result = await db.execute(
+        stmt,
+        {
+            "account_id": account_id,
+            "query_text": query_text,
+            "query_embedding": query_embedding,
+            "candidate_limit": candidate_limit,
+            "prefilter_limit": max(binary_prefilter, candidate_limit),
+            "rrf_k": rrf_k,
+            "max_distance": max_distance,
+            "seed_limit": limit,
+        },
+    )
+
+    chunks_by_id: Dict[UUID, KnowledgeChunk] = {}
+    best_rank: Dict[UUID, int] = {}
+    seed_chunks: List[KnowledgeChunk] = []
+    for row in result.mappings():
+        chunk = chunks_by_id.get(row["id"])
+        if chunk is None:
+            chunk = KnowledgeChunk(
+                id=row["id"],
+                account_id=row["account_id"],
+                document_id=row["document_id"],
+                source_type=row["source_type"],
+                source_identifier=row["source_identifier"],
+                chunk_text=row["chunk_text"],
+                chunk_index=row["chunk_index"],
+                metadata_=row["metadata"],
+            )
+            chunks_by_id[row["id"]] = chunk
+            best_rank[row["id"]] = row["seed_rank"]
+        else:
+            # A neighbour shared by two seeds keeps the best relevance rank.
+            best_rank[row["id"]] = min(best_rank[row["id"]], row["seed_rank"])
+        if row["is_seed"]:
+            seed_chunks.append(chunk)
+
+    all_retrieved_chunks = sorted(
+        chunks_by_id.values(), key=lambda c: (best_rank[c.id], c.chunk_index)
+    )
+    logger.info(
+        f"Hybrid search returned {len(all_retrieved_chunks)} context chunks "
+        f"and {len(seed_chunks)} seed chunks."
+    )
+    return all_retrieved_chunks, seed_chunks
+
+
 async def delete_chunks_by_document_id(db: AsyncSession, document_id: UUID) -> int:
     """
     Remove all chunks linked to a document. Returns deleted count.
@@ -240,3 +522,61 @@ async def delete_chunks_by_document_id(db: AsyncSession, document_id: UUID) -> i
     except Exception:
         logger.exception("Error deleting chunks by document_id.")
         raise
+
+
+async def get_chunk_fingerprints(
+    db: AsyncSession, document_id: UUID
+) -> List[Tuple[UUID, str, Optional[str], int]]:
+    """
+    Lists (id, source_identifier, content_hash, chunk_index) for every chunk of
+    a document, without loading texts or embeddings.
+    """
+    stmt = select(
+        KnowledgeChunk.id,
+        KnowledgeChunk.source_identifier,
+        KnowledgeChunk.content_hash,
+        KnowledgeChunk.chunk_index,
+    ).where(KnowledgeChunk.document_id == document_id)
+    result = await db.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+
+async def update_chunk_indexes(
+    db: AsyncSession, index_updates: List[Dict[str, Any]]
+) -> int:
+    """
+    Bulk-update chunk_index (and metadata) of existing chunks by primary key.
+
+    Args:
+        db: The SQLAlchemy AsyncSession.
+        index_updates: Dicts with "id", "chunk_index" and "metadata_".
+
+    Returns:
+        The number of chunks updated.
+    """
+    if not index_updates:
+        return 0
+    try:
+        await db.execute(update(KnowledgeChunk), index_updates)
+        logger.debug(f"Re-indexed {len(index_updates)} unchanged chunks.")
+        return len(index_updates)
+    except Exception:
+        logger.exception("Error re-indexing chunks.")
+        raise
+
+
+async def delete_chunks_by_ids(db: AsyncSession, chunk_ids: List[UUID]) -> int:
+    """
+    Remove the given chunks. Returns deleted count.
+    """
+    if not chunk_ids:
+        return 0
+    try:
+        stmt = delete(KnowledgeChunk).where(KnowledgeChunk.id.in_(chunk_ids))
+        result = await db.execute(stmt)
+        count = result.rowcount or 0
+        logger.info(f"Deleted {count} stale chunks.")
+        return count
+    except Exception:
+        logger.exception("Error deleting chunks by id.")
+        raise
@@ -1,30 +1,39 @@
+from datetime import datetime
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy import desc, select, tuple_, asc, delete
-from typing import List, Optional
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Any, Dict, List, Optional
 from loguru import logger
 from app.models.message import Message
 from app.models.inbox import Inbox
 from app.api.schemas.message import MessageCreate
 
 
-async def find_message_by_id(db: AsyncSession, message_id: UUID) -> Optional[Message]:
+async def find_message_by_id(
+    db: AsyncSession, message_id: UUID, sent_at: Optional[datetime] = None
+) -> Optional[Message]:
     """Retrieve a message by its ID with related contact and inbox loaded.
 
     Args:
         db (AsyncSession): Database session.
         message_id (UUID): The ID of the message to retrieve.
+        sent_at (Optional[datetime]): The message's sent_at, when known. Lets
+            Postgres prune the lookup to one messages partition.
 
     Returns:
         Optional[Message]: The Message object if found, otherwise None.
     """
-    result = await db.execute(
+    stmt = (
         select(Message)
         .options(joinedload(Message.contact))
         .options(joinedload(Message.inbox))
         .filter_by(id=message_id)
     )
+    if sent_at is not None:
+        stmt = stmt.filter_by(sent_at=sent_at)
+    result = await db.execute(stmt)
     message = result.scalar_one_or_none()
 
     if message:
@@ -105,20 +114,53 @@ async def create_message(db: AsyncSession, message_data: MessageCreate) -> Messa
     return new_message
 
 
-async def get_or_create_message(
+def _message_values(message_data: MessageCreate) -> Dict[str, Any]:
+    return {
+        "account_id": message_data.account_id,
+        "inbox_id": message_data.inbox_id,
+        "conversation_id": message_data.conversation_id,
+        "contact_id": message_data.contact_id,
+        "source_id": message_data.source_id,
+        "user_id": message_data.user_id,
+        "direction": message_data.direction,
+        "private": message_data.private,
+        "status": message_data.status,
+        "sent_at": message_data.message_timestamp,
+        "content": message_data.content,
+        "content_type": message_data.content_type,
+        "content_attributes": message_data.content_attributes,
+    }
+
+
+def _insert_if_absent_stmt():
+    """
+    INSERT ... ON CONFLICT DO NOTHING RETURNING on the unique
+    (inbox_id, source_id, sent_at) index: duplicates return no row.
+    """
+    return (
+        pg_insert(Message)
+        .on_conflict_do_nothing(
+            index_elements=[Message.inbox_id, Message.source_id, Message.sent_at],
+            index_where=Message.source_id.isnot(None),
+        )
+        .returning(Message)
+    )
+
+
+async def insert_message_if_absent(
     db: AsyncSession, message_data: MessageCreate
-) -> Message:
-    """Retrieve a message by inbox_id and source_id, or create one if it doesn't exist.
+) -> Optional[Message]:
+    """Inserts a message unless the same provider message is already stored.
 
-    Ensures idempotent message handling. Transaction finalization (commit, refresh, rollback)
-    should be handled by the caller.
+    One round trip, and safe under concurrency: a racing duplicate waits for
+    the first insert's transaction and then returns nothing.
 
     Args:
         db (AsyncSession): Database session.
         message_data (MessageCreate): The data for the message to create.
 
     Returns:
-        Message: The Message object.
+        Optional[Message]: The new Message, or None if it is a duplicate.
 
     Raises:
         ValueError: If source_id is not provided in message_data.
@@ -126,40 +168,56 @@ async def get_or_create_message(
     if not message_data.source_id:
         raise ValueError("source_id is required to identify messages")
 
-    # Check for an existing message
-    result = await db.execute(
-        select(Message)
-        .options(selectinload(Message.contact))
-        .filter_by(inbox_id=message_data.inbox_id, source_id=message_data.source_id)
+    result = await db.scalars(
+        _insert_if_absent_stmt(), [_message_values(message_data)]
     )
-    message = result.scalar_one_or_none()
+    message = result.first()
+    if message:
+        logger.info(f"[message] Created new message (id={message.id})")
+    else:
+        logger.debug(
+            f"[message] Duplicate message ignored (inbox={message_data.inbox_id}, "
+            f"source_id={message_data.source_id})"
+        )
+    return message
+
+
+async def get_or_create_message(
+    db: AsyncSession, message_data: MessageCreate
+) -> Message:
+    """Retrieve a message by inbox_id and source_id, or create one if it doesn't exist.
+
+    Ensures idempotent message handling: the insert is attempted first and the
+    existing row is only read back when it turns out to be a duplicate.
+    Transaction finalization (commit, refresh, rollback) should be handled by the caller.
+
+    Args:
+        db (AsyncSession): Database session.
+        message_data (MessageCreate): The data for the message to create.
+
+    Returns:
+        Message: The Message object.
 
+    Raises:
+        ValueError: If source_id is not provided in message_data.
+    """
+    message = await insert_message_if_absent(db, message_data)
     if message:
-        logger.debug(f"[message] Reusing existing message (id={message.id})")
         return message
 
-    # Create new message if one doesn't exist
-    new_message = Message(
-        account_id=message_data.account_id,
-        inbox_id=message_data.inbox_id,
-        conversation_id=message_data.conversation_id,
-        contact_id=message_data.contact_id,
-        source_id=message_data.source_id,
-        user_id=message_data.user_id,
-        direction=message_data.direction,
-        private=message_data.private,
-        status=message_data.status,
-        sent_at=message_data.message_timestamp,
-        content=message_data.content,
-        content_type=message_data.content_type,
-        content_attributes=message_data.content_attributes,
+    # sent_at is part of the unique key and lets the lookup prune to one partition
+    result = await db.execute(
+        select(Message)
+        .options(selectinload(Message.contact))
+        .filter_by(
+            inbox_id=message_data.inbox_id,
+            source_id=message_data.source_id,
+            sent_at=message_data.message_timestamp,
+        )
     )
-
-    db.add(new_message)
-    await db.flush()
-    # Removed commit and refresh: the caller should finalize the transaction.
-    logger.info(f"[message] Created new message (id={new_message.id})")
-    return new_message
+    message = result.scalar_one()
+    logger.debug(f"[message] Reusing existing message (id={message.id})")
+    return message
 
 
 async def get_messages_paginated(
@@ -170,6 +228,7 @@ async def get_messages_paginated(
     limit: int = 30,
     before_cursor: Optional[UUID] = None,
     after_cursor: Optional[UUID] = None,
+    cursor_sent_at: Optional[datetime] = None,
 ) -> List[Message]:
     """
     Fetch a paginated list of messages for a conversation using cursor-based pagination.
@@ -185,6 +244,9 @@ async def get_messages_paginated(
         limit (int): The maximum number of messages to return.
         before_cursor (Optional[UUID]): The ID of the message before which to fetch older messages.
         after_cursor (Optional[UUID]): The ID of the message after which to fetch newer messages.
+        cursor_sent_at (Optional[datetime]): sent_at of the cursor message. When
+            given, the cursor is (cursor_sent_at, cursor id) and is not looked up;
+            otherwise it is found by ID, which probes every messages partition.
 
     Returns:
         List[Message]: A list of Message objects sorted chronologically (timestamp ASC, id ASC).
@@ -199,9 +261,12 @@ async def get_messages_paginated(
     target_cursor = after_cursor or before_cursor
 
     # Fetch the cursor message's timestamp and ID if a cursor is provided
-    if target_cursor:
+    if target_cursor and cursor_sent_at is not None:
+        cursor_timestamp, cursor_id = cursor_sent_at, target_cursor
+    elif target_cursor:
         cursor_stmt = select(Message.sent_at, Message.id).where(
-            Message.id == target_cursor
+            Message.id == target_cursor,
+            Message.conversation_id == conversation_id,
         )
         cursor_result = await db.execute(cursor_stmt)
         cursor_data = cursor_result.first()
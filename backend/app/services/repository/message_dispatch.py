@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.tracing import current_trace
+from app.models.message import Message
+from app.models.message_dispatch import MessageDispatch
+
+settings = get_settings()
+
+# NOTIFY channel the outbox relay LISTENs on (delivered when the transaction commits)
+MESSAGE_DISPATCH_CHANNEL = "message_dispatch"
+
+
+async def add_message_dispatch(
+    db: AsyncSession, message: Message, queue_name: Optional[str] = None
+) -> MessageDispatch:
+    """Records an outgoing message for delivery, in the caller's transaction.
+
+    The relay only sees the dispatch once the transaction commits, so the
+    sender never gets an ID whose message row is not visible yet, and a
+    rolled back message is never sent. Transaction finalization should be
+    handled by the caller.
+
+    Args:
+        db (AsyncSession): Database session (the one that created the message).
+        message (Message): The outgoing message, already flushed.
+        queue_name (Optional[str]): Delivery queue (default: the response sender's).
+
+    Returns:
+        MessageDispatch: The pending dispatch.
+    """
+    payload = {"message_id": str(message.id), "sent_at": message.sent_at.isoformat()}
+    trace = current_trace()
+    if trace:
+        # Lets the sender relate the delivery to the webhook that caused it
+        payload["trace_context"] = trace
+    dispatch = MessageDispatch(
+        message_id=message.id,
+        message_sent_at=message.sent_at,
+        account_id=message.account_id,
+        queue_name=queue_name or settings.RESPONSE_SENDER_QUEUE_NAME,
+        payload=payload,
+    )
+    db.add(dispatch)
+    await db.execute(text(f"NOTIFY {MESSAGE_DISPATCH_CHANNEL}"))
+    logger.debug(f"[MessageDispatch] Dispatch recorded for message {message.id}")
+    return dispatch
+
+
+async def claim_pending_dispatches(
+    db: AsyncSession, limit: int = 100
+) -> List[MessageDispatch]:
+    """Locks the oldest unpublished dispatches (skipping those another relay holds).
+
+    Args:
+        db (AsyncSession): Database session; the locks last until it commits.
+        limit (int): Maximum number of dispatches to claim.
+
+    Returns:
+        List[MessageDispatch]: The claimed dispatches, oldest first.
+    """
+    result = await db.execute(
+        select(MessageDispatch)
+        .where(MessageDispatch.published_at.is_(None))
+        .order_by(MessageDispatch.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return list(result.scalars().all())
+
+
+async def mark_dispatches_published(db: AsyncSession, dispatch_ids: List[UUID]) -> None:
+    """Stamps the dispatches as published."""
+    if not dispatch_ids:
+        return
+    await db.execute(
+        update(MessageDispatch)
+        .where(MessageDispatch.id.in_(dispatch_ids))
+        .values(
+            published_at=datetime.now(timezone.utc),
+            publish_attempts=MessageDispatch.publish_attempts + 1,
+        )
+    )
+
+
+async def record_failed_publish(db: AsyncSession, dispatch_ids: List[UUID]) -> None:
+    """Counts a failed publish attempt; the dispatches stay pending."""
+    if not dispatch_ids:
+        return
+    await db.execute(
+        update(MessageDispatch)
+        .where(MessageDispatch.id.in_(dispatch_ids))
+        .values(publish_attempts=MessageDispatch.publish_attempts + 1)
+    )
+
+
+async def delete_published_dispatches(db: AsyncSession, older_than: timedelta) -> int:
+    """Deletes dispatches published more than `older_than` ago. Returns the count."""
+    result = await db.execute(
+        delete(MessageDispatch).where(
+            MessageDispatch.published_at < datetime.now(timezone.utc) - older_than
+        )
+    )
+    return result.rowcount
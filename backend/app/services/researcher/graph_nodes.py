@@ -19,16 +19,22 @@ from .graph_state import (
 
 # Import web loader
 try:
-    from .web_loader_simple import fetch_and_extract_text_and_links
+    from .web_loader_simple import create_research_crawler, page_to_text_and_links
 
     SIMPLE_LOADER_AVAILABLE = True
 except ImportError:
     SIMPLE_LOADER_AVAILABLE = False
-    logger.error("Simple web loader 'fetch_and_extract_text_and_links' not found.")
+    logger.error("Simple web loader (research crawler) not found.")
 
-    async def fetch_and_extract_text_and_links(*args, **kwargs) -> Optional[str]:
+    def create_research_crawler(*args, **kwargs):
         return None  # Dummy
 
+    def page_to_text_and_links(*args, **kwargs):
+        return None, []  # Dummy
+
+# Sitemap URLs offered to the planner alongside the links of the initial page.
+MAX_SITEMAP_LINKS_FOR_PLANNER = 50
+
 
 # Import search client
 try:
@@ -195,9 +201,13 @@ async def scrape_website(state: ResearchState) -> Dict[str, Any]:
         return {"urls_to_scrape": [], "newly_found_links": []}
 
     logger.info(f"Fetching {len(new_urls_to_fetch)} new URLs...")
-    # Call the function that returns text AND links
-    tasks = [fetch_and_extract_text_and_links(url=url) for url in new_urls_to_fetch]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # The crawler bounds concurrency (globally and per domain), respects
+    # robots.txt and parses HTML off the event loop. Pages whose content was
+    # already scraped come back without text.
+    crawler = create_research_crawler()
+    crawler.mark_seen(scraped_data.values())
+    pages = await crawler.fetch_many(new_urls_to_fetch)
+    results = [page_to_text_and_links(page) for page in pages]
 
     newly_visited = set()
     successful_scrapes = 0
@@ -238,10 +248,20 @@ async def scrape_website(state: ResearchState) -> Dict[str, Any]:
     )
     logger.info(action_summary)
 
+    # Sitemap entries go after the page links, which carry anchor texts.
+    if found_links_key_to_update == "intial_url_found_links":
+        sitemap_urls = await crawler.sitemap_urls(
+            new_urls_to_fetch[0], limit=MAX_SITEMAP_LINKS_FOR_PLANNER
+        )
+        all_links_found_this_cycle.extend(
+            LinkInfo(url=sitemap_url, anchor_text=None)
+            for sitemap_url in sitemap_urls
+        )
+
     # --- Deduplicate links found across all pages in this cycle ---
-    unique_links_dict: Dict[str, LinkInfo] = {
-        link.url: link for link in all_links_found_this_cycle
-    }
+    unique_links_dict: Dict[str, LinkInfo] = {}
+    for link in all_links_found_this_cycle:
+        unique_links_dict.setdefault(link.url, link)
     unique_new_links = list(unique_links_dict.values())
     logger.info(
         f"Found {len(unique_new_links)} unique internal links in this scraping cycle."
@@ -1,10 +1,7 @@
 import asyncio
-from typing import Optional, Dict, Tuple, List
-from urllib.parse import urljoin, urlparse
-import html2text
+from typing import Optional, Tuple, List
 from loguru import logger
 import sys
-import httpx
 
 # Import LinkInfo schema from graph_state or define it here
 try:
@@ -19,23 +16,23 @@ except ImportError:
 
 # --- Dependencies ---
 try:
-    import httpx
-    from bs4 import BeautifulSoup
+    from app.services.crawler.crawler import CrawledPage, WebCrawler
 
-    BEAUTIFULSOUP_AVAILABLE = True
+    CRAWLER_AVAILABLE = True
 except ImportError:
-    logger.error("Required libraries 'httpx' or 'beautifulsoup4' not found.")
-    BEAUTIFULSOUP_AVAILABLE = False
+    logger.error("Web crawler dependencies ('httpx', 'beautifulsoup4') not found.")
+    CRAWLER_AVAILABLE = False
 
-    class BeautifulSoup:
+    class WebCrawler:  # type: ignore
+        pass
+
+    class CrawledPage:  # type: ignore
         pass
 
 
 # --- Configuration Defaults ---
-DEFAULT_SINGLE_PAGE_TIMEOUT = 20
-DEFAULT_REQUEST_HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-}
+# Footers and headers are kept in the text: they often hold contact info.
+RESEARCHER_STRIP_TAGS = ("script", "style", "nav", "footer", "header", "aside", "form")
 
 
 # --- Helper Functions ---
@@ -55,138 +52,30 @@ def _clean_extracted_text(text: str) -> str:
     return "\n".join(lines)
 
 
-# --- Added Link Helpers (from llm_guided loader) ---
-def _get_base_domain(netloc: str) -> str:
-    parts = netloc.split(".")
-    if len(parts) <= 2:
-        return netloc
-    return ".".join(parts[-2:])
-
-
-def _is_internal_link_allow_subdomains(base_netloc: str, link_url: str) -> bool:
-    try:
-        link_netloc = urlparse(link_url).netloc
-        if not link_netloc:
-            return True
-        base_domain = _get_base_domain(base_netloc)
-        link_domain = _get_base_domain(link_netloc)
-        return base_domain == link_domain
-    except Exception:
-        return False
-
-
-def _clean_link(base_url: str, link: str) -> Optional[str]:
-    try:
-        absolute_link = urljoin(base_url, link.strip())
-        parsed_link = urlparse(absolute_link)
-        if (
-            parsed_link.scheme not in ["http", "https"]
-            or parsed_link.fragment
-            or parsed_link.scheme in ["javascript", "tel", "mailto"]
-        ):
-            return None
-        clean_url = parsed_link._replace(fragment="").geturl()
-        return clean_url
-    except Exception:
-        return None
-
-
-# --- End Added Link Helpers ---
-
-
-def _extract_text_and_links_simple(
-    html_content: str, base_url: str
-) -> Tuple[str, List[LinkInfo]]:
-    """Extracts main text content and internal links from HTML."""
-    if not BEAUTIFULSOUP_AVAILABLE:
-        return "", []
-    text = ""
-    links = []
-    try:
-        soup = BeautifulSoup(html_content, "lxml")
-        for script_or_style in soup(
-            ["script", "style", "nav", "footer", "header", "aside", "form"]
-        ):
-            script_or_style.decompose()
-        text = soup.get_text(separator="\n", strip=True)
-
-        # Extract internal links (allowing subdomains)
-        base_netloc = urlparse(base_url).netloc
-        processed_urls = set()
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            cleaned_link = _clean_link(base_url, href)
-
-            # Use the subdomain-allowing check
-            # is_whatsapp = any(
-            #     domain in cleaned_link for domain in ["wa.me", "api.whatsapp.com"]
-            # )
-
-            if (
-                cleaned_link
-                and cleaned_link not in processed_urls
-                and _is_internal_link_allow_subdomains(base_netloc, cleaned_link)
-            ):
-                anchor_text = a_tag.get_text(strip=True)
-                links.append(LinkInfo(url=cleaned_link, anchor_text=anchor_text))
-                processed_urls.add(cleaned_link)
-
-        h2t = html2text.HTML2Text()
-        h2t.body_width = 0  # No automatic line wrapping
-        h2t.ignore_images = True  # Usually good for RAG
-        h2t.ignore_links = False  # Keep links by default, can be changed
-        h2t.ignore_emphasis = False  # Keep bold/italic
-        h2t.unicode_snob = True
-        h2t.mark_code = True
-        h2t.header_style = 1  # Use #, ## for headers (ATX style)
-        h2t.use_automatic_links = True
-        h2t.skip_internal_links = True
-        h2t.include_doc_title = False  # Don't use <title> tag as H1 for the whole doc
-        # override the text using html2text
-        text = h2t.handle(html_content)
-    except Exception as e:
-        logger.error(f"Error during BeautifulSoup parsing or link extraction: {e}")
-        # Return whatever was extracted so far, or empty if error was early
-        return text, links
-
-    return text, links
-
+def create_research_crawler() -> WebCrawler:
+    """Returns a crawler configured for the researcher (raw-HTML Markdown, robots respected)."""
+    return WebCrawler(
+        strip_tags=RESEARCHER_STRIP_TAGS, markdown_from_cleaned_html=False
+    )
 
-async def _fetch_page_content_async(
-    url: str, headers: Dict[str, str], timeout: int
-) -> Optional[str]:
-    try:
-        logger.info(f"Fetching HTML from URL: {url}")
-        async with httpx.AsyncClient(
-            timeout=30.0,
-            follow_redirects=True,
-            headers=headers,
-        ) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-
-    except httpx.TimeoutException:
-        logger.warning(f"Timeout fetching {url} after {timeout}s")
-        return None
-    except httpx.RequestError as e:
-        logger.error(f"HTTP request failed for URL {url}: {e}")
-        return None
-    except Exception as e:
-        logger.error(f"Unexpected error fetching {url}: {e}")
-        return None
 
-    content_type = response.headers.get("content-type", "").lower()
-    if "html" not in content_type:
-        logger.debug(f"Skipping non-HTML content at {url} (type: {content_type})")
-        return None
+def page_to_text_and_links(
+    page: Optional[CrawledPage],
+) -> Tuple[Optional[str], List[LinkInfo]]:
+    """
+    Converts a crawled page to the (text, links) pair used by the researcher.
 
-    try:
-        return response.content.decode("utf-8")
-    except UnicodeDecodeError:
-        logger.warning(
-            f"UTF-8 decode failed for {url}, using apparent: {response.apparent_encoding}"
-        )
-        return response.text
+    Duplicated pages keep their links but return no text.
+    """
+    if page is None:
+        return None, []
+    links = [
+        LinkInfo(url=link_url, anchor_text=anchor_text)
+        for link_url, anchor_text in page.links
+    ]
+    if page.is_duplicate or not page.markdown.strip():
+        return None, links
+    return _clean_extracted_text(page.markdown), links
 
 
 # --- Core Function  ---
@@ -194,70 +83,49 @@ async def _fetch_page_content_async(
 
 async def fetch_and_extract_text_and_links(
     url: str,
-    request_timeout: int = DEFAULT_SINGLE_PAGE_TIMEOUT,
-    request_headers: Optional[Dict[str, str]] = None,
+    crawler: Optional[WebCrawler] = None,
 ) -> Tuple[Optional[str], List[LinkInfo]]:
     """
     Fetches content from a single URL, extracts cleaned text and internal links.
 
     Args:
         url: The URL of the web page to load.
-        request_timeout: Timeout in seconds for the fetch operation.
-        request_headers: Headers to use for the HTTP request.
+        crawler: The crawler to fetch with, so limits and dedup state are
+                 shared across calls. A researcher crawler is created if omitted.
 
     Returns:
         A tuple containing:
             - str: The extracted and cleaned text content, or None on failure.
             - List[LinkInfo]: A list of found internal links.
     """
-    if not BEAUTIFULSOUP_AVAILABLE:
-        logger.error("Dependencies (requests, beautifulsoup4) not available.")
+    if not CRAWLER_AVAILABLE:
+        logger.error("Dependencies (httpx, beautifulsoup4) not available.")
         return None, []
     if not _validate_url(url):
         return None, []
 
-    default_headers = DEFAULT_REQUEST_HEADERS.copy()
-
-    headers = request_headers if request_headers is not None else default_headers
     logger.info(f"Attempting to fetch/extract text & links from URL: {url}")
-
-    html_content: Optional[str] = None
-    extracted_text: Optional[str] = None
-    links: List[LinkInfo] = []
-
     try:
-
-        html_content = await _fetch_page_content_async(url, headers, request_timeout)
-
-        if html_content:
-
-            raw_text, links = _extract_text_and_links_simple(html_content, url)
-
-            if raw_text.strip():
-                extracted_text = _clean_extracted_text(raw_text)
-                logger.success(
-                    f"Successfully fetched/extracted text ({len(extracted_text)} chars) and {len(links)} links from {url}."
-                )
-            else:
-                logger.warning(
-                    f"No significant text extracted from {url}, but found {len(links)} links."
-                )
-
-                extracted_text = None
-        else:
-
-            logger.warning(
-                f"Fetch failed or returned no HTML for {url}. No text or links extracted."
-            )
-            return None, []
-
-    except asyncio.TimeoutError:
-        logger.error(f"Overall operation timeout fetching/processing {url}")
-        return None, []
+        page = await (crawler or create_research_crawler()).fetch_page(url)
     except Exception as e:
         logger.exception(f"Unexpected error during fetch/extract for {url}: {e}")
         return None, []
 
+    if page is None:
+        logger.warning(
+            f"Fetch failed or returned no HTML for {url}. No text or links extracted."
+        )
+        return None, []
+
+    extracted_text, links = page_to_text_and_links(page)
+    if extracted_text:
+        logger.success(
+            f"Successfully fetched/extracted text ({len(extracted_text)} chars) and {len(links)} links from {url}."
+        )
+    else:
+        logger.warning(
+            f"No significant (or only duplicated) text extracted from {url}, but found {len(links)} links."
+        )
     return extracted_text, links
 
 
@@ -276,7 +144,7 @@ async def main_test():
         print(f"\n--- Testing Simple Fetch for URL: {test_url} ---")
 
         extracted_text, found_links = await fetch_and_extract_text_and_links(
-            url=test_url, request_timeout=10
+            url=test_url
         )
 
         if extracted_text is not None:
@@ -296,8 +164,8 @@ async def main_test():
 
 
 if __name__ == "__main__":
-    if not BEAUTIFULSOUP_AVAILABLE:
-        logger.error("Cannot run test: Missing 'requests' or 'beautifulsoup4'.")
+    if not CRAWLER_AVAILABLE:
+        logger.error("Cannot run test: Missing 'httpx' or 'beautifulsoup4'.")
     elif not hasattr(asyncio, "to_thread"):
         logger.error("asyncio.to_thread is required (Python 3.9+).")
     else:
@@ -1,6 +1,8 @@
 # app/services/sales_agent/agent_graph.py
 
-from typing import List, Callable, Any, Literal, Union
+import asyncio
+import time
+from typing import List, Callable, Any, Literal, Tuple, Union
 from pydantic import BaseModel
 
 # Langchain & LangGraph
@@ -11,11 +13,14 @@ from langchain_core.messages import (
     AnyMessage,
     AIMessage,
     ToolMessage,
+    message_chunk_to_message,
 )
+from langchain_core.runnables import Runnable, RunnableConfig
 from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
 from langgraph.utils.runnable import RunnableCallable
 from langgraph.prebuilt import ToolNode
+from langgraph.types import Command
 
 
 from app.api.schemas.company_profile import CompanyProfileSchema
@@ -24,12 +29,22 @@ from app.api.schemas.bot_agent import BotAgentRead
 # Agent components
 from .agent_state import AgentState, TriggerEventType
 from .system_prompts import generate_system_message
+from .streaming import (
+    SentenceChunker,
+    REPLY_CHUNK_CALLBACK_CONFIG_KEY,
+    REPLY_CHUNK_MIN_CHARS_CONFIG_KEY,
+    DEFAULT_REPLY_CHUNK_MIN_CHARS,
+    STREAMED_REPLY_FLAG,
+)
 
 # hooks
 from .agent_hooks import (
     intelligent_stage_analyzer_hook,
     auto_follow_up_scheduler_hook,
     validation_compliance_check_hook,
+    VALIDATION_TOOL_NAME,
+    should_run_concurrent_stage_analysis,
+    run_concurrent_stage_analysis,
 )
 
 # Tools
@@ -149,6 +164,186 @@ def tools_outuput_condition_router(
         return "chatbot"
 
 
+def _make_chatbot_node(model_runnable: Runnable) -> Callable:
+    """
+    Builds the async `chatbot` node.
+
+    The model is called with `ainvoke`, so no executor thread is held while the
+    LLM is generating and the call is cancelled together with the graph run.
+    When a reply chunk callback is present in `config["configurable"]` and the
+    turn is not a user message, the reply is produced with `astream` instead
+    and complete sentences are handed to the callback as soon as they are
+    available. Replies to user messages are never token-streamed (see below).
+
+    In concurrent stage-analysis mode the stage analysis runs alongside the
+    model call and its updates are merged into the node output.
+
+    Args:
+        model_runnable: The prompt | model-with-tools runnable.
+
+    Returns:
+        The async node function.
+    """
+
+    async def _call_model(state: AgentState, config: RunnableConfig) -> BaseMessage:
+        configurable = (config or {}).get("configurable", {})
+        on_chunk = configurable.get(REPLY_CHUNK_CALLBACK_CONFIG_KEY)
+
+        # Replies to user messages still go through validation_compliance_check,
+        # which may retract them, so their text cannot leave before it is
+        # complete and validated; the validation node only splits it into
+        # chunks afterwards. Only replies that go straight to the customer
+        # (follow-ups, integration triggers) are streamed from the model.
+        if (
+            on_chunk is None
+            or _get_state_value(state, "trigger_event") == "user_message"
+        ):
+            return await model_runnable.ainvoke(state, config)
+
+        chunker = SentenceChunker(
+            min_chars=configurable.get(
+                REPLY_CHUNK_MIN_CHARS_CONFIG_KEY, DEFAULT_REPLY_CHUNK_MIN_CHARS
+            )
+        )
+        accumulated = None
+        has_tool_calls = False
+        dispatched = False
+
+        async for chunk in model_runnable.astream(state, config):
+            accumulated = chunk if accumulated is None else accumulated + chunk
+            if getattr(chunk, "tool_call_chunks", None):
+                has_tool_calls = True
+            if has_tool_calls or not isinstance(chunk.content, str):
+                continue
+            for piece in chunker.feed(chunk.content):
+                await on_chunk(str(accumulated.id), piece)
+                dispatched = True
+
+        if accumulated is None:
+            return await model_runnable.ainvoke(state, config)
+
+        # Once part of the text went out, the rest must follow even if the
+        # model also decided to call a tool.
+        if dispatched or not has_tool_calls:
+            tail = chunker.flush()
+            if tail:
+                await on_chunk(str(accumulated.id), tail)
+                dispatched = True
+
+        response = message_chunk_to_message(accumulated)
+        if dispatched:
+            response.additional_kwargs[STREAMED_REPLY_FLAG] = True
+        return response
+
+    async def _timed_call_model(
+        state: AgentState, config: RunnableConfig
+    ) -> Tuple[BaseMessage, float]:
+        started_at = time.perf_counter()
+        response = await _call_model(state, config)
+        return response, (time.perf_counter() - started_at) * 1000
+
+    async def chatbot(state: AgentState, config: RunnableConfig) -> dict:
+        if not should_run_concurrent_stage_analysis(state, config):
+            response, elapsed_ms = await _timed_call_model(state, config)
+            return {
+                "messages": response,
+                "turn_timings": {"chatbot_ms": elapsed_ms, "chatbot_calls": 1.0},
+            }
+
+        (response, elapsed_ms), stage_updates = await asyncio.gather(
+            _timed_call_model(state, config),
+            run_concurrent_stage_analysis(state, config),
+        )
+        stage_timings = stage_updates.pop("turn_timings", {})
+        return {
+            **stage_updates,
+            "messages": [*stage_updates.get("messages", []), response],
+            "turn_timings": {
+                **stage_timings,
+                "chatbot_ms": elapsed_ms,
+                "chatbot_calls": 1.0,
+            },
+        }
+
+    return chatbot
+
+
+def _make_validation_node(hook: Callable) -> Callable:
+    """
+    Builds the async `validation_compliance_check` node around `hook`.
+
+    When the last AIMessage passed validation and a reply chunk callback is
+    present in `config["configurable"]`, the validated text is handed to the
+    callback sentence by sentence right away, instead of waiting for the rest
+    of the graph run, and the message is flagged as already dispatched.
+
+    This is post-validation chunking, not streaming: the reply is complete
+    when it gets here, so the time to the first message is not shortened
+    beyond skipping the rest of the run; the reply is only split into several
+    WhatsApp messages.
+
+    Args:
+        hook: The validation compliance check hook.
+
+    Returns:
+        The async node function.
+    """
+
+    async def validation_compliance_check(
+        state: AgentState, config: RunnableConfig
+    ) -> Any:
+        result = await hook(state)
+
+        configurable = (config or {}).get("configurable", {})
+        on_chunk = configurable.get(REPLY_CHUNK_CALLBACK_CONFIG_KEY)
+        messages = _get_state_value(state, "messages") or []
+        if on_chunk is None or len(messages) < 2:
+            return result
+
+        # Same check the hook uses to accept a reply.
+        reply, validator_message = messages[-1], messages[-2]
+        if not (
+            isinstance(reply, AIMessage)
+            and not reply.tool_calls
+            and isinstance(validator_message, ToolMessage)
+            and validator_message.name == VALIDATION_TOOL_NAME
+            and isinstance(reply.content, str)
+            and reply.id
+        ):
+            return result
+
+        chunker = SentenceChunker(
+            min_chars=configurable.get(
+                REPLY_CHUNK_MIN_CHARS_CONFIG_KEY, DEFAULT_REPLY_CHUNK_MIN_CHARS
+            )
+        )
+        pieces = chunker.feed(reply.content)
+        tail = chunker.flush()
+        if tail:
+            pieces.append(tail)
+        for piece in pieces:
+            await on_chunk(str(reply.id), piece)
+        if not pieces:
+            return result
+
+        # Replaces the message (same id) so the worker doesn't send it again.
+        streamed_reply = reply.model_copy(
+            update={
+                "additional_kwargs": {
+                    **reply.additional_kwargs,
+                    STREAMED_REPLY_FLAG: True,
+                }
+            }
+        )
+        if isinstance(result, Command):
+            update = dict(result.update or {})
+            update["messages"] = [*update.get("messages", []), streamed_reply]
+            return Command(update=update, goto=result.goto)
+        return {"messages": [streamed_reply]}
+
+    return validation_compliance_check
+
+
 def create_react_sales_agent_graph(
     company_profile: CompanyProfileSchema,
     model: BaseChatModel,
@@ -194,13 +389,11 @@ def create_react_sales_agent_graph(
     )
     graph_builder.add_node("auto_follow_up_scheduler", auto_follow_up_scheduler_hook)
     graph_builder.add_node(
-        "validation_compliance_check", validation_compliance_check_hook
+        "validation_compliance_check",
+        _make_validation_node(validation_compliance_check_hook),
     )
     graph_builder.add_node("tools", ToolNode(all_tools))
-    graph_builder.add_node(
-        "chatbot",
-        lambda state: {"messages": model_runnable.invoke(state)},
-    )
+    graph_builder.add_node("chatbot", _make_chatbot_node(model_runnable))
 
     graph_builder.set_entry_point("intelligent_stage_analyzer")
     graph_builder.add_edge("intelligent_stage_analyzer", "chatbot")
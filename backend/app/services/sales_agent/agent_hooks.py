@@ -1,5 +1,5 @@
 # app/services/sales_agent/agent_hooks.py
-from typing import Dict, Any, List, Optional, get_args
+from typing import Dict, Any, List, Optional, Tuple, get_args
 import time
 from datetime import timedelta
 import random
@@ -27,227 +27,275 @@ from .agent_state import (
     PendingFollowUpTrigger,
 )
 from .schemas import StageAnalysisOutput
+from .follow_up_index import FollowUpIndex, FOLLOW_UP_INDEX_CONFIG_KEY
 
 STATE_CONTEXT_MESSAGE_ID = (
     "stage_context_message_v1"  # Unique ID for our system message
 )
 
+# Keys read from config["configurable"] to tune the stage analyzer.
+STAGE_ANALYZER_LLM_CONFIG_KEY = "stage_analyzer_llm"  # "primary" | "fast"
+STAGE_ANALYZER_HEURISTIC_SKIP_CONFIG_KEY = "stage_analyzer_heuristic_skip"
+STAGE_ANALYZER_CONCURRENT_CONFIG_KEY = "stage_analyzer_concurrent"
+
+# Heuristic skip: short messages without any of these words rarely move the
+# conversation to another stage, so the previous analysis is reused.
+STAGE_ANALYSIS_SKIP_MAX_CHARS = 80
+STAGE_SHIFT_KEYWORDS = (
+    "preço",
+    "preco",
+    "valor",
+    "quanto",
+    "custa",
+    "caro",
+    "desconto",
+    "comprar",
+    "pagar",
+    "pagamento",
+    "pix",
+    "cartão",
+    "link",
+    "carrinho",
+    "agendar",
+    "agenda",
+    "marcar",
+    "remarcar",
+    "cancelar",
+    "horário",
+    "horario",
+    "reunião",
+    "não quero",
+    "nao quero",
+    "desistir",
+    "fechado",
+)
+# Stages where the next customer message should always be re-analyzed.
+STAGES_ALWAYS_ANALYZED = (
+    "initial_contact",
+    "follow_up_scheduled",
+    "follow_up_pending",
+    "follow_up_in_progress",
+)
 
-async def intelligent_stage_analyzer_hook(
-    state: AgentState, config: Dict[str, Any]
-) -> Optional[Dict[str, Any]]:
-    """Analyzes conversation to determine and update sales stage before main LLM call.
 
-    This pre-model hook is executed before the main agent LLM makes its decision
-    for the turn. It performs the following steps:
-    1.  Checks if the last message is a HumanMessage (i.e., new user input).
-        If not, it skips analysis to avoid redundant processing on agent's internal
-        turns or tool responses.
-    2.  Retrieves a 'primary' LLM instance from the provided `config`.
-    3.  If the LLM is available, it analyzes the last few messages of the conversation
-        and the current sales stage from the input `state`.
-    4.  It prompts the analysis LLM to determine the most appropriate current sales
-        stage, provide reasoning, and suggest a strategic focus for the main agent.
-    5.  If the analysis LLM determines a new sales stage different from the one in
-        the input `state`, this hook updates `current_sales_stage` in the `state_updates`.
-    6.  It then constructs a `SystemMessage` containing the (potentially updated)
-        sales stage, the reasoning from the analysis, and the suggested focus.
-    7.  This `SystemMessage` is prepended to the list of messages that will be
-        sent to the main agent LLM for the current turn (using the `messages` key).
-        It also ensures any previous context message from this hook is removed.
+def _get_stage_analyzer_llm(config: Dict[str, Any]) -> Optional[BaseChatModel]:
+    configurable = config.get("configurable", {})
+    if configurable.get(STAGE_ANALYZER_LLM_CONFIG_KEY) == "fast":
+        return configurable.get("llm_fast_instance") or configurable.get(
+            "llm_primary_instance"
+        )
+    return configurable.get("llm_primary_instance")
 
-    If the analysis LLM is not available or an error occurs during analysis,
-    it falls back to using the `current_sales_stage` from the input `state` and
-    provides a default context message.
 
-    Args:
-        state: The current state of the conversation (AgentState object).
-        config: The runnable config dictionary, expected to contain
-                `configurable.llm_primary_instance` for the analysis LLM.
+def _get_stage_context_message(
+    messages: List[BaseMessage],
+) -> Optional[BaseMessage]:
+    return next(
+        (m for m in messages if getattr(m, "id", None) == STATE_CONTEXT_MESSAGE_ID),
+        None,
+    )
 
-    Returns:
-        A dictionary containing updates to be applied to the agent's state.
-        This will include 'messages' for the main LLM and potentially
-        'current_sales_stage' if it was changed by the analysis.
-        Returns None or minimal updates if analysis is skipped.
+
+def _is_stage_analysis_skippable(
+    state: AgentState, config: Dict[str, Any], messages: List[BaseMessage]
+) -> bool:
     """
-    logger.info("--- Executing pre_model_hook: intelligent_stage_analyzer_hook ---")
+    Cheap check telling whether the previous stage analysis is still valid.
 
-    state_updates: Dict[str, Any] = {}
-    current_messages: List[BaseMessage] = state.messages[:]  # Work with a copy
-    profile = state.company_profile
+    Only applies when enabled in config, a previous analysis exists in the
+    history, the stage is not one that always needs re-analysis, and the new
+    customer message is short and has no stage-shifting keyword.
+    """
+    if not config.get("configurable", {}).get(
+        STAGE_ANALYZER_HEURISTIC_SKIP_CONFIG_KEY
+    ):
+        return False
+    if not messages or not isinstance(messages[-1], HumanMessage):
+        return False
+    if _get_stage_context_message(messages) is None:
+        return False
+    if state.current_sales_stage in STAGES_ALWAYS_ANALYZED:
+        return False
+
+    user_text = str(messages[-1].content).strip().lower()
+    if len(user_text) > STAGE_ANALYSIS_SKIP_MAX_CHARS:
+        return False
+    return not any(keyword in user_text for keyword in STAGE_SHIFT_KEYWORDS)
+
+
+def should_run_concurrent_stage_analysis(
+    state: AgentState, config: Dict[str, Any]
+) -> bool:
+    """
+    Tells the chatbot node whether it must run the stage analysis alongside
+    its own model call for this turn.
 
-    # first_message = current_messages[0] if current_messages else None
-    # if first_message and first_message.id == STATE_CONTEXT_MESSAGE_ID:
-    #     messages_to_add = current_messages[1:]
-    # else:
-    #     messages_to_add = current_messages
-
-    # stage_context_message = SystemMessage(content="", id=STATE_CONTEXT_MESSAGE_ID)
-    # state_updates["messages"] = [
-    #     RemoveMessage(id=REMOVE_ALL_MESSAGES),
-    #     stage_context_message,
-    #     *messages_to_add,
-    # ]
-    # return state_updates
-    # Only run analysis if the last message is from a human (new input)
-    if not current_messages or not isinstance(current_messages[-1], HumanMessage):
-        logger.debug("No new human message, or history empty. Skipping stage analysis.")
-        state_updates["messages"] = []
-        return state_updates
+    Args:
+        state: The current agent state.
+        config: The runnable config dictionary.
 
-    stage_analyzer_llm: Optional[BaseChatModel] = config.get("configurable", {}).get(
-        "llm_primary_instance"
-    )
+    Returns:
+        True when concurrent analysis is enabled and the chatbot is answering a
+        new customer message that the heuristic did not skip.
+    """
+    if not config.get("configurable", {}).get(STAGE_ANALYZER_CONCURRENT_CONFIG_KEY):
+        return False
+    messages = state.messages
+    if not messages or not isinstance(messages[-1], HumanMessage):
+        return False
+    return not _is_stage_analysis_skippable(state, config, messages)
+
+
+async def _analyze_sales_stage(
+    state: AgentState,
+    stage_analyzer_llm: Optional[BaseChatModel],
+    messages: List[BaseMessage],
+) -> Tuple[SalesStageLiteral, str, str]:
+    """
+    Runs the structured-output stage analysis on the recent messages.
 
-    # Remove previous stage context message if it exists, to avoid duplication
-    # This uses the message ID we assign.
-    messages_for_llm_input = [
-        msg
-        for msg in current_messages
-        if getattr(msg, "id", None) != STATE_CONTEXT_MESSAGE_ID
-    ]
+    Args:
+        state: The current agent state.
+        stage_analyzer_llm: The LLM used for the analysis (primary or fast).
+        messages: The conversation history, without the stage context message.
+
+    Returns:
+        A tuple of (analyzed stage, reasoning, suggested focus). Falls back to
+        the current stage when the LLM is missing or the call fails.
+    """
+    original_sales_stage = state.current_sales_stage
+    profile = state.company_profile
 
     if not stage_analyzer_llm:
         logger.warning(
             "Stage analyzer LLM not found in config. Using existing stage for context."
         )
-        current_sales_stage = state.current_sales_stage
-        analysis_reasoning = (
-            "Análise de estágio não disponível (LLM de análise ausente)."
-        )
-        suggested_focus = "Proceda com base no estágio atual e no bom senso."
-    else:
-        original_sales_stage = state.current_sales_stage
-
-        recent_messages_for_analysis = messages_for_llm_input[-5:]
-
-        available_stages_str = ", ".join(get_args(SalesStageLiteral))
-
-        analysis_prompt_template = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    """
-                    # PERSONA: Analista de Vendas Sênior
-
-                    Você é um especialista em psicologia de vendas e análise de conversas. Sua função é atuar como um "anjo da guarda" para o agente de vendas principal, fornecendo insights estratégicos antes de cada resposta.
-                    
-                    Lembre-se é importante que o agente se conecte com o cliente, de modo a ter uma conversa natural e fluida, como se estivesse conversando com um amigo, ou seja, saber com quem o cliente está falando é importante, seu nome.
-                    
-                    Comunique-se em pt-BR.
-                    ---
-                    # CONTEXTO DA EMPRESA
-                    - **Descrição do Negócio:** {business_description}
-                    - **Público-Alvo:** {target_audience}
-                    - **Foco Estratégico de Vendas:** {sales_focus}
-                    - **Diretrizes de Comunicação:**
-                    {communication_guidelines}
-
-                    ---
-                    # SUA MISSÃO
-                    Com base no histórico da conversa e no contexto da empresa, você deve realizar 3 tarefas e retornar a resposta em formato JSON:
-
-                    1.  **`determined_sales_stage`**: Analise a conversa e determine o estágio de vendas mais apropriado.
-                        - Estágios Disponíveis: {available_stages_str}
-                        - Estágio Atual Conhecido: {original_sales_stage}
-
-                    2.  **`reasoning`**: Forneça uma justificativa curta e objetiva para sua escolha de estágio.
-
-                    3.  **`suggested_next_focus`**: Crie uma sugestão estratégica e acionável para o agente de vendas.
-                        - **REGRA 1**: A sugestão deve SEMPRE incentivar o engajamento, geralmente terminando com uma pergunta ou um convite à ação.
-                        - **REGRA 2**: Avalie criticamente se é hora de falar de preço. Se o cliente não estiver qualificado, instrua o agente a focar em qualificação primeiro.
-                        - **REGRA 3**: A sugestão deve ser concisa e alinhada com o "Foco Estratégico de Vendas".
-
-                    ---
-                    # EXEMPLO DE UMA BOA ANÁLISE
-
-                    **Conversa:**
-                    HUMAN: Oi, vi o anúncio de vocês. Quanto custa?
-
-                    **Sua Análise JSON:**
-                    {{
-                    "determined_sales_stage": "discovery",
-                    "reasoning": "O cliente está no primeiro contato e foi direto ao preço, indicando que ainda não entende o valor da solução. É cedo demais para o checkout.",
-                    "suggested_next_focus": "Agradeça o interesse, mas evite dar o preço imediatamente. Conecte-se com o cliente primeiro, perguntando o que no anúncio mais chamou sua atenção para entender a necessidade dele."
-                    }}
-
-                    ---
-                    # ANÁLISE REQUERIDA
-
-                    Analise a conversa recente abaixo e forneça sua análise no formato JSON.
-
-                    **Conversa Recente:**
-                    {recent_messages_formatted}
-                    """,
-                ),
-            ]
-        )
-
-        formatted_recent_messages = "\n".join(
-            [
-                f"{msg.type.upper()}: {msg.content}"
-                for msg in recent_messages_for_analysis
-            ]
+        return (
+            original_sales_stage,
+            "Análise de estágio não disponível (LLM de análise ausente).",
+            "Proceda com base no estágio atual e no bom senso.",
         )
 
-        structured_analyzer_llm = stage_analyzer_llm.with_structured_output(
-            StageAnalysisOutput
-        )
-        analysis_chain = analysis_prompt_template | structured_analyzer_llm
+    recent_messages_for_analysis = messages[-5:]
+
+    available_stages_str = ", ".join(get_args(SalesStageLiteral))
+
+    analysis_prompt_template = ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                """
+                # PERSONA: Analista de Vendas Sênior
+
+                Você é um especialista em psicologia de vendas e análise de conversas. Sua função é atuar como um "anjo da guarda" para o agente de vendas principal, fornecendo insights estratégicos antes de cada resposta.
+                
+                Lembre-se é importante que o agente se conecte com o cliente, de modo a ter uma conversa natural e fluida, como se estivesse conversando com um amigo, ou seja, saber com quem o cliente está falando é importante, seu nome.
+                
+                Comunique-se em pt-BR.
+                ---
+                # CONTEXTO DA EMPRESA
+                - **Descrição do Negócio:** {business_description}
+                - **Público-Alvo:** {target_audience}
+                - **Foco Estratégico de Vendas:** {sales_focus}
+                - **Diretrizes de Comunicação:**
+                {communication_guidelines}
+
+                ---
+                # SUA MISSÃO
+                Com base no histórico da conversa e no contexto da empresa, você deve realizar 3 tarefas e retornar a resposta em formato JSON:
+
+                1.  **`determined_sales_stage`**: Analise a conversa e determine o estágio de vendas mais apropriado.
+                    - Estágios Disponíveis: {available_stages_str}
+                    - Estágio Atual Conhecido: {original_sales_stage}
+
+                2.  **`reasoning`**: Forneça uma justificativa curta e objetiva para sua escolha de estágio.
+
+                3.  **`suggested_next_focus`**: Crie uma sugestão estratégica e acionável para o agente de vendas.
+                    - **REGRA 1**: A sugestão deve SEMPRE incentivar o engajamento, geralmente terminando com uma pergunta ou um convite à ação.
+                    - **REGRA 2**: Avalie criticamente se é hora de falar de preço. Se o cliente não estiver qualificado, instrua o agente a focar em qualificação primeiro.
+                    - **REGRA 3**: A sugestão deve ser concisa e alinhada com o "Foco Estratégico de Vendas".
+
+                ---
+                # EXEMPLO DE UMA BOA ANÁLISE
+
+                **Conversa:**
+                HUMAN: Oi, vi o anúncio de vocês. Quanto custa?
+
+                **Sua Análise JSON:**
+                {{
+                "determined_sales_stage": "discovery",
+                "reasoning": "O cliente está no primeiro contato e foi direto ao preço, indicando que ainda não entende o valor da solução. É cedo demais para o checkout.",
+                "suggested_next_focus": "Agradeça o interesse, mas evite dar o preço imediatamente. Conecte-se com o cliente primeiro, perguntando o que no anúncio mais chamou sua atenção para entender a necessidade dele."
+                }}
+
+                ---
+                # ANÁLISE REQUERIDA
+
+                Analise a conversa recente abaixo e forneça sua análise no formato JSON.
+
+                **Conversa Recente:**
+                {recent_messages_formatted}
+                """,
+            ),
+        ]
+    )
 
-        logger.debug(
-            f"Invoking the LLM Sales Stage Analyst. Initial stage: {original_sales_stage}"
-        )
-        try:
-            analysis_result: StageAnalysisOutput = await analysis_chain.ainvoke(
-                {
-                    "business_description": profile.business_description,
-                    "target_audience": profile.target_audience or "Não especificado",
-                    "sales_focus": profile.sales_focus
-                    or "Focar em resolver o problema do cliente.",
-                    "communication_guidelines": (
-                        "\n".join([f"- {g}" for g in profile.communication_guidelines])
-                        if profile.communication_guidelines
-                        else "Nenhuma diretriz específica."
-                    ),
-                    "recent_messages_formatted": formatted_recent_messages,
-                    "original_sales_stage": original_sales_stage,
-                    "available_stages_str": available_stages_str,
-                }
-            )
+    formatted_recent_messages = "\n".join(
+        [f"{msg.type.upper()}: {msg.content}" for msg in recent_messages_for_analysis]
+    )
 
-            analyzed_sales_stage = analysis_result.determined_sales_stage
-            analysis_reasoning = analysis_result.reasoning
-            suggested_focus = analysis_result.suggested_next_focus
-            logger.info(
-                f"Analisador de estágio determinou: {analyzed_sales_stage}. "
-                f"Razão: {analysis_reasoning}. "
-                f"Foco Sugerido: {suggested_focus}"
-            )
-        except Exception as e:
-            logger.error(
-                f"Erro durante chamada ao LLM de análise de estágio: {e}. Usando estágio original."
-            )
-            analyzed_sales_stage = original_sales_stage
-            analysis_reasoning = "Análise falhou, usando estágio anterior."
-            suggested_focus = "Análise falhou, confie em seu julgamento."
+    structured_analyzer_llm = stage_analyzer_llm.with_structured_output(
+        StageAnalysisOutput
+    )
+    analysis_chain = analysis_prompt_template | structured_analyzer_llm
 
-    final_stage_for_turn = analyzed_sales_stage
-    if original_sales_stage != analyzed_sales_stage:
-        logger.info(
-            f"Estágio de vendas atualizado pelo pre-model hook: de '{original_sales_stage}' para '{analyzed_sales_stage}'."
+    logger.debug(
+        f"Invoking the LLM Sales Stage Analyst. Initial stage: {original_sales_stage}"
+    )
+    try:
+        analysis_result: StageAnalysisOutput = await analysis_chain.ainvoke(
+            {
+                "business_description": profile.business_description,
+                "target_audience": profile.target_audience or "Não especificado",
+                "sales_focus": profile.sales_focus
+                or "Focar em resolver o problema do cliente.",
+                "communication_guidelines": (
+                    "\n".join([f"- {g}" for g in profile.communication_guidelines])
+                    if profile.communication_guidelines
+                    else "Nenhuma diretriz específica."
+                ),
+                "recent_messages_formatted": formatted_recent_messages,
+                "original_sales_stage": original_sales_stage,
+                "available_stages_str": available_stages_str,
+            }
         )
-        state_updates["current_sales_stage"] = analyzed_sales_stage
-    else:
-        logger.info(
-            f"Sales stage '{original_sales_stage}' confirmed by pre-model hook analysis."
+    except Exception as e:
+        logger.error(
+            f"Erro durante chamada ao LLM de análise de estágio: {e}. Usando estágio original."
+        )
+        return (
+            original_sales_stage,
+            "Análise falhou, usando estágio anterior.",
+            "Análise falhou, confie em seu julgamento.",
         )
 
-    num_samples = 100
-    list_of_message_templates: List[Dict[str, str]] = MESSAGE_TEMPLATES.get(
-        analyzed_sales_stage
+    logger.info(
+        f"Analisador de estágio determinou: {analysis_result.determined_sales_stage}. "
+        f"Razão: {analysis_result.reasoning}. "
+        f"Foco Sugerido: {analysis_result.suggested_next_focus}"
+    )
+    return (
+        analysis_result.determined_sales_stage,
+        analysis_result.reasoning,
+        analysis_result.suggested_next_focus,
     )
+
+
+def _build_stage_context_message(
+    stage: SalesStageLiteral, analysis_reasoning: str, suggested_focus: str
+) -> SystemMessage:
+    num_samples = 100
+    list_of_message_templates: List[Dict[str, str]] = MESSAGE_TEMPLATES.get(stage)
     inspiration_list_str: str = ""
 
     if list_of_message_templates:
@@ -274,15 +322,168 @@ async def intelligent_stage_analyzer_hook(
 
         inspiration_list_str = "\n".join(templates_bullet_points)
 
-    stage_context_message = SystemMessage(
+    return SystemMessage(
         content=f"Adição ao Contexto do Sistema:\n"
-        f"- Estágio de Vendas Atual: '{final_stage_for_turn}' (Análise: {analysis_reasoning})\n"
+        f"- Estágio de Vendas Atual: '{stage}' (Análise: {analysis_reasoning})\n"
         f"- Foco Sugerido para Próximo Passo: {suggested_focus}\n"
         f"- INSPIRATION (Use estas frases como base, adaptando-as ao contexto da empresa e da conversa):\n {inspiration_list_str}\n"
         f"Ajuste sua resposta e ações de acordo.",
         id=STATE_CONTEXT_MESSAGE_ID,  # Assign an ID to this message
     )
 
+
+def _stage_updates_from_analysis(
+    original_sales_stage: SalesStageLiteral, analyzed_sales_stage: SalesStageLiteral
+) -> Dict[str, Any]:
+    if original_sales_stage != analyzed_sales_stage:
+        logger.info(
+            f"Estágio de vendas atualizado pelo analisador: de '{original_sales_stage}' para '{analyzed_sales_stage}'."
+        )
+        return {"current_sales_stage": analyzed_sales_stage}
+    logger.info(
+        f"Sales stage '{original_sales_stage}' confirmed by stage analysis."
+    )
+    return {}
+
+
+async def run_concurrent_stage_analysis(
+    state: AgentState, config: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Stage analysis used by the chatbot node in concurrent mode.
+
+    The returned stage context message keeps STATE_CONTEXT_MESSAGE_ID, so
+    `add_messages` replaces the placeholder in place and any further chatbot
+    call in the same turn (e.g. after tools) already sees the fresh analysis.
+
+    Args:
+        state: The agent state the chatbot node received.
+        config: The runnable config dictionary.
+
+    Returns:
+        State updates with the refreshed context message, the stage change (if
+        any) and the analysis timing.
+    """
+    messages_for_analysis = [
+        msg
+        for msg in state.messages
+        if getattr(msg, "id", None) != STATE_CONTEXT_MESSAGE_ID
+    ]
+    started_at = time.perf_counter()
+    analyzed_sales_stage, analysis_reasoning, suggested_focus = (
+        await _analyze_sales_stage(
+            state, _get_stage_analyzer_llm(config), messages_for_analysis
+        )
+    )
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+    state_updates = _stage_updates_from_analysis(
+        state.current_sales_stage, analyzed_sales_stage
+    )
+    state_updates["messages"] = [
+        _build_stage_context_message(
+            analyzed_sales_stage, analysis_reasoning, suggested_focus
+        )
+    ]
+    state_updates["turn_timings"] = {"stage_analysis_ms": elapsed_ms}
+    return state_updates
+
+
+async def intelligent_stage_analyzer_hook(
+    state: AgentState, config: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Analyzes conversation to determine and update sales stage before main LLM call.
+
+    This pre-model hook is executed before the main agent LLM makes its decision
+    for the turn. It performs the following steps:
+    1.  Checks if the last message is a HumanMessage (i.e., new user input).
+        If not, it skips analysis to avoid redundant processing on agent's internal
+        turns or tool responses.
+    2.  Picks the analysis LLM from the provided `config`: `llm_primary_instance`
+        by default, or `llm_fast_instance` when `stage_analyzer_llm` is "fast".
+    3.  If `stage_analyzer_heuristic_skip` is enabled and the new message is
+        short and has no stage-shifting keyword, the previous analysis is kept
+        and no LLM call is made.
+    4.  If `stage_analyzer_concurrent` is enabled, the analysis is left to the
+        chatbot node, which runs it alongside its own model call; here only the
+        existing (or a placeholder) context message is kept in place.
+    5.  Otherwise it prompts the analysis LLM to determine the most appropriate
+        current sales stage, provide reasoning, and suggest a strategic focus for
+        the main agent, updating `current_sales_stage` if it changed.
+    6.  It then constructs a `SystemMessage` containing the (potentially updated)
+        sales stage, the reasoning from the analysis, and the suggested focus.
+    7.  This `SystemMessage` is prepended to the list of messages that will be
+        sent to the main agent LLM for the current turn (using the `messages` key).
+        It also ensures any previous context message from this hook is removed.
+
+    The time spent is reported in `turn_timings["stage_analysis_ms"]`.
+
+    Args:
+        state: The current state of the conversation (AgentState object).
+        config: The runnable config dictionary, expected to contain
+                `configurable.llm_primary_instance` for the analysis LLM.
+
+    Returns:
+        A dictionary containing updates to be applied to the agent's state.
+        This will include 'messages' for the main LLM and potentially
+        'current_sales_stage' if it was changed by the analysis.
+        Returns None or minimal updates if analysis is skipped.
+    """
+    logger.info("--- Executing pre_model_hook: intelligent_stage_analyzer_hook ---")
+
+    state_updates: Dict[str, Any] = {}
+    current_messages: List[BaseMessage] = state.messages[:]  # Work with a copy
+
+    # Only run analysis if the last message is from a human (new input)
+    if not current_messages or not isinstance(current_messages[-1], HumanMessage):
+        logger.debug("No new human message, or history empty. Skipping stage analysis.")
+        state_updates["messages"] = []
+        return state_updates
+
+    configurable = config.get("configurable", {})
+    previous_context_message = _get_stage_context_message(current_messages)
+    started_at = time.perf_counter()
+
+    if _is_stage_analysis_skippable(state, config, current_messages):
+        logger.info(
+            f"Stage analysis skipped by heuristic. Keeping stage '{state.current_sales_stage}'."
+        )
+        stage_context_message = previous_context_message
+        state_updates["turn_timings"] = {"stage_analysis_skipped": 1.0}
+    elif configurable.get(STAGE_ANALYZER_CONCURRENT_CONFIG_KEY):
+        logger.debug("Stage analysis deferred to run concurrently with the chatbot.")
+        stage_context_message = previous_context_message or (
+            _build_stage_context_message(
+                state.current_sales_stage,
+                "Análise de estágio em andamento.",
+                "Proceda com base no estágio atual e no bom senso.",
+            )
+        )
+    else:
+        # Remove previous stage context message if it exists, to avoid duplication
+        # This uses the message ID we assign.
+        messages_for_llm_input = [
+            msg
+            for msg in current_messages
+            if getattr(msg, "id", None) != STATE_CONTEXT_MESSAGE_ID
+        ]
+        analyzed_sales_stage, analysis_reasoning, suggested_focus = (
+            await _analyze_sales_stage(
+                state, _get_stage_analyzer_llm(config), messages_for_llm_input
+            )
+        )
+        state_updates.update(
+            _stage_updates_from_analysis(
+                state.current_sales_stage, analyzed_sales_stage
+            )
+        )
+        stage_context_message = _build_stage_context_message(
+            analyzed_sales_stage, analysis_reasoning, suggested_focus
+        )
+        state_updates["turn_timings"] = {
+            "stage_analysis_ms": (time.perf_counter() - started_at) * 1000
+        }
+
     # Prepend the new context message to the (potentially filtered) message history
     first_message = current_messages[0] if current_messages else None
     if first_message and first_message.id == STATE_CONTEXT_MESSAGE_ID:
@@ -303,7 +504,62 @@ async def intelligent_stage_analyzer_hook(
 async def auto_follow_up_scheduler_hook(
     state: AgentState, config: Dict[str, Any]
 ) -> Optional[Dict[str, Any]]:
-    """Schedules or re-schedules follow-ups automatically after an agent turn.
+    """Schedules follow-ups after an agent turn and mirrors them to the index.
+
+    The scheduling rules live in `_plan_auto_follow_up`. When a FollowUpIndex
+    is passed in config["configurable"], the resulting trigger, attempt count
+    and agent message timestamp are written to it so the follow-up task can
+    validate a job without loading the checkpoint.
+
+    Args:
+        state: The current state of the conversation after the agent's turn.
+        config: The runnable config dictionary.
+
+    Returns:
+        The state updates produced by `_plan_auto_follow_up`.
+    """
+    state_updates = await _plan_auto_follow_up(state, config)
+
+    follow_up_index: Optional[FollowUpIndex] = config.get("configurable", {}).get(
+        FOLLOW_UP_INDEX_CONFIG_KEY
+    )
+    if follow_up_index is not None:
+        await _sync_follow_up_index(follow_up_index, state, state_updates or {})
+
+    return state_updates
+
+
+async def _sync_follow_up_index(
+    follow_up_index: FollowUpIndex, state: AgentState, state_updates: Dict[str, Any]
+) -> None:
+    """Writes the follow-up fields the turn ends with to the index."""
+    pending_raw = state_updates.get(
+        "pending_follow_up_trigger", state.pending_follow_up_trigger
+    )
+    try:
+        pending_trigger = (
+            PendingFollowUpTrigger.model_validate(pending_raw) if pending_raw else None
+        )
+        await follow_up_index.record_agent_turn(
+            state.conversation_id,
+            pending_trigger=pending_trigger,
+            attempt_count=state_updates.get(
+                "follow_up_attempt_count", state.follow_up_attempt_count or 0
+            ),
+            last_agent_message_ts=state_updates.get(
+                "last_agent_message_timestamp", state.last_agent_message_timestamp
+            ),
+        )
+    except Exception as e:
+        # The checkpoint stays the source of truth; the follow-up task falls
+        # back to it when the index has no entry.
+        logger.warning(f"Auto-Follow-Up Hook: Failed to update follow-up index: {e}")
+
+
+async def _plan_auto_follow_up(
+    state: AgentState, config: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Decides which follow-up, if any, should be pending after an agent turn.
 
     This post-model hook is executed after the main agent LLM and any tools
     have completed their actions for the current turn. Its primary responsibilities are:
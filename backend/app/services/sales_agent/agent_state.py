@@ -7,6 +7,23 @@ from langchain_core.messages import BaseMessage
 
 from app.api.schemas.company_profile import CompanyProfileSchema
 from app.api.schemas.bot_agent import BotAgentRead
+from .context_cache import resolve_company_profile, resolve_agent_config
+
+def merge_turn_timings(
+    left: Optional[Dict[str, float]], right: Optional[Dict[str, float]]
+) -> Dict[str, float]:
+    """
+    Reducer for `turn_timings`: values reported under the same key are summed,
+    so repeated nodes (e.g. chatbot after tools) accumulate their time.
+    An empty update resets the timings, which is how each turn starts clean.
+    """
+    if not right:
+        return {}
+    merged = dict(left or {})
+    for key, value in right.items():
+        merged[key] = merged.get(key, 0.0) + value
+    return merged
+
 
 TriggerEventType = Literal["user_message", "follow_up_timeout", "integration_trigger"]
 
@@ -124,11 +141,14 @@ class AgentState(BaseModel):
         description="Customer Phone Number used in the converastion."
     )
 
-    company_profile: CompanyProfileSchema = Field(
-        description="The static profile of the company the sales agent is representing. Loaded at the start of the conversation."
+    # Only the version stamps are checkpointed; the profile and agent config
+    # themselves are resolved from the in-worker cache (see `company_profile`
+    # and `agent_config` below).
+    company_profile_version: str = Field(
+        description="Version stamp of the company profile used in this turn. Together with account_id it keys the cached CompanyProfileSchema."
     )
-    agent_config: BotAgentRead = Field(
-        description="Configuration settings specific to this bot agent instance (e.g., behavior parameters, specific LLM settings)."
+    agent_config_version: str = Field(
+        description="Version stamp of the bot agent config used in this turn. Together with bot_agent_id it keys the cached BotAgentRead."
     )
     trigger_event: Optional[TriggerEventType] = Field(
         None,
@@ -185,10 +205,24 @@ class AgentState(BaseModel):
     )
 
     # --- Operational & Debugging ---
+    turn_timings: Annotated[Dict[str, float], merge_turn_timings] = Field(
+        default_factory=dict,
+        description="Per-turn node timings in milliseconds (e.g. 'stage_analysis_ms', 'chatbot_ms'). Reset at the start of every turn.",
+    )
     last_processing_error: Optional[str] = Field(
         None,
         description="Stores the error message from the last failed node execution in the graph.",
     )
+    @property
+    def company_profile(self) -> CompanyProfileSchema:
+        """The static profile of the company the sales agent is representing."""
+        return resolve_company_profile(self.account_id, self.company_profile_version)
+
+    @property
+    def agent_config(self) -> BotAgentRead:
+        """Configuration settings specific to this bot agent instance."""
+        return resolve_agent_config(self.bot_agent_id, self.agent_config_version)
+
     model_config = ConfigDict(
         arbitrary_types_allowed=True,  # Important for Langchain types like BaseMessage
         validate_assignment=True,  # Re-validates fields upon assignment
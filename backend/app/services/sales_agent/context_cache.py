@@ -0,0 +1,175 @@
+# app/services/sales_agent/context_cache.py
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+from uuid import UUID
+from loguru import logger
+
+from app.api.schemas.company_profile import CompanyProfileSchema
+from app.api.schemas.bot_agent import BotAgentRead
+from app.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+PROFILE_CACHE_KIND = "company_profile"
+AGENT_CONFIG_CACHE_KIND = "agent_config"
+
+
+class AgentContextCache:
+    """
+    In-worker LRU cache for the static context of the sales agent.
+
+    Entries are keyed by (kind, owner id, version stamp), so a new version of a
+    profile or agent config never collides with the one a running turn is
+    still using; stale versions simply age out. A running turn pins the
+    entries its graph reads, so LRU eviction by other tenants' turns cannot
+    make them disappear mid-run.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max(max_entries, 1)
+        self._entries: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+        # key -> [value, number of running turns holding it]
+        self._pinned: Dict[Tuple[str, str, str], List[Any]] = {}
+
+    def get(self, kind: str, owner_id: Hashable, version: str) -> Optional[Any]:
+        key = (kind, str(owner_id), version)
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            return value
+        pinned = self._pinned.get(key)
+        return pinned[0] if pinned else None
+
+    def pin(
+        self, kind: str, owner_id: Hashable, version: str, value: Any
+    ) -> Tuple[str, str, str]:
+        """Keeps `value` resolvable until `unpin`, even if evicted from the LRU."""
+        key = (kind, str(owner_id), version)
+        pinned = self._pinned.setdefault(key, [value, 0])
+        pinned[1] += 1
+        return key
+
+    def unpin(self, key: Tuple[str, str, str]) -> None:
+        pinned = self._pinned.get(key)
+        if pinned is None:
+            return
+        pinned[1] -= 1
+        if pinned[1] <= 0:
+            del self._pinned[key]
+
+    def put(self, kind: str, owner_id: Hashable, version: str, value: Any) -> None:
+        key = (kind, str(owner_id), version)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_build(
+        self, kind: str, owner_id: Hashable, version: str, builder: Callable[[], T]
+    ) -> T:
+        value = self.get(kind, owner_id, version)
+        if value is None:
+            value = builder()
+            self.put(kind, owner_id, version, value)
+            logger.debug(
+                f"[AgentContextCache] Cached {kind} for {owner_id} (version {version})."
+            )
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._pinned.clear()
+
+
+agent_context_cache = AgentContextCache(
+    max_entries=settings.AGENT_CONTEXT_CACHE_MAX_ENTRIES
+)
+
+
+def build_version_stamp(db_object: Any) -> str:
+    """
+    Builds the version stamp of a DB-backed context object.
+
+    Uses `updated_at` (bumped on every update), combined with
+    `profile_version` when the object has one.
+
+    Args:
+        db_object: A CompanyProfile or BotAgent ORM instance.
+
+    Returns:
+        The version stamp as a string.
+    """
+    updated_at: Optional[datetime] = getattr(db_object, "updated_at", None)
+    stamp = updated_at.isoformat() if updated_at else "0"
+    schema_version = getattr(db_object, "profile_version", None)
+    return f"{schema_version}:{stamp}" if schema_version is not None else stamp
+
+
+def resolve_company_profile(
+    account_id: UUID, version: str, db_profile: Optional[Any] = None
+) -> CompanyProfileSchema:
+    """
+    Returns the CompanyProfileSchema for the given account and version.
+
+    Args:
+        account_id: The account owning the profile.
+        version: The version stamp stored in the agent state.
+        db_profile: The ORM profile, used to build the entry on a cache miss.
+
+    Returns:
+        The cached CompanyProfileSchema.
+
+    Raises:
+        LookupError: If the entry is neither cached nor pinned by a running
+            turn, and no ORM profile was given.
+    """
+    cached = agent_context_cache.get(PROFILE_CACHE_KIND, account_id, version)
+    if cached is not None:
+        return cached
+    if db_profile is None:
+        raise LookupError(
+            f"Company profile for account {account_id} (version {version}) is not cached in this worker."
+        )
+    return agent_context_cache.get_or_build(
+        PROFILE_CACHE_KIND,
+        account_id,
+        version,
+        lambda: CompanyProfileSchema.model_validate(db_profile),
+    )
+
+
+def resolve_agent_config(
+    bot_agent_id: UUID, version: str, db_bot_agent: Optional[Any] = None
+) -> BotAgentRead:
+    """
+    Returns the BotAgentRead for the given bot agent and version.
+
+    Args:
+        bot_agent_id: The bot agent id.
+        version: The version stamp stored in the agent state.
+        db_bot_agent: The ORM bot agent, used to build the entry on a cache miss.
+
+    Returns:
+        The cached BotAgentRead.
+
+    Raises:
+        LookupError: If the entry is neither cached nor pinned by a running
+            turn, and no ORM bot agent was given.
+    """
+    cached = agent_context_cache.get(AGENT_CONFIG_CACHE_KIND, bot_agent_id, version)
+    if cached is not None:
+        return cached
+    if db_bot_agent is None:
+        raise LookupError(
+            f"Agent config {bot_agent_id} (version {version}) is not cached in this worker."
+        )
+    return agent_context_cache.get_or_build(
+        AGENT_CONFIG_CACHE_KIND,
+        bot_agent_id,
+        version,
+        lambda: BotAgentRead.model_validate(db_bot_agent),
+    )
@@ -0,0 +1,162 @@
+# app/services/sales_agent/follow_up_index.py
+
+import json
+import time
+from typing import Any, Dict, Optional, Union
+from uuid import UUID
+from loguru import logger
+from pydantic import BaseModel
+from redis.asyncio import Redis
+
+from .agent_state import PendingFollowUpTrigger
+
+# Key used inside config["configurable"] to hand the index to the graph hooks.
+FOLLOW_UP_INDEX_CONFIG_KEY = "follow_up_index"
+
+FOLLOW_UP_INDEX_KEY_PREFIX = "followup:conversation:"
+# Longer than the largest follow-up delay, refreshed on every write.
+FOLLOW_UP_INDEX_TTL_SECONDS = 30 * 24 * 3600
+
+_PENDING_FIELD = "pending_trigger"
+_ATTEMPT_FIELD = "attempt_count"
+_DUE_FIELD = "due_ts"
+_LAST_AGENT_FIELD = "last_agent_message_ts"
+_LAST_USER_FIELD = "last_user_activity_ts"
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    return float(value) if value not in (None, "") else None
+
+
+class FollowUpIndexEntry(BaseModel):
+    """Follow-up fields of one conversation, mirrored from the agent state."""
+
+    pending_trigger: Optional[PendingFollowUpTrigger] = None
+    attempt_count: int = 0
+    due_ts: Optional[float] = None
+    last_agent_message_ts: Optional[float] = None
+    last_user_activity_ts: Optional[float] = None
+
+    def stale_reason(self, origin_agent_message_ts: Optional[float]) -> Optional[str]:
+        """
+        Checks whether a follow-up job scheduled at `origin_agent_message_ts`
+        should still run.
+
+        Args:
+            origin_agent_message_ts: Timestamp of the agent message that
+                scheduled the job.
+
+        Returns:
+            A short reason when the job must be discarded, or None if it is
+            still due.
+        """
+        if self.pending_trigger is None:
+            return "no pending trigger"
+        if origin_agent_message_ts is None:
+            return None
+        if (
+            self.last_user_activity_ts is not None
+            and self.last_user_activity_ts > origin_agent_message_ts
+        ):
+            return "customer replied after scheduling"
+        if (
+            self.last_agent_message_ts is not None
+            and self.last_agent_message_ts > origin_agent_message_ts
+        ):
+            return "conversation progressed after scheduling"
+        return None
+
+
+class FollowUpIndex:
+    """
+    Redis hash per conversation holding only what the follow-up task needs,
+    so checking a scheduled follow-up never loads the agent checkpoint.
+    """
+
+    def __init__(self, redis_client: Redis):
+        self.redis = redis_client
+
+    @staticmethod
+    def _key(conversation_id: Union[UUID, str]) -> str:
+        return f"{FOLLOW_UP_INDEX_KEY_PREFIX}{conversation_id}"
+
+    async def _write(
+        self, conversation_id: Union[UUID, str], mapping: Dict[str, Any]
+    ) -> None:
+        key = self._key(conversation_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, FOLLOW_UP_INDEX_TTL_SECONDS)
+            await pipe.execute()
+
+    async def record_agent_turn(
+        self,
+        conversation_id: Union[UUID, str],
+        pending_trigger: Optional[PendingFollowUpTrigger],
+        attempt_count: int,
+        last_agent_message_ts: Optional[float],
+    ) -> None:
+        """Stores the follow-up outcome of an agent turn."""
+        await self._write(
+            conversation_id,
+            {
+                _PENDING_FIELD: (
+                    pending_trigger.model_dump_json() if pending_trigger else ""
+                ),
+                _ATTEMPT_FIELD: attempt_count,
+                _DUE_FIELD: pending_trigger.due_timestamp if pending_trigger else "",
+                _LAST_AGENT_FIELD: (
+                    last_agent_message_ts if last_agent_message_ts is not None else ""
+                ),
+            },
+        )
+
+    async def record_user_activity(
+        self, conversation_id: Union[UUID, str], timestamp: Optional[float] = None
+    ) -> None:
+        """Cancels the pending follow-up because the customer wrote back."""
+        await self._write(
+            conversation_id,
+            {
+                _PENDING_FIELD: "",
+                _DUE_FIELD: "",
+                _ATTEMPT_FIELD: 0,
+                _LAST_USER_FIELD: timestamp if timestamp is not None else time.time(),
+            },
+        )
+
+    async def get(
+        self, conversation_id: Union[UUID, str]
+    ) -> Optional[FollowUpIndexEntry]:
+        """Returns the entry of the conversation, or None if it has none."""
+        raw = await self.redis.hgetall(self._key(conversation_id))
+        if not raw:
+            return None
+        fields = {
+            (k.decode() if isinstance(k, bytes) else k): (
+                v.decode() if isinstance(v, bytes) else v
+            )
+            for k, v in raw.items()
+        }
+
+        pending_trigger = None
+        if fields.get(_PENDING_FIELD):
+            try:
+                pending_trigger = PendingFollowUpTrigger.model_validate(
+                    json.loads(fields[_PENDING_FIELD])
+                )
+            except Exception as e:
+                logger.warning(
+                    f"[FollowUpIndex] Malformed pending trigger for conversation {conversation_id}: {e}"
+                )
+
+        return FollowUpIndexEntry(
+            pending_trigger=pending_trigger,
+            attempt_count=int(fields.get(_ATTEMPT_FIELD) or 0),
+            due_ts=_to_float(fields.get(_DUE_FIELD)),
+            last_agent_message_ts=_to_float(fields.get(_LAST_AGENT_FIELD)),
+            last_user_activity_ts=_to_float(fields.get(_LAST_USER_FIELD)),
+        )
+
+    async def clear(self, conversation_id: Union[UUID, str]) -> None:
+        await self.redis.delete(self._key(conversation_id))
@@ -0,0 +1,75 @@
+# app/services/sales_agent/streaming.py
+
+import re
+from typing import Awaitable, Callable, List, Optional
+
+# Called with (ai_message_id, chunk_text) for every chunk that is ready to be
+# delivered to the customer while the model is still generating.
+ReplyChunkCallback = Callable[[str, str], Awaitable[None]]
+
+# Key used inside config["configurable"] to hand the callback to the graph.
+REPLY_CHUNK_CALLBACK_CONFIG_KEY = "reply_chunk_callback"
+REPLY_CHUNK_MIN_CHARS_CONFIG_KEY = "reply_chunk_min_chars"
+DEFAULT_REPLY_CHUNK_MIN_CHARS = 160
+
+# Marker stored on AIMessage.additional_kwargs when its content was already
+# dispatched chunk by chunk.
+STREAMED_REPLY_FLAG = "streamed_to_customer"
+
+# A sentence end followed by whitespace, or a paragraph break.
+_BOUNDARY_RE = re.compile(r"[.!?…]+[\"')\]]*\s+|\n\s*\n")
+
+
+class SentenceChunker:
+    """
+    Accumulates streamed text and releases it at sentence boundaries.
+
+    A chunk is released on the first sentence end or paragraph break found
+    after `min_chars` characters, so short sentences are kept together instead
+    of becoming one WhatsApp message each.
+    """
+
+    def __init__(self, min_chars: int = DEFAULT_REPLY_CHUNK_MIN_CHARS):
+        self.min_chars = max(min_chars, 1)
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Adds streamed text to the buffer.
+
+        Args:
+            text: The new token(s) received from the model.
+
+        Returns:
+            The list of chunks that are complete and can be dispatched.
+        """
+        if not text:
+            return []
+        self._buffer += text
+
+        ready: List[str] = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            chunk = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if chunk:
+                ready.append(chunk)
+        return ready
+
+    def flush(self) -> Optional[str]:
+        """Returns whatever is left in the buffer (or None) and clears it."""
+        remaining = self._buffer.strip()
+        self._buffer = ""
+        return remaining or None
+
+    def _find_cut(self) -> Optional[int]:
+        if len(self._buffer) < self.min_chars:
+            return None
+        # Only boundaries past min_chars count, earlier ones would produce a
+        # chunk that is too short.
+        for match in _BOUNDARY_RE.finditer(self._buffer):
+            if match.end() >= self.min_chars:
+                return match.end()
+        return None
@@ -3,6 +3,8 @@ from typing_extensions import Annotated
 from loguru import logger
 from uuid import UUID
 
+from app.core.log import payload
+
 try:
     from app.core.embedding_utils import get_embedding
 
@@ -16,21 +18,19 @@ except ImportError:
 
 
 try:
-    from app.services.repository.knowledge_chunk import (
-        search_similar_chunks_with_context,
-        check_knowledge_chunks_exist_for_account,
+    from app.services.knowledge.retrieval import (
+        account_has_knowledge,
+        retrieve_knowledge,
     )
     from app.models.knowledge_chunk import KnowledgeChunk
 
     CHUNK_REPO_AVAILABLE = True
 except ImportError:
     CHUNK_REPO_AVAILABLE = False
-    logger.error(
-        "KnowledgeRetriever: Chunk repository (search_similar_chunks) not found."
-    )
+    logger.error("KnowledgeRetriever: Knowledge retrieval module not found.")
 
-    async def search_similar_chunks(*args, **kwargs) -> List:
-        return []  # Fallback
+    async def retrieve_knowledge(*args, **kwargs) -> tuple:
+        return [], []  # Fallback
 
     class KnowledgeChunk:
         pass  # Dummy
@@ -182,12 +182,13 @@ async def query_knowledge_base(
             error message indicating the issue.
     """
     tool_name = "query_knowledge_base"
-    logger.info(f"--- Executing Tool: {tool_name} ---")
     logger.info(f"[{tool_name}] Received query: '{user_query[:100]}...'")
 
     account_id = state.account_id
-    logger.info(
-        f"Printando company profile Bot agent:{state.company_profile.offering_overview}"
+    logger.trace(
+        "[{}] Company offerings: {}",
+        tool_name,
+        payload(state.company_profile.offering_overview, limit=500),
     )
 
     db_session_factory: Optional[async_sessionmaker[AsyncSession]] = config.get(
@@ -229,10 +230,7 @@ async def query_knowledge_base(
         return "Erro interno: Funcionalidade de busca indisponível no momento (repositório)."
 
     try:
-        async with db_session_factory() as db:
-            knowledge_exists = await check_knowledge_chunks_exist_for_account(
-                db=db, account_id=account_id
-            )
+        knowledge_exists = await account_has_knowledge(db_session_factory, account_id)
 
         if not knowledge_exists:
             logger.info(
@@ -261,17 +259,17 @@ async def query_knowledge_base(
             return "Não foi possível processar sua pergunta para a busca no momento."
 
         logger.debug(
-            f"[{tool_name}] Searching for chunks with context (limit={rag_limit}, threshold={rag_threshold})..."
+            f"[{tool_name}] Hybrid search with context (limit={rag_limit}, threshold={rag_threshold})..."
         )
 
-        async with db_session_factory() as db:
-            all_context_chunks, seed_chunks = await search_similar_chunks_with_context(
-                db=db,
-                account_id=account_id,
-                query_embedding=query_embedding,
-                limit=rag_limit,
-                similarity_threshold=rag_threshold,
-            )
+        all_context_chunks, seed_chunks = await retrieve_knowledge(
+            db_session_factory,
+            account_id=account_id,
+            query_text=user_query,
+            query_embedding=query_embedding,
+            limit=rag_limit,
+            similarity_threshold=rag_threshold,
+        )
 
         if all_context_chunks:
             logger.info(
@@ -286,7 +284,9 @@ async def query_knowledge_base(
             )
 
             logger.debug(
-                f"[{tool_name}] Formatted retrieved context: {retrieved_context_str[:300]}..."
+                "[{}] Formatted retrieved context: {}",
+                tool_name,
+                payload(retrieved_context_str, limit=300),
             )
         else:
             logger.info(
@@ -23,7 +23,7 @@ from app.config import get_settings, Settings
 
 settings: Settings = get_settings()
 WHATSAPP_GRAPH_API_VERSION = "v22.0"
-WHATSAPP_GRAPH_API_BASE_URL = "https://graph.facebook.com"
+WHATSAPP_GRAPH_API_BASE_URL = settings.WHATSAPP_GRAPH_API_BASE_URL
 
 
 @retry(
@@ -27,3 +27,9 @@ WEBHOOK_URL = os.getenv(
 POLL_INTERVAL_SECONDS = 3
 MAX_POLL_ATTEMPTS = 20
 MAX_CONVERSATION_TURNS = 15
+# AI replies are awaited on the conversation's ws pub/sub channel
+AI_RESPONSE_TIMEOUT_SECONDS = POLL_INTERVAL_SECONDS * MAX_POLL_ATTEMPTS
+# Further AI messages published within this window belong to the same reply
+REPLY_SETTLE_SECONDS = 0.5
+REPLY_COMMIT_TIMEOUT_SECONDS = 10.0
+SIMULATION_BATCH_CONCURRENCY = 8
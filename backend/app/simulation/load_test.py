@@ -0,0 +1,556 @@
+# backend/app/simulation/load_test.py
+
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models.account import Account
+from app.models.conversation import ConversationStatusEnum
+from app.models.simulation.simulation import (
+    Simulation,
+    SimulationStatusEnum,
+    SimulationOutcomeEnum,
+)
+from app.models.simulation.simulation_event import (
+    SimulationEvent,
+    SimulationEventTypeEnum,
+)
+from app.models.simulation.simulation_message import (
+    SimulationMessage,
+    SimulationMessageRoleEnum,
+)
+from app.api.schemas.contact import ContactCreate
+from app.api.schemas.simulation import SimulationMessageCreate
+from app.services.repository import company_profile as profile_repo
+from app.services.repository import contact as contact_repo
+from app.services.repository import conversation as conversation_repo
+from app.simulation.personas import loader as persona_loader
+from app.simulation.repositories import persona as persona_repo
+from app.simulation.schemas.load_test import LoadStage, LoadTestConfig, PersonaScript
+from app.simulation.schemas.persona import PersonaRead
+from app.simulation.utils.load_profile import (
+    arrival_offsets,
+    rate_at,
+    summarize_load_metrics,
+)
+from app.simulation.utils.webhook import ConversationReplyDispatcher
+from app.api.routes.simulation import _enqueue_simulation_message
+
+CACHED_SCRIPTS_PER_PERSONA = 5  # Latest live simulations replayed per persona
+LOAD_TEST_CONTACT_PREFIX = "5598"  # + 9 random digits, simulation contacts only
+SETUP_COMMIT_EVERY = 100
+RESULT_WRITE_BATCH = 100
+PROGRESS_LOG_INTERVAL_SECONDS = 10.0
+
+
+# --- Scripts ---
+
+
+def _definition_script(persona: PersonaRead) -> PersonaScript:
+    """The persona's own lines: initial message, off-topic questions, objections."""
+    utterances = [persona.initial_message]
+    utterances += persona.off_topic_questions
+    utterances += [objection.objection_text for objection in persona.potential_objections]
+    return PersonaScript(persona_id=persona.id, source="definition", utterances=utterances)
+
+
+async def _cached_scripts(
+    db: AsyncSession, persona: PersonaRead, limit: int = CACHED_SCRIPTS_PER_PERSONA
+) -> List[PersonaScript]:
+    """The user messages of the persona's latest live (LLM-driven) simulations."""
+    simulation_ids = (
+        (
+            await db.execute(
+                select(Simulation.id)
+                .where(
+                    Simulation.persona_id == persona.id,
+                    Simulation.evaluation_metrics.is_(None),  # Not a load test
+                )
+                .order_by(Simulation.created_at.desc())
+                .limit(limit)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if not simulation_ids:
+        return []
+
+    rows = await db.execute(
+        select(SimulationMessage.simulation_id, SimulationMessage.content)
+        .where(
+            SimulationMessage.simulation_id.in_(simulation_ids),
+            SimulationMessage.role == SimulationMessageRoleEnum.USER,
+        )
+        .order_by(SimulationMessage.simulation_id, SimulationMessage.turn_number)
+    )
+    utterances_by_simulation: Dict[UUID, List[str]] = {}
+    for simulation_id, content in rows:
+        if content:
+            utterances_by_simulation.setdefault(simulation_id, []).append(content)
+    return [
+        PersonaScript(persona_id=persona.id, source="cached", utterances=utterances)
+        for utterances in utterances_by_simulation.values()
+    ]
+
+
+async def _load_template_personas(
+    db: AsyncSession, account: Account, persona_id_strs: List[str]
+) -> List[PersonaRead]:
+    if persona_id_strs:
+        personas = []
+        for persona_id_str in dict.fromkeys(persona_id_strs):
+            persona = await persona_loader.load_persona_from_db(db, persona_id_str)
+            if not persona:
+                raise ValueError(f"Persona '{persona_id_str}' not found or invalid")
+            personas.append(persona)
+        return personas
+    return [
+        PersonaRead.model_validate(persona)
+        for persona in await persona_repo.get_all_personas(db, limit=1000)
+        if persona.contact and persona.contact.account_id == account.id
+    ]
+
+
+async def load_persona_scripts(
+    db: AsyncSession, account: Account, config: LoadTestConfig
+) -> List[PersonaScript]:
+    """
+    The utterance scripts synthetic conversations are drawn from; no LLM is
+    called to play the personas.
+
+    With `config.script_file`, the scripts in that file. Otherwise, for each
+    template persona, the persona messages of its latest live simulations
+    ("cached"), or a script made of its definition when it has none.
+    """
+    if config.script_file:
+        with open(config.script_file, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        scripts = []
+        for entry in entries:
+            persona_db_id = None
+            if entry.get("persona_id"):
+                persona = await persona_loader.load_persona_from_db(
+                    db, entry["persona_id"]
+                )
+                if not persona:
+                    raise ValueError(f"Persona '{entry['persona_id']}' not found or invalid")
+                persona_db_id = persona.id
+            scripts.append(
+                PersonaScript(
+                    persona_id=persona_db_id,
+                    source="file",
+                    utterances=entry["utterances"],
+                )
+            )
+        return scripts
+
+    scripts = []
+    for persona in await _load_template_personas(db, account, config.persona_ids):
+        cached = await _cached_scripts(db, persona)
+        scripts += cached or [_definition_script(persona)]
+        logger.info(
+            f"[LoadTest] Persona '{persona.persona_id}': "
+            f"{len(cached) or 1} {'cached' if cached else 'definition'} script(s)"
+        )
+    return scripts
+
+
+# --- Synthetic conversations ---
+
+
+async def _create_load_test_contact(
+    db: AsyncSession, account_id: UUID, name: str, rng: random.Random
+):
+    for _ in range(5):
+        identifier = LOAD_TEST_CONTACT_PREFIX + "".join(rng.choices("0123456789", k=9))
+        try:
+            return await contact_repo.create_contact(
+                db=db,
+                account_id=account_id,
+                contact_data=ContactCreate(
+                    name=name, phone_number=identifier, is_simulation=True
+                ),
+            )
+        except HTTPException as e:
+            if e.status_code != status.HTTP_409_CONFLICT:
+                raise
+    raise RuntimeError("Could not find a free load test contact identifier")
+
+
+async def create_load_test_conversations(
+    account: Account, count: int, run_id: UUID, seed: int = 0
+) -> List[UUID]:
+    """
+    Creates `count` fresh simulation contacts and conversations in the account's
+    simulation inbox, one per synthetic persona, before the ramp starts (so the
+    setup writes are not part of the measured load).
+    """
+    rng = random.Random(f"{run_id}-{seed}")
+    conversation_ids: List[UUID] = []
+    async with AsyncSessionLocal() as db:
+        for index in range(count):
+            contact = await _create_load_test_contact(
+                db, account.id, f"Load test {run_id.hex[:8]} #{index + 1}", rng
+            )
+            contact_inbox = await contact_repo.get_or_create_contact_inbox(
+                db=db,
+                account_id=account.id,
+                contact_id=contact.id,
+                inbox_id=account.simulation_inbox_id,
+                source_id=f"load_test_{uuid.uuid4().hex}",
+            )
+            conversation = await conversation_repo.get_or_create_conversation(
+                db=db,
+                account_id=account.id,
+                inbox_id=account.simulation_inbox_id,
+                contact_inbox_id=contact_inbox.id,
+                status=ConversationStatusEnum.BOT,
+            )
+            if not conversation.is_simulation:
+                conversation.is_simulation = True
+                db.add(conversation)
+            conversation_ids.append(conversation.id)
+            if (index + 1) % SETUP_COMMIT_EVERY == 0:
+                await db.commit()
+                logger.info(f"[LoadTest] Created {index + 1}/{count} conversations")
+        await db.commit()
+    return conversation_ids
+
+
+class LoadTestRunner:
+    """
+    Drives synthetic personas through the real pipeline (simulation enqueue ->
+    consumer -> AI replier) following a ramp profile, open loop: conversations
+    start on schedule whether or not earlier ones were answered.
+
+    Each conversation sends its script one message per turn, waits for the AI
+    reply on `ws:conversation:*` (one shared pattern subscription) and pauses
+    for a think time. Results are written to the simulation tables in batches
+    by a single writer, off the measured path.
+    """
+
+    def __init__(
+        self,
+        account: Account,
+        config: LoadTestConfig,
+        scripts: List[PersonaScript],
+        conversation_ids: List[UUID],
+        run_id: UUID,
+        profile_id: Optional[UUID] = None,
+    ):
+        self.account = account
+        self.config = config
+        self.scripts = scripts
+        self.conversation_ids = conversation_ids
+        self.run_id = run_id
+        self.profile_id = profile_id
+        self._rng = random.Random(config.seed)
+        self._results: asyncio.Queue = asyncio.Queue()
+        self._dispatcher: Optional[ConversationReplyDispatcher] = None
+        self._started_at = 0.0
+        self.write_failures = 0
+
+    def _offset(self, at: Optional[float] = None) -> float:
+        return round((at if at is not None else time.monotonic()) - self._started_at, 3)
+
+    async def run(self) -> None:
+        offsets = arrival_offsets(self.config.stages)
+        in_flight: set = set()
+        async with ConversationReplyDispatcher() as dispatcher:
+            self._dispatcher = dispatcher
+            writer = asyncio.create_task(self._write_loop())
+            self._started_at = time.monotonic()
+            last_log = 0.0
+            for index, offset in enumerate(offsets):
+                delay = self._started_at + offset - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                result = self._new_result(index, offset, self._rng.choice(self.scripts))
+                if len(in_flight) >= self.config.max_in_flight:
+                    result["error"] = {"kind": "dropped", "turn": 1, "offset": self._offset()}
+                    self._results.put_nowait(result)
+                else:
+                    task = asyncio.create_task(
+                        self._run_conversation(self.conversation_ids[index], result)
+                    )
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                if offset - last_log >= PROGRESS_LOG_INTERVAL_SECONDS:
+                    last_log = offset
+                    logger.info(
+                        f"[LoadTest] t={offset:.0f}s rate={result['target_rate']:.2f}/s "
+                        f"started={index + 1}/{len(offsets)} in_flight={len(in_flight)}"
+                    )
+            if in_flight:
+                logger.info(f"[LoadTest] Ramp done, waiting for {len(in_flight)} conversations")
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            self._results.put_nowait(None)
+            await writer
+
+    def _new_result(self, index: int, offset: float, script: PersonaScript) -> Dict[str, Any]:
+        return {
+            "arrival": index,
+            "arrival_offset_seconds": round(offset, 3),
+            "target_rate": rate_at(self.config.stages, offset),
+            "script": script,
+            "turns": [],
+            "error": None,
+            "duration_seconds": 0.0,
+        }
+
+    async def _run_conversation(self, conversation_id: UUID, result: Dict[str, Any]) -> None:
+        started = time.monotonic()
+        script: PersonaScript = result["script"]
+        self._dispatcher.register(conversation_id)
+        try:
+            for turn, utterance in enumerate(
+                script.utterances[: self.config.max_turns], start=1
+            ):
+                if turn > 1 and self.config.think_time_seconds:
+                    await asyncio.sleep(
+                        self.config.think_time_seconds * self._rng.uniform(0.5, 1.5)
+                    )
+                self._dispatcher.discard_pending(conversation_id)
+                sent_at = time.monotonic()
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await _enqueue_simulation_message(
+                            db=db,
+                            account_id=self.account.id,
+                            conversation_id=conversation_id,
+                            message_payload=SimulationMessageCreate(content=utterance),
+                        )
+                except Exception as e:
+                    result["error"] = {
+                        "kind": "enqueue_failed",
+                        "turn": turn,
+                        "offset": self._offset(sent_at),
+                        "detail": str(getattr(e, "detail", None) or e)[:200],
+                    }
+                    break
+                reply = await self._dispatcher.wait_for_reply(
+                    conversation_id, timeout=self.config.reply_timeout_seconds
+                )
+                if reply is None:
+                    result["error"] = {
+                        "kind": "timeout",
+                        "turn": turn,
+                        "offset": self._offset(sent_at),
+                    }
+                    break
+                result["turns"].append(
+                    {
+                        "turn": turn,
+                        "offset": self._offset(sent_at),
+                        "latency_ms": round((reply["received_at"] - sent_at) * 1000, 1),
+                        "user": utterance,
+                        "assistant": reply.get("content") or "",
+                        "message_id": reply.get("id"),
+                    }
+                )
+        except Exception as e:
+            logger.exception(f"[LoadTest] Conversation {conversation_id} crashed: {e}")
+            result["error"] = {
+                "kind": "runner_error",
+                "turn": len(result["turns"]) + 1,
+                "offset": self._offset(),
+                "detail": str(e)[:200],
+            }
+        finally:
+            self._dispatcher.unregister(conversation_id)
+            result["duration_seconds"] = time.monotonic() - started
+            self._results.put_nowait(result)
+
+    async def _write_loop(self) -> None:
+        finished = False
+        while not finished:
+            item = await self._results.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < RESULT_WRITE_BATCH and not self._results.empty():
+                item = self._results.get_nowait()
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+            try:
+                await self._write_results(batch)
+            except Exception as e:
+                self.write_failures += len(batch)
+                logger.exception(f"[LoadTest] Failed to record {len(batch)} simulations: {e}")
+
+    async def _write_results(self, results: List[Dict[str, Any]]) -> None:
+        stages = [[s.duration_seconds, s.target_rate] for s in self.config.stages]
+        async with AsyncSessionLocal() as db:
+            for result in results:
+                script: PersonaScript = result["script"]
+                error = result["error"]
+                if error is None:
+                    sim_status, outcome = SimulationStatusEnum.COMPLETED, None
+                elif error["kind"] == "timeout":
+                    sim_status, outcome = (
+                        SimulationStatusEnum.TIMEOUT,
+                        SimulationOutcomeEnum.TIMEOUT,
+                    )
+                else:
+                    sim_status, outcome = (
+                        SimulationStatusEnum.FAILED,
+                        SimulationOutcomeEnum.SIMULATION_ERROR,
+                    )
+                simulation = Simulation(
+                    id=uuid.uuid4(),
+                    company_profile_id=self.profile_id,
+                    persona_id=script.persona_id,
+                    status=sim_status,
+                    outcome=outcome,
+                    turn_count=len(result["turns"]),
+                    simulation_duration_seconds=round(result["duration_seconds"]),
+                    error_message=(
+                        error["kind"]
+                        + (f": {error['detail']}" if error.get("detail") else "")
+                        if error
+                        else None
+                    ),
+                    evaluation_metrics={
+                        "load_test": {
+                            "run_id": str(self.run_id),
+                            "stages": stages,
+                            "arrival": result["arrival"],
+                            "arrival_offset_seconds": result["arrival_offset_seconds"],
+                            "target_rate": round(result["target_rate"], 3),
+                            "script_source": script.source,
+                            "turns": [
+                                {"offset": t["offset"], "latency_ms": t["latency_ms"]}
+                                for t in result["turns"]
+                            ],
+                            "error": error,
+                        }
+                    },
+                )
+                db.add(simulation)
+                for t in result["turns"]:
+                    db.add_all(
+                        [
+                            SimulationMessage(
+                                simulation_id=simulation.id,
+                                turn_number=t["turn"],
+                                role=SimulationMessageRoleEnum.USER,
+                                content=t["user"],
+                            ),
+                            SimulationMessage(
+                                simulation_id=simulation.id,
+                                turn_number=t["turn"],
+                                role=SimulationMessageRoleEnum.ASSISTANT,
+                                content=t["assistant"],
+                                original_message_id=(
+                                    UUID(str(t["message_id"])) if t["message_id"] else None
+                                ),
+                            ),
+                            SimulationEvent(
+                                simulation_id=simulation.id,
+                                event_type=SimulationEventTypeEnum.AI_RESPONSE_RECEIVED,
+                                turn_number=t["turn"],
+                                details={"latency_ms": t["latency_ms"]},
+                            ),
+                        ]
+                    )
+                if error:
+                    db.add(
+                        SimulationEvent(
+                            simulation_id=simulation.id,
+                            event_type=SimulationEventTypeEnum.SIMULATION_ENGINE_ERROR,
+                            turn_number=error["turn"],
+                            details=error,
+                        )
+                    )
+            await db.commit()
+
+
+async def run_load_test(account: Account, config: LoadTestConfig) -> UUID:
+    """
+    Runs a persona-driven load test against the configured stack (DB, Redis and
+    workers of the current settings: local or staging).
+
+    Returns:
+        The run id; every simulation of the run carries it in
+        `evaluation_metrics["load_test"]["run_id"]` (see `summarize_load_test`).
+    """
+    if not account.simulation_inbox_id:
+        raise ValueError(f"Account {account.id} missing simulation_inbox_id.")
+    run_id = uuid.uuid4()
+    offsets = arrival_offsets(config.stages)
+    if not offsets:
+        raise ValueError("The load profile starts no conversations.")
+
+    async with AsyncSessionLocal() as db:
+        scripts = await load_persona_scripts(db, account, config)
+        profile = await profile_repo.get_profile_by_account_id(db, account.id)
+    if not scripts:
+        raise ValueError("No persona scripts to replay.")
+
+    logger.info(
+        f"[LoadTest] Run {run_id}: {len(offsets)} conversations over "
+        f"{sum(s.duration_seconds for s in config.stages):.0f}s, {len(scripts)} scripts"
+    )
+    conversation_ids = await create_load_test_conversations(
+        account, len(offsets), run_id, config.seed
+    )
+    runner = LoadTestRunner(
+        account,
+        config,
+        scripts,
+        conversation_ids,
+        run_id,
+        profile_id=profile.id if profile else None,
+    )
+    await runner.run()
+    if runner.write_failures:
+        logger.warning(
+            f"[LoadTest] {runner.write_failures} simulations could not be recorded."
+        )
+    logger.success(f"[LoadTest] Run {run_id} finished.")
+    return run_id
+
+
+async def summarize_load_test(
+    db: AsyncSession,
+    run_id: UUID,
+    window_seconds: float = 30.0,
+    slo_p95_ms: Optional[float] = None,
+    max_error_rate: float = 0.01,
+) -> Dict[str, Any]:
+    """Latency distribution, error rate and saturation window of a recorded run."""
+    result = await db.execute(
+        select(Simulation.evaluation_metrics).where(
+            Simulation.evaluation_metrics["load_test"]["run_id"].as_string()
+            == str(run_id)
+        )
+    )
+    runs = [metrics["load_test"] for metrics in result.scalars().all()]
+    if not runs:
+        raise ValueError(f"No simulations recorded for load test run {run_id}.")
+    stages = [
+        LoadStage(duration_seconds=duration, target_rate=rate)
+        for duration, rate in runs[0]["stages"]
+    ]
+    summary = summarize_load_metrics(
+        runs,
+        stages,
+        window_seconds=window_seconds,
+        slo_p95_ms=slo_p95_ms,
+        max_error_rate=max_error_rate,
+    )
+    summary["run_id"] = str(run_id)
+    return summary
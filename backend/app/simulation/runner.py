@@ -1,6 +1,8 @@
 # backend/app/simulation/runner.py
 
+import asyncio
 import time
+from contextlib import AsyncExitStack
 from typing import Optional, Dict, Any, List
 from uuid import UUID
 from datetime import datetime, timezone
@@ -43,7 +45,7 @@ from app.simulation.personas import loader as persona_loader
 from app.simulation.personas.logic import get_next_persona_action
 
 # Config and Utils
-from app.simulation.config import MAX_CONVERSATION_TURNS
+from app.simulation.config import MAX_CONVERSATION_TURNS, SIMULATION_BATCH_CONCURRENCY
 from app.simulation.utils import webhook as webhook_utils
 from app.simulation.utils.cleanup import reset_simulation_conversation
 from app.api.routes.simulation import _enqueue_simulation_message
@@ -53,15 +55,22 @@ async def run_single_simulation(
     account: Account,  # Passar o objeto Account diretamente é mais seguro
     persona_id_str: str,
     reset_conversation: bool = False,
-):
+) -> Optional[Dict[str, Any]]:
     """
     Orchestrates and runs a single simulation instance using an LLM-driven persona.
     Optionally resets the conversation history before starting.
 
+    AI replies are awaited on the conversation's `ws:conversation:*` channel;
+    the database is only polled if the Redis subscription cannot be made.
+
     Args:
         account: The Account object for which the simulation runs.
         persona_id_str: The identifier string of the persona to use.
         reset_conversation: If True, clears previous messages for the contact.
+
+    Returns:
+        A summary of the run (simulation id, status, outcome, turns, duration),
+        or None if the account has no simulation inbox.
     """
     account_id = account.id
     inbox_id = (
@@ -90,8 +99,9 @@ async def run_single_simulation(
     conversation_id: Optional[UUID] = None
     # Guarda o histórico simplificado para passar para a persona LLM
     conversation_history_for_persona: List[Dict[str, str]] = []
+    reply_listener: Optional[webhook_utils.ConversationReplyListener] = None
 
-    async with AsyncSessionLocal() as db:
+    async with AsyncSessionLocal() as db, AsyncExitStack() as exit_stack:
         try:
             # 1. Load Profile and Persona
             profile = await profile_repo.get_profile_by_account_id(db, account_id)
@@ -158,6 +168,16 @@ async def run_single_simulation(
             )
             events_occurred.append(SimulationEventTypeEnum.TURN_START)
 
+            # Subscribe before the first message so no reply can be missed
+            try:
+                reply_listener = await exit_stack.enter_async_context(
+                    webhook_utils.ConversationReplyListener(conversation_id)
+                )
+            except Exception as sub_err:
+                logger.warning(
+                    f"Could not subscribe to conversation {conversation_id} events, polling the DB instead: {sub_err}"
+                )
+
             # 7. Send Initial Persona Message
             initial_msg_content = persona.initial_message
             message_payload = SimulationMessageCreate(content=initial_msg_content)
@@ -201,11 +221,25 @@ async def run_single_simulation(
                 )
 
                 # 8.1 Wait for AI response
-                logger.debug(f"Polling for AI response after {last_message_time}...")
-                ai_db_message = await webhook_utils.poll_for_ai_response(
-                    db, conversation_id, last_message_time
-                )
-                if ai_db_message is None:
+                ai_reply: Optional[Dict[str, Any]] = None
+                if reply_listener is not None:
+                    ai_reply = await reply_listener.wait_for_reply()
+                    if ai_reply is not None and not await webhook_utils.wait_until_committed(
+                        db, ai_reply["id"], ai_reply.get("sent_at")
+                    ):
+                        logger.warning(
+                            f"AI message {ai_reply['id']} published but not committed yet; continuing."
+                        )
+                else:
+                    logger.debug(f"Polling for AI response after {last_message_time}...")
+                    ai_db_message = await webhook_utils.poll_for_ai_response(
+                        db, conversation_id, last_message_time
+                    )
+                    if ai_db_message is not None:
+                        ai_reply = {"content": ai_db_message.content}
+                        # Atualiza o tempo da última mensagem recebida
+                        last_message_time = ai_db_message.created_at
+                if ai_reply is None:
                     final_outcome = SimulationOutcomeEnum.TIMEOUT
                     error_msg = f"Timeout waiting for AI response on turn {turn}."
                     await simulation_event_repo.create_event(
@@ -221,10 +255,7 @@ async def run_single_simulation(
                     logger.error(error_msg)
                     break  # Sai do loop while
 
-                ai_response_text = ai_db_message.content or ""
-                last_message_time = (
-                    ai_db_message.created_at
-                )  # Atualiza o tempo da última mensagem recebida
+                ai_response_text = ai_reply.get("content") or ""
                 logger.info(f"AI Response received: '{ai_response_text[:100]}...'")
 
                 # 8.2 Log AI response
@@ -365,6 +396,8 @@ async def run_single_simulation(
                 )
 
                 message_payload = SimulationMessageCreate(content=next_persona_message)
+                if reply_listener is not None:
+                    reply_listener.discard_pending()
                 # Envia via webhook
                 await _enqueue_simulation_message(
                     db=db,
@@ -501,3 +534,68 @@ async def run_single_simulation(
     logger.info(
         f"--- Simulation finished: account={account_id}, persona={persona_id_str}, conversation_id={conversation_id} ---"
     )
+    return {
+        "persona_id": persona_id_str,
+        "simulation_id": simulation.id if simulation else None,
+        "conversation_id": conversation_id,
+        "status": final_status,
+        "outcome": final_outcome,
+        "turns": turn,
+        "duration_seconds": round(time.time() - start_time, 1),
+        "error": error_msg,
+    }
+
+
+async def run_simulation_batch(
+    account: Account,
+    persona_id_strs: List[str],
+    concurrency: int = SIMULATION_BATCH_CONCURRENCY,
+    reset_conversation: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Runs many personas at once, at most `concurrency` at a time.
+
+    Each persona talks through its own contact and simulation conversation and
+    each run uses its own DB session and pub/sub subscription, so runs do not
+    share state. A persona listed twice runs once (both runs would share its
+    conversation).
+
+    Args:
+        account: The simulation Account.
+        persona_id_strs: The persona identifiers to run.
+        concurrency: Maximum simulations in flight.
+        reset_conversation: If True, each run clears its conversation first.
+
+    Returns:
+        One summary per persona, in input order.
+    """
+    unique_persona_ids = list(dict.fromkeys(persona_id_strs))
+    if len(unique_persona_ids) != len(persona_id_strs):
+        logger.warning("Duplicate persona ids in the batch were dropped.")
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def _run_one(persona_id_str: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                summary = await run_single_simulation(
+                    account=account,
+                    persona_id_str=persona_id_str,
+                    reset_conversation=reset_conversation,
+                )
+            except Exception as e:
+                logger.exception(f"Simulation for persona {persona_id_str} crashed: {e}")
+                summary = None
+            return summary or {
+                "persona_id": persona_id_str,
+                "simulation_id": None,
+                "status": SimulationStatusEnum.FAILED,
+                "outcome": SimulationOutcomeEnum.SIMULATION_ERROR,
+                "turns": 0,
+                "duration_seconds": 0.0,
+                "error": "Simulation did not run.",
+            }
+
+    logger.info(
+        f"--- Starting simulation batch: {len(unique_persona_ids)} personas, concurrency={concurrency} ---"
+    )
+    return list(await asyncio.gather(*(_run_one(p) for p in unique_persona_ids)))
@@ -0,0 +1,47 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from uuid import UUID
+
+
+class LoadStage(BaseModel):
+    """One stage of a load profile: ramp linearly to `target_rate` over `duration_seconds`."""
+
+    duration_seconds: float = Field(
+        ..., ge=0, description="Stage length. 0 jumps to the target rate at once."
+    )
+    target_rate: float = Field(
+        ..., ge=0, description="New synthetic conversations per second at the end of the stage."
+    )
+
+
+class PersonaScript(BaseModel):
+    """The scripted (or cached) utterances one synthetic conversation sends, in order."""
+
+    persona_id: Optional[UUID] = Field(
+        None, description="DB id of the template persona, recorded on the simulation."
+    )
+    source: str = Field(..., description="'cached' | 'definition' | 'file'.")
+    utterances: List[str] = Field(..., min_length=1)
+
+
+class LoadTestConfig(BaseModel):
+    """Parameters of a persona-driven load test run."""
+
+    stages: List[LoadStage] = Field(..., min_length=1)
+    persona_ids: List[str] = Field(
+        default_factory=list,
+        description="Template personas (persona_id). Empty: every persona of the account.",
+    )
+    script_file: Optional[str] = Field(
+        None,
+        description="JSON list of {'persona_id'?: str, 'utterances': [str]}; replaces cached/definition scripts.",
+    )
+    max_turns: int = Field(5, ge=1, description="Persona messages per conversation, at most.")
+    think_time_seconds: float = Field(
+        2.0, ge=0, description="Mean pause before each follow-up message (±50% jitter)."
+    )
+    reply_timeout_seconds: float = Field(60.0, gt=0)
+    max_in_flight: int = Field(
+        500, ge=1, description="Arrivals beyond this many open conversations are dropped (and recorded)."
+    )
+    seed: int = 0
@@ -0,0 +1,159 @@
+import math
+import statistics
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.simulation.schemas.load_test import LoadStage
+
+
+def parse_load_profile(profile: str) -> List[LoadStage]:
+    """
+    Parses "duration:rate,duration:rate,..." (seconds, conversations/second).
+    Each stage ramps linearly from the previous rate (0 at the start); a stage
+    of duration 0 jumps to its rate, e.g. "0:2,60:2" holds 2/s for a minute.
+    """
+    stages = []
+    for part in profile.split(","):
+        if not part.strip():
+            continue
+        try:
+            duration, rate = part.split(":")
+            stages.append(
+                LoadStage(duration_seconds=float(duration), target_rate=float(rate))
+            )
+        except ValueError as e:
+            raise ValueError(f"Invalid load stage '{part}': expected 'duration:rate'") from e
+    if not stages:
+        raise ValueError("Load profile has no stages")
+    return stages
+
+
+def rate_at(stages: Sequence[LoadStage], offset: float) -> float:
+    """Target arrival rate at `offset` seconds into the profile."""
+    rate, start = 0.0, 0.0
+    for stage in stages:
+        if stage.duration_seconds <= 0:
+            rate = stage.target_rate
+            continue
+        if offset <= start + stage.duration_seconds:
+            progress = max(offset - start, 0.0) / stage.duration_seconds
+            return rate + (stage.target_rate - rate) * progress
+        rate, start = stage.target_rate, start + stage.duration_seconds
+    return 0.0
+
+
+def arrival_offsets(stages: Sequence[LoadStage]) -> List[float]:
+    """
+    Start offsets (seconds) of the synthetic conversations: the k-th arrives
+    when the integral of the rate reaches k, so arrivals follow the ramp exactly.
+    """
+    offsets: List[float] = []
+    rate, start, arrived = 0.0, 0.0, 0.0
+    for stage in stages:
+        r0, r1, duration = rate, stage.target_rate, stage.duration_seconds
+        rate = r1
+        if duration <= 0:
+            continue
+        stage_arrivals = (r0 + r1) / 2 * duration
+        # N(t) = r0*t + a*t^2 arrivals after t seconds in the stage
+        a = (r1 - r0) / (2 * duration)
+        k = math.floor(arrived + 1e-9) + 1
+        while k <= arrived + stage_arrivals + 1e-9:
+            need = k - arrived
+            if abs(a) < 1e-12:
+                t = need / r0
+            else:
+                t = (-r0 + math.sqrt(max(r0 * r0 + 4 * a * need, 0.0))) / (2 * a)
+            offsets.append(start + min(t, duration))
+            k += 1
+        arrived += stage_arrivals
+        start += duration
+    return offsets
+
+
+def latency_summary(values_ms: Sequence[float]) -> Dict[str, float]:
+    """count / mean / p50 / p90 / p95 / p99 / max of latencies in milliseconds."""
+    if not values_ms:
+        return {"count": 0}
+    ordered = sorted(values_ms)
+
+    def percentile(pct: float) -> float:
+        return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.mean(ordered), 1),
+        "p50": percentile(0.50),
+        "p90": percentile(0.90),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": ordered[-1],
+    }
+
+
+def summarize_load_metrics(
+    runs: Sequence[Dict[str, Any]],
+    stages: Sequence[LoadStage],
+    window_seconds: float = 30.0,
+    slo_p95_ms: Optional[float] = None,
+    max_error_rate: float = 0.01,
+) -> Dict[str, Any]:
+    """
+    Aggregates the `load_test` metrics of a run's simulations.
+
+    Each run has `turns` ([{"offset", "latency_ms"}], offset = seconds since
+    the run started when the message was sent) and an optional `error`
+    ({"kind", "offset"}). A failed turn or a dropped arrival counts as one
+    failed attempt. Attempts are also grouped in windows of `window_seconds`
+    by send time; the saturation point is the first window whose p95 exceeds
+    `slo_p95_ms` (if given) or whose error rate exceeds `max_error_rate`.
+    """
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    windows: Dict[int, Dict[str, Any]] = {}
+
+    def window_for(offset: float) -> Dict[str, Any]:
+        index = int(offset // window_seconds)
+        return windows.setdefault(index, {"latencies": [], "failed": 0})
+
+    for run in runs:
+        for turn in run.get("turns") or []:
+            latencies.append(turn["latency_ms"])
+            window_for(turn["offset"])["latencies"].append(turn["latency_ms"])
+        error = run.get("error")
+        if error:
+            errors[error["kind"]] = errors.get(error["kind"], 0) + 1
+            window_for(error["offset"])["failed"] += 1
+
+    failed = sum(errors.values())
+    attempts = len(latencies) + failed
+    summary: Dict[str, Any] = {
+        "conversations": len(runs),
+        "turns_attempted": attempts,
+        "turns_answered": len(latencies),
+        "error_rate": round(failed / attempts, 4) if attempts else 0.0,
+        "errors": errors,
+        "latency_ms": latency_summary(latencies),
+        "windows": [],
+        "saturation": None,
+    }
+    for index in sorted(windows):
+        window = windows[index]
+        window_attempts = len(window["latencies"]) + window["failed"]
+        start = index * window_seconds
+        entry = {
+            "start_seconds": start,
+            "target_rate": round(rate_at(stages, start + window_seconds / 2), 2),
+            "turns_attempted": window_attempts,
+            "error_rate": round(window["failed"] / window_attempts, 4),
+            "latency_ms": latency_summary(window["latencies"]),
+        }
+        summary["windows"].append(entry)
+        if summary["saturation"] is None and (
+            entry["error_rate"] > max_error_rate
+            or (
+                slo_p95_ms is not None
+                and entry["latency_ms"].get("p95", 0) > slo_p95_ms
+            )
+        ):
+            summary["saturation"] = entry
+    return summary
@@ -8,6 +8,7 @@ from datetime import datetime, timezone
 
 import httpx
 from loguru import logger
+from redis.asyncio import Redis
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 import re
@@ -15,10 +16,10 @@ import re
 from app.config import get_settings
 from app.api.schemas.webhooks.evolution import (
     EvolutionWebhookPayload,
-    EvolutionWebhookMessage,
-    EvolutionWebhookData,
+    EvolutionWebhookMessageData,
     EvolutionWebhookKey,
 )
+from app.api.schemas.webhooks.evolution_message import EvolutionMessageObject
 from app.models.message import Message
 from app.simulation.config import (
     SIMULATION_ACCOUNT_ID,
@@ -28,6 +29,9 @@ from app.simulation.config import (
     POLL_INTERVAL_SECONDS,
     MAX_POLL_ATTEMPTS,
     WEBHOOK_URL,
+    AI_RESPONSE_TIMEOUT_SECONDS,
+    REPLY_SETTLE_SECONDS,
+    REPLY_COMMIT_TIMEOUT_SECONDS,
 )
 from app.simulation.schemas.persona import PersonaRead
 from app.models.simulation.simulation import SimulationOutcomeEnum
@@ -63,14 +67,14 @@ def create_message_payload(
     payload = EvolutionWebhookPayload(
         event="messages.upsert",
         instance=channel_id,
-        data=EvolutionWebhookData(
+        data=EvolutionWebhookMessageData(
             key=EvolutionWebhookKey(
                 remoteJid=remote_jid,
                 fromMe=False,
                 id=message_sim_id,
             ),
             pushName=f"sim_contact_{contact_id}",
-            message=EvolutionWebhookMessage(conversation=message_text),
+            message=EvolutionMessageObject(conversation=message_text),
             messageType="conversation",
             messageTimestamp=current_epoch_timestamp,
             instanceId=channel_id,
@@ -170,6 +174,220 @@ async def poll_for_ai_response(
     return None
 
 
+def _ai_message_payload(raw_data: Any) -> Optional[Dict[str, Any]]:
+    """The message payload of a `new_message` event for an AI ('out') message."""
+    try:
+        data = json.loads(raw_data)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("type") != "new_message":
+        return None
+    payload = data.get("payload") or {}
+    return payload if payload.get("direction") == "out" else None
+
+
+def _drain(queue: asyncio.Queue) -> None:
+    while not queue.empty():
+        queue.get_nowait()
+
+
+async def _next_reply(
+    queue: asyncio.Queue, channel: str, timeout: float, settle_seconds: float
+) -> Optional[Dict[str, Any]]:
+    """
+    Waits for the next AI reply on `queue` of (received_at, payload). Messages
+    that follow within `settle_seconds` (streamed chunks, multi-message replies)
+    are joined into the same reply.
+    """
+    try:
+        parts = [await asyncio.wait_for(queue.get(), timeout)]
+    except asyncio.TimeoutError:
+        logger.warning(f"No AI response published on {channel} within {timeout}s.")
+        return None
+    while True:
+        try:
+            parts.append(await asyncio.wait_for(queue.get(), settle_seconds))
+        except asyncio.TimeoutError:
+            break
+    reply = dict(parts[-1][1])
+    reply["content"] = "\n".join(p.get("content") or "" for _, p in parts).strip()
+    reply["received_at"] = parts[0][0]
+    return reply
+
+
+class ConversationReplyListener:
+    """
+    Receives the AI messages of a simulation conversation as they are published
+    on `ws:conversation:{id}` (the AI replier publishes simulation replies there
+    instead of dispatching them), so the runner does not poll the database.
+
+    Subscribe before sending the persona message; use as an async context manager.
+    """
+
+    def __init__(self, conversation_id: UUID):
+        self.conversation_id = conversation_id
+        self.channel = f"ws:conversation:{conversation_id}"
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._redis: Optional[Redis] = None
+        self._pubsub = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "ConversationReplyListener":
+        self._redis = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=0,
+            decode_responses=True,
+        )
+        self._pubsub = self._redis.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._reader_task = asyncio.create_task(self._read())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self.channel)
+            await self._pubsub.aclose()
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    async def _read(self) -> None:
+        async for message in self._pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            payload = _ai_message_payload(message["data"])
+            if payload is not None:
+                self._queue.put_nowait((time.monotonic(), payload))
+
+    def discard_pending(self) -> None:
+        """Drops AI messages received so far (e.g. late ones from a previous turn)."""
+        _drain(self._queue)
+
+    async def wait_for_reply(
+        self,
+        timeout: float = AI_RESPONSE_TIMEOUT_SECONDS,
+        settle_seconds: float = REPLY_SETTLE_SECONDS,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Waits for the next AI reply. Messages that follow within `settle_seconds`
+        (streamed chunks, multi-message replies) are joined into the same reply.
+
+        Returns:
+            The last message payload with the joined `content` and the
+            `time.monotonic()` of its first part as `received_at`, or None on timeout.
+        """
+        return await _next_reply(self._queue, self.channel, timeout, settle_seconds)
+
+
+class ConversationReplyDispatcher:
+    """
+    One `ws:conversation:*` pattern subscription shared by many simulation
+    conversations (load tests), instead of one Redis connection per conversation.
+    Only registered conversations are buffered.
+    """
+
+    CHANNEL_PREFIX = "ws:conversation:"
+
+    def __init__(self):
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._redis: Optional[Redis] = None
+        self._pubsub = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "ConversationReplyDispatcher":
+        self._redis = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=0,
+            decode_responses=True,
+        )
+        self._pubsub = self._redis.pubsub()
+        await self._pubsub.psubscribe(f"{self.CHANNEL_PREFIX}*")
+        self._reader_task = asyncio.create_task(self._read())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self._pubsub is not None:
+            await self._pubsub.punsubscribe()
+            await self._pubsub.aclose()
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    async def _read(self) -> None:
+        async for message in self._pubsub.listen():
+            if message.get("type") != "pmessage":
+                continue
+            queue = self._queues.get(message["channel"][len(self.CHANNEL_PREFIX) :])
+            if queue is None:
+                continue
+            payload = _ai_message_payload(message["data"])
+            if payload is not None:
+                queue.put_nowait((time.monotonic(), payload))
+
+    def register(self, conversation_id: UUID) -> None:
+        self._queues.setdefault(str(conversation_id), asyncio.Queue())
+
+    def unregister(self, conversation_id: UUID) -> None:
+        self._queues.pop(str(conversation_id), None)
+
+    def discard_pending(self, conversation_id: UUID) -> None:
+        _drain(self._queues[str(conversation_id)])
+
+    async def wait_for_reply(
+        self,
+        conversation_id: UUID,
+        timeout: float = AI_RESPONSE_TIMEOUT_SECONDS,
+        settle_seconds: float = REPLY_SETTLE_SECONDS,
+    ) -> Optional[Dict[str, Any]]:
+        """Same as `ConversationReplyListener.wait_for_reply`, for a registered conversation."""
+        return await _next_reply(
+            self._queues[str(conversation_id)],
+            f"{self.CHANNEL_PREFIX}{conversation_id}",
+            timeout,
+            settle_seconds,
+        )
+
+
+async def wait_until_committed(
+    db: AsyncSession,
+    message_id: Any,
+    sent_at: Optional[Any] = None,
+    timeout: float = REPLY_COMMIT_TIMEOUT_SECONDS,
+    interval: float = 0.1,
+) -> bool:
+    """
+    The AI replier publishes before committing its turn; waits until the
+    message is visible so the next persona message does not race that commit.
+    `sent_at` (the published message's, ISO string or datetime) limits each
+    poll to one messages partition.
+    """
+    stmt = select(Message.id).where(Message.id == UUID(str(message_id)))
+    if isinstance(sent_at, str):
+        sent_at = datetime.fromisoformat(sent_at)
+    if sent_at is not None:
+        stmt = stmt.where(Message.sent_at == sent_at)
+    deadline = time.monotonic() + timeout
+    while True:
+        result = await db.execute(stmt)
+        if result.scalar_one_or_none() is not None:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(interval)
+
+
 def check_explicit_failure_criteria(
     persona: PersonaRead,
     turn: int,
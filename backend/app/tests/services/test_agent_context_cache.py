@@ -0,0 +1,65 @@
+import pytest
+from types import SimpleNamespace
+from datetime import datetime, timezone
+
+from app.services.sales_agent.context_cache import (
+    AgentContextCache,
+    build_version_stamp,
+)
+
+
+@pytest.mark.unit
+def test_cache_is_keyed_by_version_and_evicts_least_recently_used():
+    cache = AgentContextCache(max_entries=2)
+    cache.put("company_profile", "acc-1", "v1", "profile-v1")
+    cache.put("company_profile", "acc-1", "v2", "profile-v2")
+
+    assert cache.get("company_profile", "acc-1", "v1") == "profile-v1"
+
+    cache.put("company_profile", "acc-2", "v1", "other")
+
+    assert cache.get("company_profile", "acc-1", "v2") is None
+    assert cache.get("company_profile", "acc-1", "v1") == "profile-v1"
+
+
+@pytest.mark.unit
+def test_get_or_build_only_builds_on_miss():
+    cache = AgentContextCache()
+    calls = []
+
+    def builder():
+        calls.append(1)
+        return "built"
+
+    assert cache.get_or_build("agent_config", "bot-1", "v1", builder) == "built"
+    assert cache.get_or_build("agent_config", "bot-1", "v1", builder) == "built"
+    assert len(calls) == 1
+
+
+@pytest.mark.unit
+def test_version_stamp_changes_with_updated_at():
+    first = SimpleNamespace(
+        updated_at=datetime(2025, 1, 1, tzinfo=timezone.utc), profile_version=1
+    )
+    second = SimpleNamespace(
+        updated_at=datetime(2025, 1, 2, tzinfo=timezone.utc), profile_version=1
+    )
+
+    assert build_version_stamp(first) != build_version_stamp(second)
+    assert build_version_stamp(SimpleNamespace(updated_at=None)) == "0"
+
+
+@pytest.mark.unit
+def test_pinned_entries_survive_eviction_until_unpinned():
+    cache = AgentContextCache(max_entries=1)
+    cache.put("company_profile", "acc-1", "v1", "profile")
+    first = cache.pin("company_profile", "acc-1", "v1", "profile")
+    second = cache.pin("company_profile", "acc-1", "v1", "profile")  # Concurrent turn
+
+    cache.put("company_profile", "acc-2", "v1", "other")  # Evicts acc-1
+    assert cache.get("company_profile", "acc-1", "v1") == "profile"
+
+    cache.unpin(first)
+    assert cache.get("company_profile", "acc-1", "v1") == "profile"
+    cache.unpin(second)
+    assert cache.get("company_profile", "acc-1", "v1") is None
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.models.conversation_list_entry import ConversationListEntry
+from app.services.helper.conversation import list_entry_to_conversation_response
+from app.services.repository import conversation_list as conversation_list_repo
+
+
+@pytest.mark.unit
+def test_page_cursor_round_trip():
+    updated_at = datetime(2025, 5, 1, 12, 30, tzinfo=timezone.utc)
+    conversation_id = uuid4()
+
+    cursor = conversation_list_repo.encode_page_cursor(updated_at, conversation_id)
+
+    assert conversation_list_repo.decode_page_cursor(cursor) == (
+        updated_at,
+        conversation_id,
+    )
+
+
+@pytest.mark.unit
+def test_since_token_round_trip():
+    after_id = uuid4()
+
+    assert conversation_list_repo.decode_since(
+        conversation_list_repo.encode_since(1234)
+    ) == (1234, None)
+    assert conversation_list_repo.decode_since(
+        conversation_list_repo.encode_since(1234, after_id)
+    ) == (1234, after_id)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("token", ["", "not-a-token", "WzEsMl0"])
+def test_malformed_tokens_raise_value_error(token):
+    with pytest.raises(ValueError):
+        conversation_list_repo.decode_since(token)
+    with pytest.raises(ValueError):
+        conversation_list_repo.decode_page_cursor(token)
+
+
+@pytest.mark.unit
+def test_entry_maps_to_search_result():
+    message_id = uuid4()
+    entry = ConversationListEntry(
+        conversation_id=uuid4(),
+        account_id=uuid4(),
+        inbox_id=uuid4(),
+        status="HUMAN_ACTIVE",
+        unread_agent_count=2,
+        is_bot_active=False,
+        contact_name="Maria",
+        phone_number="5511999990000",
+        last_message={
+            "id": str(message_id),
+            "content": "oi",
+            "sent_at": "2025-05-01T12:30:00+00:00",
+        },
+        updated_at=datetime(2025, 5, 1, 12, 30, tzinfo=timezone.utc),
+        deleted=False,
+        version=10,
+    )
+
+    result = list_entry_to_conversation_response(entry)
+
+    assert result.id == entry.conversation_id
+    assert result.status.value == "HUMAN_ACTIVE"
+    assert result.contact.name == "Maria"
+    assert result.last_message.id == message_id
+    assert result.last_message.content == "oi"
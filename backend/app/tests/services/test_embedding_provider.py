@@ -0,0 +1,66 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core import embedding_utils
+from app.core.embedding_batching import EmbeddingMicroBatcher
+
+pytestmark = pytest.mark.unit
+
+
+class _FakeProvider(embedding_utils.EmbeddingProvider):
+    name = "fake"
+    instances = 0
+
+    def __init__(self):
+        type(self).instances += 1
+
+    async def embed(self, texts):
+        return [np.ones(3) for _ in texts]
+
+    def langchain_embeddings(self):
+        raise AssertionError("not used by these tests")
+
+
+@pytest.fixture
+def fake_provider(monkeypatch):
+    _FakeProvider.instances = 0
+    monkeypatch.setattr(embedding_utils, "_provider", None)
+    monkeypatch.setattr(embedding_utils, "_provider_failed", False)
+    monkeypatch.setattr(embedding_utils, "EMBEDDING_PROVIDER", "fake")
+    monkeypatch.setattr(embedding_utils, "_provider_factories", {})
+    embedding_utils.register_embedding_provider("fake", _FakeProvider)
+    return _FakeProvider
+
+
+@pytest.mark.asyncio
+async def test_provider_is_built_once_on_first_use(fake_provider):
+    assert fake_provider.instances == 0
+
+    results = await asyncio.gather(
+        *(embedding_utils.get_embeddings_batch(["a", "b"]) for _ in range(5))
+    )
+
+    assert fake_provider.instances == 1
+    assert all(len(result) == 2 for result in results)
+    assert await embedding_utils.warmup_embeddings(probe=True)
+    assert fake_provider.instances == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_encoded_as_one_batch():
+    batches = []
+
+    def encode(texts):
+        batches.append(list(texts))
+        return np.array([[float(len(text))] for text in texts])
+
+    batcher = EmbeddingMicroBatcher(encode, max_batch_size=64, max_wait_seconds=0.01)
+    results = await asyncio.gather(
+        batcher.embed(["a"]), batcher.embed(["bb", "ccc"]), batcher.embed(["dddd"])
+    )
+    await batcher.close()
+
+    assert batches == [["a", "bb", "ccc", "dddd"]]
+    assert [[float(e[0]) for e in result] for result in results] == [[1.0], [2.0, 3.0], [4.0]]
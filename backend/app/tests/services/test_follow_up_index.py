@@ -0,0 +1,44 @@
+import pytest
+from uuid import uuid4
+
+from app.services.sales_agent.agent_state import PendingFollowUpTrigger
+from app.services.sales_agent.follow_up_index import FollowUpIndexEntry
+
+
+def _trigger() -> PendingFollowUpTrigger:
+    return PendingFollowUpTrigger(
+        follow_up_type="custom_reminder",
+        due_timestamp=1_700_000_600.0,
+        defer_by=600.0,
+        target_conversation_id=uuid4(),
+        context={"reason": "Checking in on our recent conversation."},
+    )
+
+
+@pytest.mark.unit
+def test_follow_up_still_due_when_nothing_happened():
+    entry = FollowUpIndexEntry(
+        pending_trigger=_trigger(), last_agent_message_ts=1_700_000_000.0
+    )
+
+    assert entry.stale_reason(1_700_000_000.0) is None
+
+
+@pytest.mark.unit
+def test_user_reply_cancels_follow_up():
+    entry = FollowUpIndexEntry(
+        pending_trigger=None,
+        last_agent_message_ts=1_700_000_000.0,
+        last_user_activity_ts=1_700_000_100.0,
+    )
+
+    assert entry.stale_reason(1_700_000_000.0) == "no pending trigger"
+
+
+@pytest.mark.unit
+def test_newer_turn_supersedes_follow_up():
+    entry = FollowUpIndexEntry(
+        pending_trigger=_trigger(), last_agent_message_ts=1_700_000_500.0
+    )
+
+    assert entry.stale_reason(1_700_000_000.0) is not None
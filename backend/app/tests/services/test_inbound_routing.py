@@ -0,0 +1,60 @@
+import pytest
+from uuid import uuid4
+
+from app.models.conversation import ConversationStatusEnum
+from app.services.helper.inbound_routing import (
+    InboundRoute,
+    InboundRoutingCache,
+    build_channel_key,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _route(**overrides) -> InboundRoute:
+    data = dict(
+        account_id=uuid4(),
+        inbox_id=uuid4(),
+        contact_id=uuid4(),
+        contact_inbox_id=uuid4(),
+        conversation_id=uuid4(),
+        conversation_status=ConversationStatusEnum.BOT,
+        contact_name="Maria",
+    )
+    data.update(overrides)
+    return InboundRoute(**data)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = InboundRoutingCache(
+        ttl_seconds=60, local_ttl_seconds=60, local_max_entries=2
+    )
+
+    def _redis_down():
+        raise ConnectionError("redis unavailable")
+
+    monkeypatch.setattr(cache, "_get_redis", _redis_down)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_local_tier_serves_routes_until_invalidated(cache):
+    channel = build_channel_key("evolution", "instance-1")
+    route = _route()
+
+    await cache.put(channel, "5511999999999", route)
+    assert await cache.get(channel, "5511999999999") == route
+
+    await cache.invalidate(conversation_id=route.conversation_id)
+    assert await cache.get(channel, "5511999999999") is None
+
+
+@pytest.mark.asyncio
+async def test_local_tier_is_bounded(cache):
+    channel = build_channel_key("wpp_cloud", "12345")
+    for phone in ("1", "2", "3"):
+        await cache.put(channel, phone, _route())
+
+    assert await cache.get(channel, "1") is None
+    assert await cache.get(channel, "3") is not None
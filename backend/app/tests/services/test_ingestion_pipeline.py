@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+from uuid import uuid4
+
+from app.services.knowledge import ingestion_service as ingestion_module
+from app.services.knowledge.ingestion_service import KnowledgeIngestionService
+from app.services.repository.knowledge_chunk import compute_chunk_content_hash
+
+pytestmark = pytest.mark.unit
+
+
+class _FakeSession:
+    def __init__(self):
+        self.committed = False
+        self.rolled_back = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    sessions = []
+    saved_rows = []
+    embedding_calls = {"count": 0}
+
+    def session_factory():
+        session = _FakeSession()
+        sessions.append(session)
+        return session
+
+    async def fake_embeddings(texts):
+        embedding_calls["count"] += 1
+        if embedding_calls["count"] == 1:
+            return None  # e.g. rate limited: retried with backoff
+        return [[0.1, 0.2] for _ in texts]
+
+    async def fake_add_chunks(db, account_id, chunks_data):
+        saved_rows.extend(chunks_data)
+        return len(chunks_data)
+
+    monkeypatch.setattr(ingestion_module, "get_embeddings_batch", fake_embeddings)
+    monkeypatch.setattr(ingestion_module, "add_chunks", fake_add_chunks)
+    monkeypatch.setattr(ingestion_module, "EMBEDDING_BATCH_SIZE", 2)
+    monkeypatch.setattr(
+        ingestion_module.settings, "INGESTION_EMBEDDING_BACKOFF_SECONDS", 0
+    )
+    monkeypatch.setattr(ingestion_module.settings, "INGESTION_QUEUE_MAX_ITEMS", 1)
+
+    service = KnowledgeIngestionService(
+        db_session_factory=session_factory, chunk_size=20, chunk_overlap=0
+    )
+    return service, sessions, saved_rows
+
+
+@pytest.mark.asyncio
+async def test_pipeline_streams_all_chunks_in_one_transaction(pipeline):
+    service, sessions, saved_rows = pipeline
+    text = " ".join(f"palavra{i}" for i in range(40))
+
+    success = await service.ingest_source(
+        account_id=uuid4(),
+        source_type="text",
+        source_uri=text,
+        source_identifier="manual",
+        recursive=False,
+    )
+
+    assert success
+    assert len(saved_rows) > 2
+    assert sorted(row["chunk_index"] for row in saved_rows) == list(
+        range(len(saved_rows))
+    )
+    assert all(
+        isinstance(row["embedding"], np.ndarray)
+        and np.allclose(row["embedding"], [0.1, 0.2])
+        for row in saved_rows
+    )
+    assert [session.committed for session in sessions] == [True]
+
+
+@pytest.mark.asyncio
+async def test_reingestion_only_embeds_changed_chunks(pipeline, monkeypatch):
+    service, sessions, saved_rows = pipeline
+    text = " ".join(f"palavra{i}" for i in range(40))
+    first_chunk = service.text_splitter.split_text(text)[0]
+    unchanged_id, stale_id = uuid4(), uuid4()
+    deleted_ids = []
+
+    async def fake_fingerprints(db, document_id):
+        return [
+            (unchanged_id, "manual_text", compute_chunk_content_hash(first_chunk), 0),
+            (stale_id, "manual_text", compute_chunk_content_hash("texto antigo"), 1),
+        ]
+
+    async def fake_delete(db, chunk_ids):
+        deleted_ids.extend(chunk_ids)
+        return len(chunk_ids)
+
+    monkeypatch.setattr(ingestion_module, "get_chunk_fingerprints", fake_fingerprints)
+    monkeypatch.setattr(ingestion_module, "delete_chunks_by_ids", fake_delete)
+    monkeypatch.setattr(ingestion_module, "DOCUMENT_REPO_AVAILABLE", False)
+
+    total = await service._run_pipeline(
+        account_id=uuid4(),
+        source_type="text",
+        source_uri=text,
+        recursive=False,
+        document_id=uuid4(),
+        splitter=service.text_splitter,
+        extracted_content=[],
+    )
+
+    assert total == len(saved_rows) + 1
+    assert first_chunk not in [row["chunk_text"] for row in saved_rows]
+    assert deleted_ids == [stale_id]
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from app.services.helper.json_stream import iter_json_array
+
+
+async def _chunks(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+async def _collect(body: bytes, size: int):
+    return [item async for item in iter_json_array(_chunks(body, size))]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 3, 7, 4096])
+async def test_iter_json_array_matches_json_loads_for_any_chunking(size):
+    contacts = [
+        {"remoteJid": f"55119999{i:05d}@s.whatsapp.net", "pushName": "José ☕", "n": i}
+        for i in range(50)
+    ]
+    body = json.dumps([*contacts, 12345, "x, ]"], ensure_ascii=False, indent=1).encode()
+
+    assert await _collect(body, size) == json.loads(body)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_iter_json_array_rejects_non_arrays_and_truncated_bodies():
+    with pytest.raises(ValueError):
+        await _collect(b'{"error": "unauthorized"}', 4)
+    with pytest.raises(ValueError):
+        await _collect(b'[{"remoteJid": "1@s.whatsapp.net"}, {"remo', 4)
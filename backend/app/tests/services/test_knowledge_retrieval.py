@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from uuid import uuid4
+from sqlalchemy.dialects import postgresql
+
+from app.models.knowledge_chunk import HalfVectorEmbedding
+from app.services.knowledge import retrieval
+
+
+class _FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_knowledge_existence_is_cached_per_account(monkeypatch):
+    calls = []
+
+    async def fake_count(db, account_id, cap):
+        calls.append(account_id)
+        return 12
+
+    monkeypatch.setattr(retrieval, "count_chunks_for_account", fake_count)
+    account_id = uuid4()
+
+    assert await retrieval.account_has_knowledge(_FakeSession, account_id)
+    assert await retrieval.account_has_knowledge(_FakeSession, account_id)
+    assert calls == [account_id]
+
+
+@pytest.mark.unit
+def test_small_accounts_use_exact_scan():
+    threshold = retrieval.settings.RAG_EXACT_SCAN_MAX_CHUNKS
+
+    assert retrieval.use_exact_scan(threshold)
+    assert not retrieval.use_exact_scan(threshold + 1)
+
+
+@pytest.mark.unit
+def test_halfvec_embedding_binds_numpy_arrays():
+    process = HalfVectorEmbedding(3).bind_processor(postgresql.dialect())
+
+    assert process(np.array([0.5, -1.0, 0.25])) == "[0.5,-1.0,0.25]"
+    with pytest.raises(ValueError):
+        process(np.zeros(4))
@@ -0,0 +1,51 @@
+import sys
+
+import pytest
+from loguru import logger
+
+from app.core.log import SampledLogger, payload
+
+
+@pytest.mark.unit
+def test_payload_is_capped_and_rendered_only_when_emitted():
+    calls = []
+
+    class Spy:
+        def __str__(self):
+            calls.append(1)
+            return "x" * 50
+
+    lines = []
+    logger.remove()  # the default handler accepts DEBUG
+    logger.add(lines.append, level="INFO", format="{message}")
+    try:
+        logger.debug("skipped: {}", payload(Spy()))
+        assert calls == []
+
+        logger.info("kept: {}", payload({"text": "y" * 50}, limit=20))
+    finally:
+        logger.remove()
+        logger.add(sys.stderr)
+
+    assert lines[0].strip() == 'kept: {"text": "yyyyyyyyyy... (+42 chars)'
+
+
+@pytest.mark.unit
+def test_sampled_logger_keeps_one_in_n_per_call_site():
+    lines = []
+    handler_id = logger.add(lines.append, level="INFO", format="{message}")
+    sampled = SampledLogger(every=3)
+    try:
+        for i in range(7):
+            sampled.info("first site {}", i)
+        for i in range(2):
+            sampled.info("second site {}", i)
+    finally:
+        logger.remove(handler_id)
+
+    assert [line.strip() for line in lines] == [
+        "first site 0",
+        "first site 3",
+        "first site 6",
+        "second site 0",
+    ]
@@ -0,0 +1,113 @@
+from datetime import date, datetime, timezone, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.services.helper import message_partitions
+from app.services.repository import message as message_repo
+from app.services.helper.message_partitions import (
+    add_months,
+    archivable_months,
+    ensure_message_partitions,
+    month_start,
+    partition_month,
+    partition_name,
+)
+
+
+@pytest.mark.unit
+def test_month_arithmetic_and_names():
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    # 23:30 in São Paulo is already the next month in UTC
+    moment = datetime(2025, 3, 31, 23, 30, tzinfo=timezone(timedelta(hours=-3)))
+    assert month_start(moment) == date(2025, 4, 1)
+    assert partition_month(partition_name(date(2025, 4, 1))) == date(2025, 4, 1)
+    assert partition_month("messages_default") is None
+
+
+@pytest.mark.unit
+def test_only_months_older_than_retention_are_archived():
+    names = [
+        "messages_default",
+        "messages_p2025_06",
+        "messages_p2024_12",
+        "messages_p2025_05",
+        "messages_p2025_07",
+    ]
+
+    archivable = archivable_months(names, keep_months=2, today=date(2025, 7, 1))
+
+    assert archivable == [
+        ("messages_p2024_12", date(2024, 12, 1)),
+        ("messages_p2025_05", date(2025, 5, 1)),
+    ]
+
+
+class RecordingSession:
+    """Records SQL; months in `stranded` have rows in messages_default, `broken` fail."""
+
+    def __init__(self, stranded=(), broken=()):
+        self.stranded, self.broken = stranded, broken
+        self.statements, self.commits, self.rollbacks = [], 0, 0
+
+    async def execute(self, stmt, params=None):
+        sql = str(stmt)
+        self.statements.append(sql)
+        if any(f"PARTITION OF messages FOR VALUES FROM ('{m}" in sql for m in self.broken):
+            raise RuntimeError("boom")
+        return SimpleNamespace(rowcount=3)
+
+    async def scalar(self, stmt):
+        return any(f">= '{month}" in str(stmt) for month in self.stranded)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stranded_rows_are_moved_and_failures_skip_only_their_month(monkeypatch):
+    async def no_partitions(db):
+        return []
+
+    monkeypatch.setattr(message_partitions, "list_message_partitions", no_partitions)
+    monkeypatch.setattr(message_partitions, "month_start", lambda: date(2026, 1, 1))
+    db = RecordingSession(stranded=["2026-02-01"], broken=["2026-01-01"])
+
+    created = await ensure_message_partitions(db, months_ahead=2)
+
+    assert created == ["messages_p2026_02", "messages_p2026_03"]
+    assert (db.commits, db.rollbacks) == (2, 1)
+    february = [sql for sql in db.statements if "messages_p2026_02" in sql]
+    assert "LIKE messages" in february[0]
+    assert "DELETE FROM messages_default" in february[1]
+    assert "ATTACH PARTITION messages_p2026_02" in february[2]
+    assert any("messages_p2026_03 PARTITION OF messages" in sql for sql in db.statements)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cursor_with_sent_at_is_not_looked_up_by_id():
+    statements = []
+
+    class Session:
+        async def execute(self, stmt):
+            statements.append(stmt)
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: []))
+
+    cursor_sent_at = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+    await message_repo.get_messages_paginated(
+        Session(),
+        account_id=uuid4(),
+        conversation_id=uuid4(),
+        before_cursor=uuid4(),
+        cursor_sent_at=cursor_sent_at,
+    )
+
+    [page_query] = statements  # No separate cursor lookup
+    assert "(messages.sent_at, messages.id) <" in str(page_query)
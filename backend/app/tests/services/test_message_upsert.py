@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.api.schemas.message import MessageCreate
+from app.services.repository import message as message_repo
+
+
+def _message_data(**overrides) -> MessageCreate:
+    values = dict(
+        account_id=uuid4(),
+        inbox_id=uuid4(),
+        contact_id=uuid4(),
+        conversation_id=uuid4(),
+        source_id="wamid.123",
+        direction="in",
+        message_timestamp=datetime(2025, 5, 1, 12, tzinfo=timezone.utc),
+        content="oi",
+    )
+    values.update(overrides)
+    return MessageCreate(**values)
+
+
+@pytest.mark.unit
+def test_insert_targets_the_partial_unique_index():
+    sql = str(
+        message_repo._insert_if_absent_stmt().compile(dialect=postgresql.dialect())
+    )
+
+    assert (
+        "ON CONFLICT (inbox_id, source_id, sent_at) "
+        "WHERE source_id IS NOT NULL DO NOTHING"
+    ) in sql
+    assert "RETURNING" in sql
+
+
+@pytest.mark.unit
+def test_message_values_use_the_provider_timestamp_as_sent_at():
+    data = _message_data()
+
+    values = message_repo._message_values(data)
+
+    assert values["sent_at"] == data.message_timestamp
+    assert values["source_id"] == "wamid.123"
+
@@ -0,0 +1,93 @@
+import time
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from app.core.metrics import (
+    MetricsRegistry,
+    instrument_job,
+    merge_snapshots,
+    render_snapshot,
+)
+from app.core.tracing import current_trace, new_trace
+from app.workers.ai_replier.utils.turn_metrics import TurnMetricsCallback
+
+
+@pytest.mark.unit
+def test_render_counter_and_histogram():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    text = registry.render()
+
+    assert 'requests_total{route="/a"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+
+
+@pytest.mark.unit
+def test_merge_snapshots_adds_up_processes():
+    first, second = MetricsRegistry(), MetricsRegistry()
+    for registry in (first, second):
+        registry.counter("jobs_total", "Jobs.", ("task",)).inc(task="t")
+        registry.histogram("job_seconds", "Jobs.", buckets=(1.0,)).observe(0.5)
+    second.counter("jobs_total", "Jobs.", ("task",)).inc(task="other")
+
+    text = render_snapshot(merge_snapshots([first.snapshot(), second.snapshot()]))
+
+    assert 'jobs_total{task="t"} 2' in text
+    assert 'jobs_total{task="other"} 1' in text
+    assert 'job_seconds_bucket{le="1"} 2' in text
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_instrument_job_activates_the_trace_and_keeps_the_name():
+    seen = {}
+
+    async def sample_task(ctx, value):
+        seen["trace"] = current_trace()
+        return value * 2
+
+    wrapped = instrument_job(sample_task)
+    trace = new_trace("whatsapp_evolution")
+
+    result = await wrapped({"score": time.time() * 1000}, 21, trace_context=trace)
+
+    assert result == 42
+    assert seen["trace"] == trace
+    assert wrapped.__name__ == "sample_task"
+    assert current_trace() is None
+
+
+@pytest.mark.unit
+def test_turn_metrics_callback_counts_tokens():
+    callback = TurnMetricsCallback()
+    run_id = uuid4()
+    message = AIMessage(
+        content="ok",
+        usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150},
+    )
+
+    callback.on_chat_model_start(
+        {}, [[]], run_id=run_id, metadata={"ls_model_name": "gpt-test"}
+    )
+    callback.on_llm_end(
+        LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id
+    )
+
+    assert callback.observe_turn({"graph_ms": 12.0}) == {
+        "llm_calls": 1,
+        "input_tokens": 120,
+        "output_tokens": 30,
+    }
@@ -0,0 +1,128 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.services.queue import outbox_relay
+from app.services.queue.outbox_relay import OutboxRelay
+from app.services.repository import message_dispatch as dispatch_repo
+
+
+class FakeSession:
+    def __init__(self):
+        self.committed = False
+        self.rolled_back = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+class FakeQueue:
+    def __init__(self, accept: bool):
+        self.accept = accept
+        self.pushed = []
+
+    async def enqueue_many(self, messages):
+        if self.accept:
+            self.pushed.extend(messages)
+        return self.accept
+
+
+def _dispatch(queue_name: str):
+    message_id = str(uuid4())
+    return SimpleNamespace(
+        id=uuid4(), queue_name=queue_name, payload={"message_id": message_id}
+    )
+
+
+@pytest.fixture
+def repo_calls(monkeypatch):
+    calls = {"published": [], "failed": [], "pending": []}
+
+    async def claim(db, limit):
+        return calls["pending"][:limit]
+
+    async def mark_published(db, ids):
+        calls["published"].extend(ids)
+
+    async def record_failed(db, ids):
+        calls["failed"].extend(ids)
+
+    monkeypatch.setattr(outbox_relay.dispatch_repo, "claim_pending_dispatches", claim)
+    monkeypatch.setattr(
+        outbox_relay.dispatch_repo, "mark_dispatches_published", mark_published
+    )
+    monkeypatch.setattr(outbox_relay.dispatch_repo, "record_failed_publish", record_failed)
+    return calls
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_publishes_batch_per_queue_and_marks_it(repo_calls):
+    session = FakeSession()
+    relay = OutboxRelay(db_session_factory=lambda: session, batch_size=10)
+    responses, other = FakeQueue(accept=True), FakeQueue(accept=True)
+    relay._queues = {"response_queue": responses, "other_queue": other}
+    repo_calls["pending"] = [
+        _dispatch("response_queue"),
+        _dispatch("other_queue"),
+        _dispatch("response_queue"),
+    ]
+
+    published = await relay.relay_once()
+
+    assert published == 3
+    assert len(responses.pushed) == 2 and len(other.pushed) == 1
+    assert repo_calls["published"] == [
+        dispatch.id for dispatch in repo_calls["pending"]
+        if dispatch.queue_name == "response_queue"
+    ] + [repo_calls["pending"][1].id]
+    assert session.committed
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_unpublished_dispatches_stay_pending(repo_calls):
+    session = FakeSession()
+    relay = OutboxRelay(db_session_factory=lambda: session, batch_size=10)
+    relay._queues = {"response_queue": FakeQueue(accept=False)}
+    repo_calls["pending"] = [_dispatch("response_queue")]
+
+    assert await relay.relay_once() == 0
+    assert repo_calls["published"] == []
+    assert repo_calls["failed"] == [repo_calls["pending"][0].id]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_dispatch_carries_the_message_partition_key():
+    class RecordingSession:
+        def __init__(self):
+            self.added = []
+
+        def add(self, obj):
+            self.added.append(obj)
+
+        async def execute(self, stmt):
+            return None
+
+    db = RecordingSession()
+    sent_at = datetime(2026, 10, 19, 9, 30, tzinfo=timezone.utc)
+    message = SimpleNamespace(id=uuid4(), account_id=uuid4(), sent_at=sent_at)
+
+    dispatch = await dispatch_repo.add_message_dispatch(db, message, queue_name="q")
+
+    assert db.added == [dispatch]
+    assert dispatch.message_sent_at == sent_at
+    assert dispatch.payload["message_id"] == str(message.id)
+    assert datetime.fromisoformat(dispatch.payload["sent_at"]) == sent_at
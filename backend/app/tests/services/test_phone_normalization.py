@@ -0,0 +1,56 @@
+import pytest
+
+from app.services.helper.contact import (
+    PhoneNumberNormalizer,
+    _as_e164_digits,
+    _parse_to_e164_digits,
+)
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "5511941986775",
+        "+5511941986775",
+        "551133334444",
+        "559188887777",
+        "5500000000000",  # National prefix: goes through phonenumbers
+        "+1 202 555 0172",
+        "(11) 94198-6775",
+        "12345",
+    ],
+)
+@pytest.mark.unit
+def test_normalizer_matches_phonenumbers(raw):
+    normalizer = PhoneNumberNormalizer(max_entries=10)
+
+    assert normalizer.normalize(raw, "BR") == _parse_to_e164_digits(raw, "BR")
+    assert normalizer.normalize(raw, "BR") == _parse_to_e164_digits(raw, "BR")
+
+
+@pytest.mark.unit
+def test_e164_digits_skip_the_cache_and_formatted_input_is_cached():
+    normalizer = PhoneNumberNormalizer(max_entries=2)
+
+    assert _as_e164_digits("5511941986775", "BR") == "5511941986775"
+    assert _as_e164_digits("5500000000000", "BR") is None
+
+    normalizer.normalize("5511941986775", "BR")
+    assert (normalizer.hits, normalizer.misses) == (0, 0)
+
+    for raw in ["(11) 94198-6775", "(11) 94198-6775", "(21) 3333-4444", "(31) 99999-8888"]:
+        normalizer.normalize(raw, "BR")
+    assert (normalizer.hits, normalizer.misses) == (1, 3)
+    assert len(normalizer._entries) == 2
+
+
+@pytest.mark.unit
+def test_normalize_many_keeps_order_and_parses_duplicates_once():
+    normalizer = PhoneNumberNormalizer()
+
+    result = normalizer.normalize_many(
+        ["(11) 94198-6775", "abc", "(11) 94198-6775", None], "BR"
+    )
+
+    assert result == ["5511941986775", None, "5511941986775", None]
+    assert normalizer.misses == 2
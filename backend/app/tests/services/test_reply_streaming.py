@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.types import Command
+
+from app.services.sales_agent.agent_graph import _make_validation_node
+from app.services.sales_agent.streaming import (
+    REPLY_CHUNK_CALLBACK_CONFIG_KEY,
+    REPLY_CHUNK_MIN_CHARS_CONFIG_KEY,
+    STREAMED_REPLY_FLAG,
+    SentenceChunker,
+)
+
+
+@pytest.mark.unit
+def test_chunker_waits_for_min_chars():
+    chunker = SentenceChunker(min_chars=30)
+
+    assert chunker.feed("Olá! ") == []
+    assert chunker.feed("Tudo bem? ") == []
+    ready = chunker.feed("Posso te ajudar com o agendamento. Claro")
+
+    assert ready == ["Olá! Tudo bem? Posso te ajudar com o agendamento."]
+    assert chunker.flush() == "Claro"
+    assert chunker.flush() is None
+
+
+@pytest.mark.unit
+def test_chunker_splits_on_paragraph_breaks():
+    chunker = SentenceChunker(min_chars=10)
+
+    ready = chunker.feed("Temos três planos disponíveis\n\n- Básico\n- Pro")
+
+    assert ready == ["Temos três planos disponíveis"]
+    assert chunker.flush() == "- Básico\n- Pro"
+
+
+@pytest.mark.unit
+def test_chunker_handles_token_by_token_input():
+    chunker = SentenceChunker(min_chars=5)
+    text = "Primeira frase. Segunda frase! Fim"
+
+    ready = []
+    for char in text:
+        ready.extend(chunker.feed(char))
+
+    assert ready == ["Primeira frase.", "Segunda frase!"]
+    assert chunker.flush() == "Fim"
+
+
+def _validation_config(sent):
+    async def on_chunk(ai_message_id, text):
+        sent.append((ai_message_id, text))
+
+    return {
+        "configurable": {
+            REPLY_CHUNK_CALLBACK_CONFIG_KEY: on_chunk,
+            REPLY_CHUNK_MIN_CHARS_CONFIG_KEY: 10,
+        }
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_validated_reply_is_streamed_and_flagged():
+    async def hook(state):
+        return Command(update={"messages": []}, goto="auto_follow_up_scheduler")
+
+    reply = AIMessage(content="Primeira frase longa. Segunda frase!", id="ai-1")
+    state = SimpleNamespace(
+        messages=[
+            ToolMessage(
+                content=reply.content,
+                name="validate_response_and_references",
+                tool_call_id="call-1",
+            ),
+            reply,
+        ]
+    )
+    sent = []
+
+    result = await _make_validation_node(hook)(state, _validation_config(sent))
+
+    assert sent == [("ai-1", "Primeira frase longa."), ("ai-1", "Segunda frase!")]
+    assert result.goto == "auto_follow_up_scheduler"
+    [streamed] = result.update["messages"]
+    assert streamed.id == "ai-1"
+    assert streamed.additional_kwargs[STREAMED_REPLY_FLAG] is True
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_unvalidated_reply_is_not_streamed():
+    retry = Command(update={"messages": []}, goto="chatbot")
+
+    async def hook(state):
+        return retry
+
+    state = SimpleNamespace(
+        messages=[
+            ToolMessage(content="42", name="get_current_datetime", tool_call_id="c"),
+            AIMessage(content="Resposta sem validação.", id="ai-2"),
+        ]
+    )
+    sent = []
+
+    result = await _make_validation_node(hook)(state, _validation_config(sent))
+
+    assert sent == []
+    assert result is retry
@@ -0,0 +1,60 @@
+import pytest
+from types import SimpleNamespace
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+
+from app.services.sales_agent.agent_hooks import (
+    STATE_CONTEXT_MESSAGE_ID,
+    STAGE_ANALYZER_HEURISTIC_SKIP_CONFIG_KEY,
+    STAGE_ANALYZER_CONCURRENT_CONFIG_KEY,
+    _is_stage_analysis_skippable,
+    should_run_concurrent_stage_analysis,
+)
+
+
+def _history(user_text: str):
+    return [
+        SystemMessage(content="contexto", id=STATE_CONTEXT_MESSAGE_ID),
+        HumanMessage(content="Oi, tudo bem?"),
+        AIMessage(content="Tudo ótimo! Como posso ajudar?"),
+        HumanMessage(content=user_text),
+    ]
+
+
+SKIP_CONFIG = {"configurable": {STAGE_ANALYZER_HEURISTIC_SKIP_CONFIG_KEY: True}}
+
+
+@pytest.mark.unit
+def test_short_message_keeps_previous_stage():
+    state = SimpleNamespace(current_sales_stage="discovery")
+
+    assert _is_stage_analysis_skippable(state, SKIP_CONFIG, _history("legal, entendi"))
+
+
+@pytest.mark.unit
+def test_stage_shift_keyword_forces_analysis():
+    state = SimpleNamespace(current_sales_stage="discovery")
+
+    assert not _is_stage_analysis_skippable(
+        state, SKIP_CONFIG, _history("e quanto custa?")
+    )
+
+
+@pytest.mark.unit
+def test_heuristic_disabled_or_first_analysis_never_skips():
+    state = SimpleNamespace(current_sales_stage="discovery")
+    history = _history("legal")
+
+    assert not _is_stage_analysis_skippable(state, {"configurable": {}}, history)
+    assert not _is_stage_analysis_skippable(state, SKIP_CONFIG, history[1:])
+
+
+@pytest.mark.unit
+def test_concurrent_analysis_only_on_new_customer_message():
+    config = {"configurable": {STAGE_ANALYZER_CONCURRENT_CONFIG_KEY: True}}
+    history = _history("quero saber mais sobre o plano")
+
+    state = SimpleNamespace(current_sales_stage="discovery", messages=history)
+    assert should_run_concurrent_stage_analysis(state, config)
+
+    state.messages = history + [AIMessage(content="Claro!")]
+    assert not should_run_concurrent_stage_analysis(state, config)
@@ -0,0 +1,166 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.services.billing.usage_metering import (
+    FLUSHING_KEY_PREFIX,
+    UsageMeter,
+    aggregate_rows,
+    bucket_start,
+    parse_flushing_key,
+)
+from app.workers.ai_replier.tasks import message_handler_task
+
+
+class FakeDB:
+    def __init__(self, stripe_customer_id):
+        self.stripe_customer_id = stripe_customer_id
+        self.lookups = 0
+        self.added = []
+        self.commits = 0
+
+    async def scalar(self, stmt):
+        self.lookups += 1
+        return self.stripe_customer_id
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        self.commits += 1
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def hincrby(self, key, field, amount):
+        self.commands.append(("hincrby", key, field, amount))
+
+    def expire(self, key, seconds):
+        self.commands.append(("expire", key))
+
+    def sadd(self, key, member):
+        self.commands.append(("sadd", key, member))
+
+    async def execute(self):
+        if self.redis.down:
+            raise ConnectionError("redis down")
+        self.redis.executed.extend(self.commands)
+
+
+class FakeRedis:
+    def __init__(self, down=False):
+        self.down = down
+        self.executed = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def _meter(redis):
+    meter = UsageMeter(
+        bucket_seconds=3600, flush_grace_seconds=120, customer_cache_ttl_seconds=300
+    )
+    meter._get_redis = lambda: redis
+    return meter
+
+
+@pytest.mark.unit
+def test_bucket_and_aggregate_rows():
+    moment = datetime(2025, 5, 1, 12, 34, 56, tzinfo=timezone.utc)
+    bucket = bucket_start(moment, 3600)
+    assert datetime.fromtimestamp(bucket, tz=timezone.utc) == datetime(
+        2025, 5, 1, 12, tzinfo=timezone.utc
+    )
+    assert parse_flushing_key(f"{FLUSHING_KEY_PREFIX}{bucket}:abc") == (bucket, "abc")
+
+    account_id = uuid4()
+    rows = aggregate_rows(
+        {f"{account_id}|cus_1|generated_ia_messages": "7", f"{account_id}|cus_1|other": "0"},
+        bucket,
+        "abc",
+    )
+
+    assert len(rows) == 1
+    assert rows[0]["account_id"] == account_id
+    assert rows[0]["quantity"] == 7
+    assert rows[0]["usage_key"] == f"cus_1:generated_ia_messages:{bucket}:abc"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_record_increments_redis_and_caches_the_customer():
+    redis, db = FakeRedis(), FakeDB("cus_1")
+    meter = _meter(redis)
+    account_id = uuid4()
+
+    assert await meter.record(db, account_id, "generated_ia_messages")
+    assert await meter.record(db, account_id, "generated_ia_messages")
+
+    assert db.lookups == 1
+    assert db.added == []
+    increments = [command for command in redis.executed if command[0] == "hincrby"]
+    assert len(increments) == 2
+    assert increments[0][2] == f"{account_id}|cus_1|generated_ia_messages"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_record_falls_back_to_a_row_when_redis_is_down():
+    db = FakeDB("cus_1")
+    meter = _meter(FakeRedis(down=True))
+
+    assert await meter.record(db, uuid4(), "generated_ia_messages")
+
+    assert len(db.added) == 1
+    assert db.added[0].quantity == 1
+    assert ":direct-" in db.added[0].usage_key
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_accounts_without_stripe_customer_are_not_metered():
+    redis = FakeRedis()
+    meter = _meter(redis)
+
+    assert not await meter.record(FakeDB(None), uuid4(), "generated_ia_messages")
+    assert redis.executed == []
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_committed_replies_are_metered_once_with_their_fallback_row(monkeypatch):
+    db = FakeDB("cus_1")
+    monkeypatch.setattr(
+        message_handler_task, "usage_meter", _meter(FakeRedis(down=True))
+    )
+    conversation = SimpleNamespace(is_simulation=False)
+
+    await message_handler_task._meter_ai_replies(db, uuid4(), conversation, 3, "[test]")
+    await message_handler_task._meter_ai_replies(db, uuid4(), conversation, 0, "[test]")
+
+    assert [event.quantity for event in db.added] == [3]
+    assert db.commits == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_simulation_replies_are_not_metered(monkeypatch):
+    redis, db = FakeRedis(), FakeDB("cus_1")
+    monkeypatch.setattr(message_handler_task, "usage_meter", _meter(redis))
+
+    await message_handler_task._meter_ai_replies(
+        db, uuid4(), SimpleNamespace(is_simulation=True), 2, "[test]"
+    )
+
+    assert redis.executed == [] and db.commits == 0
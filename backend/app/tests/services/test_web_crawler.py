@@ -0,0 +1,60 @@
+import httpx
+import pytest
+
+from app.services.crawler import crawler as crawler_module
+from app.services.crawler.crawler import WebCrawler
+from app.services.crawler.html_parsing import parse_html_page
+
+PAGES = {
+    "/": '<html><body><nav><a href="/hidden">menu</a></nav><h1>Home</h1>'
+    '<a href="/about">Sobre</a><a href="/copy">Copy</a><a href="/private">Priv</a>'
+    '<a href="https://other.com/x">Out</a></body></html>',
+    "/about": "<html><body><p>Sobre nós</p></body></html>",
+    "/copy": "<html><body><p>Sobre  nós</p></body></html>",
+    "/private": "<html><body><p>Secret</p></body></html>",
+}
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/robots.txt":
+        return httpx.Response(200, text="User-agent: *\nDisallow: /private\n")
+    if request.url.path == "/sitemap.xml":
+        return httpx.Response(404)
+    body = PAGES.get(request.url.path)
+    if body is None:
+        return httpx.Response(404)
+    return httpx.Response(200, text=body, headers={"content-type": "text/html"})
+
+
+@pytest.fixture
+def mock_client(monkeypatch):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    monkeypatch.setattr(crawler_module, "get_shared_http_client", lambda: client)
+    monkeypatch.setattr(crawler_module, "_get_parser_pool", lambda: None)
+    return client
+
+
+@pytest.mark.unit
+def test_parse_html_page_keeps_same_site_links_outside_boilerplate():
+    markdown, links = parse_html_page(PAGES["/"], "https://site.com/")
+
+    assert "# Home" in markdown
+    assert [url for url, _ in links] == [
+        "https://site.com/about",
+        "https://site.com/copy",
+        "https://site.com/private",
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_crawl_skips_duplicates_and_robots_disallowed(mock_client):
+    crawler = WebCrawler(per_domain_delay=0, respect_robots=True)
+
+    pages = [page async for page in crawler.crawl("https://site.com", max_depth=1)]
+
+    crawled = sorted(page.url for page in pages)
+    assert crawled[0] == "https://site.com/"
+    # /about and /copy only differ in whitespace: one of them is dropped.
+    assert len(crawled) == 2
+    assert not any(url.endswith("/private") for url in crawled)
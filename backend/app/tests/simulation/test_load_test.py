@@ -0,0 +1,222 @@
+# backend/app/tests/simulation/test_load_test.py
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+
+from app.models.simulation.simulation import (
+    Simulation,
+    SimulationStatusEnum,
+    SimulationOutcomeEnum,
+)
+from app.models.simulation.simulation_event import (
+    SimulationEvent,
+    SimulationEventTypeEnum,
+)
+from app.models.simulation.simulation_message import (
+    SimulationMessage,
+    SimulationMessageRoleEnum,
+)
+from app.simulation import load_test
+from app.simulation.schemas.load_test import LoadTestConfig, PersonaScript
+from app.simulation.utils.load_profile import parse_load_profile
+from app.simulation.utils.webhook import ConversationReplyDispatcher
+
+
+class FakePatternPubSub:
+    def __init__(self):
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    def publish(self, conversation_id, payload: dict) -> None:
+        self.messages.put_nowait(
+            {
+                "type": "pmessage",
+                "pattern": "ws:conversation:*",
+                "channel": f"ws:conversation:{conversation_id}",
+                "data": json.dumps({"type": "new_message", "payload": payload}),
+            }
+        )
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+
+class FakeSession:
+    def __init__(self):
+        self.added = []
+        self.commits = 0
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def add_all(self, objs):
+        self.added.extend(objs)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest_asyncio.fixture(scope="function")
+async def dispatcher():
+    reply_dispatcher = ConversationReplyDispatcher()
+    pubsub = FakePatternPubSub()
+    reply_dispatcher._pubsub = pubsub
+    reply_dispatcher._reader_task = asyncio.create_task(reply_dispatcher._read())
+    reply_dispatcher.fake = pubsub
+    yield reply_dispatcher
+    reply_dispatcher._reader_task.cancel()
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    created = []
+
+    def session_factory():
+        created.append(FakeSession())
+        return created[-1]
+
+    monkeypatch.setattr(load_test, "AsyncSessionLocal", session_factory)
+    return created
+
+
+def _runner(**config) -> load_test.LoadTestRunner:
+    return load_test.LoadTestRunner(
+        account=SimpleNamespace(id=uuid.uuid4(), simulation_inbox_id=uuid.uuid4()),
+        config=LoadTestConfig(stages=parse_load_profile("0:1,10:1"), **config),
+        scripts=[],
+        conversation_ids=[],
+        run_id=uuid.uuid4(),
+        profile_id=uuid.uuid4(),
+    )
+
+
+def _result(error=None, turns=1) -> dict:
+    return {
+        "arrival": 0,
+        "arrival_offset_seconds": 1.0,
+        "target_rate": 1.0,
+        "script": PersonaScript(persona_id=uuid.uuid4(), source="cached", utterances=["oi"]),
+        "turns": [
+            {
+                "turn": turn,
+                "offset": float(turn),
+                "latency_ms": 850.0,
+                "user": "Quanto custa?",
+                "assistant": "R$ 10",
+                "message_id": str(uuid.uuid4()),
+            }
+            for turn in range(1, turns + 1)
+        ],
+        "error": error,
+        "duration_seconds": 4.2,
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_dispatcher_routes_replies_to_registered_conversations_only(dispatcher):
+    mine, other = uuid.uuid4(), uuid.uuid4()
+    dispatcher.register(mine)
+
+    dispatcher.fake.publish(other, {"id": "x", "direction": "out", "content": "not mine"})
+    dispatcher.fake.publish(mine, {"id": "1", "direction": "in", "content": "oi"})
+    dispatcher.fake.publish(mine, {"id": "2", "direction": "out", "content": "Olá!"})
+    reply = await dispatcher.wait_for_reply(mine, timeout=1.0, settle_seconds=0.05)
+
+    assert reply["id"] == "2" and reply["content"] == "Olá!"
+    assert str(other) not in dispatcher._queues
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_dispatcher_discards_and_stops_buffering_after_unregister(dispatcher):
+    conversation_id = uuid.uuid4()
+    dispatcher.register(conversation_id)
+    dispatcher.fake.publish(conversation_id, {"id": "1", "direction": "out", "content": "late"})
+    await asyncio.sleep(0.01)
+
+    dispatcher.discard_pending(conversation_id)
+    assert await dispatcher.wait_for_reply(conversation_id, timeout=0.05) is None
+
+    dispatcher.unregister(conversation_id)
+    dispatcher.fake.publish(conversation_id, {"id": "2", "direction": "out", "content": "x"})
+    await asyncio.sleep(0.01)
+    assert str(conversation_id) not in dispatcher._queues
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_write_results_records_turns_latencies_and_errors(sessions):
+    runner = _runner()
+
+    await runner._write_results(
+        [_result(turns=2), _result(error={"kind": "timeout", "turn": 2, "offset": 3.0})]
+    )
+
+    [session] = sessions
+    assert session.commits == 1
+    simulations = [o for o in session.added if isinstance(o, Simulation)]
+    messages = [o for o in session.added if isinstance(o, SimulationMessage)]
+    events = [o for o in session.added if isinstance(o, SimulationEvent)]
+
+    completed, timed_out = simulations
+    assert completed.status == SimulationStatusEnum.COMPLETED and completed.outcome is None
+    assert timed_out.status == SimulationStatusEnum.TIMEOUT
+    assert timed_out.outcome == SimulationOutcomeEnum.TIMEOUT
+    assert timed_out.error_message == "timeout"
+    metrics = completed.evaluation_metrics["load_test"]
+    assert metrics["run_id"] == str(runner.run_id)
+    assert metrics["stages"] == [[0.0, 1.0], [10.0, 1.0]]
+    assert metrics["turns"] == [
+        {"offset": 1.0, "latency_ms": 850.0},
+        {"offset": 2.0, "latency_ms": 850.0},
+    ]
+
+    assert len(messages) == 6  # User + assistant per answered turn
+    assert {m.role for m in messages} == {
+        SimulationMessageRoleEnum.USER,
+        SimulationMessageRoleEnum.ASSISTANT,
+    }
+    assert [e.event_type for e in events].count(
+        SimulationEventTypeEnum.AI_RESPONSE_RECEIVED
+    ) == 3
+    [error_event] = [
+        e for e in events if e.event_type == SimulationEventTypeEnum.SIMULATION_ENGINE_ERROR
+    ]
+    assert error_event.simulation_id == timed_out.id
+    assert error_event.details["kind"] == "timeout"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_write_loop_batches_results_until_the_end_marker(sessions, monkeypatch):
+    monkeypatch.setattr(load_test, "RESULT_WRITE_BATCH", 2)
+    runner = _runner()
+    for _ in range(3):
+        runner._results.put_nowait(_result())
+    runner._results.put_nowait(
+        _result(error={"kind": "dropped", "turn": 1, "offset": 0.5}, turns=0)
+    )
+    runner._results.put_nowait(None)
+
+    await runner._write_loop()
+
+    assert len(sessions) == 2  # Two batches of two, one transaction each
+    simulations = [
+        o for s in sessions for o in s.added if isinstance(o, Simulation)
+    ]
+    assert len(simulations) == 4
+    assert simulations[-1].status == SimulationStatusEnum.FAILED
+    assert simulations[-1].outcome == SimulationOutcomeEnum.SIMULATION_ERROR
+    assert runner.write_failures == 0
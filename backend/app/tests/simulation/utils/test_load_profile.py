@@ -0,0 +1,65 @@
+# backend/app/tests/simulation/utils/test_load_profile.py
+
+import pytest
+
+from app.simulation.utils.load_profile import (
+    arrival_offsets,
+    parse_load_profile,
+    rate_at,
+    summarize_load_metrics,
+)
+
+
+@pytest.mark.unit
+def test_constant_rate_spaces_arrivals_evenly():
+    offsets = arrival_offsets(parse_load_profile("0:2,5:2"))
+
+    assert offsets == pytest.approx([0.5 * k for k in range(1, 11)])
+
+
+@pytest.mark.unit
+def test_linear_ramp_follows_the_integral_of_the_rate():
+    stages = parse_load_profile("10:10,10:0")
+    offsets = arrival_offsets(stages)
+
+    # 0 -> 10/s over 10s is 50 arrivals, then 50 more ramping back down
+    assert len(offsets) == 100
+    assert offsets[0] == pytest.approx(2**0.5)  # N(t) = t^2 / 2
+    assert offsets[49] == pytest.approx(10.0)
+    assert offsets[-1] == pytest.approx(20.0)
+    assert offsets == sorted(offsets)
+    assert rate_at(stages, 5) == pytest.approx(5.0)
+    assert rate_at(stages, 15) == pytest.approx(5.0)
+
+
+@pytest.mark.unit
+def test_parse_load_profile_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_load_profile("10-5")
+    with pytest.raises(ValueError):
+        parse_load_profile(" , ")
+
+
+@pytest.mark.unit
+def test_summary_counts_failed_turns_and_finds_the_saturation_window():
+    stages = parse_load_profile("0:1,20:1,20:4")
+    runs = [
+        {"turns": [{"offset": 1.0, "latency_ms": 800.0}, {"offset": 5.0, "latency_ms": 900.0}]},
+        {"turns": [{"offset": 12.0, "latency_ms": 1000.0}]},
+        {
+            "turns": [{"offset": 25.0, "latency_ms": 4000.0}],
+            "error": {"kind": "timeout", "turn": 2, "offset": 31.0},
+        },
+        {"turns": [], "error": {"kind": "dropped", "turn": 1, "offset": 33.0}},
+    ]
+
+    summary = summarize_load_metrics(runs, stages, window_seconds=10, slo_p95_ms=2000)
+
+    assert summary["turns_attempted"] == 6
+    assert summary["turns_answered"] == 4
+    assert summary["error_rate"] == pytest.approx(2 / 6, abs=1e-4)
+    assert summary["errors"] == {"timeout": 1, "dropped": 1}
+    assert summary["latency_ms"]["max"] == 4000.0
+    assert [w["start_seconds"] for w in summary["windows"]] == [0, 10, 20, 30]
+    assert summary["saturation"]["start_seconds"] == 20  # p95 4000ms > SLO
+    assert summary["windows"][3]["error_rate"] == 1.0
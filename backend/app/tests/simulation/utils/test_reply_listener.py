@@ -0,0 +1,86 @@
+# backend/app/tests/simulation/utils/test_reply_listener.py
+
+import asyncio
+import json
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from app.simulation.utils.webhook import ConversationReplyListener
+
+
+class FakePubSub:
+    """Stands in for redis' PubSub: yields whatever the test publishes."""
+
+    def __init__(self):
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    def publish(self, payload: dict, event_type: str = "new_message") -> None:
+        self.messages.put_nowait(
+            {"type": "message", "data": json.dumps({"type": event_type, "payload": payload})}
+        )
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def listener():
+    reply_listener = ConversationReplyListener(uuid.uuid4())
+    pubsub = FakePubSub()
+    reply_listener._pubsub = pubsub
+    reply_listener._reader_task = asyncio.create_task(reply_listener._read())
+    reply_listener.fake = pubsub
+    yield reply_listener
+    reply_listener._reader_task.cancel()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_messages_within_the_settle_window_form_one_reply(listener):
+    listener.fake.publish({"id": "1", "direction": "in", "content": "oi"})  # Persona echo
+    listener.fake.publish({"id": "2", "direction": "out", "content": "Olá!"})
+    listener.fake.publish({"id": "3", "direction": "out", "content": "Como posso ajudar?"})
+
+    reply = await listener.wait_for_reply(timeout=1.0, settle_seconds=0.05)
+
+    assert reply["id"] == "3"
+    assert reply["content"] == "Olá!\nComo posso ajudar?"
+    assert isinstance(reply["received_at"], float)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_message_after_the_settle_window_is_the_next_reply(listener):
+    listener.fake.publish({"id": "1", "direction": "out", "content": "first"})
+    first = await listener.wait_for_reply(timeout=1.0, settle_seconds=0.05)
+    listener.fake.publish({"id": "2", "direction": "out", "content": "second"})
+    second = await listener.wait_for_reply(timeout=1.0, settle_seconds=0.05)
+
+    assert first["content"] == "first"
+    assert second["content"] == "second"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_wait_for_reply_times_out_without_ai_messages(listener):
+    listener.fake.publish({"id": "1", "direction": "in", "content": "oi"})
+    listener.fake.publish({"id": "2", "direction": "out"}, event_type="conversation_updated")
+
+    assert await listener.wait_for_reply(timeout=0.1, settle_seconds=0.05) is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_discard_pending_drops_late_replies(listener):
+    listener.fake.publish({"id": "1", "direction": "out", "content": "late reply"})
+    await asyncio.sleep(0.01)  # Let the reader queue it
+
+    listener.discard_pending()
+    listener.fake.publish({"id": "2", "direction": "out", "content": "fresh reply"})
+    reply = await listener.wait_for_reply(timeout=1.0, settle_seconds=0.05)
+
+    assert reply["id"] == "2"
+    assert reply["content"] == "fresh reply"
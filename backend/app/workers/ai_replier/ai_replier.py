@@ -34,15 +34,13 @@ except ImportError:
 try:
     from langchain_openai import AzureChatOpenAI
     from langchain_core.language_models import BaseChatModel
-    from app.core.embedding_utils import (
-        get_embedding,
-    )  # Assuming this is an async function
+    from app.core.embedding_utils import warmup_embeddings
 
     LANGCHAIN_AVAILABLE = True
 except ImportError:
     AzureChatOpenAI = None  # type: ignore
     BaseChatModel = None  # type: ignore
-    get_embedding = None  # type: ignore
+    warmup_embeddings = None  # type: ignore
     LANGCHAIN_AVAILABLE = False
     logger.warning(
         "ArqWorkerSettings: LangChain components unavailable. LLM/Embedding features limited."
@@ -70,6 +68,9 @@ except ImportError:
         pass
 
 
+from app.core.log import configure_logging
+from app.core.metrics import instrument_job, start_snapshot_writer, stop_snapshot_writer
+
 # --- Import Task Functions ---
 from app.workers.ai_replier.tasks.message_handler_task import handle_ai_reply_request
 from app.workers.ai_replier.tasks.follow_up_task import schedule_conversation_follow_up
@@ -77,6 +78,14 @@ from app.workers.ai_replier.tasks.billing_task import (
     report_usage_to_stripe_task,
     REPORT_USAGE_TASK_NAME,
 )
+from app.workers.ai_replier.tasks.checkpoint_task import (
+    prune_agent_checkpoints_task,
+    PRUNE_CHECKPOINTS_TASK_NAME,
+)
+from app.workers.ai_replier.tasks.message_partition_task import (
+    maintain_message_partitions_task,
+    MAINTAIN_MESSAGE_PARTITIONS_TASK_NAME,
+)
 
 # ==============================================================================
 # Arq Worker Configuration Callbacks
@@ -94,6 +103,7 @@ async def startup(ctx: dict):
     Args:
         ctx: The ARQ context dictionary to be populated.
     """
+    configure_logging("ai-replier")
     worker_id = os.getpid()
     logger.info(f"Unified ARQ Worker (PID: {worker_id}) starting up...")
     s = (
@@ -167,18 +177,13 @@ async def startup(ctx: dict):
             logger.info(f"Fast LLM client initialized: {s.FAST_LLM_MODEL_NAME}")
             logger.success("LLM clients initialized.")
 
-            if get_embedding and s.AZURE_OPENAI_EMBEDDING_MODEL:
-                logger.info("Testing embedding utility...")
-                # Assuming get_embedding is an async function
-                test_embedding = await get_embedding("test")
-                if test_embedding is not None:
-                    logger.success(
-                        f"Embedding utility test successful (vector dim: {len(test_embedding)})."
-                    )
-                else:
-                    logger.warning("Embedding utility test returned empty or None.")
-            else:
-                logger.warning("Embedding utility or config not available.")
+            # The embedding provider is built lazily on first use; warming it up
+            # here moves that cost (and a probe call) into startup instead.
+            if warmup_embeddings and s.EMBEDDING_WARMUP_ON_STARTUP:
+                logger.info("Warming up embedding provider...")
+                await warmup_embeddings(probe=True)
+            elif not warmup_embeddings:
+                logger.warning("Embedding utility not available.")
 
         except EnvironmentError as env_err:
             logger.error(
@@ -253,6 +258,9 @@ async def startup(ctx: dict):
         if "arq_pool" not in ctx:
             ctx["arq_pool"] = None
 
+    # Metrics are exposed by the keep-alive server (worker_http_server.py)
+    ctx["metrics_snapshot_task"] = start_snapshot_writer("ai-replier")
+
     logger.info(
         f"Unified ARQ Worker (PID: {worker_id}) startup complete. Context keys: {list(ctx.keys())}"
     )
@@ -277,6 +285,8 @@ async def shutdown(ctx: dict):
         except Exception as e:
             logger.exception(f"Error closing ARQ Redis pool from arq_manager: {e}")
 
+    await stop_snapshot_writer(ctx.get("metrics_snapshot_task"))
+
     logger.info(f"Unified ARQ Worker (PID: {worker_id}) shutdown complete.")
 
 
@@ -294,9 +304,11 @@ class WorkerSettings:
     """
 
     functions = [
-        handle_ai_reply_request,
-        schedule_conversation_follow_up,
+        instrument_job(handle_ai_reply_request),
+        instrument_job(schedule_conversation_follow_up),
         report_usage_to_stripe_task,
+        prune_agent_checkpoints_task,
+        maintain_message_partitions_task,
     ]
     """List of all task functions this worker can execute."""
 
@@ -339,6 +351,19 @@ class WorkerSettings:
             minute=59,
             run_at_startup=True,
         ),
+        cron(
+            prune_agent_checkpoints_task,
+            name=PRUNE_CHECKPOINTS_TASK_NAME,
+            hour={4},
+            minute=17,
+        ),
+        cron(
+            maintain_message_partitions_task,
+            name=MAINTAIN_MESSAGE_PARTITIONS_TASK_NAME,
+            hour={3},
+            minute=41,
+            run_at_startup=True,
+        ),
     ]
 
     logger.info(
@@ -0,0 +1,39 @@
+# backend/app/workers/ai_replier/tasks/checkpoint_task.py
+from typing import Optional
+from loguru import logger
+
+from app.database import AsyncSessionLocal
+from app.services.helper.checkpoint import prune_checkpoints
+from app.config import get_settings
+
+settings = get_settings()
+
+# Name of the task for the ARQ scheduler
+PRUNE_CHECKPOINTS_TASK_NAME = "prune_agent_checkpoints_task"
+
+
+async def prune_agent_checkpoints_task(ctx: dict, keep_last: Optional[int] = None):
+    """
+    ARQ task that keeps only the latest N LangGraph checkpoints per conversation
+    thread (CHECKPOINT_KEEP_LAST_PER_THREAD by default).
+
+    Args:
+        ctx: The ARQ context dictionary.
+        keep_last: Optional override of the number of checkpoints kept per thread.
+    """
+    task_id = ctx.get("job_id", "manual_run_prune_checkpoints")
+    log_prefix = f"[{PRUNE_CHECKPOINTS_TASK_NAME}:{task_id}]"
+    keep_last = keep_last or settings.CHECKPOINT_KEEP_LAST_PER_THREAD
+    logger.info(f"{log_prefix} Pruning checkpoints, keeping last {keep_last} per thread.")
+
+    db_session_factory = ctx.get("db_session_factory") or AsyncSessionLocal
+    async with db_session_factory() as db:
+        try:
+            totals = await prune_checkpoints(db, keep_last=keep_last)
+        except Exception as e:
+            await db.rollback()
+            logger.exception(f"{log_prefix} Failed to prune checkpoints: {e}")
+            raise
+
+    logger.info(f"{log_prefix} Checkpoint pruning finished: {totals}")
+    return totals
@@ -70,6 +70,69 @@ except ImportError as e:
 from app.services.repository import conversation as conversation_repo
 from app.models.conversation import ConversationStatusEnum
 from app.services.sales_agent.serializers import JsonOnlySerializer
+from app.services.sales_agent.follow_up_index import (
+    FollowUpIndex,
+    FollowUpIndexEntry,
+)
+
+
+async def _load_follow_up_entry_from_checkpoint(
+    conversation_id_str: str, log_prefix: str
+) -> Optional[FollowUpIndexEntry]:
+    """
+    Builds the follow-up entry from the latest checkpoint.
+
+    Only used for conversations the index has no entry for (jobs scheduled
+    before the index existed, or an expired/evicted key).
+
+    Args:
+        conversation_id_str: The conversation (thread) id.
+        log_prefix: Prefix for log messages.
+
+    Returns:
+        The entry, or None when there is no checkpoint for the conversation.
+    """
+    if not CHECKPOINTER_AVAILABLE:
+        logger.error(f"{log_prefix} Checkpointer unavailable for fallback lookup.")
+        return None
+
+    serializer = JsonOnlySerializer()
+    # Ensure DATABASE_URL is correctly formatted for AsyncPostgresSaver
+    db_conn_string_pg = str(settings.DATABASE_URL).replace(
+        "postgresql+asyncpg://", "postgresql://"
+    )
+    async with AsyncPostgresSaver.from_conn_string(
+        db_conn_string_pg, serde=serializer
+    ) as checkpointer:
+        checkpoint = await checkpointer.aget(
+            config={"configurable": {"thread_id": conversation_id_str}}
+        )
+
+    if not checkpoint:
+        logger.warning(
+            f"{log_prefix} No state checkpoint found for conversation. Aborting follow-up."
+        )
+        return None
+
+    current_convo_state: Dict[str, Any] = checkpoint.get("channel_values", {})
+    pending_trigger_data = current_convo_state.get("pending_follow_up_trigger")
+    pending_trigger: Optional[PendingFollowUpTrigger] = None
+    if pending_trigger_data:
+        try:
+            pending_trigger = PendingFollowUpTrigger.model_validate(
+                pending_trigger_data
+            )
+        except Exception as e:
+            logger.error(
+                f"{log_prefix} Failed to parse PendingFollowUpTrigger from state: {e}. Data: {pending_trigger_data}"
+            )
+
+    return FollowUpIndexEntry(
+        pending_trigger=pending_trigger,
+        attempt_count=current_convo_state.get("follow_up_attempt_count") or 0,
+        due_ts=pending_trigger.due_timestamp if pending_trigger else None,
+        last_agent_message_ts=current_convo_state.get("last_agent_message_timestamp"),
+    )
 
 
 async def schedule_conversation_follow_up(
@@ -87,8 +150,10 @@ async def schedule_conversation_follow_up(
     ARQ task to check if a scheduled follow-up is still valid and, if so,
     trigger the AI reply handler for a follow-up event.
 
-    This task is deferred and runs after a specified timeout. It checks
-    the conversation's state to prevent redundant or outdated follow-ups.
+    This task is deferred and runs after a specified timeout. It checks the
+    conversation's follow-up index entry (maintained by
+    `auto_follow_up_scheduler_hook`) to prevent redundant or outdated
+    follow-ups; the checkpoint is only read when the index has no entry.
 
     Args:
         ctx: The ARQ context, containing 'arq_pool' and 'db_session_factory'.
@@ -106,9 +171,9 @@ async def schedule_conversation_follow_up(
 
     logger.info(f"{log_prefix} Starting follow-up check.")
 
-    if not PROJECT_IMPORTS_AVAILABLE or not CHECKPOINTER_AVAILABLE:
+    if not PROJECT_IMPORTS_AVAILABLE:
         logger.error(
-            f"{log_prefix} Critical project or checkpointer imports missing. Cannot proceed."
+            f"{log_prefix} Critical project imports missing. Cannot proceed."
         )
         return f"Critical imports missing for follow-up on {conversation_id_str}"
 
@@ -124,123 +189,69 @@ async def schedule_conversation_follow_up(
         return f"ARQ pool missing for follow-up on {conversation_id_str}"
 
     try:
-        serializer = JsonOnlySerializer()
-        # Ensure DATABASE_URL is correctly formatted for AsyncPostgresSaver
-        db_conn_string_pg = str(settings.DATABASE_URL).replace(
-            "postgresql+asyncpg://", "postgresql://"
-        )
+        # --- 1. Common path: a single lookup in the follow-up index ---
+        follow_up_entry = await FollowUpIndex(arq_write_pool).get(conversation_id)
+        if follow_up_entry is None:
+            logger.info(
+                f"{log_prefix} No follow-up index entry. Falling back to the checkpoint."
+            )
+            follow_up_entry = await _load_follow_up_entry_from_checkpoint(
+                conversation_id_str, log_prefix
+            )
+            if follow_up_entry is None:
+                return f"No state checkpoint for {conversation_id_str}"
+
+        # --- 2. Staleness Check: cancelled by a reply or superseded by a newer turn ---
+        stale_reason = follow_up_entry.stale_reason(origin_agent_message_timestamp)
+        if stale_reason:
+            logger.info(
+                f"{log_prefix} Follow-up discarded ({stale_reason}). "
+                f"OriginTS: {origin_agent_message_timestamp}, "
+                f"LastAgentMsgTS: {follow_up_entry.last_agent_message_ts}, "
+                f"LastUserActivityTS: {follow_up_entry.last_user_activity_ts}."
+            )
+            return f"Follow-up stale ({stale_reason}) for {conversation_id_str}"
 
         async with AsyncSessionLocal() as db:
             conversation = await conversation_repo.find_conversation_by_id(
                 db=db, account_id=account_id, conversation_id=conversation_id
             )
             logger.debug(f"{log_prefix} Checking status of the conversation.")
-            if conversation.status != ConversationStatusEnum.BOT:
+            if not conversation or conversation.status != ConversationStatusEnum.BOT:
                 logger.debug(
                     f"{log_prefix} Converation is not on the BOT status. Aborting follow-up."
                 )
                 return
 
-        async with AsyncPostgresSaver.from_conn_string(
-            db_conn_string_pg, serde=serializer
-        ) as checkpointer:
-            logger.debug(
-                f"{log_prefix} AsyncPostgresSaver checkpointer context acquired."
-            )
-
-            config_load_state = {"configurable": {"thread_id": conversation_id_str}}
-            # Fetch the latest checkpoint for the conversation
-            # The checkpoint contains the full state, including 'values' which is the RichConversationState
-            checkpoint = await checkpointer.aget(config=config_load_state)
-
-            if not checkpoint or not checkpoint.values:
-                logger.warning(
-                    f"{log_prefix} No state checkpoint found for conversation. Aborting follow-up."
-                )
-                return f"No state checkpoint for {conversation_id_str}"
-
-            # The actual conversation state is within checkpoint.values
-            current_convo_state: Dict[str, Any] = checkpoint.get("channel_values", {})
-
-            pending_trigger_data_from_state: Optional[Dict[str, Any]] = (
-                current_convo_state.get("pending_follow_up_trigger")
-            )
-
-            if not pending_trigger_data_from_state:
-                logger.info(
-                    f"{log_prefix} No 'pending_follow_up_trigger' found in current state. Follow-up might have been cancelled or already processed. Discarding task."
-                )
-                return f"Follow-up trigger not found in state for {conversation_id_str}"
-
-            # --- 2. Validate and Parse the Trigger Data ---
-            try:
-                # Assuming pending_trigger_data_from_state is a dict from JSON
-                current_pending_trigger = PendingFollowUpTrigger.model_validate(
-                    pending_trigger_data_from_state
-                )
-            except Exception as e:
-                logger.error(
-                    f"{log_prefix} Failed to parse PendingFollowUpTrigger from state: {e}. Data: {pending_trigger_data_from_state}"
-                )
-                return f"Malformed follow-up trigger data for {conversation_id_str}"
-
-            # if current_pending_trigger.due_timestamp > (
-            #     time.time() + 60
-            # ):  # Example: if it's more than 60s in the future, something is wrong with scheduling
-            #     logger.warning(
-            #         f"{log_prefix} Follow-up trigger found, but its due_timestamp ({current_pending_trigger.due_timestamp}) is significantly in the future. Current time: {time.time()}. This might be an issue with ARQ scheduling or a stale trigger. Discarding."
-            #     )
-            #     return f"Follow-up trigger due time mismatch for {conversation_id_str}"
-
-            # --- 4. Staleness Check: Has the conversation progressed significantly since this follow-up was scheduled? ---
-            last_agent_msg_ts_in_state: Optional[float] = current_convo_state.get(
-                "last_agent_message_timestamp"
-            )
-
-            # The origin_agent_message_timestamp is the timestamp of the agent message
-            # that *led to this specific PendingFollowUpTrigger being created*.
-            if (
-                last_agent_msg_ts_in_state is not None
-                and origin_agent_message_timestamp
-                is not None  # Ensure origin_ts is not None
-                and last_agent_msg_ts_in_state > origin_agent_message_timestamp
-            ):
-                logger.info(
-                    f"{log_prefix} Conversation has progressed since this follow-up was scheduled. "
-                    f"(State's LastAgentMsgTS: {last_agent_msg_ts_in_state} > Follow-up's OriginTS: {origin_agent_message_timestamp}). "
-                    f"This follow-up is stale. Discarding task."
-                )
-                return (
-                    f"Follow-up stale (timestamp comparison) for {conversation_id_str}"
-                )
-            # --- All checks passed, prepare to trigger the main AI handler ---
-            follow_up_reason_for_handler = current_pending_trigger.context.get(
-                "reason", "your previous discussion"
-            )
-            # The follow_up_attempt_count_for_this_job is the attempt number of the PFT being processed.
-            # This was set when this PFT was scheduled.
-
-            payload_for_ai_replier = {
-                "account_id": account_id,
-                "conversation_id": conversation_id,
-                "bot_agent_id": bot_agent_id,  # The bot_agent_id at the time of original scheduling
-                "event_type": "follow_up_timeout",
-                "follow_up_attempt_count": follow_up_attempt_count_for_this_job,
-                "follow_up_reason_context": follow_up_reason_for_handler,  # Pass the reason
-            }
-
-            logger.info(
-                f"{log_prefix} Follow-up validation passed. Enqueuing 'handle_ai_reply_request'."
-            )
-            await arq_write_pool.enqueue_job(
-                "handle_ai_reply_request",
-                _queue_name=settings.AI_REPLY_QUEUE_NAME,
-                **payload_for_ai_replier,
-            )
-            logger.info(
-                f"{log_prefix} Successfully enqueued 'handle_ai_reply_request' for follow-up."
-            )
-            return f"Follow-up notification sent for {conversation_id_str}"
+        # --- All checks passed, prepare to trigger the main AI handler ---
+        current_pending_trigger = follow_up_entry.pending_trigger
+        follow_up_reason_for_handler = (current_pending_trigger.context or {}).get(
+            "reason", "your previous discussion"
+        )
+        # The follow_up_attempt_count_for_this_job is the attempt number of the PFT being processed.
+        # This was set when this PFT was scheduled.
+
+        payload_for_ai_replier = {
+            "account_id": account_id,
+            "conversation_id": conversation_id,
+            "bot_agent_id": bot_agent_id,  # The bot_agent_id at the time of original scheduling
+            "event_type": "follow_up_timeout",
+            "follow_up_attempt_count": follow_up_attempt_count_for_this_job,
+            "follow_up_reason_context": follow_up_reason_for_handler,  # Pass the reason
+        }
+
+        logger.info(
+            f"{log_prefix} Follow-up validation passed. Enqueuing 'handle_ai_reply_request'."
+        )
+        await arq_write_pool.enqueue_job(
+            "handle_ai_reply_request",
+            _queue_name=settings.AI_REPLY_QUEUE_NAME,
+            **payload_for_ai_replier,
+        )
+        logger.info(
+            f"{log_prefix} Successfully enqueued 'handle_ai_reply_request' for follow-up."
+        )
+        return f"Follow-up notification sent for {conversation_id_str}"
 
     except Exception as e:
         logger.exception(f"{log_prefix} Error processing follow-up: {e}")
@@ -3,11 +3,10 @@
 import os
 import asyncio
 import random
-import json
 import time
 from uuid import UUID, uuid4
 from loguru import logger
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set
 from datetime import datetime, timezone, timedelta
 
 # --- Third-Party Imports ---
@@ -23,6 +22,28 @@ try:
         TriggerEventType,
     )
     from app.services.sales_agent.serializers import JsonOnlySerializer
+    from app.services.sales_agent.context_cache import (
+        AGENT_CONFIG_CACHE_KIND,
+        PROFILE_CACHE_KIND,
+        agent_context_cache,
+        build_version_stamp,
+        resolve_company_profile,
+        resolve_agent_config,
+    )
+    from app.services.sales_agent.agent_hooks import (
+        STAGE_ANALYZER_LLM_CONFIG_KEY,
+        STAGE_ANALYZER_HEURISTIC_SKIP_CONFIG_KEY,
+        STAGE_ANALYZER_CONCURRENT_CONFIG_KEY,
+    )
+    from app.services.sales_agent.follow_up_index import (
+        FollowUpIndex,
+        FOLLOW_UP_INDEX_CONFIG_KEY,
+    )
+    from app.services.sales_agent.streaming import (
+        REPLY_CHUNK_CALLBACK_CONFIG_KEY,
+        REPLY_CHUNK_MIN_CHARS_CONFIG_KEY,
+        STREAMED_REPLY_FLAG,
+    )
 
     GRAPH_AVAILABLE = True
     logger.info("MessageHandlerTask: Successfully imported LangGraph components.")
@@ -146,6 +167,7 @@ try:
     from app.services.repository import conversation as conversation_repo
     from app.services.repository import company_profile as profile_repo
     from app.services.repository import bot_agent as bot_agent_repo
+    from app.services.repository import message_dispatch as dispatch_repo
 
     REPO_AVAILABLE = True
     logger.info("MessageHandlerTask: Successfully imported repository components.")
@@ -160,8 +182,7 @@ try:
     from app.api.schemas.message import MessageCreate
     from app.api.schemas.company_profile import CompanyProfileSchema
     from app.api.schemas.bot_agent import BotAgentRead
-    from app.models.account import Account
-    from app.models.usage_event import UsageEvent
+    from app.services.billing.usage_metering import usage_meter
 
     MODELS_SCHEMAS_AVAILABLE = True
     logger.info(
@@ -173,12 +194,6 @@ except ImportError:
         "MessageHandlerTask: Models/Schemas unavailable. Data handling impaired."
     )
 
-    class Account:
-        pass  # type: ignore
-
-    class UsageEvent:
-        pass  # type: ignore
-
     class Message:
         pass  # type: ignore
 
@@ -201,13 +216,13 @@ except ImportError:
         id: Optional[UUID] = None  # type: ignore
 
 
-# Queue & WebSocket Services
-from app.services.queue.redis_queue import (
-    RedisQueue,
-)  # Assuming this is a simple wrapper
+# WebSocket Services
 from app.services.helper.websocket import publish_to_conversation_ws
 from app.services.helper.checkpoint import reset_checkpoint
 
+from app.core.log import payload
+from app.core.metrics import observe_pipeline_stage
+from app.workers.ai_replier.utils.turn_metrics import TurnMetricsCallback
 from app.workers.ai_replier.utils.circuit_breaker import (
     check_and_update_ping_pong_circuit_breaker,
     PingPongLimitExceeded,
@@ -236,7 +251,9 @@ async def _process_one_message(
     Creates, stores, and dispatches a single AI-generated message.
 
     Handles DB record creation, WebSocket publishing for simulations,
-    and enqueuing to the response sender for real messages.
+    and an outbox dispatch for real messages (published to the response
+    sender by the outbox relay once the caller commits). Usage is not
+    metered here: the caller meters with `_meter_ai_replies` after its commit.
 
     Args:
         db: The active SQLAlchemy async session.
@@ -246,6 +263,9 @@ async def _process_one_message(
         final_state: The final state from the LangGraph execution.
         conversation: The conversation object.
         ai_response_text: The content of the AI's response.
+
+    Returns:
+        The created Message.
     """
     log_prefix = f"[MessageHandlerTask:{task_id}|MsgProc|Conv:{conversation.id}|Acc:{account_id}]"
     logger.debug(
@@ -280,6 +300,7 @@ async def _process_one_message(
             "final_sales_stage": final_state.get("current_sales_stage", ""),
             "intent_classified": final_state.get("intent", ""),
             "bot_agent_id": bot_agent_id_str,
+            "turn_timings": final_state.get("turn_timings") or {},
         },
         is_simulation=conversation.is_simulation,
     )
@@ -290,35 +311,6 @@ async def _process_one_message(
         f"{log_prefix} Created outgoing AI message record (ID: {ai_message.id})."
     )
 
-    if not conversation.is_simulation:
-        account_for_usage = await db.get(Account, account_id)
-
-        if account_for_usage and account_for_usage.stripe_customer_id:
-            usage_event = UsageEvent(
-                account_id=account_id,
-                stripe_customer_id=account_for_usage.stripe_customer_id,
-                meter_event_name=METER_EVENT_NAME_AI_MESSAGE,
-                quantity=1,
-                event_timestamp=current_utc_time,
-            )
-            db.add(usage_event)
-            logger.info(
-                f"{log_prefix} UsageEvent for 1 '{METER_EVENT_NAME_AI_MESSAGE}' prepared for DB (Account: {account_id})."
-            )
-        elif not account_for_usage:
-            logger.error(
-                f"{log_prefix} Account {account_id} not found. Cannot determine stripe_customer_id for usage event."
-            )
-        else:
-            logger.warning(
-                f"{log_prefix} Account {account_id} does not have a stripe_customer_id. "
-                f"Usage for '{METER_EVENT_NAME_AI_MESSAGE}' will not be reported to Stripe."
-            )
-    else:
-        logger.info(
-            f"{log_prefix} Skipping usage event logging for simulation message."
-        )
-
     if conversation.is_simulation:
         logger.info(
             f"{log_prefix} Publishing simulation message {ai_message.id} via WebSocket."
@@ -340,11 +332,48 @@ async def _process_one_message(
                 f"{log_prefix} Failed to publish simulation message {ai_message.id} to WS: {ws_err}"
             )
     else:
-        sender_payload = {"message_id": str(ai_message.id)}
-        output_queue = RedisQueue(queue_name=settings.RESPONSE_SENDER_QUEUE_NAME)
-        await output_queue.enqueue(sender_payload)
+        await dispatch_repo.add_message_dispatch(
+            db, ai_message, queue_name=settings.RESPONSE_SENDER_QUEUE_NAME
+        )
         logger.info(
-            f"{log_prefix} Enqueued message {ai_message.id} to '{settings.RESPONSE_SENDER_QUEUE_NAME}'."
+            f"{log_prefix} Dispatch for message {ai_message.id} recorded, sent to "
+            f"'{settings.RESPONSE_SENDER_QUEUE_NAME}' on commit."
+        )
+    return ai_message
+
+
+async def _meter_ai_replies(
+    db: AsyncSession,
+    account_id: UUID,
+    conversation: Conversation,
+    quantity: int,
+    log_prefix: str,
+) -> None:
+    """
+    Counts `quantity` billable AI replies once the messages are committed.
+
+    Called only after the commit that stores them, so a rolled-back or retried
+    turn never bills replies that were not sent. If Redis is down the usage is
+    added as a UsageEvent row, committed here. Errors are logged, not raised:
+    the replies are already committed, and an ARQ retry would duplicate them.
+    """
+    if quantity <= 0:
+        return
+    if conversation.is_simulation:
+        logger.info(f"{log_prefix} Skipping usage metering for simulation messages.")
+        return
+    try:
+        # One Redis increment; aggregated and reported by the billing task.
+        if await usage_meter.record(
+            db, account_id, METER_EVENT_NAME_AI_MESSAGE, quantity=quantity
+        ):
+            logger.info(
+                f"{log_prefix} Counted {quantity} '{METER_EVENT_NAME_AI_MESSAGE}' (Account: {account_id})."
+            )
+        await db.commit()  # Persists the fallback row, if one was written
+    except Exception as e:
+        logger.exception(
+            f"{log_prefix} Failed to meter {quantity} AI replies for account {account_id}: {e}"
         )
 
 
@@ -442,6 +471,11 @@ async def handle_ai_reply_request(
 
     # --- 3. Main Processing Block ---
     final_state: Optional[AgentState] = None
+    follow_up_index = FollowUpIndex(arq_pool)
+    # AI messages with at least one chunk committed (and so sent) during the run
+    streamed_reply_ids: Set[str] = set()
+    # Context cache entries held for the duration of the turn
+    pinned_context_keys: List[Any] = []
     try:
         serializer = JsonOnlySerializer()
 
@@ -465,13 +499,19 @@ async def handle_ai_reply_request(
                 )
 
                 agent_config_db: Optional[BotAgentRead] = None
+                agent_config_version: Optional[str] = None
                 customer_phone: Optional[str] = None
                 if conversation and conversation.inbox_id:
                     agent_data_raw = await bot_agent_repo.get_bot_agent_for_inbox(
                         db, inbox_id=conversation.inbox_id, account_id=account_id
                     )
                     if agent_data_raw:
-                        agent_config_db = BotAgentRead.model_validate(agent_data_raw)
+                        agent_config_version = build_version_stamp(agent_data_raw)
+                        agent_config_db = resolve_agent_config(
+                            agent_data_raw.id,
+                            agent_config_version,
+                            db_bot_agent=agent_data_raw,
+                        )
 
                     customer_phone = conversation.contact_inbox.contact.phone_number
 
@@ -491,6 +531,31 @@ async def handle_ai_reply_request(
                     )
                     return f"No BotAgent for inbox {conversation.inbox_id}"
 
+                # The graph state only carries version stamps; nodes resolve the
+                # profile and agent config from the in-worker cache.
+                profile_version = build_version_stamp(profile_db)
+                company_profile = resolve_company_profile(
+                    account_id, profile_version, db_profile=profile_db
+                )
+                # Pinned so an LRU eviction during the run cannot turn the
+                # nodes' `state.company_profile` / `state.agent_config` into misses.
+                pinned_context_keys.extend(
+                    [
+                        agent_context_cache.pin(
+                            PROFILE_CACHE_KIND,
+                            account_id,
+                            profile_version,
+                            company_profile,
+                        ),
+                        agent_context_cache.pin(
+                            AGENT_CONFIG_CACHE_KIND,
+                            agent_config_db.id,
+                            agent_config_version,
+                            agent_config_db,
+                        ),
+                    ]
+                )
+
                 try:
                     await check_and_update_ping_pong_circuit_breaker(
                         db=db, conversation=conversation, log_prefix=log_prefix
@@ -507,29 +572,18 @@ async def handle_ai_reply_request(
                         conversation,
                         "Parece que estamos com dificuldades para nos comunicar. Por favor, aguarde um momento enquanto eu conecto você com um de nossos especialistas para continuar a conversa.",
                     )
+                    await db.commit()  # Message and its dispatch
+                    await _meter_ai_replies(db, account_id, conversation, 1, log_prefix)
                     return "Circuit breaker tripped. AI reply aborted."
 
                 compiled_reply_graph = create_react_sales_agent_graph(
                     model=llm_primary_client,
-                    company_profile=profile_db,
+                    company_profile=company_profile,
                     bot_agent=agent_config_db,
                     checkpointer=checkpointer,
                 )
                 logger.debug(f"{log_prefix} Reply graph compiled with checkpointer.")
 
-                graph_config = {
-                    "configurable": {
-                        "thread_id": str(conversation_id),
-                        "llm_primary_instance": llm_primary_client,
-                        "llm_fast_instance": llm_fast_client,
-                        "db_session_factory": db_session_factory,  # Pass the factory
-                    }
-                }
-
-                logger.debug(
-                    f"{log_prefix} Graph config prepared with thread_id: {conversation_id}"
-                )
-
                 current_user_input_content: Optional[str] = None
                 current_input_updates: Optional[Dict[str, Any]] = {}
                 trigger_event_for_graph: TriggerEventType = "user_message"
@@ -624,6 +678,15 @@ async def handle_ai_reply_request(
                     current_input_updates["pending_follow_up_trigger"] = None
                     current_input_updates["follow_up_attempt_count"] = 0
 
+                    # Cancels any scheduled follow-up right away, even while
+                    # this turn is still running.
+                    try:
+                        await follow_up_index.record_user_activity(conversation_id)
+                    except Exception as e_index:
+                        logger.warning(
+                            f"{log_prefix} Failed to record user activity in follow-up index: {e_index}"
+                        )
+
                     if (
                         current_user_input_content.lower().strip()
                         == settings.RESET_MESSAGE_TRIGGER.lower().strip()
@@ -651,6 +714,9 @@ async def handle_ai_reply_request(
                         logger.info(
                             f"{log_prefix} Conversation reset processed and committed."
                         )
+                        await _meter_ai_replies(
+                            db, account_id, conversation, 1, log_prefix
+                        )
                         return "Conversation reset processed"
                 else:
                     # This case should have been caught by the initial log_prefix logic
@@ -659,36 +725,75 @@ async def handle_ai_reply_request(
                     )
                     return "Invalid trigger: no user message or follow-up event"
 
-                profile_dict = CompanyProfileSchema.model_validate(
-                    profile_db
-                ).model_dump(mode="json")
-                agent_config_dict = agent_config_db.model_dump(mode="json")
-
                 current_input: AgentState = {
                     "account_id": str(account_id),
                     "conversation_id": str(conversation_id),
                     "bot_agent_id": str(agent_config_db.id),
                     "customer_phone": customer_phone,
-                    "company_profile": profile_dict,
-                    "agent_config": agent_config_dict,
+                    "company_profile_version": profile_version,
+                    "agent_config_version": agent_config_version,
                     "trigger_event": trigger_event_for_graph,
                     "last_processing_error": None,
                     "remaining_steps": RemainingSteps(),
+                    "turn_timings": {},  # empty update resets the previous turn
                     **current_input_updates,
                 }
 
                 logger.trace(
-                    f"{log_prefix} Current graph input prepared: {json.dumps(current_input, indent=2, default=str)}"
+                    "{} Current graph input prepared: {}",
+                    log_prefix,
+                    payload(current_input),
                 )
 
+                turn_metrics = TurnMetricsCallback()
                 graph_config = {
+                    "callbacks": [turn_metrics],
                     "configurable": {
                         "thread_id": str(conversation_id),
                         "llm_primary_instance": llm_primary_client,
                         "llm_fast_instance": llm_fast_client,
                         "db_session_factory": db_session_factory,  # Pass the factory
+                        STAGE_ANALYZER_LLM_CONFIG_KEY: settings.STAGE_ANALYZER_LLM,
+                        STAGE_ANALYZER_HEURISTIC_SKIP_CONFIG_KEY: settings.STAGE_ANALYZER_HEURISTIC_SKIP,
+                        STAGE_ANALYZER_CONCURRENT_CONFIG_KEY: settings.STAGE_ANALYZER_CONCURRENT,
+                        FOLLOW_UP_INDEX_CONFIG_KEY: follow_up_index,
                     }
                 }
+
+                if settings.AI_REPLY_STREAMING_ENABLED:
+                    async def _dispatch_reply_chunk(
+                        ai_message_id: str, chunk_text: str
+                    ) -> None:
+                        # Each chunk is committed right away so the response
+                        # sender can pick it up while the graph keeps running.
+                        await _process_one_message(
+                            db=db,
+                            account_id=account_id,
+                            task_id=task_id,
+                            agent_config_db=agent_config_db,
+                            final_state={},
+                            conversation=conversation,
+                            ai_response_text=chunk_text,
+                        )
+                        await db.commit()
+                        # A streamed reply is one AIMessage, billed once
+                        # however many chunks it is sent in.
+                        if ai_message_id not in streamed_reply_ids:
+                            streamed_reply_ids.add(ai_message_id)
+                            await _meter_ai_replies(
+                                db, account_id, conversation, 1, log_prefix
+                            )
+                        logger.debug(
+                            f"{log_prefix} Dispatched streamed chunk of AI message {ai_message_id}."
+                        )
+
+                    graph_config["configurable"].update(
+                        {
+                            REPLY_CHUNK_CALLBACK_CONFIG_KEY: _dispatch_reply_chunk,
+                            REPLY_CHUNK_MIN_CHARS_CONFIG_KEY: settings.AI_REPLY_STREAM_MIN_CHUNK_CHARS,
+                        }
+                    )
+
                 logger.debug(
                     f"{log_prefix} Graph config prepared with thread_id: {conversation_id}"
                 )
@@ -714,17 +819,38 @@ async def handle_ai_reply_request(
                 logger.info(f"{log_prefix} Invoking reply graph...")
                 # The graph's `stream` or `invoke` will internally use the checkpointer
                 # to load the full state for `thread_id`, merge `current_input`, run, and save.
+                graph_started_at = time.perf_counter()
                 final_state_values = await compiled_reply_graph.ainvoke(
                     current_input, config={**graph_config, "recursion_limit": 50}
                 )
+                graph_elapsed_ms = (time.perf_counter() - graph_started_at) * 1000
 
                 final_state = AgentState(**final_state_values)
+                final_state.turn_timings = {
+                    **final_state.turn_timings,
+                    "graph_ms": graph_elapsed_ms,
+                }
+
+                token_usage = turn_metrics.observe_turn(final_state.turn_timings)
 
                 logger.info(f"{log_prefix} Reply graph execution finished.")
+                logger.info(
+                    f"{log_prefix} Turn timings (ms): "
+                    + ", ".join(
+                        f"{name}={value:.1f}"
+                        for name, value in final_state.turn_timings.items()
+                    )
+                )
+                logger.info(
+                    f"{log_prefix} Turn usage: {token_usage['llm_calls']} LLM calls, "
+                    f"{token_usage['input_tokens']} input / {token_usage['output_tokens']} output tokens."
+                )
                 logger.trace(
-                    f"{log_prefix} Final graph state: {json.dumps(final_state, indent=2, default=str)}"
+                    "{} Final graph state: {}", log_prefix, payload(final_state)
                 )
 
+                # Billed only once the commit below stores them.
+                replies_to_meter = 0
                 graph_error = final_state.last_processing_error
                 final_messages_lc_from_state = final_state.messages
 
@@ -740,6 +866,9 @@ async def handle_ai_reply_request(
                             )  # it is not a tool call
                             and msg_lc.id
                         ):
+                            if msg_lc.additional_kwargs.get(STREAMED_REPLY_FLAG):
+                                # Already delivered chunk by chunk during the run.
+                                continue
                             if (
                                 str(msg_lc.id)
                                 not in previous_ai_message_ids_in_checkpoint
@@ -770,6 +899,7 @@ async def handle_ai_reply_request(
                             conversation,
                             "I encountered an issue processing your request. Please try again later.",
                         )
+                        replies_to_meter += 1
 
                 if not new_ai_messages_to_process and not graph_error:
                     logger.warning(
@@ -790,6 +920,7 @@ async def handle_ai_reply_request(
                                 final_state=final_state,  # Pass the whole state
                                 ai_response_text=str(ai_msg_lc.content),
                             )
+                            replies_to_meter += 1
                         else:
                             logger.warning(
                                 f"{log_prefix} New AI Message (ID: {ai_msg_lc.id}) has no content. Skipping."
@@ -875,11 +1006,23 @@ async def handle_ai_reply_request(
                     )
 
                 await db.commit()
+                observe_pipeline_stage("ai_replied")
                 logger.info(
                     f"{log_prefix} Database transaction committed successfully."
                 )
+                await _meter_ai_replies(
+                    db, account_id, conversation, replies_to_meter, log_prefix
+                )
 
     except Exception as e:
+        if streamed_reply_ids:
+            # Part of the reply already reached the customer: a retry would
+            # regenerate and send it again, so the turn ends here.
+            logger.exception(
+                f"{log_prefix} Error after {len(streamed_reply_ids)} streamed AI message(s) "
+                f"were sent; not retrying the turn: {e}"
+            )
+            return f"AI reply for conversation {conversation_id} partially sent before an error"
         logger.exception(
             f"{log_prefix} Unhandled error processing AI reply request: {e}"
         )
@@ -889,6 +1032,8 @@ async def handle_ai_reply_request(
         raise  # Re-raise to let ARQ handle it (e.g., move to dead-letter queue or retry)
 
     finally:
+        for key in pinned_context_keys:
+            agent_context_cache.unpin(key)
         logger.info(f"{log_prefix} Task finished.")
         # DB session is closed automatically by `async with db_session_factory() as db:`
         # Checkpointer is closed automatically by `async with AsyncPostgresSaver.from_conn_string(...) as checkpointer:`
@@ -0,0 +1,62 @@
+# backend/app/workers/ai_replier/tasks/message_partition_task.py
+from loguru import logger
+
+from app.database import AsyncSessionLocal
+from app.services.helper.message_partitions import (
+    archive_message_partitions,
+    ensure_message_partitions,
+)
+from app.config import get_settings
+
+settings = get_settings()
+
+# Name of the task for the ARQ scheduler
+MAINTAIN_MESSAGE_PARTITIONS_TASK_NAME = "maintain_message_partitions_task"
+
+
+def _upload_to_archive_bucket(path: str, object_name: str) -> None:
+    """Uploads an exported partition to MESSAGES_ARCHIVE_GCS_BUCKET_NAME."""
+    from app.services.cloud_storage import get_gcs_bucket
+
+    bucket = get_gcs_bucket(settings.MESSAGES_ARCHIVE_GCS_BUCKET_NAME)
+    blob = bucket.blob(object_name)
+    blob.upload_from_filename(path, content_type="application/gzip", timeout=600)
+
+
+async def maintain_message_partitions_task(ctx: dict):
+    """
+    ARQ task that keeps the monthly partitions of messages ahead of time
+    (MESSAGES_PARTITION_MONTHS_AHEAD) and archives the ones older than
+    MESSAGES_RETENTION_MONTHS to the archive bucket, when one is configured.
+
+    Args:
+        ctx: The ARQ context dictionary.
+    """
+    task_id = ctx.get("job_id", "manual_run_message_partitions")
+    log_prefix = f"[{MAINTAIN_MESSAGE_PARTITIONS_TASK_NAME}:{task_id}]"
+    db_session_factory = ctx.get("db_session_factory") or AsyncSessionLocal
+
+    async with db_session_factory() as db:
+        try:
+            created = await ensure_message_partitions(
+                db, months_ahead=settings.MESSAGES_PARTITION_MONTHS_AHEAD
+            )
+        except Exception as e:
+            await db.rollback()
+            logger.exception(f"{log_prefix} Failed to create partitions: {e}")
+            raise
+
+    archived = {}
+    if settings.MESSAGES_RETENTION_MONTHS > 0 and settings.MESSAGES_ARCHIVE_GCS_BUCKET_NAME:
+        archived = await archive_message_partitions(
+            db_session_factory,
+            keep_months=settings.MESSAGES_RETENTION_MONTHS,
+            upload=_upload_to_archive_bucket,
+        )
+    else:
+        logger.info(f"{log_prefix} Archival disabled (no retention or archive bucket).")
+
+    logger.info(
+        f"{log_prefix} Partition maintenance finished. Created: {created}. Archived: {archived}"
+    )
+    return {"created": created, "archived": archived}
@@ -0,0 +1,130 @@
+# app/workers/ai_replier/utils/turn_metrics.py
+
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.core.metrics import (
+    AI_TURN_STEP_SECONDS,
+    AI_TURN_TOKENS,
+    LLM_CALL_SECONDS,
+    LLM_TOKENS_TOTAL,
+    TOOL_CALL_SECONDS,
+)
+
+
+class TurnMetricsCallback(BaseCallbackHandler):
+    """
+    LangChain callback that times every LLM call and tool run of one AI turn
+    and adds up the tokens it consumed.
+
+    Passed in the graph config `callbacks`, so it also sees the calls made by
+    the hooks (stage analyzer, validation) and by tools that use an LLM.
+    """
+
+    # Only updates counters; no need to hop to an executor thread
+    run_inline = True
+
+    def __init__(self):
+        self._llm_runs: Dict[UUID, tuple] = {}
+        self._tool_runs: Dict[UUID, tuple] = {}
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.llm_calls = 0
+
+    @staticmethod
+    def _model_name(serialized: Optional[Dict[str, Any]], metadata: Optional[Dict[str, Any]]) -> str:
+        metadata = metadata or {}
+        serialized = serialized or {}
+        kwargs = serialized.get("kwargs") or {}
+        return str(
+            metadata.get("ls_model_name")
+            or kwargs.get("model_name")
+            or kwargs.get("deployment_name")
+            or kwargs.get("azure_deployment")
+            or (serialized.get("id") or ["unknown"])[-1]
+        )
+
+    # --- LLM ---
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._llm_runs[run_id] = (self._model_name(serialized, metadata), time.perf_counter())
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._llm_runs[run_id] = (self._model_name(serialized, metadata), time.perf_counter())
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        model, started_at = self._llm_runs.pop(run_id, ("unknown", None))
+        if started_at is not None:
+            LLM_CALL_SECONDS.observe(
+                time.perf_counter() - started_at, model=model, outcome="success"
+            )
+        self.llm_calls += 1
+
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+        if not (input_tokens or output_tokens):
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            input_tokens = usage.get("prompt_tokens", 0)
+            output_tokens = usage.get("completion_tokens", 0)
+
+        if input_tokens:
+            LLM_TOKENS_TOTAL.inc(input_tokens, model=model, type="input")
+        if output_tokens:
+            LLM_TOKENS_TOTAL.inc(output_tokens, model=model, type="output")
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+    def on_llm_error(self, error: BaseException, *, run_id, **kwargs):
+        model, started_at = self._llm_runs.pop(run_id, ("unknown", None))
+        if started_at is not None:
+            LLM_CALL_SECONDS.observe(
+                time.perf_counter() - started_at, model=model, outcome="error"
+            )
+
+    # --- Tools ---
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        self._tool_runs[run_id] = (name, time.perf_counter())
+
+    def _end_tool(self, run_id: UUID, outcome: str) -> None:
+        name, started_at = self._tool_runs.pop(run_id, (None, None))
+        if name is not None:
+            TOOL_CALL_SECONDS.observe(
+                time.perf_counter() - started_at, tool=name, outcome=outcome
+            )
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end_tool(run_id, "success")
+
+    def on_tool_error(self, error: BaseException, *, run_id, **kwargs):
+        self._end_tool(run_id, "error")
+
+    # --- Turn ---
+
+    def observe_turn(self, turn_timings: Optional[Dict[str, float]] = None) -> Dict[str, int]:
+        """
+        Records the per-turn totals (tokens and the `turn_timings` steps).
+
+        Returns:
+            The token usage of the turn, for logging.
+        """
+        for key, value in (turn_timings or {}).items():
+            if key.endswith("_ms"):
+                AI_TURN_STEP_SECONDS.observe(value / 1000, step=key[: -len("_ms")])
+        AI_TURN_TOKENS.observe(self.input_tokens, type="input")
+        AI_TURN_TOKENS.observe(self.output_tokens, type="output")
+        return {
+            "llm_calls": self.llm_calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
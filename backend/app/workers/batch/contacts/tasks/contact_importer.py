@@ -8,7 +8,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
 from pydantic import ValidationError
-from typing import AsyncGenerator
+from itertools import islice
+from typing import AsyncGenerator, Optional
 from loguru import logger
 
 # --- Local Imports ---
@@ -19,13 +20,17 @@ from app.models.contact import Contact
 from app.api.schemas.contact import ContactCreate
 from app.api.schemas.contact_importer import ContactImportSummary, ContactImportError
 from app.services.repository import contact as contact_repo
-from app.services.helper.contact import normalize_phone_number
+from app.services.helper.contact import (
+    normalize_phone_number,
+    normalize_phone_numbers,
+)
 from app.services.cloud_storage import get_gcs_bucket
 
 
 settings: Settings = get_settings()
 # --- Async Database Session Management for Worker ---
 ARQ_TASK_NAME = "process_contact_csv_task"
+IMPORT_NORMALIZE_BATCH_SIZE = 500  # Rows whose phone numbers are normalized together
 
 
 @asynccontextmanager
@@ -41,7 +46,10 @@ async def get_worker_async_db_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def _create_contact_in_db_async(
-    db: AsyncSession, contact_data: ContactCreate, account_id: uuid.UUID
+    db: AsyncSession,
+    contact_data: ContactCreate,
+    account_id: uuid.UUID,
+    normalized_phone: Optional[str] = None,
 ) -> Contact | None:
     """
     Placeholder: Creates a single contact asynchronously in the database.
@@ -50,6 +58,8 @@ async def _create_contact_in_db_async(
         db: The async database session.
         contact_data: Pydantic model with validated contact data.
         account_id: The account ID to associate the contact with.
+        normalized_phone: The phone number already normalized by the caller
+            (batch normalization); normalized here when omitted.
 
     Returns:
         The created Contact object or None if creation failed (e.g., duplicate).
@@ -57,7 +67,8 @@ async def _create_contact_in_db_async(
     Raises:
         Exception: For unexpected database errors.
     """
-    normalized_phone = normalize_phone_number(contact_data.phone_number)
+    if normalized_phone is None:
+        normalized_phone = normalize_phone_number(contact_data.phone_number)
     if not normalized_phone:
         raise ValidationError(
             detail=f"Invalid or unparseable phone number: {contact_data.phone_number}",
@@ -188,73 +199,81 @@ async def process_contact_csv_task(ctx, job_pk: uuid.UUID, account_id: uuid.UUID
                 header = next(reader)
                 logger.info(f"CSV Header: {header}")
 
-                for i, row in enumerate(reader):
-                    row_number = i + 2
-                    total_rows += 1
-                    logger.info(f"Processing row {row_number}: {row}")
+                rows = enumerate(reader, start=2)
+                while batch := list(islice(rows, IMPORT_NORMALIZE_BATCH_SIZE)):
+                    normalized_phones = normalize_phone_numbers(
+                        "".join(filter(str.isdigit, row.get("phone_number") or ""))
+                        for _, row in batch
+                    )
+                    for (row_number, row), normalized_phone in zip(batch, normalized_phones):
+                        total_rows += 1
+                        logger.info(f"Processing row {row_number}: {row}")
+
+                        try:
+                            if not row.get("name") or not row.get("phone_number"):
+                                raise ValueError(
+                                    "Missing required field: 'name' or 'phone_number'"
+                                )
 
-                    try:
-                        if not row.get("name") or not row.get("phone_number"):
-                            raise ValueError(
-                                "Missing required field: 'name' or 'phone_number'"
+                            cleaned_phone = "".join(
+                                filter(str.isdigit, row["phone_number"])
                             )
+                            if not cleaned_phone:
+                                raise ValueError("Invalid phone number format")
 
-                        cleaned_phone = "".join(
-                            filter(str.isdigit, row["phone_number"])
-                        )
-                        if not cleaned_phone:
-                            raise ValueError("Invalid phone number format")
+                            contact_input = ContactCreate(
+                                name=row["name"].strip(),
+                                phone_number=cleaned_phone,
+                                email=row.get("email", "").strip() or None,
+                            )
 
-                        contact_input = ContactCreate(
-                            name=row["name"].strip(),
-                            phone_number=cleaned_phone,
-                            email=row.get("email", "").strip() or None,
-                        )
+                            # Attempt to create contact (Async)
+                            created_contact = await _create_contact_in_db_async(
+                                db=db,
+                                contact_data=contact_input,
+                                account_id=account_id,
+                                normalized_phone=normalized_phone,
+                            )
 
-                        # Attempt to create contact (Async)
-                        created_contact = await _create_contact_in_db_async(
-                            db=db, contact_data=contact_input, account_id=account_id
-                        )
+                            if created_contact:
+                                successful_imports += 1
+                            else:
+                                failed_imports += 1
+                                errors_list.append(
+                                    ContactImportError(
+                                        row_number=row_number,
+                                        reason="Skipped: Duplicate phone number.",
+                                        data=row,
+                                    )
+                                )
 
-                        if created_contact:
-                            successful_imports += 1
-                        else:
+                        except ValidationError as e:
                             failed_imports += 1
                             errors_list.append(
                                 ContactImportError(
                                     row_number=row_number,
-                                    reason="Skipped: Duplicate phone number.",
+                                    reason=f"Validation Error: {e.errors()}",
                                     data=row,
                                 )
                             )
-
-                    except ValidationError as e:
-                        failed_imports += 1
-                        errors_list.append(
-                            ContactImportError(
-                                row_number=row_number,
-                                reason=f"Validation Error: {e.errors()}",
-                                data=row,
-                            )
-                        )
-                    except ValueError as e:
-                        failed_imports += 1
-                        errors_list.append(
-                            ContactImportError(
-                                row_number=row_number, reason=str(e), data=row
+                        except ValueError as e:
+                            failed_imports += 1
+                            errors_list.append(
+                                ContactImportError(
+                                    row_number=row_number, reason=str(e), data=row
+                                )
                             )
-                        )
-                    except Exception as e:
-                        failed_imports += 1
-                        errors_list.append(
-                            ContactImportError(
-                                row_number=row_number,
-                                reason=f"Unexpected processing error: {str(e)}",
-                                data=row,
+                        except Exception as e:
+                            failed_imports += 1
+                            errors_list.append(
+                                ContactImportError(
+                                    row_number=row_number,
+                                    reason=f"Unexpected processing error: {str(e)}",
+                                    data=row,
+                                )
                             )
-                        )
-                        logger.error(f"Error processing row {row_number}: {e}")
-                        # Decide if row error stops import? Continue for now.
+                            logger.error(f"Error processing row {row_number}: {e}")
+                            # Decide if row error stops import? Continue for now.
 
                 # Processing finished successfully
                 job_status = ImportJobStatus.COMPLETE
@@ -1,9 +1,11 @@
 # app/workers/evolution_whatsapp_sync.py
 
+import json
 import httpx
 from uuid import UUID
-from typing import List, Optional, Set
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from pydantic import ValidationError
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from loguru import logger
@@ -11,11 +13,12 @@ from loguru import logger
 # --- Local Imports ---
 from app.core.security import decrypt_logical_token
 from app.api.schemas.evolution_instance import EvolutionContact
-from app.models.contact import Contact
 from app.models.channels.evolution_instance import (
     EvolutionInstance,
 )
-from app.services.helper.contact import normalize_phone_number
+from app.services.helper.contact import normalize_phone_numbers
+from app.services.helper.json_stream import iter_json_array
+from app.services.helper.websocket import publish_to_instance_ws
 from app.database import (
     AsyncSessionLocal,
 )
@@ -23,6 +26,123 @@ from app.config import get_settings, Settings
 
 # --- Constants ---
 ARQ_TASK_NAME = "sync_evolution_whatsapp_contacts_task"
+SYNC_BATCH_SIZE = 1000  # Contacts validated, normalized and COPYed at a time
+CONTACT_TEXT_MAX_LENGTH = 255  # contacts.name / profile_picture_url are VARCHAR(255)
+
+STAGE_TABLE = "evolution_contact_sync_stage"
+STAGE_COLUMNS = ("identifier", "name", "profile_picture_url")
+
+CREATE_STAGE_TABLE_SQL = text(
+    f"""
+    CREATE TEMP TABLE {STAGE_TABLE} (
+        identifier text NOT NULL,
+        name text,
+        profile_picture_url text
+    ) ON COMMIT DROP
+    """
+)
+
+# New numbers are inserted; for numbers already in the account the saved name
+# is kept and only missing data / a new profile picture is filled in.
+# `xmax = 0` is true only for rows inserted by this statement.
+UPSERT_CONTACTS_SQL = text(
+    f"""
+    WITH staged AS (
+        SELECT DISTINCT ON (identifier) identifier, name, profile_picture_url
+        FROM {STAGE_TABLE}
+        ORDER BY identifier, (name IS NULL), (profile_picture_url IS NULL)
+    ),
+    upserted AS (
+        INSERT INTO contacts (
+            id, account_id, name, phone_number, identifier,
+            profile_picture_url, additional_attributes
+        )
+        SELECT gen_random_uuid(), CAST(:account_id AS uuid), s.name, s.identifier, s.identifier,
+               s.profile_picture_url, CAST(:additional_attributes AS json)
+        FROM staged s
+        ON CONFLICT (account_id, identifier) WHERE deleted_at IS NULL
+        DO UPDATE SET
+            name = COALESCE(contacts.name, EXCLUDED.name),
+            profile_picture_url = COALESCE(
+                EXCLUDED.profile_picture_url, contacts.profile_picture_url
+            ),
+            updated_at = now()
+        WHERE (contacts.name IS NULL AND EXCLUDED.name IS NOT NULL)
+           OR contacts.profile_picture_url IS DISTINCT FROM
+              COALESCE(EXCLUDED.profile_picture_url, contacts.profile_picture_url)
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT
+        count(*) FILTER (WHERE inserted) AS inserted,
+        count(*) FILTER (WHERE NOT inserted) AS updated
+    FROM upserted
+    """
+)
+
+
+async def _iter_whatsapp_contacts(
+    response: httpx.Response, stats: Dict[str, int]
+) -> AsyncIterator[EvolutionContact]:
+    """Validates the WhatsApp user contacts of the response while it is being read."""
+    async for contact_data in iter_json_array(response.aiter_bytes()):
+        stats["received"] += 1
+        if not (
+            isinstance(contact_data, dict)
+            and isinstance(contact_data.get("remoteJid"), str)
+            and "@s.whatsapp.net" in contact_data["remoteJid"]
+        ):
+            continue  # Groups, broadcast lists, malformed entries
+        try:
+            yield EvolutionContact.model_validate(contact_data)
+        except ValidationError as e_val:
+            stats["invalid"] += 1
+            logger.warning(
+                f"[{ARQ_TASK_NAME}] Skipping contact due to validation error: {e_val.errors()} | remoteJid: {contact_data.get('remoteJid')}"
+            )
+
+
+def _stage_rows(
+    contacts: List[EvolutionContact], stats: Dict[str, int]
+) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """Normalizes one batch into staging rows; unparseable numbers are counted and skipped."""
+    rows = []
+    normalized_phones = normalize_phone_numbers(
+        contact.phone_number for contact in contacts
+    )
+    for contact, normalized_phone in zip(contacts, normalized_phones):
+        if not normalized_phone:
+            stats["invalid"] += 1
+            continue
+        name = contact.display_name[:CONTACT_TEXT_MAX_LENGTH] if contact.display_name else None
+        picture_url = contact.profile_picture_url
+        if picture_url and len(picture_url) > CONTACT_TEXT_MAX_LENGTH:
+            picture_url = None  # A truncated (signed) URL would be useless
+        rows.append((normalized_phone, name, picture_url))
+    return rows
+
+
+async def _copy_to_stage(db: AsyncSession, rows: List[Tuple]) -> None:
+    """COPYs staging rows through the session's connection (same transaction)."""
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        STAGE_TABLE, records=rows, columns=STAGE_COLUMNS
+    )
+
+
+async def _publish_progress(instance_id: UUID, status: str, stats: Dict[str, int]) -> None:
+    try:
+        await publish_to_instance_ws(
+            str(instance_id),
+            {
+                "type": "contacts.sync",
+                "payload": {"instance_id": str(instance_id), "status": status, **stats},
+            },
+        )
+    except Exception as e:
+        logger.warning(
+            f"[{ARQ_TASK_NAME}] Could not publish sync progress for {instance_id}: {e}"
+        )
 
 
 async def sync_evolution_whatsapp_contacts_task(
@@ -30,11 +150,18 @@ async def sync_evolution_whatsapp_contacts_task(
 ):
     """
     ARQ task to fetch contacts from an Evolution WhatsApp instance
-    and sync new contacts into the platform's database.
+    and sync them into the platform's database.
+
+    The contact list is parsed while it is downloaded and handled in batches
+    of SYNC_BATCH_SIZE: each batch is validated, normalized and COPYed into a
+    temporary staging table, then one set-based upsert writes the new
+    contacts (and fills in data of existing ones). Progress is published on
+    the instance WebSocket channel as `contacts.sync` events.
 
     Args:
         ctx: The ARQ job context containing dependencies like 'db' and 'httpx_client'.
         instance_id: The UUID of the WhatsApp instance to sync.
+        account_id: The account that owns the instance.
 
     Raises:
         Exception: Catches and logs exceptions during the process.
@@ -52,6 +179,13 @@ async def sync_evolution_whatsapp_contacts_task(
     logger.info(f"[{ARQ_TASK_NAME}] Starting sync for instance_id: {instance_id}")
 
     api_key: Optional[str] = None
+    stats: Dict[str, int] = {
+        "received": 0,
+        "staged": 0,
+        "invalid": 0,
+        "created": 0,
+        "updated": 0,
+    }
 
     try:
         # 1. Get Instance Details (Account ID, API Key) from DB
@@ -64,7 +198,6 @@ async def sync_evolution_whatsapp_contacts_task(
 
         if not instance:
             logger.error(f"[{ARQ_TASK_NAME}] Instance not found in DB: {instance_id}")
-            await db.close()
             return
 
         api_key = decrypt_logical_token(instance.logical_token_encrypted)
@@ -74,14 +207,14 @@ async def sync_evolution_whatsapp_contacts_task(
             logger.error(
                 f"[{ARQ_TASK_NAME}] API key not found for instance {instance_id} or globally."
             )
-            await db.close()
             return
 
         logger.info(
             f"[{ARQ_TASK_NAME}] Found instance {instance_id} for account {account_id}"
         )
+        await _publish_progress(instance_id, "started", stats)
 
-        # 2. Fetch Contacts from Evolution API
+        # 2. Stream contacts from Evolution API into the staging table
         evolution_api_url = (
             f"{settings.EVOLUTION_API_SHARED_URL}/chat/findContacts/{instance_id}"
         )
@@ -90,131 +223,86 @@ async def sync_evolution_whatsapp_contacts_task(
             "Accept": "application/json",
         }
 
+        await db.execute(CREATE_STAGE_TABLE_SQL)
+
         logger.debug(
             f"[{ARQ_TASK_NAME}] Calling Evolution API: POST {evolution_api_url}"
         )
         try:
-            response = await http_client.post(evolution_api_url, headers=headers)
-            response.raise_for_status()
-            raw_contacts = response.json()
-            logger.info(
-                f"[{ARQ_TASK_NAME}] Received {len(raw_contacts)} contacts from Evolution API."
-            )
+            async with http_client.stream(
+                "POST", evolution_api_url, headers=headers
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+
+                batch: List[EvolutionContact] = []
+                async for contact in _iter_whatsapp_contacts(response, stats):
+                    batch.append(contact)
+                    if len(batch) >= SYNC_BATCH_SIZE:
+                        rows = _stage_rows(batch, stats)
+                        await _copy_to_stage(db, rows)
+                        stats["staged"] += len(rows)
+                        batch = []
+                        await _publish_progress(instance_id, "in_progress", stats)
+                if batch:
+                    rows = _stage_rows(batch, stats)
+                    await _copy_to_stage(db, rows)
+                    stats["staged"] += len(rows)
 
         except httpx.RequestError as e:
             logger.error(
                 f"[{ARQ_TASK_NAME}] HTTP request error calling Evolution API for {instance_id}: {e}"
             )
-            await db.close()
             raise
         except httpx.HTTPStatusError as e:
             logger.error(
                 f"[{ARQ_TASK_NAME}] HTTP status error calling Evolution API for {instance_id}: {e.response.status_code} - {e.response.text}"
             )
-            await db.close()
             raise
-        except Exception as e:
-            logger.error(
-                f"[{ARQ_TASK_NAME}] Error processing Evolution API response for {instance_id}: {e}"
+        except ValueError as e:
+            # Not a JSON array (e.g. an error object) or a truncated body
+            logger.warning(
+                f"[{ARQ_TASK_NAME}] Unexpected response format from Evolution API for {instance_id}: {e}"
             )
-            await db.close()
-            raise
+            await db.rollback()
+            await _publish_progress(instance_id, "failed", stats)
+            return
 
-        # 3. Parse and Validate Evolution Contacts
-        whatsapp_contacts: List[EvolutionContact] = []
-        try:
-            if isinstance(raw_contacts, list):
-                for contact_data in raw_contacts:
-                    if (
-                        isinstance(contact_data.get("remoteJid"), str)
-                        and "@s.whatsapp.net" in contact_data["remoteJid"]
-                    ):
-                        try:
-                            whatsapp_contacts.append(
-                                EvolutionContact.model_validate(contact_data)
-                            )
-                        except ValidationError as e_val:
-                            logger.warning(
-                                f"[{ARQ_TASK_NAME}] Skipping contact due to validation error: {e_val.errors()} | Data: {contact_data}"
-                            )
-            else:
-                logger.warning(
-                    f"[{ARQ_TASK_NAME}] Unexpected response format from Evolution API: {type(raw_contacts)}"
-                )
-
-        except Exception as e:
-            logger.error(
-                f"[{ARQ_TASK_NAME}] Error parsing contacts from Evolution API response: {e}"
-            )
+        logger.info(
+            f"[{ARQ_TASK_NAME}] Received {stats['received']} contacts from Evolution API, "
+            f"{stats['staged']} staged, {stats['invalid']} invalid."
+        )
 
-        if not whatsapp_contacts:
+        if not stats["staged"]:
             logger.info(
                 f"[{ARQ_TASK_NAME}] No valid contacts found or parsed from Evolution API for {instance_id}."
             )
-            await db.close()
+            await db.rollback()
+            await _publish_progress(instance_id, "completed", stats)
             return
 
-        # 4. Fetch Existing Contact Phone Numbers from DB for the Account
-        logger.debug(
-            f"[{ARQ_TASK_NAME}] Fetching existing contact phone numbers for account {account_id}"
-        )
-        contact_stmt = select(Contact.identifier).where(
-            Contact.account_id == account_id, Contact.deleted_at.is_(None)
+        # 3. Set-based upsert from the staging table (dropped on commit)
+        result = await db.execute(
+            UPSERT_CONTACTS_SQL,
+            {
+                "account_id": account_id,
+                "additional_attributes": json.dumps(
+                    {
+                        "source": "EVOLUTION_WHATSAPP_SYNC",
+                        "instance_id": str(instance_id),
+                    }
+                ),
+            },
         )
-        active_contact_result = await db.execute(contact_stmt)
+        counts = result.one()
+        await db.commit()
+        stats["created"], stats["updated"] = counts.inserted, counts.updated
 
-        existing_phones: Set[str] = {phone for phone, in active_contact_result.all()}
-        logger.info(
-            f"[{ARQ_TASK_NAME}] Found {len(existing_phones)} existing contacts in DB for account {account_id}."
+        logger.success(
+            f"[{ARQ_TASK_NAME}] Added {stats['created']} new contacts and updated {stats['updated']} for account {account_id}."
         )
-
-        # 5. Identify and Prepare New Contacts
-        contacts_to_add: List[Contact] = []
-        for wc in whatsapp_contacts:
-            normalized_phone = normalize_phone_number(wc.phone_number)
-            if not normalized_phone:
-                raise ValidationError(
-                    detail=f"Invalid or unparseable phone number: {wc.phone_number}",
-                )
-
-            # Ensure phone number is valid and not already in DB
-            if normalized_phone and normalized_phone not in existing_phones:
-                new_contact = Contact(
-                    account_id=account_id,
-                    phone_number=normalized_phone,
-                    identifier=normalized_phone,
-                    # Use display_name which prefers saved name over pushname
-                    profile_picture_url=wc.profile_picture_url,
-                    name=wc.display_name,
-                    additional_attributes={
-                        "source": "EVOLUTION_WHATSAPP_SYNC",
-                        "instance_id": str(instance_id),
-                    },
-                )
-                contacts_to_add.append(new_contact)
-                # Add to existing_phones set immediately to handle duplicates within the API response itself
-                existing_phones.add(normalized_phone)
-
-        # 6. Add New Contacts to Database
-        if contacts_to_add:
-            logger.info(
-                f"[{ARQ_TASK_NAME}] Attempting to add {len(contacts_to_add)} new contacts to DB for account {account_id}."
-            )
-            try:
-                db.add_all(contacts_to_add)
-                await db.commit()
-                logger.success(
-                    f"[{ARQ_TASK_NAME}] Successfully added {len(contacts_to_add)} new contacts for account {account_id}."
-                )
-            except Exception as e:
-                logger.error(
-                    f"[{ARQ_TASK_NAME}] Database error adding new contacts for account {account_id}: {e}"
-                )
-                await db.rollback()
-        else:
-            logger.info(
-                f"[{ARQ_TASK_NAME}] No new contacts to add for account {account_id}."
-            )
+        await _publish_progress(instance_id, "completed", stats)
 
         logger.info(
             f"[{ARQ_TASK_NAME}] Finished sync successfully for instance_id: {instance_id}"
@@ -225,6 +313,7 @@ async def sync_evolution_whatsapp_contacts_task(
             f"[{ARQ_TASK_NAME}] Unhandled exception during sync for instance {instance_id}: {e}"
         )
         await db.rollback()
+        await _publish_progress(instance_id, "failed", stats)
         raise
     finally:
         await db.close()
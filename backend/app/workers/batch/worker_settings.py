@@ -153,6 +153,9 @@ try:
 except ImportError:
     logger.error("Failed to import knowledge ingester task.")
 
+from app.core.log import configure_logging
+from app.core.metrics import instrument_job, start_snapshot_writer, stop_snapshot_writer
+
 # Check if any functions were loaded
 if not BATCH_FUNCTIONS_IMPORTED:
     logger.critical("CRITICAL: No Batch Arq task functions were successfully imported!")
@@ -169,6 +172,7 @@ async def on_startup(ctx: Dict[str, Any]) -> None:
     """
     Initialize shared resources needed by the BATCH worker tasks.
     """
+    configure_logging("batch-worker")
     worker_pid = os.getpid()
     logger.info(f"Batch Arq worker (PID: {worker_pid}) starting up...")
 
@@ -291,6 +295,9 @@ async def on_startup(ctx: Dict[str, Any]) -> None:
         )
         ctx["ingestion_service"] = None
 
+    # Metrics are exposed by the keep-alive server (worker_http_server.py)
+    ctx["metrics_snapshot_task"] = start_snapshot_writer("batch")
+
     logger.info(f"Batch Arq worker (PID: {worker_pid}) startup complete.")
 
 
@@ -300,6 +307,14 @@ async def on_shutdown(ctx: Dict[str, Any]) -> None:
     """
     worker_pid = os.getpid()
     logger.info(f"Batch Arq worker (PID: {worker_pid}) shutting down...")
+    try:
+        from app.services.crawler.crawler import close_crawler_resources
+
+        await close_crawler_resources()
+        logger.info("Web crawler HTTP client and parser pool closed.")
+    except Exception as e:
+        logger.warning(f"Failed to close web crawler resources: {e}")
+    await stop_snapshot_writer(ctx.get("metrics_snapshot_task"))
     # Example: Dispose engine if created locally in startup
     # db_engine = ctx.get("db_engine")
     # if db_engine:
@@ -321,7 +336,9 @@ class WorkerSettings:
     """
 
     # --- Core Arq Settings ---
-    functions: List[Callable[..., Any]] = BATCH_FUNCTIONS_IMPORTED
+    functions: List[Callable[..., Any]] = [
+        instrument_job(function) for function in BATCH_FUNCTIONS_IMPORTED
+    ]
 
     # Redis connection settings
     redis_settings: RedisSettings = RedisSettings(
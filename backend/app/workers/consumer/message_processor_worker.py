@@ -62,6 +62,8 @@ from app.workers.consumer.tasks.process_incoming_message import (
 )
 
 from app.services.debounce.message_debounce import MessageDebounceService
+from app.core.log import configure_logging
+from app.core.metrics import instrument_job, start_snapshot_writer, stop_snapshot_writer
 
 # Se houver outras tarefas relacionadas ao processamento de mensagens (ex: status), importe-as aqui.
 
@@ -77,6 +79,7 @@ async def startup(ctx: dict):
     Called once when an ARQ worker process starts.
     Sets up database session factory and ARQ pool for enqueuing further tasks.
     """
+    configure_logging("message-consumer")
     worker_id = os.getpid()
     logger.info(f"Message Processor ARQ Worker (PID: {worker_id}) starting up...")
     s = get_settings()  # Usar a instância global 'settings' ou obter uma nova
@@ -170,6 +173,9 @@ async def startup(ctx: dict):
         )
         ctx["arq_pool_for_ai_tasks"] = None  # Garantir que a chave exista
 
+    # Metrics are exposed by the keep-alive server (worker_http_server.py)
+    ctx["metrics_snapshot_task"] = start_snapshot_writer("message-consumer")
+
     logger.info(
         f"Message Processor ARQ Worker (PID: {worker_id}) startup complete. Context keys: {list(ctx.keys())}"
     )
@@ -198,6 +204,8 @@ async def shutdown(ctx: dict):
                 f"Message Processor Worker: Error closing ARQ Redis pool for AI tasks: {e}"
             )
 
+    await stop_snapshot_writer(ctx.get("metrics_snapshot_task"))
+
     logger.info(f"Message Processor ARQ Worker (PID: {worker_id}) shutdown complete.")
 
 
@@ -212,7 +220,7 @@ class WorkerSettings:
     """
 
     functions = [
-        process_incoming_message_task,
+        instrument_job(process_incoming_message_task),
         # Adicione outras tarefas de processamento de mensagens aqui se houver
     ]
     """List of all task functions this worker can execute."""
@@ -27,6 +27,7 @@ from app.services.parser.message_webhook_parser import (
 
 # Lógica de Serviço Principal
 from app.services.parser.message_processing import process_incoming_message_logic
+from app.core.log import payload, sampled
 
 from app.services.debounce.message_debounce import MessageDebounceService
 
@@ -54,10 +55,13 @@ async def process_incoming_message_task(ctx: dict, arq_payload_dict: dict):
         "business_identifier", "unknown_business_id"
     )
     source_api_for_log = arq_payload_dict.get("source_api", "unknown_source")
-    logger.info(
-        f"{log_prefix} Starting processing for source_api='{source_api_for_log}', business_identifier='{business_id_for_log}'"
+    sampled.info(
+        "{} Starting processing for source_api='{}', business_identifier='{}'",
+        log_prefix,
+        source_api_for_log,
+        business_id_for_log,
     )
-    logger.debug(f"{log_prefix} Raw ARQ payload dict: {arq_payload_dict}")
+    logger.debug("{} Raw ARQ payload dict: {}", log_prefix, payload(arq_payload_dict))
 
     db_session_factory = ctx.get("db_session_factory")
     if not db_session_factory:
@@ -229,7 +233,7 @@ async def process_incoming_message_task(ctx: dict, arq_payload_dict: dict):
                 else:
                     logger.warning(
                         f"{log_prefix} Transformation returned None for an Evolution API message. "
-                        f"Raw payload: {external_value_or_message_dict}. Skipping this message."
+                        f"Raw payload: {payload(external_value_or_message_dict)}. Skipping this message."
                     )
             else:
                 logger.error(
@@ -1,10 +1,14 @@
 import asyncio
+import time
 import httpx
+from datetime import datetime
+from typing import Optional
 from uuid import UUID
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import AsyncSessionLocal
 from app.services.queue.redis_queue import RedisQueue
+from app.services.queue.outbox_relay import OutboxRelay
 from app.services.sender import evolution as evolution_sender
 from app.services.sender import whatsapp_cloud as whatsapp_cloud_sender
 from app.models.channels.channel_types import ChannelTypeEnum
@@ -16,6 +20,14 @@ from app.services.repository.message import (
     delete_messages_by_conversation,
 )
 from app.config import get_settings, Settings
+from app.core.metrics import (
+    SENDER_SEND_SECONDS,
+    observe_pipeline_stage,
+    start_snapshot_writer,
+    stop_snapshot_writer,
+)
+from app.core.tracing import activate_trace
+from app.core.log import configure_logging
 
 settings: Settings = get_settings()
 
@@ -26,7 +38,7 @@ class ResponseSender:
     It listens to the `ready_for_sending_queue`, fetches the message by ID, and attempts delivery.
     """
 
-    def __init__(self, queue_name: str = "response_queue"):
+    def __init__(self, queue_name: str = settings.RESPONSE_SENDER_QUEUE_NAME):
         """
         Initializes the Redis queue listener.
 
@@ -34,37 +46,50 @@ class ResponseSender:
             queue_name (str): The name of the Redis queue to consume from.
         """
         self.queue = RedisQueue(queue_name=queue_name)
+        self.outbox_relay = OutboxRelay()
         logger.info(f"[sender:init] ResponseSender initialized queue: {queue_name}")
 
     async def _process_one_message(self):
         """
         Processes one message from the queue: fetches the ID, looks up the message,
         and attempts delivery to the external provider.
+
+        Returns:
+            bool: Whether a payload was dequeued.
         """
         try:
             payload = await self.queue.dequeue()
             if not payload:
-                return
+                return False
 
             logger.debug(f"[sender] Raw data dequeued: {payload}")
 
             message_id = payload.get("message_id")
             if not message_id:
                 logger.warning("[sender] Payload missing 'message_id'")
-                return
-
-            async with AsyncSessionLocal() as db:
-                try:
-                    await self._handle_message(db, message_id)
-                    await db.commit()
-                except Exception:
-                    await db.rollback()
-                    raise
-                finally:
-                    await db.close()
+                return True
+
+            # Partition key of the message (absent from dispatches written
+            # before it was added to the payload)
+            sent_at = payload.get("sent_at")
+            sent_at = datetime.fromisoformat(sent_at) if sent_at else None
+
+            # Set by the AI replier when the reply belongs to a traced webhook
+            with activate_trace(payload.get("trace_context")):
+                async with AsyncSessionLocal() as db:
+                    try:
+                        await self._handle_message(db, message_id, sent_at)
+                        await db.commit()
+                    except Exception:
+                        await db.rollback()
+                        raise
+                    finally:
+                        await db.close()
+            return True
 
         except Exception as e:
             logger.exception(f"[sender] Unexpected failure: {type(e).__name__} - {e}")
+            return False
 
     async def run(self):
         """
@@ -94,43 +119,47 @@ class ResponseSender:
             )
             return
 
-        while True:
-            await self._process_one_message()
-            await asyncio.sleep(0.1)
-
-    async def _handle_message(self, db: AsyncSession, message_id: UUID):
+        # Publishes committed outbox dispatches to the queue consumed below
+        relay_task = asyncio.create_task(self.outbox_relay.run())
+        # Metrics are exposed by the keep-alive server (worker_http_server.py)
+        metrics_task = start_snapshot_writer("response-sender")
+        try:
+            while True:
+                # BLPOP already blocks while the queue is empty; back off only on errors
+                if not await self._process_one_message():
+                    await asyncio.sleep(0.1)
+        finally:
+            relay_task.cancel()
+            await asyncio.gather(relay_task, return_exceptions=True)
+            await stop_snapshot_writer(metrics_task)
+
+    async def _handle_message(
+        self,
+        db: AsyncSession,
+        message_id: UUID,
+        sent_at: Optional[datetime] = None,
+    ):
         """
-        Handles delivery of a specific message by ID, with retries if not found initially.
+        Handles delivery of a specific message by ID.
+
+        IDs come from the outbox relay, which only publishes committed dispatches,
+        so the message row is always visible here.
 
         Args:
             db (AsyncSession): Active SQLAlchemy database session.
             message_id (UUID): The ID of the message to be delivered.
+            sent_at (Optional[datetime]): The message's sent_at (its partition key).
         """
-        message = None
-        max_retries = 3
-        retry_delay = 0.5
-
-        for attempt in range(max_retries):
-            message = await message_repo.find_message_by_id(db, message_id)
-            if message:
-                logger.debug(
-                    f"[sender] Message {message_id} found on attempt {attempt + 1}."
-                )
-                break
-            else:
-                logger.warning(
-                    f"[sender] Message ID {message_id} not found on attempt {attempt + 1}/{max_retries}. "
-                    f"Retrying in {retry_delay}s..."
-                )
-
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
-
+        message = await message_repo.find_message_by_id(db, message_id, sent_at)
         if not message:
-            logger.error(
-                f"[sender] Message ID {message_id} not found after {max_retries} attempts. Giving up."
-            )
+            logger.warning(f"[sender] Message ID {message_id} not found. Skipping.")
+            return
 
+        # The relay delivers at least once: a message already handled is not resent.
+        if message.status != "processing":
+            logger.info(
+                f"[sender] Message {message_id} already handled (status '{message.status}'). Skipping."
+            )
             return
 
         try:
@@ -166,6 +195,8 @@ class ResponseSender:
 
             status_from_provider: str = "pending"
             external_id: str = None
+            channel = getattr(inbox_with_config.channel_type, "value", "unknown")
+            send_started_at = time.perf_counter()
             if inbox_with_config.channel_type == ChannelTypeEnum.WHATSAPP_EVOLUTION:
                 api_response_data = await evolution_sender.send_message(
                     message_content=message_content,
@@ -187,6 +218,11 @@ class ResponseSender:
 
                 external_id = api_response_data.get("messages", [])[0].get("id")
 
+            SENDER_SEND_SECONDS.observe(
+                time.perf_counter() - send_started_at, channel=channel, outcome="sent"
+            )
+            observe_pipeline_stage("sent")
+
             if external_id:
                 logger.info(
                     f"[sender] Message {message.id} sent, external ID: {external_id}"
@@ -201,6 +237,9 @@ class ResponseSender:
             )
 
         except httpx.HTTPError as e:
+            SENDER_SEND_SECONDS.observe(
+                time.perf_counter() - send_started_at, channel=channel, outcome="failed"
+            )
             message.status = "failed"
             db.add(message)
             logger.warning(f"[sender] HTTP error sending message {message.id}: {e}")
@@ -218,6 +257,7 @@ async def main():
     """
     Main function to start the response sender.
     """
+    configure_logging("response-sender")
     sender = ResponseSender()
     await sender.run()
 
@@ -1,8 +1,20 @@
 # backend/app/workers/worker_http_server.py
 
 import os
+from typing import Optional
+
 import uvicorn
-from fastapi import FastAPI, status
+from fastapi import FastAPI, Header, Response, status
+
+from app.config import get_settings
+from app.core.metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    is_metrics_request_authorized,
+    read_snapshots,
+    render_snapshot,
+)
+
+settings = get_settings()
 
 # Get the port from the environment variable set by Cloud Run, default to 8080
 PORT = int(os.getenv("PORT", 8080))
@@ -36,6 +48,24 @@ async def keep_alive():
     return {"status": "alive"}
 
 
+@http_server_app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """
+    Prometheus exposition of the worker running in this container.
+
+    The worker is a separate process: it writes snapshots of its metrics to
+    METRICS_SNAPSHOT_DIR (see app.core.metrics.start_snapshot_writer), which
+    are merged here.
+    """
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+    if not is_metrics_request_authorized(authorization):
+        return Response(status_code=status.HTTP_401_UNAUTHORIZED)
+    return Response(
+        content=render_snapshot(read_snapshots()), media_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
 # Add a root endpoint just for basic verification if needed
 @http_server_app.get("/", include_in_schema=False)
 async def root():
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import sys
+
+import typer
+from loguru import logger
+from sqlalchemy import text
+
+# --- Setup sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# ----------------------
+
+# --- App Imports ---
+from app.database import async_engine
+from app.models.knowledge_chunk import EMBEDDING_DIMENSION
+
+app = typer.Typer(
+    help=(
+        "Build or drop the binary-quantized index used by the hamming pre-filter "
+        "(RAG_BINARY_PREFILTER_CANDIDATES > 0). It is not part of the migrations."
+    )
+)
+
+INDEX_NAME = "ix_knowledge_chunks_embedding_bq"
+
+
+async def _execute(statement: str) -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    async with async_engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(text(statement))
+    await async_engine.dispose()
+
+
+@app.command()
+def create() -> None:
+    """Builds the index without blocking writes to knowledge_chunks."""
+    logger.info(f"[BinaryQuantizedIndex] Creating {INDEX_NAME}...")
+    asyncio.run(
+        _execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} ON knowledge_chunks "
+            f"USING hnsw ((binary_quantize(embedding)::bit({EMBEDDING_DIMENSION})) "
+            f"bit_hamming_ops)"
+        )
+    )
+    logger.info(f"[BinaryQuantizedIndex] {INDEX_NAME} created.")
+
+
+@app.command()
+def drop() -> None:
+    """Drops the index; the pre-filter then scans the account's rows."""
+    logger.info(f"[BinaryQuantizedIndex] Dropping {INDEX_NAME}...")
+    asyncio.run(_execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}"))
+    logger.info(f"[BinaryQuantizedIndex] {INDEX_NAME} dropped.")
+
+
+if __name__ == "__main__":
+    app()
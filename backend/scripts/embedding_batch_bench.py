@@ -0,0 +1,91 @@
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Annotated, List
+
+import typer
+
+# --- Setup sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# ----------------------
+
+# --- App Imports ---
+from app.core.embedding_batching import EmbeddingMicroBatcher
+from app.core.embedding_utils import LOCAL_EMBEDDING_MODEL, LocalEmbeddingProvider
+
+app = typer.Typer(
+    help="Throughput of the local embedding provider with and without micro-batching."
+)
+
+SAMPLE_QUERIES = [
+    "Qual o horário de funcionamento da loja?",
+    "Vocês entregam no meu bairro?",
+    "Quanto custa a torta holandesa?",
+    "Aceitam pagamento com Pix?",
+    "Tem opções sem glúten?",
+    "Posso cancelar minha encomenda?",
+]
+
+
+async def _run(
+    batcher: EmbeddingMicroBatcher, concurrency: int, requests: int
+) -> tuple[float, List[float]]:
+    """Sends `requests` single-text embeds, `concurrency` at a time; returns (req/s, latencies ms)."""
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await batcher.embed([SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]])
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    await batcher.close()
+    return requests / elapsed, latencies
+
+
+@app.command()
+def throughput(
+    concurrency: Annotated[
+        List[int], typer.Option(help="Concurrency levels to measure.")
+    ] = [1, 4, 16, 64],
+    requests: Annotated[int, typer.Option(help="Requests per level.")] = 256,
+    max_wait_ms: Annotated[float, typer.Option(help="Batching window.")] = 5.0,
+    max_batch_size: Annotated[int, typer.Option(help="Largest batch.")] = 64,
+):
+    """
+    Loads the local model once and compares one encode per request (the old
+    behaviour) with the micro-batcher, per concurrency level (CPU/GPU as
+    available to sentence-transformers).
+    """
+    provider = LocalEmbeddingProvider(LOCAL_EMBEDDING_MODEL)
+    provider._encode(SAMPLE_QUERIES)  # warm up
+
+    for level in concurrency:
+        for name, batcher in (
+            ("unbatched", EmbeddingMicroBatcher(provider._encode, 1, 0.0)),
+            (
+                "batched",
+                EmbeddingMicroBatcher(
+                    provider._encode, max_batch_size, max_wait_ms / 1000
+                ),
+            ),
+        ):
+            rate, latencies = asyncio.run(_run(batcher, level, requests))
+            ordered = sorted(latencies)
+            typer.echo(
+                f"concurrency {level:>3} | {name:>9} | {rate:8.1f} req/s | "
+                f"p50: {statistics.median(ordered):7.1f}ms | "
+                f"p95: {ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]:7.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    app()
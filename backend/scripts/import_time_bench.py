@@ -0,0 +1,103 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Annotated, Dict, List, Optional, Tuple
+
+import typer
+
+# --- Setup sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# ----------------------
+
+app = typer.Typer(
+    help="Cold-start import time of the API and worker entry points (fresh interpreter per run)."
+)
+
+# name -> module imported by the process at startup
+ENTRY_POINTS: Dict[str, str] = {
+    "api": "app.main",
+    "consumer": "app.workers.consumer.message_processor_worker",
+    "ai_replier": "app.workers.ai_replier.ai_replier",
+    "response_sender": "app.workers.response_sender.response_sender",
+    "batch": "app.workers.batch.worker_settings",
+    "sales_agent_tools": "app.services.sales_agent.tools.knowledge",
+}
+
+_IMPORT_TIME_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)")
+_PROBE = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print(f'IMPORT_SECONDS={{time.perf_counter() - started}}')"
+)
+
+
+def _run_once(module: str) -> Tuple[float, Dict[str, int]]:
+    """
+    Imports `module` in a fresh interpreter. Returns the import seconds and,
+    per external top-level package, its largest cumulative import time (us).
+    """
+    env = {**os.environ, "PYTHONPATH": project_root, "PYTHONDONTWRITEBYTECODE": "1"}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module)],
+        cwd=project_root,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    match = re.search(r"IMPORT_SECONDS=([\d.e-]+)", completed.stdout)
+    if completed.returncode != 0 or not match:
+        raise RuntimeError(
+            f"Importing {module} failed:\n{completed.stderr.strip()[-2000:]}"
+        )
+
+    packages: Dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        parsed = _IMPORT_TIME_LINE.match(line)
+        if not parsed:
+            continue
+        package = parsed.group(2).split(".")[0]
+        if package != "app":
+            packages[package] = max(packages.get(package, 0), int(parsed.group(1)))
+    return float(match.group(1)), packages
+
+
+@app.command()
+def measure(
+    entry_point: Annotated[
+        Optional[List[str]],
+        typer.Option(help=f"Entry points to measure (default: all of {list(ENTRY_POINTS)})."),
+    ] = None,
+    runs: Annotated[int, typer.Option(help="Fresh interpreters per entry point.")] = 5,
+    top: Annotated[int, typer.Option(help="Slowest external packages to list.")] = 8,
+):
+    """
+    Imports each entry point `runs` times in a new interpreter (like a cold
+    Cloud Run start, minus the container) and reports the import wall time,
+    plus the slowest external packages from `python -X importtime`.
+    """
+    names = entry_point or list(ENTRY_POINTS)
+    for name in names:
+        module = ENTRY_POINTS.get(name, name)
+        timings: List[float] = []
+        slowest: Dict[str, List[int]] = {}
+        for _ in range(runs):
+            seconds, packages = _run_once(module)
+            timings.append(seconds)
+            for package, cumulative_us in packages.items():
+                slowest.setdefault(package, []).append(cumulative_us)
+
+        typer.echo(
+            f"{name:>18} | median: {statistics.median(timings) * 1000:8.1f}ms | "
+            f"min: {min(timings) * 1000:8.1f}ms | max: {max(timings) * 1000:8.1f}ms"
+        )
+        ranked = sorted(
+            ((statistics.median(values), package) for package, values in slowest.items()),
+            reverse=True,
+        )
+        for cumulative_us, package in ranked[:top]:
+            typer.echo(f"{'':>18}   {cumulative_us / 1000:8.1f}ms  {package}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,323 @@
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Annotated, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+import typer
+from loguru import logger
+
+# --- Setup sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# ----------------------
+
+# --- App Imports ---
+from app.api.schemas.knowledge_document import KnowledgeDocumentCreate
+from app.core.embedding_utils import get_embeddings_batch
+from app.database import AsyncSessionLocal
+from app.models.account import Account
+from app.models.knowledge_chunk import EMBEDDING_DIMENSION
+from app.models.knowledge_document import DocumentStatus
+from app.services.repository import knowledge_document as knowledge_document_repo
+from app.services.repository.knowledge_chunk import (
+    add_chunks,
+    configure_ann_search,
+    hybrid_search_chunks_with_context,
+    search_similar_chunks,
+    search_similar_chunks_with_context,
+)
+
+app = typer.Typer(
+    help="Offline evaluation and latency benchmark of knowledge retrieval (vector vs hybrid)."
+)
+
+SIMULATION_ACCOUNT_ID = UUID("0c59ccfa-dc09-4a68-a1fa-d49726b2d519")
+DEFAULT_FIXTURE = Path(project_root) / "data" / "knowledge_eval" / "padaria_central_kb.json"
+
+
+async def _load_fixture(
+    account_id: UUID, fixture: Dict
+) -> Tuple[List[UUID], Dict[Tuple[UUID, int], str]]:
+    """Stores the fixture documents/chunks; returns document ids and (doc id, index) -> fixture key."""
+    document_ids: List[UUID] = []
+    chunk_keys: Dict[Tuple[UUID, int], str] = {}
+    async with AsyncSessionLocal() as db:
+        for document in fixture["documents"]:
+            record = await knowledge_document_repo.create_document(
+                db=db,
+                account_id=account_id,
+                document_in=KnowledgeDocumentCreate(
+                    source_type="text",
+                    source_uri=f"retrieval-bench:{document['key']}",
+                    original_filename=None,
+                ),
+                initial_status=DocumentStatus.COMPLETED,
+            )
+            document_ids.append(record.id)
+            embeddings = await get_embeddings_batch(document["chunks"])
+            if embeddings is None:
+                raise RuntimeError("Failed to embed the fixture chunks.")
+            await add_chunks(
+                db,
+                account_id=account_id,
+                chunks_data=[
+                    {
+                        "chunk_text": chunk_text,
+                        "chunk_index": index,
+                        "embedding": embedding,
+                        "source_type": "text",
+                        "source_identifier": document["key"],
+                        "document_id": record.id,
+                    }
+                    for index, (chunk_text, embedding) in enumerate(
+                        zip(document["chunks"], embeddings)
+                    )
+                ],
+            )
+            for index in range(len(document["chunks"])):
+                chunk_keys[(record.id, index)] = f"{document['key']}:{index}"
+        await db.commit()
+    return document_ids, chunk_keys
+
+
+async def _cleanup(document_ids: List[UUID]) -> None:
+    async with AsyncSessionLocal() as db:
+        for document_id in document_ids:
+            await knowledge_document_repo.delete_document(db, document_id)
+        await db.commit()
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+async def _evaluate(
+    account_id: UUID, fixture_path: Path, limit: int, threshold: float, repeat: int
+) -> None:
+    fixture = json.loads(fixture_path.read_text(encoding="utf-8"))
+    queries = fixture["queries"]
+    query_embeddings = await get_embeddings_batch([q["query"] for q in queries])
+    if query_embeddings is None:
+        raise RuntimeError("Failed to embed the fixture queries.")
+
+    document_ids, chunk_keys = await _load_fixture(account_id, fixture)
+    try:
+        strategies = {
+            "vector": lambda db, q, emb: search_similar_chunks_with_context(
+                db,
+                account_id=account_id,
+                query_embedding=emb,
+                limit=limit,
+                similarity_threshold=threshold,
+            ),
+            "hybrid": lambda db, q, emb: hybrid_search_chunks_with_context(
+                db,
+                account_id=account_id,
+                query_text=q,
+                query_embedding=emb,
+                limit=limit,
+                similarity_threshold=threshold,
+            ),
+        }
+        for name, search in strategies.items():
+            hits, reciprocal_ranks, latencies = 0, [], []
+            async with AsyncSessionLocal() as db:
+                for query, embedding in zip(queries, query_embeddings):
+                    for _ in range(repeat):
+                        started = time.perf_counter()
+                        _, seeds = await search(db, query["query"], embedding)
+                        latencies.append((time.perf_counter() - started) * 1000)
+                    found = [
+                        chunk_keys.get((seed.document_id, seed.chunk_index))
+                        for seed in seeds
+                    ]
+                    ranks = [
+                        position
+                        for position, key in enumerate(found, start=1)
+                        if key in query["expected"]
+                    ]
+                    hits += bool(ranks)
+                    reciprocal_ranks.append(1 / ranks[0] if ranks else 0.0)
+                    if not ranks:
+                        logger.info(f"[{name}] miss: '{query['query']}' -> {found}")
+
+            typer.echo(
+                f"{name:>7} | hit@{limit}: {hits / len(queries):.2f} | "
+                f"MRR: {statistics.mean(reciprocal_ranks):.3f} | "
+                f"p50: {statistics.median(latencies):.1f}ms | "
+                f"p95: {_percentile(latencies, 0.95):.1f}ms"
+            )
+    finally:
+        await _cleanup(document_ids)
+
+
+@app.command()
+def evaluate(
+    account_id: Annotated[
+        UUID, typer.Option(help="Account that temporarily owns the fixture chunks.")
+    ] = SIMULATION_ACCOUNT_ID,
+    fixture: Annotated[Path, typer.Option(help="Fixture knowledge base (JSON).")] = DEFAULT_FIXTURE,
+    limit: Annotated[int, typer.Option(help="Seed chunks per query.")] = 3,
+    threshold: Annotated[float, typer.Option(help="Similarity threshold.")] = 0.5,
+    repeat: Annotated[int, typer.Option(help="Timed runs per query.")] = 10,
+):
+    """Loads the fixture, scores vector-only vs hybrid retrieval and removes the fixture."""
+    asyncio.run(_evaluate(account_id, fixture, limit, threshold, repeat))
+
+
+# --- Multi-tenant vector search benchmark (synthetic data) ---
+
+# name -> (exact scan, hnsw.iterative_scan mode or None = off, binary pre-filter candidates)
+VECTOR_STRATEGIES: Dict[str, Tuple[bool, Optional[str], int]] = {
+    "exact": (True, None, 0),
+    "hnsw": (False, None, 0),
+    "hnsw+iterative": (False, "relaxed_order", 0),
+    "binary+rerank": (False, "relaxed_order", 200),
+}
+
+
+def _synthetic_vectors(rng: np.random.Generator, count: int) -> np.ndarray:
+    """Unit vectors around a few tenant-specific centers (topics)."""
+    centers = rng.standard_normal((8, EMBEDDING_DIMENSION)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)]
+    vectors += 0.6 * rng.standard_normal(vectors.shape).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def _create_tenant(name: str, vectors: np.ndarray) -> UUID:
+    async with AsyncSessionLocal() as db:
+        account = Account(name=name)
+        db.add(account)
+        await db.flush()
+        for start in range(0, len(vectors), 1000):
+            await add_chunks(
+                db,
+                account_id=account.id,
+                chunks_data=[
+                    {
+                        "chunk_text": f"{name} #{start + offset}",
+                        "chunk_index": start + offset,
+                        "embedding": vector,
+                        "source_type": "text",
+                        "source_identifier": name,
+                    }
+                    for offset, vector in enumerate(vectors[start : start + 1000])
+                ],
+            )
+        await db.commit()
+        return account.id
+
+
+async def _multitenant(
+    small_tenants: int,
+    small_size: int,
+    large_tenants: int,
+    large_size: int,
+    queries_per_tenant: int,
+    top_k: int,
+    ef_search: int,
+    seed: int,
+) -> None:
+    rng = np.random.default_rng(seed)
+    tenants: List[Tuple[str, UUID, np.ndarray]] = []
+    try:
+        for size_class, count, size in (
+            ("small", small_tenants, small_size),
+            ("large", large_tenants, large_size),
+        ):
+            for i in range(count):
+                vectors = _synthetic_vectors(rng, size)
+                account_id = await _create_tenant(
+                    f"retrieval-bench-{size_class}-{i}", vectors
+                )
+                tenants.append((size_class, account_id, vectors))
+        typer.echo(f"Loaded {len(tenants)} tenants. Running queries...")
+
+        for name, (exact, iterative_scan, binary_prefilter) in VECTOR_STRATEGIES.items():
+            recalls: Dict[str, List[float]] = {"small": [], "large": []}
+            latencies: Dict[str, List[float]] = {"small": [], "large": []}
+            for size_class, account_id, vectors in tenants:
+                picks = rng.integers(0, len(vectors), queries_per_tenant)
+                for query in vectors[picks] + 0.1 * rng.standard_normal(
+                    (queries_per_tenant, EMBEDDING_DIMENSION)
+                ).astype(np.float32):
+                    expected = set(np.argsort(vectors @ query)[::-1][:top_k])
+                    async with AsyncSessionLocal() as db:
+                        if not exact:
+                            await configure_ann_search(
+                                db, ef_search=ef_search, iterative_scan=iterative_scan or "off"
+                            )
+                        started = time.perf_counter()
+                        chunks = await search_similar_chunks(
+                            db,
+                            account_id=account_id,
+                            query_embedding=query,
+                            limit=top_k,
+                            exact=exact,
+                            binary_prefilter=binary_prefilter,
+                        )
+                        latencies[size_class].append(
+                            (time.perf_counter() - started) * 1000
+                        )
+                    found = {chunk.chunk_index for chunk in chunks}
+                    recalls[size_class].append(len(found & expected) / top_k)
+
+            for size_class in ("small", "large"):
+                if not latencies[size_class]:
+                    continue
+                typer.echo(
+                    f"{name:>15} | {size_class:>5} tenants | "
+                    f"recall@{top_k}: {statistics.mean(recalls[size_class]):.3f} | "
+                    f"p50: {statistics.median(latencies[size_class]):.1f}ms | "
+                    f"p95: {_percentile(latencies[size_class], 0.95):.1f}ms"
+                )
+    finally:
+        async with AsyncSessionLocal() as db:
+            for _, account_id, _ in tenants:
+                # Chunks are removed by the ON DELETE CASCADE.
+                account = await db.get(Account, account_id)
+                if account:
+                    await db.delete(account)
+            await db.commit()
+
+
+@app.command()
+def multitenant(
+    small_tenants: Annotated[int, typer.Option(help="Number of small tenants.")] = 20,
+    small_size: Annotated[int, typer.Option(help="Chunks per small tenant.")] = 200,
+    large_tenants: Annotated[int, typer.Option(help="Number of large tenants.")] = 2,
+    large_size: Annotated[int, typer.Option(help="Chunks per large tenant.")] = 20000,
+    queries_per_tenant: Annotated[int, typer.Option(help="Queries per tenant.")] = 10,
+    top_k: Annotated[int, typer.Option(help="Neighbours per query.")] = 10,
+    ef_search: Annotated[int, typer.Option(help="hnsw.ef_search for ANN runs.")] = 40,
+    seed: Annotated[int, typer.Option(help="Random seed.")] = 42,
+):
+    """
+    Recall and latency of exact scan vs HNSW (with and without iterative scan)
+    vs binary pre-filter + rerank on synthetic tenants sharing the indexes. Creates throwaway accounts and
+    deletes them at the end.
+    """
+    asyncio.run(
+        _multitenant(
+            small_tenants,
+            small_size,
+            large_tenants,
+            large_size,
+            queries_per_tenant,
+            top_k,
+            ef_search,
+            seed,
+        )
+    )
+
+
+if __name__ == "__main__":
+    app()
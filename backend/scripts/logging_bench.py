@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Annotated, Callable, Dict
+from uuid import uuid4
+
+import typer
+
+# --- Setup sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# ----------------------
+
+# --- App Imports ---
+from loguru import logger
+
+from app.api.schemas.internal_messaging import InternalIncomingMessageDTO
+from app.core.log import SampledLogger, payload
+
+app = typer.Typer(
+    help="CPU spent on logging per message: eager f-strings vs lazy/capped/sampled."
+)
+
+
+def _sample_raw_payload() -> Dict:
+    """An Evolution `messages.upsert` webhook, roughly the size seen in production."""
+    return {
+        "event": "messages.upsert",
+        "instance": "bench-instance",
+        "data": {
+            "key": {"remoteJid": "5511999990000@s.whatsapp.net", "fromMe": False, "id": uuid4().hex},
+            "pushName": "Cliente Bench",
+            "message": {
+                "conversation": "Olá! Gostaria de saber o preço da torta holandesa " * 4,
+                "messageContextInfo": {"deviceListMetadata": {"senderKeyHash": "x" * 40}},
+            },
+            "messageType": "conversation",
+            "messageTimestamp": int(time.time()),
+        },
+        "destination": "http://localhost:8000/webhooks/evolution",
+        "date_time": datetime.now(timezone.utc).isoformat(),
+        "sender": "5511988887777@s.whatsapp.net",
+        "server_url": "http://localhost:8080",
+        "apikey": "k" * 32,
+    }
+
+
+def _sample_dto() -> InternalIncomingMessageDTO:
+    return InternalIncomingMessageDTO(
+        account_id=uuid4(),
+        inbox_id=uuid4(),
+        contact_id=uuid4(),
+        conversation_id=uuid4(),
+        external_message_id=uuid4().hex,
+        sender_identifier="5511999990000",
+        message_content="Olá! Gostaria de saber o preço da torta holandesa",
+        internal_content_type="text",
+        message_timestamp=datetime.now(timezone.utc),
+        source_api="whatsapp_evolution",
+        raw_message_attributes=_sample_raw_payload()["data"],
+    )
+
+
+def _eager(raw: Dict, dto: InternalIncomingMessageDTO, state: Dict) -> None:
+    """The hot-path log lines as they were: everything rendered up front."""
+    log_prefix = f"ARQ Task (ID: {dto.external_message_id}):"
+    logger.info(
+        f"{log_prefix} Starting processing for source_api='{dto.source_api}', business_identifier='bench'"
+    )
+    logger.debug(f"{log_prefix} Raw ARQ payload dict: {raw}")
+    logger.info(f"{log_prefix} Starting core processing.")
+    logger.info(
+        f"{log_prefix} Processing message logic for internal DTO, source: {dto.source_api}, source_id: {dto.external_message_id}"
+    )
+    logger.debug(f"{log_prefix} Internal DTO payload: {dto.model_dump_json(indent=2)}")
+    logger.trace(f"{log_prefix} Current graph input prepared: {json.dumps(state, indent=2, default=str)}")
+
+
+def _budgeted(sampled: SampledLogger) -> Callable[[Dict, InternalIncomingMessageDTO, Dict], None]:
+    def run(raw: Dict, dto: InternalIncomingMessageDTO, state: Dict) -> None:
+        log_prefix = f"ARQ Task (ID: {dto.external_message_id}):"
+        sampled.info(
+            "{} Starting processing for source_api='{}', business_identifier='{}'",
+            log_prefix,
+            dto.source_api,
+            "bench",
+        )
+        logger.debug("{} Raw ARQ payload dict: {}", log_prefix, payload(raw))
+        sampled.info(
+            "{} Processing message logic for internal DTO, source: {}",
+            log_prefix,
+            dto.source_api,
+        )
+        logger.debug("{} Internal DTO payload: {}", log_prefix, payload(dto))
+        logger.trace("{} Current graph input prepared: {}", log_prefix, payload(state))
+
+    return run
+
+
+def _measure(fn: Callable, messages: int, raw: Dict, dto, state: Dict) -> float:
+    """CPU microseconds per message."""
+    started = time.process_time()
+    for _ in range(messages):
+        fn(raw, dto, state)
+    return (time.process_time() - started) / messages * 1e6
+
+
+@app.command()
+def compare(
+    messages: Annotated[int, typer.Option(help="Messages logged per variant.")] = 5000,
+    level: Annotated[str, typer.Option(help="Handler level (INFO in production).")] = "INFO",
+    sample_every: Annotated[int, typer.Option(help="Sampling rate of the info lines.")] = 10,
+):
+    """
+    Runs the per-message log lines of the consumer / AI replier against a sink
+    that drops the output, so only formatting and loguru dispatch are measured.
+    """
+    raw, dto = _sample_raw_payload(), _sample_dto()
+    state = {"messages": [raw["data"]["message"]] * 10, "company_profile": raw, "trace": dto}
+
+    logger.remove()
+    logger.add(lambda message: None, level=level)
+
+    variants = (
+        ("eager (before)", _eager),
+        ("lazy + capped", _budgeted(SampledLogger(every=1))),
+        (f"lazy + capped + 1/{sample_every}", _budgeted(SampledLogger(every=sample_every))),
+    )
+    results = []
+    for name, fn in variants:
+        _measure(fn, min(messages, 200), raw, dto, state)  # warm up
+        results.append((name, _measure(fn, messages, raw, dto, state)))
+
+    baseline = results[0][1]
+    print(f"level={level} messages={messages}")
+    for name, cpu_us in results:
+        print(f"  {name:<28} {cpu_us:8.1f} us/msg  ({baseline - cpu_us:+8.1f} us saved)")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,117 @@
+import os
+import random
+import sys
+import time
+from typing import Annotated, Callable, List, Optional
+
+import typer
+
+# --- Setup sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# ----------------------
+
+# --- App Imports ---
+from loguru import logger
+
+from app.services.helper.contact import PhoneNumberNormalizer, _parse_to_e164_digits
+
+app = typer.Typer(
+    help="Phone normalization over a Brazilian number corpus: uncached vs LRU vs batch."
+)
+
+BR_AREA_CODES = [
+    11, 12, 13, 14, 15, 16, 17, 18, 19, 21, 22, 24, 27, 28, 31, 32, 33, 34, 35,
+    37, 38, 41, 42, 43, 44, 45, 46, 47, 48, 49, 51, 53, 54, 55, 61, 62, 63, 64,
+    65, 66, 67, 68, 69, 71, 73, 74, 75, 77, 79, 81, 82, 83, 84, 85, 86, 87, 88,
+    89, 91, 92, 93, 94, 95, 96, 97, 98, 99,
+]
+
+
+def _random_number(rng: random.Random) -> str:
+    """One number written the way it reaches us: WhatsApp ids, forms, CSV cells."""
+    ddd = rng.choice(BR_AREA_CODES)
+    if rng.random() < 0.85:
+        local = f"9{rng.randint(6000, 9999)}{rng.randint(0, 9999):04d}"  # Mobile
+    else:
+        local = f"{rng.randint(2, 5)}{rng.randint(0, 999):03d}{rng.randint(0, 9999):04d}"
+    style = rng.random()
+    if style < 0.45:
+        return f"55{ddd}{local}"  # WhatsApp id / Evolution remoteJid
+    if style < 0.6:
+        return f"+55 ({ddd}) {local[:-4]}-{local[-4:]}"
+    if style < 0.8:
+        return f"({ddd}) {local[:-4]}-{local[-4:]}"
+    if style < 0.95:
+        return f"{ddd}{local}"
+    return f"0{ddd}{local}"
+
+
+def build_corpus(unique: int, size: int, seed: int) -> List[str]:
+    """`size` lookups over `unique` numbers, skewed: a few contacts write a lot."""
+    rng = random.Random(seed)
+    pool = [_random_number(rng) for _ in range(unique)]
+    corpus = []
+    for _ in range(size):
+        if rng.random() < 0.7:
+            corpus.append(pool[min(int(rng.paretovariate(1.2)) - 1, unique - 1)])
+        else:
+            corpus.append(rng.choice(pool))
+    return corpus
+
+
+def _timed(fn: Callable[[], List[Optional[str]]]) -> tuple[float, List[Optional[str]]]:
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+@app.command()
+def compare(
+    unique: Annotated[int, typer.Option(help="Distinct numbers in the corpus.")] = 3000,
+    size: Annotated[int, typer.Option(help="Normalizations performed.")] = 50000,
+    batch_size: Annotated[int, typer.Option(help="Batch size of the batch API.")] = 1000,
+    cache_size: Annotated[int, typer.Option(help="LRU entries.")] = 50000,
+    seed: Annotated[int, typer.Option(help="Corpus seed.")] = 7,
+):
+    """
+    Normalizes the same corpus three ways and checks the results are identical:
+    phonenumbers on every call (the old behaviour), the LRU + E.164 fast path
+    one number at a time, and the batch API in chunks of --batch-size.
+    """
+    logger.remove()  # Invalid numbers are logged on every miss
+    corpus = build_corpus(unique, size, seed)
+
+    uncached_s, expected = _timed(lambda: [_parse_to_e164_digits(p, "BR") for p in corpus])
+
+    single = PhoneNumberNormalizer(cache_size)
+    single_s, single_result = _timed(lambda: [single.normalize(p, "BR") for p in corpus])
+
+    batched = PhoneNumberNormalizer(cache_size)
+    batch_s, batch_result = _timed(
+        lambda: [
+            value
+            for start in range(0, len(corpus), batch_size)
+            for value in batched.normalize_many(corpus[start : start + batch_size], "BR")
+        ]
+    )
+
+    assert single_result == expected and batch_result == expected, "results differ"
+    fast_path = size - single.hits - single.misses
+
+    print(f"corpus: {size} lookups over {unique} numbers, {sum(v is None for v in expected)} invalid")
+    print(f"  fast path {fast_path}, cache hits {single.hits}, misses {single.misses}")
+    for name, seconds in (
+        ("uncached (before)", uncached_s),
+        ("LRU + fast path", single_s),
+        (f"batch of {batch_size}", batch_s),
+    ):
+        print(
+            f"  {name:<20} {seconds * 1e6 / size:7.2f} us/number  "
+            f"{uncached_s / seconds:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    app()
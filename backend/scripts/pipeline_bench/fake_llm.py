@@ -0,0 +1,182 @@
+import asyncio
+import json
+import random
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+_VOCABULARY = (
+    "olá claro temos pão fresco hoje pedido entrega horário posso ajudar "
+    "valor promoção combo café bolo encomenda retirada loja obrigado "
+    "pagamento pix cartão confirmo quantidade sabor chocolate queijo"
+).split()
+
+
+def _sample_value(schema: Dict[str, Any], defs: Dict[str, Any], depth: int = 0) -> Any:
+    """Smallest value that validates against a JSON schema (good enough for tool args)."""
+    if depth > 8:
+        return None
+    if "$ref" in schema:
+        return _sample_value(defs.get(schema["$ref"].split("/")[-1], {}), defs, depth + 1)
+    if "default" in schema:
+        return schema["default"]
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [option for option in schema[key] if option.get("type") != "null"]
+            return _sample_value(options[0] if options else {}, defs, depth + 1)
+
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), None)
+    if schema_type == "object" or "properties" in schema:
+        properties = schema.get("properties", {})
+        return {
+            name: _sample_value(properties[name], defs, depth + 1)
+            for name in schema.get("required", [])
+            if name in properties
+        }
+    if schema_type == "array":
+        item = _sample_value(schema.get("items", {}), defs, depth + 1)
+        return [item] * schema.get("minItems", 0)
+    if schema_type == "integer":
+        return int(schema.get("minimum", 0))
+    if schema_type == "number":
+        return float(schema.get("minimum", 0))
+    if schema_type == "boolean":
+        return False
+    if schema_type == "string":
+        return "benchmark"
+    return None
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic chat model for pipeline benchmarks.
+
+    Answers after `latency_seconds` (+ up to `jitter_seconds`, seeded) with a
+    reply derived from the last message, so two runs of the same workload get
+    the same replies. Structured output (tool_choice forced) is answered with
+    schema-valid minimal arguments; with `tool_call_every=N`, every Nth call
+    that has `tool_name` bound calls that tool instead of answering.
+    """
+
+    latency_seconds: float = 0.5
+    jitter_seconds: float = 0.0
+    reply_words: int = 25
+    tool_call_every: int = 0
+    tool_name: Optional[str] = None
+    seed: int = 0
+    # Shared between the copies made by bind_tools
+    stats: Dict[str, int] = Field(
+        default_factory=lambda: {"calls": 0, "tool_calls": 0, "output_tokens": 0}
+    )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Any = None, **kwargs: Any):
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, tool_choice=tool_choice, **kwargs)
+
+    def _delay(self, messages: List[BaseMessage]) -> float:
+        if not self.jitter_seconds:
+            return self.latency_seconds
+        rng = random.Random(self.seed ^ self._fingerprint(messages))
+        return self.latency_seconds + rng.uniform(0, self.jitter_seconds)
+
+    @staticmethod
+    def _fingerprint(messages: List[BaseMessage]) -> int:
+        last = messages[-1].content if messages else ""
+        if not isinstance(last, str):
+            last = json.dumps(last, sort_keys=True, default=str)
+        return zlib.crc32(f"{len(messages)}:{last}".encode())
+
+    def _tool_call(self, tool: Dict[str, Any]) -> AIMessage:
+        function = tool["function"]
+        parameters = function.get("parameters", {})
+        args = _sample_value(parameters, parameters.get("$defs", {})) or {}
+        self.stats["tool_calls"] += 1
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": function["name"],
+                    "args": args,
+                    "id": f"call_{self.stats['calls']}",
+                    "type": "tool_call",
+                }
+            ],
+        )
+
+    def _respond(
+        self,
+        messages: List[BaseMessage],
+        tools: Optional[List[Dict[str, Any]]],
+        tool_choice: Any,
+    ) -> AIMessage:
+        self.stats["calls"] += 1
+        tools = tools or []
+        by_name = {tool["function"]["name"]: tool for tool in tools}
+
+        if tools and tool_choice not in (None, "auto", "none"):
+            # Structured output / forced tool
+            forced = tool_choice
+            if isinstance(tool_choice, dict):
+                forced = tool_choice.get("function", {}).get("name")
+            return self._tool_call(by_name.get(forced) or tools[0])
+
+        answering_tool = bool(messages) and isinstance(messages[-1], ToolMessage)
+        if (
+            self.tool_call_every
+            and self.tool_name in by_name
+            and not answering_tool
+            and self.stats["calls"] % self.tool_call_every == 0
+        ):
+            return self._tool_call(by_name[self.tool_name])
+
+        rng = random.Random(self.seed ^ self._fingerprint(messages))
+        words = [rng.choice(_VOCABULARY) for _ in range(self.reply_words)]
+        content = " ".join(words).capitalize() + "."
+        input_tokens = sum(len(str(message.content)) // 4 for message in messages)
+        self.stats["output_tokens"] += len(words)
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": len(words),
+                "total_tokens": input_tokens + len(words),
+            },
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._delay(messages))
+        message = self._respond(messages, kwargs.get("tools"), kwargs.get("tool_choice"))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._delay(messages))
+        message = self._respond(messages, kwargs.get("tools"), kwargs.get("tool_choice"))
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,74 @@
+import asyncio
+import re
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List
+
+from fastapi import FastAPI, Request
+
+
+def phone_key(number: str) -> str:
+    """Digits of a phone number / JID, as used to correlate sends with contacts."""
+    return re.sub(r"\D", "", number.split("@", 1)[0])
+
+
+class ProviderRecorder:
+    """Receive times of the outgoing messages, per recipient."""
+
+    def __init__(self):
+        self.deliveries: Dict[str, List[float]] = defaultdict(list)
+        self._changed = asyncio.Condition()
+
+    async def record(self, number: str) -> None:
+        async with self._changed:
+            self.deliveries[phone_key(number)].append(time.time())
+            self._changed.notify_all()
+
+    async def wait_for(self, number: str, count: int, timeout: float) -> bool:
+        """Waits until `number` received at least `count` messages."""
+        key = phone_key(number)
+        try:
+            async with self._changed:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: len(self.deliveries[key]) >= count),
+                    timeout=timeout,
+                )
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+def create_fake_provider_app(recorder: ProviderRecorder, latency_seconds: float = 0.05) -> FastAPI:
+    """
+    Stand-in for the Evolution API and the WhatsApp Cloud Graph API: accepts
+    text sends, answers like the real provider and records when they arrived.
+    """
+    app = FastAPI(title="Fake WhatsApp providers")
+
+    @app.post("/message/sendText/{instance_id}")
+    async def evolution_send_text(instance_id: str, request: Request):
+        payload = await request.json()
+        await recorder.record(payload["number"])
+        await asyncio.sleep(latency_seconds)
+        return {
+            "key": {
+                "remoteJid": f"{payload['number']}@s.whatsapp.net",
+                "fromMe": True,
+                "id": f"FAKE{uuid.uuid4().hex[:16].upper()}",
+            },
+            "status": "PENDING",
+        }
+
+    @app.post("/{api_version}/{phone_number_id}/messages")
+    async def cloud_send_message(api_version: str, phone_number_id: str, request: Request):
+        payload = await request.json()
+        await recorder.record(payload["to"])
+        await asyncio.sleep(latency_seconds)
+        return {
+            "messaging_product": "whatsapp",
+            "contacts": [{"input": payload["to"], "wa_id": payload["to"]}],
+            "messages": [{"id": f"wamid.FAKE{uuid.uuid4().hex}"}],
+        }
+
+    return app
@@ -0,0 +1,144 @@
+import json
+import os
+from dataclasses import dataclass
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas.company_profile import CompanyProfileSchema
+from app.core.security import encrypt_logical_token
+from app.models.account import Account
+from app.models.bot_agent import BotAgent
+from app.models.bot_agent_inbox import BotAgentInbox
+from app.models.channels.channel_types import ChannelTypeEnum
+from app.models.channels.evolution_instance import (
+    EvolutionInstance,
+    EvolutionInstanceStatus,
+)
+from app.models.channels.whatsapp_cloud_config import WhatsAppCloudConfig
+from app.models.conversation import ConversationStatusEnum
+from app.models.inbox import Inbox
+from app.services.repository import company_profile as profile_repo
+
+# Fixed ids: the benchmark tenant is created once and reused by every run
+BENCH_ACCOUNT_ID = UUID("be9c0000-0000-4000-8000-000000000001")
+BENCH_BOT_AGENT_ID = UUID("be9c0000-0000-4000-8000-000000000002")
+BENCH_EVOLUTION_INSTANCE_ID = UUID("be9c0000-0000-4000-8000-000000000003")
+BENCH_EVOLUTION_INBOX_ID = UUID("be9c0000-0000-4000-8000-000000000004")
+BENCH_CLOUD_CONFIG_ID = UUID("be9c0000-0000-4000-8000-000000000005")
+BENCH_CLOUD_INBOX_ID = UUID("be9c0000-0000-4000-8000-000000000006")
+BENCH_EVOLUTION_INSTANCE_NAME = "pipeline-bench"
+BENCH_CLOUD_PHONE_NUMBER_ID = "990000000000001"
+
+COMPANY_PROFILE_FIXTURE = os.path.join(
+    os.path.dirname(__file__), "..", "..", "data", "company_profiles", "padaria_central.json"
+)
+
+
+@dataclass
+class BenchTenant:
+    account_id: UUID
+    evolution_instance_id: UUID
+    cloud_phone_number_id: str
+
+
+async def ensure_bench_tenant(db: AsyncSession, provider_url: str) -> BenchTenant:
+    """Creates (once) the account, inboxes, channels and bot agent used by the benchmark."""
+    if not await db.get(Account, BENCH_ACCOUNT_ID):
+        logger.info("[pipeline-bench] Creating benchmark tenant...")
+        db.add(Account(id=BENCH_ACCOUNT_ID, name="Pipeline Benchmark"))
+        await db.flush()
+
+        with open(COMPANY_PROFILE_FIXTURE, "r", encoding="utf-8") as f:
+            profile_data = json.load(f)
+        profile_data.pop("id", None)
+        await profile_repo.get_or_create_profile(
+            db=db,
+            account_id=BENCH_ACCOUNT_ID,
+            profile_defaults=CompanyProfileSchema(**profile_data).model_dump(),
+        )
+
+        db.add(
+            EvolutionInstance(
+                id=BENCH_EVOLUTION_INSTANCE_ID,
+                instance_name=BENCH_EVOLUTION_INSTANCE_NAME,
+                shared_api_url=provider_url,
+                logical_token_encrypted=encrypt_logical_token("pipeline-bench"),
+                webhook_url=f"/webhooks/evolution/{BENCH_EVOLUTION_INSTANCE_ID}",
+                status=EvolutionInstanceStatus.CONNECTED,
+                account_id=BENCH_ACCOUNT_ID,
+            )
+        )
+        db.add(
+            WhatsAppCloudConfig(
+                id=BENCH_CLOUD_CONFIG_ID,
+                phone_number_id=BENCH_CLOUD_PHONE_NUMBER_ID,
+                waba_id="990000000000000",
+                encrypted_access_token=encrypt_logical_token("pipeline-bench"),
+                webhook_verify_token="pipeline-bench",
+                account_id=BENCH_ACCOUNT_ID,
+            )
+        )
+        await db.flush()
+
+        db.add_all(
+            [
+                Inbox(
+                    id=BENCH_EVOLUTION_INBOX_ID,
+                    account_id=BENCH_ACCOUNT_ID,
+                    name="Bench Evolution",
+                    channel_id=BENCH_EVOLUTION_INSTANCE_NAME,
+                    channel_type=ChannelTypeEnum.WHATSAPP_EVOLUTION,
+                    initial_conversation_status=ConversationStatusEnum.BOT,
+                    evolution_instance_id=BENCH_EVOLUTION_INSTANCE_ID,
+                ),
+                Inbox(
+                    id=BENCH_CLOUD_INBOX_ID,
+                    account_id=BENCH_ACCOUNT_ID,
+                    name="Bench Cloud",
+                    channel_id=BENCH_CLOUD_PHONE_NUMBER_ID,
+                    channel_type=ChannelTypeEnum.WHATSAPP_CLOUD,
+                    initial_conversation_status=ConversationStatusEnum.BOT,
+                    whatsapp_cloud_config_id=BENCH_CLOUD_CONFIG_ID,
+                ),
+                BotAgent(id=BENCH_BOT_AGENT_ID, account_id=BENCH_ACCOUNT_ID),
+            ]
+        )
+        await db.flush()
+        db.add_all(
+            [
+                BotAgentInbox(
+                    account_id=BENCH_ACCOUNT_ID,
+                    inbox_id=inbox_id,
+                    bot_agent_id=BENCH_BOT_AGENT_ID,
+                )
+                for inbox_id in (BENCH_EVOLUTION_INBOX_ID, BENCH_CLOUD_INBOX_ID)
+            ]
+        )
+        await db.commit()
+        logger.success("[pipeline-bench] Benchmark tenant created.")
+
+    return BenchTenant(
+        account_id=BENCH_ACCOUNT_ID,
+        evolution_instance_id=BENCH_EVOLUTION_INSTANCE_ID,
+        cloud_phone_number_id=BENCH_CLOUD_PHONE_NUMBER_ID,
+    )
+
+
+async def delete_bench_conversations(db: AsyncSession) -> None:
+    """Removes the conversations (and their messages/contacts) produced by previous runs."""
+    params = {"account_id": BENCH_ACCOUNT_ID}
+    for statement in (
+        "DELETE FROM message_dispatches WHERE account_id = :account_id",
+        "DELETE FROM messages WHERE account_id = :account_id",
+        "DELETE FROM events WHERE account_id = :account_id",
+        "DELETE FROM conversations WHERE account_id = :account_id",
+        "DELETE FROM contact_inboxes WHERE contact_id IN "
+        "(SELECT id FROM contacts WHERE account_id = :account_id)",
+        "DELETE FROM contacts WHERE account_id = :account_id",
+    ):
+        await db.execute(text(statement), params)
+    await db.commit()
+    logger.info("[pipeline-bench] Previous benchmark conversations deleted.")
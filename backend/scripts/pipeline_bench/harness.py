@@ -0,0 +1,440 @@
+"""
+In-process end-to-end run of the message pipeline.
+
+webhook (FastAPI) -> message consumer (ARQ) -> debounce -> AI replier (ARQ,
+fake chat model) -> outbox relay / response sender -> fake provider server.
+
+Every component is the production one, started in this process against the
+configured Postgres and Redis; only the LLM and the WhatsApp providers are
+replaced. Import it only after the provider URLs were pointed at the fake
+server (see scripts/pipeline_bench_cli.py): the app reads its settings at
+import time.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+import uvicorn
+from arq.worker import Function, create_worker, func
+from loguru import logger
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models.message import Message
+from app.services.debounce.message_debounce import MessageDebounceService
+from app.workers.ai_replier import ai_replier
+from app.workers.ai_replier.tasks.message_handler_task import handle_ai_reply_request
+from app.workers.consumer import message_processor_worker
+from app.workers.response_sender.response_sender import ResponseSender
+from scripts.pipeline_bench.fake_llm import FakeChatModel
+from scripts.pipeline_bench.fake_provider import (
+    ProviderRecorder,
+    create_fake_provider_app,
+)
+from scripts.pipeline_bench.fixtures import (
+    BenchTenant,
+    delete_bench_conversations,
+    ensure_bench_tenant,
+)
+
+settings = get_settings()
+
+STAGES = ("webhook_to_stored", "stored_to_ai_enqueued", "ai_turn", "ai_to_sent", "end_to_end")
+
+_CUSTOMER_LINES = [
+    "Oi, vocês têm pão de queijo hoje?",
+    "Quanto custa o combo de café da manhã?",
+    "Vocês entregam no centro?",
+    "Quero encomendar um bolo de chocolate para sábado.",
+    "Aceitam pix?",
+    "Qual o horário de funcionamento?",
+]
+
+
+@dataclass
+class BenchConfig:
+    conversations: int = 20
+    turns: int = 3
+    channel: str = "evolution"  # evolution | cloud | mixed
+    llm_latency_seconds: float = 0.5
+    llm_jitter_seconds: float = 0.0
+    tool_call_every: int = 0
+    tool_name: Optional[str] = None
+    provider_latency_seconds: float = 0.05
+    debounce_seconds: float = 0.0
+    reply_timeout_seconds: float = 60.0
+    think_time_seconds: float = 0.0
+    api_port: int = 18000
+    provider_port: int = 18001
+    seed: int = 0
+    reset_data: bool = True
+
+
+@dataclass
+class AiJobTiming:
+    conversation_id: str
+    enqueued: float
+    started: float
+    finished: float
+
+
+@dataclass
+class BenchResult:
+    config: Dict[str, Any]
+    wall_seconds: float
+    turns_sent: int
+    turns_completed: int
+    throughput_turns_per_second: float
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    llm_calls: int = 0
+    llm_tool_calls: int = 0
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    """count / mean / p50 / p95 / p99 / max, in milliseconds."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(value * 1000 for value in values)
+
+    def percentile(pct: float) -> float:
+        return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+    return {
+        "count": len(ordered),
+        "mean": statistics.mean(ordered),
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": ordered[-1],
+    }
+
+
+class PipelineBench:
+    def __init__(self, config: BenchConfig):
+        self.config = config
+        self.recorder = ProviderRecorder()
+        self.llm = FakeChatModel(
+            latency_seconds=config.llm_latency_seconds,
+            jitter_seconds=config.llm_jitter_seconds,
+            tool_call_every=config.tool_call_every,
+            tool_name=config.tool_name,
+            seed=config.seed,
+        )
+        self.ai_jobs: List[AiJobTiming] = []
+        # source_id -> (phone, webhook sent at)
+        self.webhooks: Dict[str, tuple] = {}
+        self.timeouts = 0
+        self._servers: List[tuple] = []
+        self._workers: List[tuple] = []
+        self._sender_task: Optional[asyncio.Task] = None
+
+    # --- components ---
+
+    async def _serve(self, app: Any, port: int) -> None:
+        server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+        )
+        task = asyncio.create_task(server.serve())
+        while not server.started:
+            if task.done():
+                task.result()  # Surfaces the startup error
+            await asyncio.sleep(0.05)
+        self._servers.append((server, task))
+
+    async def _timed_ai_reply(self, ctx: dict, *args, **kwargs):
+        started = time.time()
+        try:
+            return await handle_ai_reply_request(ctx, *args, **kwargs)
+        finally:
+            if kwargs.get("event_type") == "user_message":
+                self.ai_jobs.append(
+                    AiJobTiming(
+                        conversation_id=str(kwargs.get("conversation_id")),
+                        enqueued=ctx["enqueue_time"].timestamp(),
+                        started=started,
+                        finished=time.time(),
+                    )
+                )
+
+    async def _start_workers(self) -> None:
+        consumer_settings = message_processor_worker.WorkerSettings
+        replier_settings = ai_replier.WorkerSettings
+
+        async def consumer_startup(ctx: dict):
+            await consumer_settings.on_startup(ctx)
+            ctx["message_debounce_service_instance"] = MessageDebounceService(
+                redis_client=ctx["redis"],
+                default_delay_seconds=self.config.debounce_seconds,
+            )
+
+        async def replier_startup(ctx: dict):
+            await replier_settings.on_startup(ctx)
+            ctx["llm_primary"] = self.llm
+            ctx["llm_fast"] = self.llm
+
+        replier_functions = [
+            function
+            for function in replier_settings.functions
+            if getattr(function, "__name__", getattr(function, "name", None))
+            != "handle_ai_reply_request"
+        ]
+        replier_functions.append(func(self._timed_ai_reply, name="handle_ai_reply_request"))
+
+        for settings_cls, overrides in (
+            (consumer_settings, {"on_startup": consumer_startup}),
+            (
+                replier_settings,
+                {"on_startup": replier_startup, "functions": replier_functions},
+            ),
+        ):
+            worker = create_worker(
+                settings_cls, handle_signals=False, cron_jobs=[], **overrides
+            )
+            self._workers.append((worker, asyncio.create_task(worker.async_run())))
+
+        sender = ResponseSender()
+        await sender.queue.connect()
+        self._sender_task = asyncio.create_task(sender.run())
+
+    async def start(self) -> BenchTenant:
+        from app.main import app as api_app
+
+        provider_url = f"http://127.0.0.1:{self.config.provider_port}"
+        await self._serve(
+            create_fake_provider_app(self.recorder, self.config.provider_latency_seconds),
+            self.config.provider_port,
+        )
+        async with AsyncSessionLocal() as db:
+            tenant = await ensure_bench_tenant(db, provider_url)
+            if self.config.reset_data:
+                await delete_bench_conversations(db)
+        await self._serve(api_app, self.config.api_port)
+        await self._start_workers()
+        return tenant
+
+    async def stop(self) -> None:
+        if self._sender_task:
+            self._sender_task.cancel()
+            await asyncio.gather(self._sender_task, return_exceptions=True)
+        for worker, task in self._workers:
+            try:
+                await worker.close()
+            except Exception as e:
+                logger.warning(f"[pipeline-bench] Worker shutdown error: {e}")
+            await asyncio.gather(task, return_exceptions=True)
+        for server, task in reversed(self._servers):
+            server.should_exit = True
+            await asyncio.gather(task, return_exceptions=True)
+
+    # --- load ---
+
+    def _webhook_request(self, tenant: BenchTenant, channel: str, phone: str, text: str):
+        source_id = f"BENCH{uuid.uuid4().hex.upper()}"
+        now = int(time.time())
+        if channel == "evolution":
+            url = f"/webhooks/evolution/{tenant.evolution_instance_id}"
+            payload = {
+                "event": "messages.upsert",
+                "instance": "pipeline-bench",
+                "data": {
+                    "key": {
+                        "remoteJid": f"{phone}@s.whatsapp.net",
+                        "fromMe": False,
+                        "id": source_id,
+                    },
+                    "pushName": f"Bench {phone[-4:]}",
+                    "message": {"conversation": text},
+                    "messageType": "conversation",
+                    "messageTimestamp": now,
+                    "instanceId": str(tenant.evolution_instance_id),
+                    "source": "android",
+                },
+                "destination": f"http://127.0.0.1:{self.config.api_port}",
+                "date_time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "server_url": f"http://127.0.0.1:{self.config.provider_port}",
+                "apikey": "pipeline-bench",
+            }
+        else:
+            url = f"/webhooks/whatsapp/cloud/{tenant.cloud_phone_number_id}"
+            payload = {
+                "object": "whatsapp_business_account",
+                "entry": [
+                    {
+                        "id": "990000000000000",
+                        "changes": [
+                            {
+                                "field": "messages",
+                                "value": {
+                                    "messaging_product": "whatsapp",
+                                    "metadata": {
+                                        "display_phone_number": "5511900000000",
+                                        "phone_number_id": tenant.cloud_phone_number_id,
+                                    },
+                                    "contacts": [
+                                        {"profile": {"name": f"Bench {phone[-4:]}"}, "wa_id": phone}
+                                    ],
+                                    "messages": [
+                                        {
+                                            "from": phone,
+                                            "id": source_id,
+                                            "timestamp": str(now),
+                                            "type": "text",
+                                            "text": {"body": text},
+                                        }
+                                    ],
+                                },
+                            }
+                        ],
+                    }
+                ],
+            }
+        body = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json"}
+        if channel == "cloud" and settings.META_APP_SECRET:
+            signature = hmac.new(
+                settings.META_APP_SECRET.encode(), body, hashlib.sha256
+            ).hexdigest()
+            headers["X-Hub-Signature-256"] = f"sha256={signature}"
+        return source_id, url, body, headers
+
+    async def _conversation(
+        self, client: httpx.AsyncClient, tenant: BenchTenant, index: int, phone: str
+    ) -> None:
+        channel = self.config.channel
+        if channel == "mixed":
+            channel = "evolution" if index % 2 == 0 else "cloud"
+        for turn in range(self.config.turns):
+            text = _CUSTOMER_LINES[(index + turn) % len(_CUSTOMER_LINES)]
+            source_id, url, body, headers = self._webhook_request(tenant, channel, phone, text)
+            self.webhooks[source_id] = (phone, time.time())
+            response = await client.post(url, content=body, headers=headers)
+            if response.status_code >= 400:
+                logger.error(
+                    f"[pipeline-bench] Webhook rejected ({response.status_code}): {response.text}"
+                )
+                return
+            if not await self.recorder.wait_for(
+                phone, turn + 1, self.config.reply_timeout_seconds
+            ):
+                self.timeouts += 1
+                logger.warning(f"[pipeline-bench] No reply for {phone} turn {turn}.")
+                return
+            if self.config.think_time_seconds:
+                await asyncio.sleep(self.config.think_time_seconds)
+
+    async def drive(self, tenant: BenchTenant) -> float:
+        """Runs the conversations concurrently; returns the wall time."""
+        run_tag = int(time.time()) % 10_000
+        phones = [f"55119{run_tag:04d}{index:04d}" for index in range(self.config.conversations)]
+        started = time.perf_counter()
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{self.config.api_port}", timeout=30.0
+        ) as client:
+            await asyncio.gather(
+                *(
+                    self._conversation(client, tenant, index, phone)
+                    for index, phone in enumerate(phones)
+                )
+            )
+        return time.perf_counter() - started
+
+    # --- report ---
+
+    async def collect(self, wall_seconds: float) -> BenchResult:
+        stored: Dict[str, tuple] = {}
+        source_ids = list(self.webhooks)
+        async with AsyncSessionLocal() as db:
+            for start in range(0, len(source_ids), 500):
+                rows = await db.execute(
+                    select(Message.source_id, Message.created_at, Message.conversation_id).where(
+                        Message.source_id.in_(source_ids[start : start + 500])
+                    )
+                )
+                for source_id, created_at, conversation_id in rows:
+                    stored[source_id] = (created_at.timestamp(), str(conversation_id))
+
+        # Turns of a conversation are sequential: the k-th webhook of a phone,
+        # the k-th AI job of its conversation and its k-th delivery line up.
+        turns_by_phone: Dict[str, List[tuple]] = defaultdict(list)
+        for source_id, (phone, sent_at) in self.webhooks.items():
+            turns_by_phone[phone].append((sent_at, source_id))
+        jobs_by_conversation: Dict[str, List[AiJobTiming]] = defaultdict(list)
+        for job in sorted(self.ai_jobs, key=lambda job: job.enqueued):
+            jobs_by_conversation[job.conversation_id].append(job)
+
+        samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        completed = 0
+        for phone, turns in turns_by_phone.items():
+            deliveries = self.recorder.deliveries.get(phone, [])
+            for position, (sent_at, source_id) in enumerate(sorted(turns)):
+                stored_at, conversation_id = stored.get(source_id, (None, None))
+                jobs = jobs_by_conversation.get(conversation_id, [])
+                job = jobs[position] if position < len(jobs) else None
+                delivered_at = deliveries[position] if position < len(deliveries) else None
+                if stored_at is not None:
+                    samples["webhook_to_stored"].append(stored_at - sent_at)
+                if job and stored_at is not None:
+                    samples["stored_to_ai_enqueued"].append(job.enqueued - stored_at)
+                if job:
+                    samples["ai_turn"].append(job.finished - job.started)
+                if job and delivered_at is not None:
+                    samples["ai_to_sent"].append(delivered_at - job.finished)
+                if delivered_at is not None:
+                    samples["end_to_end"].append(delivered_at - sent_at)
+                    completed += 1
+
+        return BenchResult(
+            config=asdict(self.config),
+            wall_seconds=wall_seconds,
+            turns_sent=len(self.webhooks),
+            turns_completed=completed,
+            throughput_turns_per_second=completed / wall_seconds if wall_seconds else 0.0,
+            stages={stage: latency_summary(values) for stage, values in samples.items()},
+            llm_calls=self.llm.stats["calls"],
+            llm_tool_calls=self.llm.stats["tool_calls"],
+        )
+
+
+async def run_bench(config: BenchConfig) -> BenchResult:
+    bench = PipelineBench(config)
+    tenant = await bench.start()
+    try:
+        # Let the workers register before the first webhook
+        await asyncio.sleep(1.0)
+        wall_seconds = await bench.drive(tenant)
+        # Deliveries are recorded on arrival; give the sender a moment to commit
+        await asyncio.sleep(0.5)
+    finally:
+        await bench.stop()
+    if bench.timeouts:
+        logger.warning(f"[pipeline-bench] {bench.timeouts} conversations timed out.")
+    return await bench.collect(wall_seconds)
+
+
+def format_result(result: BenchResult) -> str:
+    lines = [
+        f"turns: {result.turns_completed}/{result.turns_sent} in {result.wall_seconds:.1f}s "
+        f"({result.throughput_turns_per_second:.2f} turns/s) | "
+        f"LLM calls: {result.llm_calls} (tool calls: {result.llm_tool_calls})",
+        f"{'stage':>22} | {'n':>5} | {'p50':>9} | {'p95':>9} | {'p99':>9}",
+    ]
+    for stage in STAGES:
+        summary = result.stages.get(stage, {})
+        if not summary.get("count"):
+            lines.append(f"{stage:>22} | {0:>5} | {'-':>9} | {'-':>9} | {'-':>9}")
+            continue
+        lines.append(
+            f"{stage:>22} | {summary['count']:>5} | {summary['p50']:>7.1f}ms | "
+            f"{summary['p95']:>7.1f}ms | {summary['p99']:>7.1f}ms"
+        )
+    return "\n".join(lines)
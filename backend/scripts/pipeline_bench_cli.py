@@ -0,0 +1,224 @@
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+from typing import Annotated, Dict, List, Optional
+
+import typer
+
+# --- Setup sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# ----------------------
+
+# App modules are imported lazily (see _prepare_environment): the settings are
+# read at import time and the providers must already point at the fake server.
+
+app = typer.Typer(
+    help=(
+        "End-to-end pipeline benchmark: synthetic webhooks -> consumer -> AI replier "
+        "(fake LLM) -> response sender -> fake provider, against local Postgres/Redis."
+    )
+)
+
+BENCH_FILES = ("scripts/pipeline_bench", "scripts/pipeline_bench_cli.py")
+
+
+def _prepare_environment(provider_port: int) -> None:
+    """Points the providers at the fake server and turns the Cloud Run wake-ups off."""
+    provider_url = f"http://127.0.0.1:{provider_port}"
+    os.environ["EVOLUTION_API_SHARED_URL"] = provider_url
+    os.environ["WHATSAPP_GRAPH_API_BASE_URL"] = provider_url
+    for name in (
+        "MESSAGE_CONSUMER_WORKER_INTERNAL_URL",
+        "AI_REPLIER_INTERNAL_URL",
+        "RESPONSE_SENDER_WORKER_INTERNAL_URL",
+        "BATCH_WORKER_INTERNAL_URL",
+    ):
+        os.environ[name] = ""
+
+
+@app.command()
+def run(
+    conversations: Annotated[int, typer.Option(help="Concurrent conversations.")] = 20,
+    turns: Annotated[int, typer.Option(help="Customer messages per conversation.")] = 3,
+    channel: Annotated[str, typer.Option(help="evolution | cloud | mixed.")] = "evolution",
+    llm_latency: Annotated[float, typer.Option(help="Fake LLM latency per call (s).")] = 0.5,
+    llm_jitter: Annotated[float, typer.Option(help="Extra seeded LLM latency, up to (s).")] = 0.0,
+    tool_call_every: Annotated[
+        int, typer.Option(help="Every Nth LLM call invokes --tool-name (0 = never).")
+    ] = 0,
+    tool_name: Annotated[Optional[str], typer.Option(help="Agent tool called by the fake LLM.")] = None,
+    provider_latency: Annotated[float, typer.Option(help="Fake provider latency (s).")] = 0.05,
+    debounce: Annotated[float, typer.Option(help="Message debounce window (s).")] = 0.0,
+    reply_timeout: Annotated[float, typer.Option(help="Max wait for each reply (s).")] = 60.0,
+    think_time: Annotated[float, typer.Option(help="Pause between turns (s).")] = 0.0,
+    api_port: Annotated[int, typer.Option(help="Port of the in-process API.")] = 18000,
+    provider_port: Annotated[int, typer.Option(help="Port of the fake provider.")] = 18001,
+    seed: Annotated[int, typer.Option(help="Seed of the fake LLM.")] = 0,
+    keep_data: Annotated[
+        bool, typer.Option(help="Keep the conversations of previous runs.")
+    ] = False,
+    json_out: Annotated[Optional[Path], typer.Option(help="Write the result as JSON.")] = None,
+):
+    """Runs the whole pipeline in this process and reports per-stage latencies."""
+    if channel not in ("evolution", "cloud", "mixed"):
+        raise typer.BadParameter("channel must be evolution, cloud or mixed")
+    _prepare_environment(provider_port)
+
+    from scripts.pipeline_bench.harness import (
+        BenchConfig,
+        format_result,
+        run_bench,
+    )
+
+    config = BenchConfig(
+        conversations=conversations,
+        turns=turns,
+        channel=channel,
+        llm_latency_seconds=llm_latency,
+        llm_jitter_seconds=llm_jitter,
+        tool_call_every=tool_call_every,
+        tool_name=tool_name,
+        provider_latency_seconds=provider_latency,
+        debounce_seconds=debounce,
+        reply_timeout_seconds=reply_timeout,
+        think_time_seconds=think_time,
+        api_port=api_port,
+        provider_port=provider_port,
+        seed=seed,
+        reset_data=not keep_data,
+    )
+    result = asyncio.run(run_bench(config))
+    typer.echo(format_result(result))
+    if json_out:
+        json_out.write_text(json.dumps(asdict(result), indent=2))
+        typer.echo(f"Result written to {json_out}")
+
+
+def _checkout(revision: str, workdir: Path, repo_root: Path) -> Path:
+    """Detached worktree of `revision` with the current benchmark copied in."""
+    subprocess.run(
+        ["git", "worktree", "add", "--detach", str(workdir), revision],
+        cwd=repo_root,
+        check=True,
+        capture_output=True,
+    )
+    backend = workdir / Path(project_root).relative_to(repo_root)
+    for relative in BENCH_FILES:
+        source = Path(project_root) / relative
+        target = backend / relative
+        if source.is_dir():
+            shutil.rmtree(target, ignore_errors=True)
+            shutil.copytree(source, target, ignore=shutil.ignore_patterns("__pycache__"))
+        else:
+            shutil.copy2(source, target)
+    return backend
+
+
+def _run_revision(backend: Path, run_args: List[str], migrate: bool) -> Dict:
+    env = {**os.environ, "PYTHONPATH": str(backend)}
+    if migrate:
+        subprocess.run(["alembic", "upgrade", "head"], cwd=backend, env=env, check=True)
+    result_path = backend / "pipeline_bench_result.json"
+    subprocess.run(
+        [
+            sys.executable,
+            "scripts/pipeline_bench_cli.py",
+            "run",
+            *run_args,
+            "--json-out",
+            str(result_path),
+        ],
+        cwd=backend,
+        env=env,
+        check=True,
+    )
+    return json.loads(result_path.read_text())
+
+
+@app.command(context_settings={"allow_extra_args": True, "ignore_unknown_options": True})
+def compare(
+    ctx: typer.Context,
+    base: Annotated[str, typer.Argument(help="Baseline git revision.")],
+    head: Annotated[str, typer.Argument(help="Candidate git revision.")] = "HEAD",
+    migrate: Annotated[
+        bool,
+        typer.Option(help="Run `alembic upgrade head` before each revision (use a dedicated bench DB)."),
+    ] = False,
+    json_out: Annotated[Optional[Path], typer.Option(help="Write both results as JSON.")] = None,
+):
+    """
+    Runs the same workload on two git revisions and prints the deltas.
+
+    Extra options are forwarded to `run` (e.g. `compare main HEAD --conversations 50`).
+    Each revision runs from a temporary worktree with the current benchmark code.
+    Revisions without the WHATSAPP_GRAPH_API_BASE_URL setting can only be
+    compared on the evolution channel. Timings mix the DB clock (created_at)
+    with the host clock, so run Postgres on the same machine.
+    """
+    repo_root = Path(
+        subprocess.run(
+            ["git", "rev-parse", "--show-toplevel"],
+            cwd=project_root,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    )
+    results: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory(prefix="pipeline-bench-") as tmp:
+        for revision in (base, head):
+            workdir = Path(tmp) / f"rev-{len(results)}"
+            typer.echo(f"\n=== {revision} ===")
+            try:
+                backend = _checkout(revision, workdir, repo_root)
+                results[revision] = _run_revision(backend, list(ctx.args), migrate)
+            finally:
+                subprocess.run(
+                    ["git", "worktree", "remove", "--force", str(workdir)],
+                    cwd=repo_root,
+                    capture_output=True,
+                )
+
+    before, after = results[base], results[head]
+    typer.echo(f"\n{'metric':>34} | {base[:12]:>12} | {head[:12]:>12} | {'delta':>8}")
+    rows = [
+        (
+            "throughput (turns/s)",
+            before["throughput_turns_per_second"],
+            after["throughput_turns_per_second"],
+        )
+    ]
+    for stage, summary in before["stages"].items():
+        for key in ("p50", "p95", "p99"):
+            if key in summary and key in after["stages"].get(stage, {}):
+                rows.append((f"{stage} {key} (ms)", summary[key], after["stages"][stage][key]))
+    for label, old, new in rows:
+        delta = f"{(new - old) / old * 100:+.1f}%" if old else "-"
+        typer.echo(f"{label:>34} | {old:>12.2f} | {new:>12.2f} | {delta:>8}")
+    if json_out:
+        json_out.write_text(json.dumps({"base": before, "head": after}, indent=2))
+
+
+@app.command()
+def cleanup():
+    """Deletes the conversations, messages and contacts created by the benchmark."""
+    from app.database import AsyncSessionLocal
+    from scripts.pipeline_bench.fixtures import delete_bench_conversations
+
+    async def _cleanup():
+        async with AsyncSessionLocal() as db:
+            await delete_bench_conversations(db)
+
+    asyncio.run(_cleanup())
+
+
+if __name__ == "__main__":
+    app()
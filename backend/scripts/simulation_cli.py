@@ -5,7 +5,7 @@ import os
 import sys
 import json
 from uuid import UUID
-from typing import Annotated, Optional
+from typing import Annotated, List, Optional
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -17,7 +17,12 @@ if project_root not in sys.path:
 # ----------------------
 
 # --- App Imports ---
-from app.simulation.runner import run_single_simulation
+from app.simulation.config import SIMULATION_BATCH_CONCURRENCY
+from app.simulation.runner import run_single_simulation, run_simulation_batch
+from app.simulation.load_test import run_load_test, summarize_load_test
+from app.simulation.schemas.load_test import LoadTestConfig
+from app.simulation.utils.load_profile import parse_load_profile
+from app.simulation.repositories import persona as persona_repo
 from app.simulation.personas import generator as persona_generator
 from app.simulation.personas import importer as persona_importer
 
@@ -181,6 +186,213 @@ def run(
         raise typer.Exit(code=1)
 
 
+@app.command(name="run-batch")
+def run_batch(
+    persona_id_strs: Annotated[
+        Optional[List[str]],
+        typer.Argument(help="persona_ids to run (omit with --all)."),
+    ] = None,
+    all_personas: Annotated[
+        bool,
+        typer.Option("--all", help="Run every persona of the simulation account."),
+    ] = False,
+    limit: Annotated[
+        int, typer.Option(help="Maximum personas loaded with --all.")
+    ] = 100,
+    concurrency: Annotated[
+        int,
+        typer.Option("--concurrency", "-c", help="Simulations running at once."),
+    ] = SIMULATION_BATCH_CONCURRENCY,
+    reset: Annotated[
+        bool, typer.Option("--reset", help="Reset conversation history before running.")
+    ] = False,
+):
+    """
+    Runs several personas concurrently, each on its own simulation conversation,
+    and prints a summary per persona.
+    """
+    if not persona_id_strs and not all_personas:
+        logger.error("Pass persona ids or --all.")
+        raise typer.Exit(code=1)
+
+    async def _run_batch():
+        async with AsyncSessionLocal() as db:
+            account = await _get_simulation_account(db, SIMULATION_ACCOUNT_ID)
+            persona_ids = list(persona_id_strs or [])
+            if all_personas:
+                personas = await persona_repo.get_all_personas(db, limit=limit)
+                persona_ids += [
+                    persona.persona_id
+                    for persona in personas
+                    if persona.contact and persona.contact.account_id == account.id
+                ]
+        if not persona_ids:
+            raise ValueError("No personas to run.")
+
+        summaries = await run_simulation_batch(
+            account=account,
+            persona_id_strs=persona_ids,
+            concurrency=concurrency,
+            reset_conversation=reset,
+        )
+
+        print("\n--- Simulation Batch ---")
+        print(f"{'persona':<32} {'status':<10} {'outcome':<28} {'turns':>5} {'secs':>7}")
+        for summary in summaries:
+            print(
+                f"{summary['persona_id']:<32} {str(summary['status'].value):<10} "
+                f"{str(summary['outcome'].value if summary['outcome'] else '-'):<28} "
+                f"{summary['turns']:>5} {summary['duration_seconds']:>7.1f}"
+            )
+        return summaries
+
+    try:
+        summaries = asyncio.run(_run_batch())
+    except ValueError as ve:
+        logger.error(f"Error during simulation batch: {ve}")
+        raise typer.Exit(code=1)
+    except Exception as e:
+        logger.exception(f"Unexpected error during simulation batch: {e}")
+        raise typer.Exit(code=1)
+    failed = sum(s["status"] != "completed" for s in summaries)
+    logger.success(f"Simulation batch finished: {len(summaries) - failed}/{len(summaries)} completed.")
+
+
+def _print_load_test_report(report: dict) -> None:
+    def _latency(summary: dict) -> str:
+        if not summary.get("count"):
+            return "-"
+        return f"p50 {summary['p50']:.0f}  p95 {summary['p95']:.0f}  p99 {summary['p99']:.0f}  max {summary['max']:.0f} ms"
+
+    print(f"\n--- Load Test {report['run_id']} ---")
+    print(
+        f"conversations: {report['conversations']}  turns: {report['turns_answered']}/{report['turns_attempted']} answered  "
+        f"error rate: {report['error_rate']:.2%}  errors: {report['errors'] or '-'}"
+    )
+    print(f"latency: {_latency(report['latency_ms'])}")
+    print(f"\n{'window':>8} {'rate/s':>7} {'turns':>6} {'errors':>7}  latency")
+    for window in report["windows"]:
+        print(
+            f"{window['start_seconds']:>7.0f}s {window['target_rate']:>7.2f} {window['turns_attempted']:>6} "
+            f"{window['error_rate']:>7.2%}  {_latency(window['latency_ms'])}"
+        )
+    saturation = report["saturation"]
+    if saturation:
+        print(
+            f"\nsaturation: window at {saturation['start_seconds']:.0f}s, "
+            f"~{saturation['target_rate']:.2f} new conversations/s"
+        )
+    else:
+        print("\nsaturation: not reached")
+
+
+@app.command(name="load-test")
+def load_test(
+    profile: Annotated[
+        str,
+        typer.Option(
+            "--profile",
+            "-p",
+            help="Ramp stages 'seconds:rate,...' (new conversations/s; each stage ramps from the previous rate, 0s jumps).",
+        ),
+    ] = "60:1,120:1",
+    personas: Annotated[
+        Optional[List[str]],
+        typer.Option("--persona", help="Template persona_id (repeatable; default: all of the account)."),
+    ] = None,
+    script_file: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--script-file",
+            exists=True,
+            dir_okay=False,
+            resolve_path=True,
+            help="JSON list of {persona_id?, utterances} to replay instead of cached persona messages.",
+        ),
+    ] = None,
+    max_turns: Annotated[int, typer.Option(help="Persona messages per conversation.")] = 5,
+    think_time: Annotated[
+        float, typer.Option(help="Mean seconds between an AI reply and the next message.")
+    ] = 2.0,
+    timeout: Annotated[float, typer.Option(help="Seconds to wait for each AI reply.")] = 60.0,
+    max_in_flight: Annotated[
+        int, typer.Option(help="Open conversations cap; arrivals beyond it are dropped.")
+    ] = 500,
+    seed: Annotated[int, typer.Option(help="Script choice / think time seed.")] = 0,
+    window: Annotated[float, typer.Option(help="Report window in seconds.")] = 30.0,
+    slo_p95_ms: Annotated[
+        Optional[float], typer.Option(help="p95 reply latency above which a window is saturated.")
+    ] = None,
+):
+    """
+    Persona-driven load test: replays scripted or cached persona messages on
+    fresh simulation conversations, started at the rate of --profile, through
+    the real consumer / AI replier chain (no persona LLM). Per-turn latencies
+    and errors are recorded in the simulation tables.
+    """
+    try:
+        config = LoadTestConfig(
+            stages=parse_load_profile(profile),
+            persona_ids=personas or [],
+            script_file=str(script_file) if script_file else None,
+            max_turns=max_turns,
+            think_time_seconds=think_time,
+            reply_timeout_seconds=timeout,
+            max_in_flight=max_in_flight,
+            seed=seed,
+        )
+    except ValueError as ve:
+        logger.error(f"Invalid load test options: {ve}")
+        raise typer.Exit(code=1)
+
+    async def _load_test():
+        async with AsyncSessionLocal() as db:
+            account = await _get_simulation_account(db, SIMULATION_ACCOUNT_ID)
+        run_id = await run_load_test(account, config)
+        async with AsyncSessionLocal() as db:
+            return await summarize_load_test(
+                db, run_id, window_seconds=window, slo_p95_ms=slo_p95_ms
+            )
+
+    try:
+        report = asyncio.run(_load_test())
+    except ValueError as ve:
+        logger.error(f"Error during load test: {ve}")
+        raise typer.Exit(code=1)
+    except Exception as e:
+        logger.exception(f"Unexpected error during load test: {e}")
+        raise typer.Exit(code=1)
+    _print_load_test_report(report)
+
+
+@app.command(name="load-test-report")
+def load_test_report(
+    run_id: Annotated[UUID, typer.Argument(help="Run id printed by load-test.")],
+    window: Annotated[float, typer.Option(help="Report window in seconds.")] = 30.0,
+    slo_p95_ms: Annotated[
+        Optional[float], typer.Option(help="p95 reply latency above which a window is saturated.")
+    ] = None,
+    as_json: Annotated[bool, typer.Option("--json", help="Print the report as JSON.")] = False,
+):
+    """Rebuilds the report of a load test run from the simulation tables."""
+
+    async def _report():
+        async with AsyncSessionLocal() as db:
+            return await summarize_load_test(
+                db, run_id, window_seconds=window, slo_p95_ms=slo_p95_ms
+            )
+
+    try:
+        report = asyncio.run(_report())
+    except ValueError as ve:
+        logger.error(f"Error building load test report: {ve}")
+        raise typer.Exit(code=1)
+    if as_json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_load_test_report(report)
+
+
 @app.command(name="generate-persona")
 def generate_persona_cli(
     persona_type: Annotated[
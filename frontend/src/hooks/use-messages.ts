@@ -46,8 +46,9 @@ export function useMessages(
   const [hasMoreOlder, setHasMoreOlder] = useState<boolean>(true);
   const [hasMoreNewer, setHasMoreNewer] = useState<boolean>(false);
 
-  const oldestMessageCursorRef = useRef<string | null>(null);
-  const newestMessageCursorRef = useRef<string | null>(null);
+  // Cursor messages: their id and sent_at (the partition key) are sent to the API
+  const oldestMessageCursorRef = useRef<Message | null>(null);
+  const newestMessageCursorRef = useRef<Message | null>(null);
   const isLoading = useRef<boolean>(false);
   const initialLoadWasContext = useRef<boolean>(false);
 
@@ -130,9 +131,9 @@ export function useMessages(
         setHasMoreNewer(fetchedHasMoreNewer);
 
         if (processedMessages.length > 0) {
-          oldestMessageCursorRef.current = processedMessages[0].id;
-          newestMessageCursorRef.current = processedMessages[processedMessages.length - 1].id;
-          console.log("Initial cursors set:", oldestMessageCursorRef.current, newestMessageCursorRef.current);
+          oldestMessageCursorRef.current = processedMessages[0];
+          newestMessageCursorRef.current = processedMessages[processedMessages.length - 1];
+          console.log("Initial cursors set:", oldestMessageCursorRef.current.id, newestMessageCursorRef.current.id);
           console.log("Initial hasMore:", fetchedHasMoreOlder, fetchedHasMoreNewer);
         } else {
           oldestMessageCursorRef.current = null;
@@ -172,13 +173,16 @@ export function useMessages(
       else setLoadingNewer(true);
       setError(null);
 
-      const params: { limit: number; before_cursor?: string; after_cursor?: string } = {
+      const params: { limit: number; before_cursor?: string; after_cursor?: string; cursor_sent_at?: string } = {
           limit: MESSAGES_PER_PAGE,
       };
       if (direction === 'older') {
-          params.before_cursor = cursor;
+          params.before_cursor = cursor.id;
       } else {
-          params.after_cursor = cursor;
+          params.after_cursor = cursor.id;
+      }
+      if (cursor.sent_at) {
+          params.cursor_sent_at = cursor.sent_at;
       }
 
       const url = `/api/v1/conversations/${conversationId}/messages`;
@@ -198,9 +202,9 @@ export function useMessages(
               });
 
               if (direction === 'older') {
-                  oldestMessageCursorRef.current = fetchedMessages[0].id;
+                  oldestMessageCursorRef.current = fetchedMessages[0];
               } else {
-                  newestMessageCursorRef.current = fetchedMessages[fetchedMessages.length - 1].id;
+                  newestMessageCursorRef.current = fetchedMessages[fetchedMessages.length - 1];
               }
           }
 